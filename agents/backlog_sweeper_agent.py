@@ -12,6 +12,64 @@ except ImportError:
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from integrators.azure_devops_api import AzureDevOpsIntegrator
+from utils.text_feature_cache import TextFeatureCache
+
+HIERARCHY_FORWARD = 'System.LinkTypes.Hierarchy-Forward'
+HIERARCHY_REVERSE = 'System.LinkTypes.Hierarchy-Reverse'
+SWEEP_WORK_ITEM_TYPES = ["Epic", "Feature", "User Story", "Task", "Test Case"]
+
+# Qualifiers that make otherwise vague criteria measurable
+SPECIFIC_QUALIFIER_PATTERN = re.compile(r'\d+|specific|exact|precise')
+
+
+class WorkItemIndex:
+    """
+    In-memory parent/child adjacency index built from one batch fetch.
+    
+    Work items must be fetched with their relations expanded; every validation
+    rule then reads hierarchy links from here instead of one request per item.
+    """
+    
+    def __init__(self, work_items: List[Dict[str, Any]]):
+        self.work_items = work_items
+        self.work_items_by_id: Dict[int, Dict[str, Any]] = {}
+        self.children: Dict[int, List[int]] = {}
+        self.parents: Dict[int, List[int]] = {}
+        
+        for wi in work_items:
+            wi_id = wi['id']
+            self.work_items_by_id[wi_id] = wi
+            for relation in wi.get('relations') or []:
+                target_id = self._id_from_url(relation.get('url', ''))
+                if target_id is None:
+                    continue
+                if relation.get('rel') == HIERARCHY_FORWARD:
+                    self.children.setdefault(wi_id, []).append(target_id)
+                elif relation.get('rel') == HIERARCHY_REVERSE:
+                    self.parents.setdefault(wi_id, []).append(target_id)
+    
+    @staticmethod
+    def _id_from_url(url: str) -> Optional[int]:
+        try:
+            return int(url.rstrip('/').split('/')[-1])
+        except (ValueError, IndexError):
+            return None
+    
+    def get_field(self, wi_id: int, field: str) -> Any:
+        return self.work_items_by_id.get(wi_id, {}).get('fields', {}).get(field, '')
+    
+    def get_type(self, wi_id: int) -> str:
+        return self.get_field(wi_id, 'System.WorkItemType')
+    
+    def get_children(self, wi_id: int) -> List[int]:
+        return self.children.get(wi_id, [])
+    
+    def get_parents(self, wi_id: int) -> List[int]:
+        return self.parents.get(wi_id, [])
+    
+    def of_type(self, work_item_type: str) -> List[Dict[str, Any]]:
+        return [wi for wi in self.work_items if wi.get('fields', {}).get('System.WorkItemType') == work_item_type]
+
 
 class BacklogSweeperAgent:
     """
@@ -105,6 +163,23 @@ class BacklogSweeperAgent:
             'decomposition_agent': 'feature_decomposer_agent'
         }
 
+        # Parent/child index for the current sweep (see load_work_item_index)
+        self.work_item_index: Optional[WorkItemIndex] = None
+        
+        # Text features of acceptance criteria; unchanged stories are not re-analysed on later sweeps
+        self.text_features = TextFeatureCache(config)
+        
+        # Local SQLite mirror of ADO state, synced incrementally before each sweep
+        self.mirror = None
+        mirror_config = (config or {}).get('ado_mirror', {}) or {}
+        if mirror_config.get('enabled', False):
+            from models.ado_mirror import AdoWorkItemMirror
+            self.mirror = AdoWorkItemMirror(
+                db_path=mirror_config.get('db_path', 'ado_mirror.db'),
+                full_resync_hours=mirror_config.get('full_resync_hours', 24),
+                work_item_types=SWEEP_WORK_ITEM_TYPES
+            )
+
         # Initialize QA completeness validator if available
         if self.qa_validation_enabled:
             try:
@@ -187,10 +262,7 @@ class BacklogSweeperAgent:
         
         # Check for BDD format (if required by configuration)
         if self.require_bdd_format:
-            bdd_count = 0
-            for criteria in criteria_items:
-                if re.search(r'\b(given|when|then)\b', criteria.lower()):
-                    bdd_count += 1
+            bdd_count = sum(1 for criteria in criteria_items if self.text_features.has_bdd_keyword(criteria))
             
             if bdd_count == 0 and len(criteria_items) > 0:
                 discrepancies.append({
@@ -205,11 +277,11 @@ class BacklogSweeperAgent:
         
         # Check for functional vs non-functional criteria mix (if required)
         if self.require_functional_and_nonfunctional:
-            functional_indicators = ['user can', 'system shall', 'application will', 'feature allows', 'button click', 'form submit']
-            nonfunctional_indicators = ['performance', 'response time', 'security', 'usability', 'accessibility', 'reliability', 'scalability']
+            functional_indicators = ('user can', 'system shall', 'application will', 'feature allows', 'button click', 'form submit')
+            nonfunctional_indicators = ('performance', 'response time', 'security', 'usability', 'accessibility', 'reliability', 'scalability')
             
-            has_functional = any(any(indicator in criteria.lower() for indicator in functional_indicators) for criteria in criteria_items)
-            has_nonfunctional = any(any(indicator in criteria.lower() for indicator in nonfunctional_indicators) for criteria in criteria_items)
+            has_functional = any(self.text_features.contains_any(criteria, functional_indicators) for criteria in criteria_items)
+            has_nonfunctional = any(self.text_features.contains_any(criteria, nonfunctional_indicators) for criteria in criteria_items)
             
             if has_functional and not has_nonfunctional:
                 discrepancies.append({
@@ -223,10 +295,10 @@ class BacklogSweeperAgent:
                 })
         
         # Check for vague or unmeasurable criteria
-        vague_words = ['better', 'faster', 'easier', 'improved', 'enhanced', 'good', 'bad', 'nice']
+        vague_words = ('better', 'faster', 'easier', 'improved', 'enhanced', 'good', 'bad', 'nice')
         for i, criteria in enumerate(criteria_items):
-            if any(vague_word in criteria.lower() for vague_word in vague_words):
-                if not re.search(r'\d+|specific|exact|precise', criteria.lower()):
+            if self.text_features.contains_any(criteria, vague_words):
+                if not self.text_features.search(criteria, SPECIFIC_QUALIFIER_PATTERN):
                     discrepancies.append({
                         'type': 'vague_acceptance_criteria',
                         'work_item_id': wi_id,
@@ -245,26 +317,19 @@ class BacklogSweeperAgent:
         Returns structured discrepancies with agent assignment suggestions.
         """
         discrepancies = []
-        types = ["Epic", "Feature", "User Story", "Task", "Test Case"]
-        all_ids = []
-        
-        for t in types:
-            all_ids.extend(self.ado_client.query_work_items(t))
-        
-        work_items = self.ado_client.get_work_item_details(all_ids)
-        work_items_by_id = {wi['id']: wi for wi in work_items}
+        index = self.load_work_item_index(refresh=True)
+        work_items_by_id = index.work_items_by_id
 
         def get_field(wi, field):
             return wi.get('fields', {}).get(field, '')
 
-        for wi in work_items:
+        for wi in index.work_items:
             wi_id = wi['id']
             wi_type = get_field(wi, 'System.WorkItemType')
             title = get_field(wi, 'System.Title')
             description = get_field(wi, 'System.Description')
-            relations = self.ado_client.get_work_item_relations(wi_id)
-            children = [r for r in relations if r.get('rel') == 'System.LinkTypes.Hierarchy-Forward']
-            parents = [r for r in relations if r.get('rel') == 'System.LinkTypes.Hierarchy-Reverse']
+            children = index.get_children(wi_id)
+            parents = index.get_parents(wi_id)
 
             # Epic validation rules
             if wi_type == "Epic":
@@ -291,7 +356,7 @@ class BacklogSweeperAgent:
                     })
                 
                 # Validate Epic children (should only have Features)
-                child_ids = [int(r['url'].split('/')[-1]) for r in children]
+                child_ids = children
                 child_types = [get_field(work_items_by_id.get(cid, {}), 'System.WorkItemType') for cid in child_ids]
                 
                 if not any(ct == 'Feature' for ct in child_types):
@@ -341,7 +406,7 @@ class BacklogSweeperAgent:
                         'suggested_agent': self.agent_assignments.get('missing_feature_description', 'feature_decomposer_agent')
                     })
                 
-                child_ids = [int(r['url'].split('/')[-1]) for r in children]
+                child_ids = children
                 child_types = [get_field(work_items_by_id.get(cid, {}), 'System.WorkItemType') for cid in child_ids]
                 
                 if not any(ct == 'User Story' for ct in child_types):
@@ -410,7 +475,7 @@ class BacklogSweeperAgent:
                     })
                 
                 # Child validation
-                child_ids = [int(r['url'].split('/')[-1]) for r in children]
+                child_ids = children
                 child_types = [get_field(work_items_by_id.get(cid, {}), 'System.WorkItemType') for cid in child_ids]
                 
                 if not any(ct == 'Task' for ct in child_types):
@@ -471,7 +536,7 @@ class BacklogSweeperAgent:
                     })
                 
                 if parents:
-                    parent_id = int(parents[0]['url'].split('/')[-1])
+                    parent_id = parents[0]
                     parent_type = get_field(work_items_by_id.get(parent_id, {}), 'System.WorkItemType')
                     if parent_type not in ['User Story', 'Product Backlog Item']:
                         discrepancies.append({
@@ -498,7 +563,7 @@ class BacklogSweeperAgent:
                     })
                 
                 if parents:
-                    parent_id = int(parents[0]['url'].split('/')[-1])
+                    parent_id = parents[0]
                     parent_type = get_field(work_items_by_id.get(parent_id, {}), 'System.WorkItemType')
                     if parent_type != 'User Story':
                         discrepancies.append({
@@ -513,25 +578,51 @@ class BacklogSweeperAgent:
 
         return discrepancies
 
+    def load_work_item_index(self, refresh: bool = False) -> WorkItemIndex:
+        """
+        Fetch all swept work items once, with relations expanded, and index their hierarchy.
+        
+        Reads from the local ADO mirror (after an incremental sync) when it is
+        enabled. The index is reused by every validation rule in a sweep; pass
+        refresh=True to re-read Azure DevOps.
+        """
+        if self.work_item_index is not None and not refresh:
+            return self.work_item_index
+        
+        work_items = None
+        if self.mirror is not None:
+            try:
+                sync_summary = self.mirror.sync(self.ado_client)
+                self.logger.info(f"ADO mirror {sync_summary['mode']} sync: {sync_summary['updated_work_items']} "
+                                 f"work items updated in {sync_summary['duration_seconds']:.1f}s")
+                work_items = self.mirror.get_work_items(self.ado_client.project, SWEEP_WORK_ITEM_TYPES)
+            except Exception as e:
+                self.logger.warning(f"ADO mirror unavailable, reading work items directly: {e}")
+        
+        if work_items is None:
+            all_ids = []
+            for t in SWEEP_WORK_ITEM_TYPES:
+                all_ids.extend(self.ado_client.query_work_items(t))
+            work_items = self.ado_client.get_work_item_details(all_ids, expand_relations=True)
+        
+        self.work_item_index = WorkItemIndex(work_items)
+        self.logger.info(f"Indexed {len(work_items)} work items for sweep "
+                         f"({sum(len(c) for c in self.work_item_index.children.values())} parent/child links)")
+        return self.work_item_index
+
     def validate_relationships(self):
         """Monitor parent/child links, hierarchy, dependencies, and test case assignments."""
         discrepancies = []
         
-        # Query all work items and their relationships
-        types = ["Epic", "Feature", "User Story", "Task", "Test Case"]
-        all_ids = []
-        for t in types:
-            all_ids.extend(self.ado_client.query_work_items(t))
+        # Work items and their relationships from the sweep index
+        index = self.load_work_item_index()
         
-        work_items = self.ado_client.get_work_item_details(all_ids)
-        
-        for wi in work_items:
+        for wi in index.work_items:
             wi_id = wi['id']
             wi_type = wi.get('fields', {}).get('System.WorkItemType', '')
             title = wi.get('fields', {}).get('System.Title', '')
             
-            relations = self.ado_client.get_work_item_relations(wi_id)
-            parents = [r for r in relations if r.get('rel') == 'System.LinkTypes.Hierarchy-Reverse']
+            parents = index.get_parents(wi_id)
             
             # Check for orphaned work items (except Epics)
             if wi_type in ['Feature', 'User Story', 'Task', 'Test Case'] and not parents:
@@ -558,26 +649,16 @@ class BacklogSweeperAgent:
         discrepancies = []
         
         # Check for User Stories without Tasks
-        user_story_ids = self.ado_client.query_work_items("User Story")
+        index = self.load_work_item_index()
         
-        for story_id in user_story_ids:
-            relations = self.ado_client.get_work_item_relations(story_id)
-            children = [r for r in relations if r.get('rel') == 'System.LinkTypes.Hierarchy-Forward']
+        for story in index.of_type("User Story"):
+            story_id = story['id']
             
             # Check if this story has any Task children
-            has_tasks = False
-            for child in children:
-                child_id = int(child['url'].split('/')[-1])
-                child_details = self.ado_client.get_work_item_details([child_id])
-                if child_details:
-                    child_type = child_details[0].get('fields', {}).get('System.WorkItemType', '')
-                    if child_type == 'Task':
-                        has_tasks = True
-                        break
+            has_tasks = any(index.get_type(child_id) == 'Task' for child_id in index.get_children(story_id))
             
             if not has_tasks:
-                story_details = self.ado_client.get_work_item_details([story_id])
-                story_title = story_details[0].get('fields', {}).get('System.Title', '') if story_details else ''
+                story_title = story.get('fields', {}).get('System.Title', '')
                 
                 discrepancies.append({
                     'type': 'user_story_missing_tasks',
@@ -1015,24 +1096,21 @@ class BacklogSweeperAgent:
         discrepancies = []
         
         try:
-            # Get all test cases from Azure DevOps
-            test_cases = self.ado_client.get_work_items_by_type("Test Case")
+            # Test cases and their parents from the sweep index
+            index = self.load_work_item_index()
             
-            for test_case in test_cases:
+            for test_case in index.of_type("Test Case"):
                 test_case_id = test_case.get('id')
                 test_case_area_path = test_case.get('fields', {}).get('System.AreaPath', '')
                 
                 # Get parent user story
-                parent_relations = self.ado_client.get_work_item_relations(test_case_id)
                 parent_user_story = None
                 
-                for relation in parent_relations:
-                    if relation.get('rel') == 'System.LinkTypes.Hierarchy-Reverse':
-                        parent_id = self._extract_work_item_id_from_url(relation.get('url', ''))
-                        parent_work_item = self.ado_client.get_work_item(parent_id)
-                        if parent_work_item.get('fields', {}).get('System.WorkItemType') == 'User Story':
-                            parent_user_story = parent_work_item
-                            break
+                for parent_id in index.get_parents(test_case_id):
+                    parent_work_item = index.work_items_by_id.get(parent_id) or self.ado_client.get_work_item(parent_id)
+                    if parent_work_item.get('fields', {}).get('System.WorkItemType') == 'User Story':
+                        parent_user_story = parent_work_item
+                        break
                 
                 if parent_user_story:
                     parent_id = parent_user_story.get('id')
@@ -4,13 +4,21 @@ import requests
 import logging
 import time
 import signal
+import threading
 from typing import Dict, Any, Optional, List, Callable
 from datetime import datetime, timedelta
 from functools import wraps
 
 from config.config_loader import Config
 from utils.prompt_manager import prompt_manager
+from utils.ollama_client import prompt_cache_stats
+from utils.context_budget import ContextBudgetManager
+from utils.llm_response_cache import get_llm_response_cache
+from utils.model_fallback_manager import DEFAULT_ACCEPT_RATINGS, ModelFallbackManager
 from utils.unified_llm_config import get_agent_config
+from utils.structured_output import (
+    StructuredOutputError, build_request_options, is_structured_output_enabled, parse_structured_output
+)
 
 logger = logging.getLogger(__name__)
 
@@ -171,6 +179,24 @@ class Agent:
         agent_config = config.settings.get('agents', {}).get(name, {})
         self.timeout_seconds = agent_config.get('timeout_seconds', 120)  # Default 2 minutes
         
+        # Schema constrained JSON output (Ollama format / OpenAI response_format)
+        self.structured_output_enabled = is_structured_output_enabled(config.settings, self.llm_provider)
+        
+        # Stable-prefix prompt layout so the provider can reuse its prompt KV cache
+        self.shared_prefix_layout = config.settings.get('prompt_cache', {}).get('shared_prefix_layout', False)
+        
+        # Budget-fitted vision/epic/feature context (the supervisor shares one manager per job)
+        self.context_budget = ContextBudgetManager(config.settings)
+        
+        # Draft-then-refine model cascade (fast draft model, larger model only for weak items)
+        self.model_cascade = ModelFallbackManager()
+        self.model_cascade.configure_cascade(config.settings, name, self.llm_provider, self.model)
+        self._cascade_providers = {}
+        
+        # Process-wide response cache (exact tier; approximate tier only for opted-in agents)
+        self.response_cache = get_llm_response_cache(config.settings)
+        self._cache_state = threading.local()
+        
         logger.info(f"Initialized agent: {name} with provider: {self.llm_provider}, timeout: {self.timeout_seconds}s")
     
     def _setup_llm_config(self):
@@ -211,7 +237,8 @@ class Agent:
                         preset=self.llm_preset,
                         custom_config={
                             'model': self.model,
-                            'base_url': self.api_url
+                            'base_url': self.api_url,
+                            'keep_alive': self.config.settings.get('prompt_cache', {}).get('keep_alive')
                         }
                     )
                 except ImportError:
@@ -251,7 +278,8 @@ class Agent:
                         preset=preset,
                         custom_config={
                             'model': self.model,
-                            'base_url': self.api_url
+                            'base_url': self.api_url,
+                            'keep_alive': self.config.settings.get('prompt_cache', {}).get('keep_alive')
                         }
                     )
                     # Store preset for later use
@@ -305,8 +333,63 @@ class Agent:
             raise PromptError(f"Failed to generate prompt for {self.name}: {e}")
     
     
-    def run(self, user_input: str, context: dict = None) -> str:
-        """Send a message to the selected LLM and return the assistant's response with comprehensive error handling."""
+    def set_context_budget(self, context_budget: ContextBudgetManager):
+        """Share a job-level context budget manager (and its summary cache) with this agent."""
+        self.context_budget = context_budget
+    
+    def set_text_feature_cache(self, text_features):
+        """Share a job-level text feature cache with this agent's validators and assessors."""
+        self.text_features = text_features
+        for component_name in ('quality_validator', 'user_story_quality_assessor'):
+            component = getattr(self, component_name, None)
+            if component is not None and hasattr(component, 'set_text_feature_cache'):
+                component.set_text_feature_cache(text_features)
+    
+    def set_near_duplicate_detector(self, near_duplicates):
+        """Share a job-level near-duplicate detector with this agent."""
+        self.near_duplicates = near_duplicates
+    
+    def fit_context(self, context: dict, model: str = None) -> dict:
+        """Fit oversized vision/epic/feature context into the target model's token budget."""
+        if not context or not getattr(self, 'context_budget', None):
+            return context
+        return self.context_budget.fit_context(context, model or self.model)
+    
+    def get_prompt_messages(self, context: dict, user_input: str, template_name: str = None,
+                            model: str = None) -> tuple:
+        """
+        Build (system_prompt, user_input) for one call.
+        
+        With the shared-prefix layout the system prompt holds only stable content
+        (instructions, vision, domain) and the per-item values are prepended to the
+        user message, so consecutive calls for different items share their prefix.
+        """
+        template_name = template_name or self.name
+        context = self.fit_context(context, model)
+        if not self.shared_prefix_layout:
+            if template_name == self.name:
+                return self.get_prompt(context), user_input
+            return prompt_manager.get_prompt(template_name, context or {}), user_input
+        
+        if not self.template_valid and template_name == self.name:
+            raise PromptError(f"Template validation failed for {self.name} - cannot generate prompt")
+        try:
+            system_prompt, item_block = prompt_manager.get_prompt_parts(template_name, context or {})
+        except Exception as e:
+            logger.error(f"Failed to generate prompt for {template_name}: {e}")
+            raise PromptError(f"Failed to generate prompt for {template_name}: {e}")
+        
+        if item_block:
+            user_input = f"{item_block}\n\n{user_input}"
+        return system_prompt, user_input
+    
+    def run(self, user_input: str, context: dict = None, output_type: str = None, model: str = None) -> str:
+        """Send a message to the selected LLM and return the assistant's response with comprehensive error handling.
+        
+        When output_type is given and structured output is enabled, the response is
+        constrained to that type's JSON schema (see utils.structured_output).
+        model overrides the configured model for this call (used by the model cascade).
+        """
         start_time = datetime.now()
         
         try:
@@ -315,7 +398,11 @@ class Agent:
             self.last_execution_time = start_time
             
             # Use circuit breaker to protect against repeated failures
-            result = self.circuit_breaker.call(self._execute_with_timeout, user_input, context)
+            self._cache_state.lookup = None
+            cache_state = {}
+            result = self.circuit_breaker.call(self._execute_with_timeout, user_input, context, output_type, model,
+                                               cache_state)
+            self._track_cache_lookup(cache_state.get('lookup'), context)
             
             # Update success tracking
             self.success_count += 1
@@ -344,7 +431,8 @@ class Agent:
             raise AgentError(error_msg) from e
     
     @with_timeout(120)  # This will be overridden by instance timeout
-    def _execute_with_timeout(self, user_input: str, context: dict = None) -> str:
+    def _execute_with_timeout(self, user_input: str, context: dict = None, output_type: str = None,
+                              model: str = None, cache_state: dict = None) -> str:
         """Execute the agent with timeout protection."""
         # Override timeout dynamically
         import threading
@@ -353,16 +441,27 @@ class Agent:
             current_thread._timeout = self.timeout_seconds
         
         # Generate prompt with context
-        system_prompt = self.get_prompt(context)
+        system_prompt, user_input = self.get_prompt_messages(context, user_input, model=model)
+        
+        lookup = self.response_cache.lookup(self.name, model or self.model, output_type, system_prompt, user_input)
+        if cache_state is not None:
+            cache_state['lookup'] = lookup
+        if lookup is not None and lookup.hit:
+            logger.info(f"[CACHE] {self.name} served from {lookup.tier} response cache (similarity {lookup.similarity:.2f})")
+            return lookup.response
         
         logger.info(f"Executing {self.name} (attempt {self.execution_count}) with {self.llm_provider}")
         
+        structured_options = self.get_structured_request_options(output_type)
+        
         # Handle Ollama differently
         if self.llm_provider == "ollama":
-            result = self._run_ollama(system_prompt, user_input)
+            result = self._run_ollama(system_prompt, user_input, output_format=structured_options.get('format'),
+                                      model=model)
         else:
             # Prepare request payload for cloud providers
-            payload = self._prepare_request_payload(system_prompt, user_input)
+            payload = self._prepare_request_payload(system_prompt, user_input, model=model)
+            payload.update(structured_options)
             logger.debug(f"Request payload for {self.name}: {json.dumps(payload, indent=2)}")
             
             # Make API request with retry logic
@@ -371,27 +470,102 @@ class Agent:
             # Process response
             result = self._process_response(response)
         
+        # Only a missed lookup stores; with the cache off the response is not parsed here
+        if lookup is not None and not lookup.hit and self._is_cacheable_response(result, output_type):
+            self.response_cache.store(lookup, result)
         return result
     
-    def _run_ollama(self, system_prompt: str, user_input: str) -> str:
+    def _is_cacheable_response(self, response: str, output_type: str = None) -> bool:
+        """Only typed responses that parse are cached; untyped ones are discarded by callers that cannot parse them."""
+        if not output_type:
+            return True
+        if getattr(self, 'structured_output_enabled', False):
+            try:
+                parse_structured_output(output_type, response)
+                return True
+            except StructuredOutputError:
+                pass
+        from utils.json_extractor import JSONExtractor
+        return JSONExtractor.parse_json_from_response(response) is not None
+    
+    def _track_cache_lookup(self, lookup, context: dict = None):
+        """Remember this thread's last cache lookup and record it in the quality metrics."""
+        self._cache_state.lookup = lookup
+        self._cache_state.job_id = (context or {}).get('job_id')
+        if lookup is None:
+            return
+        try:
+            from utils.quality_metrics_tracker import quality_tracker
+            quality_tracker.record_cache_event(self._cache_state.job_id, self.name, 'lookup', lookup.tier,
+                                               similarity=lookup.similarity if lookup.tier == 'semantic' else None)
+        except Exception as e:
+            logger.debug(f"Failed to record cache lookup for {self.name}: {e}")
+    
+    def record_cache_outcome(self, rating: str, score: int = None):
+        """
+        Record the quality rating of the item built from this thread's last LLM response.
+        
+        Responses rated below the accept ratings are evicted from the response
+        cache (whichever tier served or stored them), so a retry of the same
+        prompt is sent to the LLM instead of getting the same response back.
+        """
+        lookup = getattr(self._cache_state, 'lookup', None)
+        if lookup is None:
+            return
+        self._cache_state.lookup = None
+        if rating not in DEFAULT_ACCEPT_RATINGS:
+            self.response_cache.reject(lookup)
+        try:
+            from utils.quality_metrics_tracker import quality_tracker
+            quality_tracker.record_cache_event(self._cache_state.job_id, self.name, 'outcome', lookup.tier,
+                                               rating=rating, score=score)
+        except Exception as e:
+            logger.debug(f"Failed to record cache outcome for {self.name}: {e}")
+    
+    def discard_cached_response(self):
+        """Evict this thread's last LLM response from the response cache (the caller could not use it)."""
+        lookup = getattr(self._cache_state, 'lookup', None)
+        self._cache_state.lookup = None
+        self.response_cache.reject(lookup)
+    
+    def get_ollama_provider(self, model: str = None):
+        """Ollama provider for a model (the configured one unless a cascade model is requested)."""
+        if not model or model == self.model:
+            return self.ollama_provider
+        if model not in self._cascade_providers:
+            from utils.ollama_client import create_ollama_provider
+            self._cascade_providers[model] = create_ollama_provider(
+                preset=getattr(self, 'llm_preset', 'high_quality'),
+                custom_config={
+                    'model': model,
+                    'base_url': self.api_url,
+                    'keep_alive': self.config.settings.get('prompt_cache', {}).get('keep_alive')
+                }
+            )
+        return self._cascade_providers[model]
+    
+    def _run_ollama(self, system_prompt: str, user_input: str, output_format: Optional[dict] = None,
+                    model: str = None) -> str:
         """Run inference using local Ollama."""
         try:
-            logger.info(f"[OLLAMA] Using local Ollama model: {self.model} with preset: {getattr(self, 'llm_preset', 'high_quality')}")
+            logger.info(f"[OLLAMA] Using local Ollama model: {model or self.model} with preset: {getattr(self, 'llm_preset', 'high_quality')}")
             # Ollama provider already has the preset configurations built-in
             # Just call generate_response without overriding temperature/max_tokens
-            return self.ollama_provider.generate_response(
+            return self.get_ollama_provider(model).generate_response(
                 system_prompt=system_prompt,
-                user_input=user_input
+                user_input=user_input,
                 # Temperature and max_tokens are handled by the provider based on preset
+                output_format=output_format
             )
         except Exception as e:
             logger.error(f"[ERROR] Ollama inference failed: {e}")
             raise CommunicationError(f"Ollama inference failed: {str(e)}")
     
-    def _prepare_request_payload(self, system_prompt: str, user_input: str) -> dict:
+    def _prepare_request_payload(self, system_prompt: str, user_input: str, model: str = None) -> dict:
         """Prepare the request payload for the LLM API."""
+        model = model or self.model
         payload = {
-            "model": self.model,
+            "model": model,
             "messages": [
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": user_input}
@@ -403,16 +577,16 @@ class Agent:
         preset_config = PRESET_CONFIGS.get(preset, PRESET_CONFIGS['high_quality'])
         
         # GPT-5 models have different API requirements
-        if self.model and 'gpt-5' in self.model.lower():
+        if model and 'gpt-5' in model.lower():
             # GPT-5 models use 'max_completion_tokens' instead of 'max_tokens'
             payload["max_completion_tokens"] = preset_config["max_tokens"]
             # GPT-5 models only support default temperature (1.0), don't set custom temperature
-            logger.info(f"[API] Using GPT-5 model {self.model} with preset {preset} (max_tokens: {preset_config['max_tokens']})")
+            logger.info(f"[API] Using GPT-5 model {model} with preset {preset} (max_tokens: {preset_config['max_tokens']})")
         else:
             # All other models (GPT-4, GPT-3.5, Grok, etc.)
             payload["temperature"] = preset_config["temperature"]
             payload["max_tokens"] = preset_config["max_tokens"]
-            logger.info(f"[API] Using {self.llm_provider} model {self.model} with preset {preset} (temp: {preset_config['temperature']}, max_tokens: {preset_config['max_tokens']})")
+            logger.info(f"[API] Using {self.llm_provider} model {model} with preset {preset} (temp: {preset_config['temperature']}, max_tokens: {preset_config['max_tokens']})")
         
         return payload
     
@@ -538,6 +712,29 @@ class Agent:
         except KeyError as e:
             raise CommunicationError(f"Missing key in response: {e}")
     
+    def get_structured_request_options(self, output_type: str = None) -> Dict[str, Any]:
+        """Get provider request fields that constrain the response to output_type's schema."""
+        if not output_type or not getattr(self, 'structured_output_enabled', False):
+            return {}
+        return build_request_options(self.llm_provider, output_type)
+    
+    def parse_structured_response(self, response: str, output_type: str) -> Optional[Any]:
+        """
+        Validate a schema constrained response into its typed output.
+        
+        Returns:
+            Parsed and validated data, or None when structured output is not active
+            or the response failed validation (callers fall back to JSON extraction
+            on the same response instead of regenerating).
+        """
+        if not getattr(self, 'structured_output_enabled', False):
+            return None
+        try:
+            return parse_structured_output(output_type, response)
+        except StructuredOutputError as e:
+            logger.warning(f"[STRUCTURED] {self.name} {output_type} response failed validation, falling back to extraction: {e}")
+            return None
+    
     def get_stats(self) -> Dict[str, Any]:
         """Get agent execution statistics."""
         return {
@@ -550,7 +747,10 @@ class Agent:
             "success_rate": self.success_count / max(self.execution_count, 1),
             "last_execution_time": self.last_execution_time,
             "template_valid": self.template_valid,
-            "required_variables": self.required_variables
+            "required_variables": self.required_variables,
+            "prompt_cache": prompt_cache_stats.summary(self.model) if self.llm_provider == "ollama" else None,
+            "model_cascade": self.model_cascade.get_cascade_summary(),
+            "response_cache": self.response_cache.get_stats() if self.response_cache.config.enabled else None
         }
     
     def reset_stats(self):
@@ -6,6 +6,7 @@ from config.config_loader import Config
 from utils.quality_validator import WorkItemQualityValidator
 from utils.task_quality_assessor import TaskQualityAssessor
 from utils.json_extractor import JSONExtractor
+from utils.structured_output import unwrap_list_output
 
 class TimeoutError(Exception):
     """Custom timeout exception."""
@@ -125,23 +126,27 @@ User Type: {user_story.get('user_type', 'user')}
             
             print(f"[PROACTIVE GENERATION] Generating {tasks_to_generate} tasks upfront (target: {max_tasks or 'unlimited'})")
             
-            response = self.run_with_template(user_input_inflated, prompt_context_inflated, "developer_agent")
+            response = self.run_with_template(user_input_inflated, prompt_context_inflated, "developer_agent",
+                                              output_type='tasks')
             
             if not response or not response.strip():
                 print("Empty response from LLM")
                 return []
             
-            # Extract and parse JSON
-            cleaned_response = JSONExtractor.extract_json_from_response(response)
-            if not cleaned_response:
-                print("No JSON found in task generation response")
-                return []
-            
-            try:
-                tasks = json.loads(cleaned_response)
-            except (json.JSONDecodeError, TypeError) as e:
-                print(f"Failed to parse JSON from task generation response: {e}")
-                return []
+            # Schema constrained responses validate directly; otherwise extract JSON
+            tasks = self.parse_structured_response(response, 'tasks')
+            if tasks is None:
+                # Extract and parse JSON
+                cleaned_response = JSONExtractor.extract_json_from_response(response)
+                if not cleaned_response:
+                    print("No JSON found in task generation response")
+                    return []
+                
+                try:
+                    tasks = unwrap_list_output(json.loads(cleaned_response))
+                except (json.JSONDecodeError, TypeError) as e:
+                    print(f"Failed to parse JSON from task generation response: {e}")
+                    return []
             
             print(f"[PROACTIVE GENERATION] Generated {len(tasks)} tasks for quality assessment")
             
@@ -201,7 +206,7 @@ User Type: {user_story.get('user_type', 'user')}
                 )
                 print(log_output)
                 
-                if assessment.rating in ["EXCELLENT", "GOOD"]:
+                if self.model_cascade.is_accepted(assessment.rating):
                     print(f"+ Task approved with {assessment.rating} rating on attempt {attempt}")
                     approved_tasks.append(current_task)
                     
@@ -302,15 +307,14 @@ Generate a maximum of {replacements_needed} tasks only.
                     cleaned_response = JSONExtractor.extract_json_from_response(replacement_response)
                     replacement_tasks = json.loads(cleaned_response) if cleaned_response else []
                     
-                    # Quick quality check for replacements (1 attempt only)
-                    for i, replacement_task in enumerate(replacement_tasks):
+                    # Quick quality check for replacements (1 attempt only), scored as one batch
+                    replacement_assessments = self.task_quality_assessor.assess_many(
+                        replacement_tasks, {'user_story': user_story, 'domain': domain, 'product_vision': product_vision}
+                    )
+                    for i, (replacement_task, assessment) in enumerate(zip(replacement_tasks, replacement_assessments)):
                         task_title = replacement_task.get('title', f'Replacement Task {i+1}')
                         
-                        assessment = self.task_quality_assessor.assess_task(
-                            replacement_task, user_story, domain, product_vision
-                        )
-                        
-                        if assessment.rating in ["EXCELLENT", "GOOD"]:
+                        if self.model_cascade.is_accepted(assessment.rating):
                             approved_tasks.append(replacement_task)
                             print(f"[REPLACEMENT SUCCESS] Added replacement task '{task_title}' with {assessment.rating} rating")
                             
@@ -467,24 +471,24 @@ Return only a single improved task in this JSON format:
             traceback.print_exc()
             return None
     
-    def run_with_template(self, user_input: str, context: dict, template_name: str = None) -> str:
+    def run_with_template(self, user_input: str, context: dict, template_name: str = None, output_type: str = None) -> str:
         """Run with a specific prompt template."""
         template_to_use = template_name or "developer_agent"
         
         try:
-            # Import prompt manager
-            from utils.prompt_manager import prompt_manager
-            
             # Get the prompt (now includes all domain examples)
-            prompt = prompt_manager.get_prompt(template_to_use, context)
+            prompt, item_input = self.get_prompt_messages(context, user_input, template_to_use)
+            
+            structured_options = self.get_structured_request_options(output_type)
             
             # Use the proper method based on provider
             if self.llm_provider == "ollama":
                 return self.ollama_provider.generate_response(
                     system_prompt=prompt,
-                    user_input=user_input,
+                    user_input=item_input,
                     temperature=0.7,
-                    max_tokens=8000
+                    max_tokens=8000,
+                    output_format=structured_options.get('format')
                 )
             else:
                 # Use direct API call for cloud providers
@@ -498,9 +502,10 @@ Return only a single improved task in this JSON format:
                     "model": self.model,
                     "messages": [
                         {"role": "system", "content": prompt},
-                        {"role": "user", "content": user_input}
+                        {"role": "user", "content": item_input}
                     ]
                 }
+                payload.update(structured_options)
                 
                 import requests
                 timeout = 600  # 10 minutes for all models
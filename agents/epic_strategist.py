@@ -8,6 +8,7 @@ from utils.content_enhancer import ContentEnhancer
 from utils.epic_quality_assessor_v2 import EpicQualityAssessor
 from utils.model_fallback_manager import ModelFallbackManager
 from utils.safe_logger import get_safe_logger
+from utils.structured_output import unwrap_list_output
 
 class TimeoutError(Exception):
     """Custom timeout exception"""
@@ -224,7 +225,7 @@ class EpicStrategist(Agent):
             # Use configured timeout from current model
             timeout = self.timeout_seconds if hasattr(self, 'timeout_seconds') and self.timeout_seconds else 600
             self.logger.info(f"[EPIC GEN] Calling LLM with timeout={timeout}s, model={self.model}")
-            response = self._run_with_timeout(user_input, prompt_context, timeout=timeout)
+            response = self._run_with_timeout(user_input, prompt_context, timeout=timeout, output_type='epics')
         except TimeoutError as e:
             self.logger.warning(f"[EPIC GEN] Epic generation timed out after {timeout} seconds")
             raise TimeoutError(f"Epic generation timed out after {timeout} seconds") from e
@@ -237,17 +238,20 @@ class EpicStrategist(Agent):
                 self.logger.error(f"[EPIC GEN] Empty response from model {self.model}")
                 raise ValueError("Empty response from LLM")
             
-            # Extract JSON with improved parsing
-            cleaned_response = self._extract_json_from_response(response)
-            
-            # Safety check for empty or invalid JSON
-            if not cleaned_response or cleaned_response.strip() == "[]":
-                raise ValueError("Empty or invalid JSON response")
-            
-            try:
-                epics = json.loads(cleaned_response)
-            except (json.JSONDecodeError, TypeError) as e:
-                raise ValueError(f"Failed to parse JSON response: {e}")
+            # Schema constrained responses validate directly; otherwise extract JSON
+            epics = self.parse_structured_response(response, 'epics')
+            if epics is None:
+                # Extract JSON with improved parsing
+                cleaned_response = self._extract_json_from_response(response)
+                
+                # Safety check for empty or invalid JSON
+                if not cleaned_response or cleaned_response.strip() == "[]":
+                    raise ValueError("Empty or invalid JSON response")
+                
+                try:
+                    epics = unwrap_list_output(json.loads(cleaned_response))
+                except (json.JSONDecodeError, TypeError) as e:
+                    raise ValueError(f"Failed to parse JSON response: {e}")
                 
             if not isinstance(epics, list):
                 raise ValueError("LLM response was not a list")
@@ -453,6 +457,10 @@ class EpicStrategist(Agent):
                 # Assess current epic quality
                 assessment = self.quality_assessor.assess_epic(current_epic, domain, product_vision)
                 
+                if attempt > 1:
+                    # Improved versions come from the (possibly cached) improvement prompt response
+                    self.record_cache_outcome(assessment.rating, assessment.score)
+                
                 # Record attempt in quality tracker
                 quality_tracker.record_attempt(
                     metrics_id, attempt, assessment.rating, assessment.score,
@@ -634,20 +642,22 @@ Return the IMPROVED version of the SAME epic in this JSON format:
             elif isinstance(improved_epic, list) and len(improved_epic) > 0:
                 return improved_epic[0]  # Take first epic if array returned
             else:
+                self.discard_cached_response()
                 return None
                 
         except Exception as e:
             print(f"Error generating improved epic: {e}")
+            self.discard_cached_response()
             return None
 
-    def _run_with_timeout(self, user_input: str, prompt_context: dict, timeout: int = 600):
+    def _run_with_timeout(self, user_input: str, prompt_context: dict, timeout: int = 600, output_type: str = None):
         """Run the agent with a timeout to prevent hanging."""
         result = [None]
         exception = [None]
         
         def target():
             try:
-                result[0] = self.run(user_input, prompt_context)
+                result[0] = self.run(user_input, prompt_context, output_type=output_type)
             except Exception as e:
                 exception[0] = e
         
@@ -5,6 +5,9 @@ from agents.base_agent import Agent
 from config.config_loader import Config
 from utils.quality_validator import WorkItemQualityValidator
 from utils.feature_quality_assessor_v2 import FeatureQualityAssessor
+from utils.near_duplicate_detector import NearDuplicateDetector
+from utils.json_extractor import JSONExtractor
+from utils.structured_output import unwrap_list_output
 
 class TimeoutError(Exception):
     """Custom timeout exception."""
@@ -21,6 +24,7 @@ class FeatureDecomposerAgent(Agent):
         # Initialize quality validator with current configuration
         self.quality_validator = WorkItemQualityValidator(config.settings if hasattr(config, 'settings') else None)
         self.feature_quality_assessor = FeatureQualityAssessor()
+        self.near_duplicates = NearDuplicateDetector(config.settings if hasattr(config, 'settings') else None)
         self.max_quality_retries = 3  # Maximum attempts to achieve GOOD or better rating
     
     def _determine_feature_count(self, epic: dict, base_max: int = None) -> int:
@@ -150,21 +154,23 @@ Dependencies: {epic.get('dependencies', [])}
                 
                 # Temporarily switch to this model
                 original_model = self.model
-                self.model = model_name
+                original_provider = getattr(self, 'ollama_provider', None)
                 
-                # Update Ollama provider if needed
+                # Update Ollama provider if needed (keeps the configured base_url and keep_alive)
                 if hasattr(self, 'ollama_provider') and self.llm_provider == "ollama":
                     try:
-                        from utils.ollama_client import create_ollama_provider
-                        self.ollama_provider = create_ollama_provider(preset='balanced')
+                        self.ollama_provider = self.get_ollama_provider(model_name)
                     except Exception as e:
                         print(f"Failed to switch to {model_name}: {e}")
                         continue
+                self.model = model_name
                 
-                response = self._run_with_timeout(user_input, prompt_context, timeout=timeout)
+                response = self._run_with_timeout(user_input, prompt_context, timeout=timeout, output_type='features',
+                                                  model=self.model_cascade.get_draft_model())
                 
                 # Restore original model
                 self.model = original_model
+                self.ollama_provider = original_provider
                 
                 print(f"Successfully generated features using {model_name}")
                 break
@@ -173,11 +179,13 @@ Dependencies: {epic.get('dependencies', [])}
                 print(f"{model_name} timed out after {timeout}s, trying next model...")
                 # Restore original model before continuing
                 self.model = original_model
+                self.ollama_provider = original_provider
                 continue
             except Exception as e:
                 print(f"{model_name} failed: {e}, trying next model...")
                 # Restore original model before continuing
                 self.model = original_model
+                self.ollama_provider = original_provider
                 continue
         else:
             # All models failed
@@ -190,25 +198,28 @@ Dependencies: {epic.get('dependencies', [])}
                 print("Empty response from LLM")
                 return self._extract_features_from_any_format("", epic, feature_limit)
             
-            # Check for markdown code blocks
-            # Extract JSON with improved parsing
-            cleaned_response = self._extract_json_from_response(response)
-            
-            # Safety check for empty or invalid JSON
-            if not cleaned_response or cleaned_response.strip() == "[]":
-                print("Empty or invalid JSON response")
-                return self._extract_features_from_any_format(response, epic, feature_limit)
-            
-            try:
-                features = json.loads(cleaned_response)
-            except (json.JSONDecodeError, TypeError) as e:
-                print(f"Failed to parse JSON response: {e}")
-                print(f"Raw response length: {len(response)} chars")
-                print(f"Cleaned response length: {len(cleaned_response)} chars")
-                print(f"Raw response preview (first 500 chars): {response[:500]}")
-                print(f"Cleaned response preview (first 500 chars): {cleaned_response[:500]}")
-                print(f"Cleaned response ending (last 100 chars): ...{cleaned_response[-100:]}")
-                return self._extract_features_from_any_format(response, epic, feature_limit)
+            # Schema constrained responses validate directly; otherwise extract JSON
+            features = self.parse_structured_response(response, 'features')
+            if features is None:
+                # Check for markdown code blocks
+                # Extract JSON with improved parsing
+                cleaned_response = JSONExtractor.extract_json_from_response(response)
+                
+                # Safety check for empty or invalid JSON
+                if not cleaned_response or cleaned_response.strip() == "[]":
+                    print("Empty or invalid JSON response")
+                    return self._extract_features_from_any_format(response, epic, feature_limit)
+                
+                try:
+                    features = unwrap_list_output(json.loads(cleaned_response))
+                except (json.JSONDecodeError, TypeError) as e:
+                    print(f"Failed to parse JSON response: {e}")
+                    print(f"Raw response length: {len(response)} chars")
+                    print(f"Cleaned response length: {len(cleaned_response)} chars")
+                    print(f"Raw response preview (first 500 chars): {response[:500]}")
+                    print(f"Cleaned response preview (first 500 chars): {cleaned_response[:500]}")
+                    print(f"Cleaned response ending (last 100 chars): ...{cleaned_response[-100:]}")
+                    return self._extract_features_from_any_format(response, epic, feature_limit)
             if isinstance(features, list) and len(features) > 0:
                 # Apply the feature limit constraint if specified
                 if feature_limit:
@@ -245,7 +256,8 @@ Dependencies: {epic.get('dependencies', [])}
         # Try to extract features from text format
         extracted_features = self._extract_features_from_text(response, epic)
         
-        # Apply limit if specified
+        # Apply limit if specified, counting distinct features only
+        extracted_features = self.near_duplicates.deduplicate(extracted_features, label='feature')
         if max_features and len(extracted_features) > max_features:
             extracted_features = extracted_features[:max_features]
             print(f"Limited features to {max_features}")
@@ -460,202 +472,15 @@ Dependencies: {epic.get('dependencies', [])}
                 print(f"Fallback generation failed: {fallback_e}")
                 return ""
 
-    def _extract_json_from_response(self, response: str) -> str:
-        """Extract JSON content from AI response with improved parsing."""
-        if not response:
-            return "[]"
-        
-        import re
-        import json
-        
-        # Method 1: Try to parse the entire response as JSON first
-        try:
-            json.loads(response.strip())
-            return response.strip()
-        except (json.JSONDecodeError, TypeError):
-            # Try cleaning common JSON issues and parsing again
-            cleaned = self._clean_json_syntax(response.strip())
-            try:
-                json.loads(cleaned)
-                print(f"🧹 Fixed JSON syntax issues, returning cleaned version")
-                return cleaned
-            except (json.JSONDecodeError, TypeError):
-                pass
-        
-        # Method 2: Look for JSON inside ```json blocks
-        json_pattern = r'```json\s*([\s\S]*?)\s*```'
-        json_match = re.search(json_pattern, response, re.IGNORECASE)
-        
-        if json_match:
-            content = json_match.group(1).strip()
-            try:
-                json.loads(content)
-                return content
-            except (json.JSONDecodeError, TypeError):
-                pass
-        
-        # Method 3: Look for JSON inside ``` blocks (without language specifier)
-        code_pattern = r'```\s*([\s\S]*?)\s*```'
-        code_match = re.search(code_pattern, response)
-        
-        if code_match:
-            content = code_match.group(1).strip()
-            if content.startswith(('{', '[')):
-                try:
-                    json.loads(content)
-                    return content
-                except (json.JSONDecodeError, TypeError):
-                    pass
-        
-        # Method 4: Find the largest valid JSON structure using regex
-        # Look for array patterns first (most common for features)
-        array_patterns = [
-            r'\[[\s\S]*\]',  # Match from first [ to last ]
-        ]
-        
-        for pattern in array_patterns:
-            matches = re.findall(pattern, response, re.DOTALL)
-            print(f"🔍 Regex found {len(matches)} potential JSON arrays")
-            for i, match in enumerate(matches):
-                print(f"🔍 Array {i+1}: {len(match)} chars, starts with: {match[:100]}...")
-                try:
-                    json.loads(match)
-                    print(f"🎯 Found valid JSON array: {len(match)} characters")
-                    return match
-                except (json.JSONDecodeError, TypeError) as e:
-                    print(f"❌ Array {i+1} failed JSON validation: {e}")
-                    # Try cleaning the JSON and parsing again
-                    cleaned_match = self._clean_json_syntax(match)
-                    try:
-                        json.loads(cleaned_match)
-                        print(f"🧹 Fixed JSON syntax in array {i+1}, returning cleaned version")
-                        return cleaned_match
-                    except (json.JSONDecodeError, TypeError):
-                        print(f"❌ Array {i+1} still invalid after cleaning")
-                        continue
-        
-        # Method 5: Try to find object patterns
-        object_patterns = [
-            r'\{[\s\S]*\}',  # Match from first { to last }
-        ]
-        
-        for pattern in object_patterns:
-            matches = re.findall(pattern, response, re.DOTALL)
-            for match in matches:
-                try:
-                    json.loads(match)
-                    print(f"🎯 Found valid JSON object: {len(match)} characters")
-                    return match
-                except (json.JSONDecodeError, TypeError):
-                    continue
-        
-        # Method 6: Last resort - try to extract JSON by finding balanced brackets
-        print("🔍 Using fallback bracket matching...")
-        return self._extract_json_with_balanced_brackets(response)
-
-    def _clean_json_syntax(self, json_str: str) -> str:
-        """Clean common JSON syntax issues that LLMs often produce."""
-        if not json_str:
-            return json_str
-        
-        import re
-        
-        # Fix trailing commas before closing brackets/braces
-        json_str = re.sub(r',(\s*[}\]])', r'\1', json_str)
-        
-        # Fix missing commas between objects in arrays (less common but possible)
-        json_str = re.sub(r'}(\s*){', r'},\1{', json_str)
-        
-        # Fix missing quotes around property names (though templates should prevent this)
-        json_str = re.sub(r'([{,]\s*)([a-zA-Z_][a-zA-Z0-9_]*)\s*:', r'\1"\2":', json_str)
-        
-        # Fix single quotes to double quotes
-        json_str = json_str.replace("'", '"')
-        
-        # Remove comments (JSON doesn't support comments but LLMs sometimes add them)
-        json_str = re.sub(r'//.*$', '', json_str, flags=re.MULTILINE)
-        json_str = re.sub(r'/\*.*?\*/', '', json_str, flags=re.DOTALL)
-        
-        return json_str
-
-    def _extract_json_with_balanced_brackets(self, response: str) -> str:
-        """Extract JSON using balanced bracket counting as last resort."""
-        import json
-        
-        # Find the start of JSON
-        start_idx = response.find('[')
-        if start_idx == -1:
-            start_idx = response.find('{')
-            if start_idx == -1:
-                return "[]"
-        
-        # Count brackets/braces to find the complete JSON structure
-        if response[start_idx] == '[':
-            bracket_count = 0
-            in_string = False
-            escape_next = False
-            
-            for i, char in enumerate(response[start_idx:], start_idx):
-                if escape_next:
-                    escape_next = False
-                    continue
-                if char == '\\' and in_string:
-                    escape_next = True
-                    continue
-                if char == '"' and not escape_next:
-                    in_string = not in_string
-                    continue
-                if not in_string:
-                    if char == '[':
-                        bracket_count += 1
-                    elif char == ']':
-                        bracket_count -= 1
-                        if bracket_count == 0:
-                            candidate = response[start_idx:i+1]
-                            try:
-                                json.loads(candidate)
-                                return candidate
-                            except (json.JSONDecodeError, TypeError):
-                                continue
-        else:  # Starting with '{'
-            brace_count = 0
-            in_string = False
-            escape_next = False
-            
-            for i, char in enumerate(response[start_idx:], start_idx):
-                if escape_next:
-                    escape_next = False
-                    continue
-                if char == '\\' and in_string:
-                    escape_next = True
-                    continue
-                if char == '"' and not escape_next:
-                    in_string = not in_string
-                    continue
-                if not in_string:
-                    if char == '{':
-                        brace_count += 1
-                    elif char == '}':
-                        brace_count -= 1
-                        if brace_count == 0:
-                            candidate = response[start_idx:i+1]
-                            try:
-                                json.loads(candidate)
-                                return candidate
-                            except (json.JSONDecodeError, TypeError):
-                                continue
-        
-        # If nothing worked, return the remainder and hope for the best
-        return response[start_idx:].strip()
-
-    def _run_with_timeout(self, user_input: str, context: dict, timeout: int = 600):
+    def _run_with_timeout(self, user_input: str, context: dict, timeout: int = 600, output_type: str = None,
+                          model: str = None):
         """Run the agent with a timeout to prevent hanging."""
         result = [None]
         exception = [None]
         
         def target():
             try:
-                result[0] = self.run(user_input, context)
+                result[0] = self.run(user_input, context, output_type=output_type, model=model)
             except Exception as e:
                 exception[0] = e
         
@@ -681,8 +506,13 @@ Dependencies: {epic.get('dependencies', [])}
         
         domain = context.get('domain', 'general') if context else 'general'
         approved_features = []
-        feature_limit = len(features)  # Track original target count
-        failed_feature_count = 0  # Track failed features for replacement
+        feature_limit = target_count or len(features)  # Track target count
+        
+        # Drop reworded copies before they are assessed, improved and decomposed further;
+        # dropped copies are replaced like failed features so the target is still reached
+        distinct_features = self.near_duplicates.deduplicate(features, label='feature')
+        failed_feature_count = len(features) - len(distinct_features)  # Track features to replace
+        features = distinct_features
         
         print(f"\nStarting feature quality assessment for {len(features)} features (target: {feature_limit})...")
         print(f"Epic Context: {epic.get('title', 'Unknown Epic')}")
@@ -708,21 +538,31 @@ Dependencies: {epic.get('dependencies', [])}
                     current_feature, epic, domain, product_vision
                 )
                 
+                if attempt > 1:
+                    # Improved versions come from the (possibly cached) improvement prompt response
+                    self.record_cache_outcome(assessment.rating, assessment.score)
+                
                 # Log assessment
                 log_output = self.feature_quality_assessor.format_assessment_log(
                     current_feature, assessment, attempt
                 )
                 print(log_output)
                 
-                if assessment.rating in ["EXCELLENT", "GOOD"]:
+                if attempt == 1:
+                    # Cascade: drafts rated below GOOD go to the refine model for improvement
+                    self.model_cascade.record_cascade_result(
+                        assessment.rating, refined=not self.model_cascade.is_accepted(assessment.rating)
+                    )
+                
+                if self.model_cascade.is_accepted(assessment.rating):
                     print(f"+ Feature approved with {assessment.rating} rating on attempt {attempt}")
                     approved_features.append(current_feature)
                     
                     # Check if we have enough approved features
-                    if target_count and len(approved_features) >= target_count:
-                        print(f"\n[TARGET REACHED] Have {len(approved_features)} approved features (target: {target_count})")
+                    if len(approved_features) >= feature_limit:
+                        print(f"\n[TARGET REACHED] Have {len(approved_features)} approved features (target: {feature_limit})")
                         print(f"Skipping assessment of remaining {len(features) - i - 1} features")
-                        return approved_features[:target_count]
+                        return approved_features[:feature_limit]
                     break
                 
                 if attempt == self.max_quality_retries:
@@ -791,9 +631,11 @@ Dependencies: {epic.get('dependencies', [])}
                 
                 if replacement_response:
                     # Parse replacement features
-                    from utils.json_extractor import JSONExtractor
                     cleaned_response = JSONExtractor.extract_json_from_response(replacement_response)
                     replacement_features = json.loads(cleaned_response) if cleaned_response else []
+                    replacement_features = self.near_duplicates.deduplicate(
+                        replacement_features, existing=approved_features, label='replacement feature'
+                    )
                     
                     # Quick quality check for replacements (1 attempt only)
                     for i, replacement_feature in enumerate(replacement_features):
@@ -803,7 +645,7 @@ Dependencies: {epic.get('dependencies', [])}
                             replacement_feature, epic, domain, product_vision
                         )
                         
-                        if assessment.rating in ["EXCELLENT", "GOOD"]:
+                        if self.model_cascade.is_accepted(assessment.rating):
                             approved_features.append(replacement_feature)
                             print(f"[REPLACEMENT SUCCESS] Added replacement feature '{feature_title}' with {assessment.rating} rating")
                             
@@ -869,15 +711,14 @@ Return only a single improved feature in this JSON format:
     def _generate_improved_feature(self, improvement_prompt: str, context: dict) -> dict:
         """Generate an improved version of the feature."""
         try:
-            # Use the existing run method to generate improvement
-            response = self.run(improvement_prompt, context or {})
+            # Use the existing run method to generate improvement (refine model when cascading)
+            response = self.run(improvement_prompt, context or {}, model=self.model_cascade.get_refine_model())
             
             if not response:
                 return None
             
             # Extract and parse JSON
-            cleaned_response = self._extract_json_from_response(response)
-            improved_feature = json.loads(cleaned_response)
+            improved_feature = JSONExtractor.parse_json_from_response(response)
             
             # Validate that we got a single feature object
             if isinstance(improved_feature, dict):
@@ -885,8 +726,10 @@ Return only a single improved feature in this JSON format:
             elif isinstance(improved_feature, list) and len(improved_feature) > 0:
                 return improved_feature[0]  # Take first feature if array returned
             else:
+                self.discard_cached_response()
                 return None
                 
         except Exception as e:
             print(f"Error generating improved feature: {e}")
+            self.discard_cached_response()
             return None
@@ -7,6 +7,7 @@ import re
 from typing import Dict, List, Any, Optional
 from agents.base_agent import Agent
 import re
+from utils.json_extractor import JSONExtractor
 
 
 class TestCaseAgent(Agent):
@@ -127,7 +128,7 @@ class TestCaseAgent(Agent):
             # Call LLM to generate test cases using template system
             # The run() method will internally call get_prompt(template_context)
             user_input = f"Create comprehensive test cases for the user story: {user_story.get('title', 'Unknown Story')}"
-            response = self.run(user_input, template_context)
+            response = self.run(user_input, template_context, output_type='test_cases')
             
             if not response:
                 self.logger.error("LLM returned empty response for test cases generation")
@@ -221,8 +222,13 @@ Ensure coverage of all acceptance criteria and consider real-world scenarios in
     def _parse_test_cases_response(self, response: str) -> List[Dict[str, Any]]:
         """Parse LLM response to extract test cases."""
         try:
+            # Schema constrained responses validate directly into typed test cases
+            structured_test_cases = self.parse_structured_response(response, 'test_cases')
+            if structured_test_cases:
+                return structured_test_cases
+            
             # Try to extract JSON from response
-            parsed_content = self._extract_json_from_response(response)
+            parsed_content = JSONExtractor.parse_json_from_response(response)
             
             if parsed_content and isinstance(parsed_content, list):
                 return parsed_content
@@ -487,43 +493,6 @@ Ensure coverage of all acceptance criteria and consider real-world scenarios in
         
         return not ui_intensive  # Less UI-intensive tests are better automation candidates
     
-    def _extract_json_from_response(self, response: str) -> Optional[Any]:
-        """Extract JSON content from LLM response."""
-        import json
-        import re
-        
-        try:
-            # First try to parse the entire response as JSON
-            return json.loads(response)
-        except:
-            pass
-        
-        try:
-            # Look for JSON blocks in markdown
-            json_match = re.search(r'```json\s*(\[.*?\])\s*```', response, re.DOTALL)
-            if json_match:
-                return json.loads(json_match.group(1))
-        except:
-            pass
-        
-        try:
-            # Look for JSON array content
-            json_match = re.search(r'\[.*\]', response, re.DOTALL)
-            if json_match:
-                return json.loads(json_match.group(0))
-        except:
-            pass
-        
-        try:
-            # Look for JSON object content
-            json_match = re.search(r'\{.*\}', response, re.DOTALL)
-            if json_match:
-                return json.loads(json_match.group(0))
-        except:
-            pass
-        
-        return None
-    
     def _generate_test_cases_by_category(self, 
                                        feature: Dict[str, Any],
                                        user_story: Dict[str, Any], 
@@ -628,7 +597,7 @@ Keep it simple and focused only on {category} scenarios. Each test should be exe
         """Parse simplified test case responses for faster generation."""
         try:
             # Clean the response
-            clean_response = self._extract_json_from_response(response)
+            clean_response = JSONExtractor.parse_json_from_response(response)
             
             if isinstance(clean_response, list):
                 test_cases = []
@@ -5,6 +5,7 @@ Test Plan Agent - Specialized agent for creating test plans at the feature level
 import logging
 from typing import Dict, List, Any, Optional
 from agents.base_agent import Agent
+from utils.json_extractor import JSONExtractor
 
 
 class TestPlanAgent(Agent):
@@ -158,7 +159,7 @@ class TestPlanAgent(Agent):
             try:
                 self.logger.info(f"Calling LLM for test plan generation for feature: {feature.get('title', 'Unknown')}")
                 user_input = f"Create a comprehensive test plan for the feature: {feature.get('title', 'Unknown Feature')}"
-                response = self.run(user_input, template_context)
+                response = self.run(user_input, template_context, output_type='test_plan')
                 self.logger.info(f"LLM response received, length: {len(response) if response else 0}")
             except Exception as e:
                 self.logger.warning(f"LLM call failed for test plan generation: {e}")
@@ -253,8 +254,14 @@ Ensure the test plan is thorough, realistic, and aligned with industry best prac
     def _parse_test_plan_response(self, response: str) -> Dict[str, Any]:
         """Parse LLM response to extract test plan components."""
         try:
+            # Schema constrained responses already carry the required fields
+            structured_plan = self.parse_structured_response(response, 'test_plan')
+            if structured_plan:
+                self.logger.info("Successfully validated structured test plan from LLM response")
+                return structured_plan
+            
             # Try to extract JSON from response
-            parsed_content = self._extract_json_from_response(response)
+            parsed_content = JSONExtractor.parse_json_from_response(response)
             
             if parsed_content and isinstance(parsed_content, dict):
                 # Validate that we have the minimum required fields
@@ -273,71 +280,3 @@ Ensure the test plan is thorough, realistic, and aligned with industry best prac
             self.logger.error(f"Error parsing test plan response: {e}")
             # Skip test plan creation on parsing error
             return None
-    
-    def _extract_json_from_response(self, response: str) -> Optional[Dict[str, Any]]:
-        """Extract JSON content from LLM response with improved parsing."""
-        import json
-        import re
-        
-        if not response or not isinstance(response, str):
-            return None
-        
-        # Clean the response
-        cleaned_response = response.strip()
-        
-        # Method 1: Try to parse the entire response as JSON
-        try:
-            return json.loads(cleaned_response)
-        except (json.JSONDecodeError, TypeError):
-            pass
-        
-        # Method 2: Look for JSON blocks in markdown
-        try:
-            json_match = re.search(r'```json\s*(\{.*?\})\s*```', cleaned_response, re.DOTALL)
-            if json_match:
-                return json.loads(json_match.group(1))
-        except (json.JSONDecodeError, AttributeError):
-            pass
-        
-        # Method 3: Look for JSON blocks without language specifier
-        try:
-            json_match = re.search(r'```\s*(\{.*?\})\s*```', cleaned_response, re.DOTALL)
-            if json_match:
-                return json.loads(json_match.group(1))
-        except (json.JSONDecodeError, AttributeError):
-            pass
-        
-        # Method 4: Look for JSON content between curly braces (more specific)
-        try:
-            # Find the outermost JSON object
-            brace_count = 0
-            start_idx = -1
-            for i, char in enumerate(cleaned_response):
-                if char == '{':
-                    if brace_count == 0:
-                        start_idx = i
-                    brace_count += 1
-                elif char == '}':
-                    brace_count -= 1
-                    if brace_count == 0 and start_idx != -1:
-                        json_str = cleaned_response[start_idx:i+1]
-                        return json.loads(json_str)
-        except (json.JSONDecodeError, IndexError):
-            pass
-        
-        # Method 5: Try to find JSON after common prefixes
-        try:
-            patterns = [
-                r'response:\s*(\{.*\})',
-                r'json:\s*(\{.*\})',
-                r'result:\s*(\{.*\})',
-                r'output:\s*(\{.*\})'
-            ]
-            for pattern in patterns:
-                match = re.search(pattern, cleaned_response, re.DOTALL | re.IGNORECASE)
-                if match:
-                    return json.loads(match.group(1))
-        except (json.JSONDecodeError, AttributeError):
-            pass
-        
-        return None
@@ -6,6 +6,7 @@ import logging
 from typing import Dict, List, Any, Optional
 from agents.base_agent import Agent
 from integrators.azure_devops_api import AzureDevOpsIntegrator
+from utils.json_extractor import JSONExtractor
 
 
 class TestSuiteAgent(Agent):
@@ -138,7 +139,7 @@ class TestSuiteAgent(Agent):
             # Call LLM to generate test suite using template system
             # The run() method will internally call get_prompt(template_context)
             user_input = f"Create a comprehensive test suite for the user story: {user_story.get('title', 'Unknown Story')}"
-            response = self.run(user_input, template_context)
+            response = self.run(user_input, template_context, output_type='test_suite')
             
             if not response:
                 self.logger.error("LLM returned empty response for test suite generation")
@@ -203,8 +204,13 @@ The test suite should validate all aspects of the user story from the perspectiv
     def _parse_test_suite_response(self, response: str) -> Dict[str, Any]:
         """Parse LLM response to extract test suite components."""
         try:
+            # Schema constrained responses validate directly into the typed suite
+            structured_suite = self.parse_structured_response(response, 'test_suite')
+            if structured_suite:
+                return structured_suite
+            
             # Try to extract JSON from response
-            parsed_content = self._extract_json_from_response(response)
+            parsed_content = JSONExtractor.parse_json_from_response(response)
             
             if parsed_content:
                 return parsed_content
@@ -237,35 +243,6 @@ The test suite should validate all aspects of the user story from the perspectiv
             self.logger.error(f"Error parsing test suite response: {e}")
             return {}
     
-    def _extract_json_from_response(self, response: str) -> Optional[Dict[str, Any]]:
-        """Extract JSON content from LLM response."""
-        import json
-        import re
-        
-        try:
-            # First try to parse the entire response as JSON
-            return json.loads(response)
-        except:
-            pass
-        
-        try:
-            # Look for JSON blocks in markdown
-            json_match = re.search(r'```json\s*(\{.*?\})\s*```', response, re.DOTALL)
-            if json_match:
-                return json.loads(json_match.group(1))
-        except:
-            pass
-        
-        try:
-            # Look for JSON content between curly braces
-            json_match = re.search(r'\{.*\}', response, re.DOTALL)
-            if json_match:
-                return json.loads(json_match.group(0))
-        except:
-            pass
-        
-        return None
-    
     def organize_test_cases(self, 
                            test_suite: Dict[str, Any], 
                            test_cases: List[Dict[str, Any]]) -> Dict[str, Any]:
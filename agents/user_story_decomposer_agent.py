@@ -6,7 +6,9 @@ from agents.base_agent import Agent
 from config.config_loader import Config
 from utils.quality_validator import WorkItemQualityValidator
 from utils.json_extractor import JSONExtractor
+from utils.structured_output import unwrap_list_output
 from utils.user_story_quality_assessor_v2 import UserStoryQualityAssessor
+from utils.near_duplicate_detector import NearDuplicateDetector
 
 class TimeoutError(Exception):
     """Custom timeout exception."""
@@ -23,6 +25,7 @@ class UserStoryDecomposerAgent(Agent):
         # Initialize quality validator with current configuration
         self.quality_validator = WorkItemQualityValidator(config.settings if hasattr(config, 'settings') else None)
         self.user_story_quality_assessor = UserStoryQualityAssessor()
+        self.near_duplicates = NearDuplicateDetector(config.settings if hasattr(config, 'settings') else None)
         self.max_quality_retries = 3  # Maximum attempts to achieve GOOD or better rating
     
     def _determine_story_count(self, feature: dict, base_max: int = None) -> int:
@@ -172,23 +175,24 @@ Edge Cases: {feature.get('edge_cases', [])}
                 
                 # Temporarily switch to this model
                 original_model = self.model
-                self.model = model_name
+                original_provider = getattr(self, 'ollama_provider', None)
                 
-                # Update Ollama provider if needed
+                # Update Ollama provider if needed (keeps the configured base_url and keep_alive)
                 if hasattr(self, 'ollama_provider') and self.llm_provider == "ollama":
                     try:
-                        from utils.ollama_client import create_ollama_provider
-                        self.ollama_provider = create_ollama_provider(preset='balanced')
+                        self.ollama_provider = self.get_ollama_provider(model_name)
                     except Exception as e:
                         print(f"WARNING: Failed to switch to {model_name}: {e}")
                         continue
+                self.model = model_name
                 
                 # Use lower temperature for better instruction following
                 original_temperature = getattr(self, 'temperature', 0.7)
                 self.temperature = 0.3  # Lower temperature for more structured output
                 
                 # Try normal prompt first
-                response = self._run_with_timeout(user_input, prompt_context, timeout=timeout, template_name="user_story_decomposer")
+                response = self._run_with_timeout(user_input, prompt_context, timeout=timeout, template_name="user_story_decomposer",
+                                                  output_type='user_stories', model=self.model_cascade.get_draft_model())
                 
                 # If response doesn't look like JSON, try strict prompt
                 if response and not (response.strip().startswith('[') or response.strip().startswith('{')):
@@ -214,6 +218,7 @@ Edge Cases: {feature.get('edge_cases', [])}
                 
                 # Restore original model
                 self.model = original_model
+                self.ollama_provider = original_provider
                 
                 # Only claim success if we actually have a response
                 if response and len(response.strip()) > 0:
@@ -227,11 +232,13 @@ Edge Cases: {feature.get('edge_cases', [])}
                 print(f"TIMEOUT {model_name} timed out after {timeout}s, trying next model...")
                 # Restore original model before continuing
                 self.model = original_model
+                self.ollama_provider = original_provider
                 continue
             except Exception as e:
                 print(f"ERROR {model_name} failed: {e}, trying next model...")
                 # Restore original model before continuing
                 self.model = original_model
+                self.ollama_provider = original_provider
                 continue
         else:
             # All models failed
@@ -253,11 +260,17 @@ Edge Cases: {feature.get('edge_cases', [])}
             else:
                 print("[UserStoryDecomposerAgent] Response is empty or None!")
             
+            # Schema constrained responses validate directly into typed user stories
+            structured_stories = self.parse_structured_response(response, 'user_stories')
+            if structured_stories:
+                print(f"[UserStoryDecomposerAgent] Validated {len(structured_stories)} structured user stories")
+                return self._assess_and_improve_user_story_quality(structured_stories, feature, context, product_vision, max_user_stories)
+            
             # Extract JSON with robust parsing
             cleaned_response = JSONExtractor.extract_json_from_response(response)
             if cleaned_response:
                 try:
-                    parsed_preview = json.loads(cleaned_response)
+                    parsed_preview = unwrap_list_output(json.loads(cleaned_response))
                     if isinstance(parsed_preview, list):
                         print(f"[UserStoryDecomposerAgent] Extracted {len(parsed_preview)} user stories")
                         if parsed_preview:
@@ -272,18 +285,11 @@ Edge Cases: {feature.get('edge_cases', [])}
             
             # Safety check for empty or invalid JSON
             if not cleaned_response or cleaned_response.strip() == "[]":
-                print("WARNING: Empty or invalid JSON response, trying manual extraction")
-                # Try one more manual extraction approach
-                manual_json = self._manual_json_extraction(response)
-                if manual_json:
-                    cleaned_response = manual_json
-                    print(f"Manual extraction successful: {cleaned_response[:100]}...")
-                else:
-                    print("WARNING: Manual extraction failed, attempting text extraction")
-                    return self._extract_user_stories_from_text(response, feature, max_user_stories)
+                print("WARNING: Empty or invalid JSON response, attempting text extraction")
+                return self._extract_user_stories_from_text(response, feature, max_user_stories)
             
             try:
-                user_stories = json.loads(cleaned_response)
+                user_stories = unwrap_list_output(json.loads(cleaned_response))
             except (json.JSONDecodeError, TypeError):
                 print("WARNING: Failed to parse JSON response")
                 return self._extract_user_stories_from_text(response, feature, max_user_stories)
@@ -511,7 +517,8 @@ Edge Cases: {feature.get('edge_cases', [])}
         Validate and enhance user stories to meet quality standards.
         Ensures compliance with Backlog Sweeper monitoring rules.
         """
-        # Apply limit if specified
+        # Apply limit if specified, counting distinct stories only
+        user_stories = self.near_duplicates.deduplicate(user_stories, label='user story')
         if max_user_stories and len(user_stories) > max_user_stories:
             user_stories = user_stories[:max_user_stories]
             
@@ -645,25 +652,26 @@ Edge Cases: {feature.get('edge_cases', [])}
         
         return enhanced_story
 
-    def run_with_template(self, user_input: str, context: dict, template_name: str = None) -> str:
+    def run_with_template(self, user_input: str, context: dict, template_name: str = None, output_type: str = None,
+                          model: str = None) -> str:
         """Run with a specific prompt template (fallback to default if template doesn't exist)."""
         # Use the template name if provided, otherwise use the agent name
         template_to_use = template_name or "user_story_decomposer"
         
         try:
-            # Import prompt manager
-            from utils.prompt_manager import prompt_manager
-            
             # Try to use the specific template
-            prompt = prompt_manager.get_prompt(template_to_use, context)
+            prompt, item_input = self.get_prompt_messages(context, user_input, template_to_use, model=model)
+            structured_options = self.get_structured_request_options(output_type)
+            
             # Use the proper method based on provider
             if self.llm_provider == "ollama":
                 # Use the Ollama provider for local inference
-                return self.ollama_provider.generate_response(
+                return self.get_ollama_provider(model).generate_response(
                     system_prompt=prompt,
-                    user_input=user_input,
+                    user_input=item_input,
                     temperature=0.7,
-                    max_tokens=8000
+                    max_tokens=8000,
+                    output_format=structured_options.get('format')
                 )
             else:
                 # Use direct API call for cloud providers
@@ -674,12 +682,13 @@ Edge Cases: {feature.get('edge_cases', [])}
                 }
                 
                 payload = {
-                    "model": self.model,
+                    "model": model or self.model,
                     "messages": [
                         {"role": "system", "content": prompt},
-                        {"role": "user", "content": user_input}
+                        {"role": "user", "content": item_input}
                     ]
                 }
+                payload.update(structured_options)
                 
                 import requests
                 # Use extended timeout for quality (all models)
@@ -704,174 +713,8 @@ Edge Cases: {feature.get('edge_cases', [])}
                 print(f"ERROR: Fallback generation failed: {fallback_e}")
                 return ""
 
-    def _extract_json_from_response(self, response: str) -> str:
-        """
-        Extract JSON content from AI response with improved bracket counting and validation.
-        
-        Args:
-            response: Raw response from AI model
-            
-        Returns:
-            Cleaned JSON string
-        """
-        if not response:
-            return "[]"
-        
-        import re
-        
-        # Look for JSON inside ```json blocks
-        json_pattern = r'```json\s*([\s\S]*?)\s*```'
-        json_match = re.search(json_pattern, response, re.IGNORECASE)
-        
-        if json_match:
-            content = json_match.group(1).strip()
-            # Try to clean and validate the JSON
-            try:
-                json.loads(content)
-                return content
-            except json.JSONDecodeError:
-                # Try to fix common JSON issues
-                cleaned = self._fix_json_syntax(content)
-                try:
-                    json.loads(cleaned)
-                    return cleaned
-                except json.JSONDecodeError:
-                    pass
-        
-        # Look for JSON inside ``` blocks (without language specifier)
-        code_pattern = r'```\s*([\s\S]*?)\s*```'
-        code_match = re.search(code_pattern, response)
-        
-        if code_match:
-            content = code_match.group(1).strip()
-            # Check if it looks like JSON (starts with { or [)
-            if content.startswith(('{', '[')):
-                return content
-        
-        # Enhanced JSON extraction with proper bracket counting
-        # Find the start of JSON array
-        start_idx = response.find('[')
-        if start_idx == -1:
-            start_idx = response.find('{')
-            if start_idx == -1:
-                return "[]"
-        
-        # Count brackets/braces to find the complete JSON structure
-        if response[start_idx] == '[':
-            bracket_count = 0
-            brace_count = 0
-            in_string = False
-            escape_next = False
-            
-            for i, char in enumerate(response[start_idx:], start_idx):
-                if escape_next:
-                    escape_next = False
-                    continue
-                    
-                if char == '\\' and in_string:
-                    escape_next = True
-                    continue
-                    
-                if char == '"' and not escape_next:
-                    in_string = not in_string
-                    continue
-                
-                if char == "'" and not escape_next:
-                    in_string = not in_string
-                    continue
-                    
-                if not in_string:
-                    if char == '[':
-                        bracket_count += 1
-                    elif char == ']':
-                        bracket_count -= 1
-                        if bracket_count == 0:
-                            # Found the end of the JSON array
-                            return response[start_idx:i+1]
-                    elif char == '{':
-                        brace_count += 1
-                    elif char == '}':
-                        brace_count -= 1
-        
-        else:  # Starting with '{'
-            brace_count = 0
-            bracket_count = 0
-            in_string = False
-            escape_next = False
-            
-            for i, char in enumerate(response[start_idx:], start_idx):
-                if escape_next:
-                    escape_next = False
-                    continue
-                    
-                if char == '\\' and in_string:
-                    escape_next = True
-                    continue
-                    
-                if char == '"' and not escape_next:
-                    in_string = not in_string
-                    continue
-                
-                if char == "'" and not escape_next:
-                    in_string = not in_string
-                    continue
-                    
-                if not in_string:
-                    if char == '{':
-                        brace_count += 1
-                    elif char == '}':
-                        brace_count -= 1
-                        if brace_count == 0:
-                            # Found the end of the JSON object
-                            return response[start_idx:i+1]
-                    elif char == '[':
-                        bracket_count += 1
-                    elif char == ']':
-                        bracket_count -= 1
-        
-        # Fallback: return everything from start to end of response
-        return response[start_idx:].strip()
-    
-    def _fix_json_syntax(self, json_str: str) -> str:
-        """
-        Fix common JSON syntax issues that LLMs often produce.
-        """
-        if not json_str:
-            return "[]"
-        
-        import re
-        
-        # Remove comments and extra text
-        lines = json_str.split('\n')
-        cleaned_lines = []
-        for line in lines:
-            line = line.strip()
-            # Skip comment lines and empty lines
-            if line.startswith('#') or line.startswith('//') or not line:
-                continue
-            # Remove inline comments
-            if '#' in line:
-                line = line.split('#')[0].strip()
-            if '//' in line:
-                line = line.split('//')[0].strip()
-            if line:
-                cleaned_lines.append(line)
-        
-        cleaned_json = '\n'.join(cleaned_lines)
-        
-        # Fix common issues
-        cleaned_json = re.sub(r',\s*}', '}', cleaned_json)  # Remove trailing commas
-        cleaned_json = re.sub(r',\s*]', ']', cleaned_json)  # Remove trailing commas in arrays
-        
-        # Fix unquoted property names
-        cleaned_json = re.sub(r'(\w+):', r'"\1":', cleaned_json)
-        
-        # Fix single quotes to double quotes
-        cleaned_json = cleaned_json.replace("'", '"')
-        
-        return cleaned_json
-
-    def _run_with_timeout(self, user_input: str, context: dict, timeout: int = 600, template_name: str = None):
+    def _run_with_timeout(self, user_input: str, context: dict, timeout: int = 600, template_name: str = None,
+                          output_type: str = None, model: str = None):
         """Run the agent with a timeout to prevent hanging."""
         result = [None]
         exception = [None]
@@ -880,9 +723,10 @@ Edge Cases: {feature.get('edge_cases', [])}
             try:
                 print(f"Starting LLM call with template: {template_name}")
                 if template_name:
-                    result[0] = self.run_with_template(user_input, context, template_name)
+                    result[0] = self.run_with_template(user_input, context, template_name, output_type=output_type,
+                                                       model=model)
                 else:
-                    result[0] = self.run(user_input, context)
+                    result[0] = self.run(user_input, context, output_type=output_type, model=model)
                 print(f"LLM call completed, response length: {len(result[0]) if result[0] else 0}")
             except Exception as e:
                 print(f"LLM call failed with exception: {e}")
@@ -904,91 +748,6 @@ Edge Cases: {feature.get('edge_cases', [])}
         # Ensure we never return None - return empty string if result is None
         return result[0] if result[0] is not None else ""
     
-    def _manual_json_extraction(self, response: str) -> Optional[str]:
-        """Manual JSON extraction as final fallback for CodeLlama responses."""
-        if not response:
-            return None
-            
-        try:
-            # Strategy 1: Look for JSON after explanatory text
-            # CodeLlama often explains then provides JSON
-            lines = response.split('\n')
-            json_start = -1
-            json_end = -1
-            
-            for i, line in enumerate(lines):
-                if line.strip().startswith('[') and '{' in line:
-                    json_start = i
-                    break
-                elif line.strip().startswith('{') and '"title"' in line:
-                    json_start = i
-                    break
-            
-            if json_start >= 0:
-                # Find the end of JSON
-                bracket_count = 0
-                json_lines = []
-                for i in range(json_start, len(lines)):
-                    line = lines[i]
-                    json_lines.append(line)
-                    
-                    # Count brackets to find end
-                    for char in line:
-                        if char == '[' or char == '{':
-                            bracket_count += 1
-                        elif char == ']' or char == '}':
-                            bracket_count -= 1
-                    
-                    if bracket_count == 0 and (']' in line or '}' in line):
-                        json_end = i
-                        break
-                
-                if json_end >= 0:
-                    json_text = '\n'.join(json_lines)
-                    
-                    # Clean up the JSON
-                    json_text = json_text.strip()
-                    
-                    # If it's a single object, wrap in array
-                    if json_text.startswith('{') and json_text.endswith('}'):
-                        json_text = f'[{json_text}]'
-                    
-                    # Try to parse it
-                    try:
-                        json.loads(json_text)
-                        return json_text
-                    except:
-                        pass
-            
-            # Strategy 2: Extract any JSON-like content using regex
-            import re
-            
-            # Look for array patterns
-            array_match = re.search(r'\[[\s\S]*?\]', response)
-            if array_match:
-                potential_json = array_match.group(0)
-                try:
-                    json.loads(potential_json)
-                    return potential_json
-                except:
-                    pass
-            
-            # Strategy 3: Look for object patterns and wrap in array
-            object_matches = re.findall(r'\{[^{}]*"title"[^{}]*:[^{}]*\}', response, re.DOTALL)
-            if object_matches:
-                json_text = '[' + ','.join(object_matches) + ']'
-                try:
-                    json.loads(json_text)
-                    return json_text
-                except:
-                    pass
-            
-            return None
-            
-        except Exception as e:
-            print(f"ERROR: Manual JSON extraction error: {e}")
-            return None
-
     def _assess_and_improve_user_story_quality(self, user_stories: list, feature: dict, context: dict, 
                                              product_vision: str, max_user_stories: int = None) -> list:
         """Assess user story quality and retry generation if not GOOD or better."""
@@ -1000,7 +759,12 @@ Edge Cases: {feature.get('edge_cases', [])}
         domain = context.get('domain', 'general') if context else 'general'
         approved_stories = []
         story_limit = max_user_stories or len(user_stories)  # Track target count
-        failed_story_count = 0  # Track failed stories for replacement
+        
+        # Drop reworded copies before they are assessed, improved and decomposed further;
+        # dropped copies are replaced like failed stories so the target is still reached
+        distinct_stories = self.near_duplicates.deduplicate(user_stories, label='user story')
+        failed_story_count = len(user_stories) - len(distinct_stories)  # Track stories to replace
+        user_stories = distinct_stories
         
         print(f"\nStarting user story quality assessment for {len(user_stories)} stories (target: {story_limit})...")
         print(f"Feature Context: {feature.get('title', 'Unknown Feature')}")
@@ -1046,13 +810,23 @@ Edge Cases: {feature.get('edge_cases', [])}
                     current_story, feature, domain, product_vision
                 )
                 
+                if attempt > 1:
+                    # Improved versions come from the (possibly cached) improvement prompt response
+                    self.record_cache_outcome(assessment.rating, assessment.score)
+                
                 # Log assessment
                 log_output = self.user_story_quality_assessor.format_assessment_log(
                     current_story, assessment, attempt
                 )
                 print(log_output)
                 
-                if assessment.rating in ["EXCELLENT", "GOOD"]:
+                if attempt == 1:
+                    # Cascade: drafts rated below GOOD go to the refine model for improvement
+                    self.model_cascade.record_cascade_result(
+                        assessment.rating, refined=not self.model_cascade.is_accepted(assessment.rating)
+                    )
+                
+                if self.model_cascade.is_accepted(assessment.rating):
                     print(f"SUCCESS: User story approved with {assessment.rating} rating on attempt {attempt}")
                     approved_stories.append(current_story)
                     
@@ -1137,7 +911,6 @@ Edge Cases: {feature.get('edge_cases', [])}
                 
                 if replacement_response:
                     # Parse replacement user stories
-                    from utils.json_extractor import JSONExtractor
                     cleaned_response = JSONExtractor.extract_json_from_response(replacement_response)
                     replacement_stories = json.loads(cleaned_response) if cleaned_response else []
                     
@@ -1162,15 +935,18 @@ Edge Cases: {feature.get('edge_cases', [])}
                             converted_stories.append(converted_story)
                         replacement_stories = converted_stories
                     
-                    # Quick quality check for replacements (1 attempt only)
-                    for i, replacement_story in enumerate(replacement_stories):
+                    replacement_stories = self.near_duplicates.deduplicate(
+                        replacement_stories, existing=approved_stories, label='replacement user story'
+                    )
+                    
+                    # Quick quality check for replacements (1 attempt only), scored as one batch
+                    replacement_assessments = self.user_story_quality_assessor.assess_many(
+                        replacement_stories, {'feature': feature, 'domain': domain, 'product_vision': product_vision}
+                    )
+                    for i, (replacement_story, assessment) in enumerate(zip(replacement_stories, replacement_assessments)):
                         story_title = replacement_story.get('title', f'Replacement Story {i+1}')
                         
-                        assessment = self.user_story_quality_assessor.assess_user_story(
-                            replacement_story, feature, domain, product_vision
-                        )
-                        
-                        if assessment.rating in ["EXCELLENT", "GOOD"]:
+                        if self.model_cascade.is_accepted(assessment.rating):
                             approved_stories.append(replacement_story)
                             print(f"[REPLACEMENT SUCCESS] Added replacement user story '{story_title}' with {assessment.rating} rating")
                             
@@ -1271,8 +1047,8 @@ Return only a single improved user story in this JSON format:
                 'feature_context': context.get('feature_context', '') if context else ''
             }
             
-            # Use the base agent run method to generate improvement
-            response = self.run(improvement_prompt, prompt_context)
+            # Use the base agent run method to generate improvement (refine model when cascading)
+            response = self.run(improvement_prompt, prompt_context, model=self.model_cascade.get_refine_model())
             print(f"[DEBUG] Improvement response received: {len(response) if response else 0} characters")
             
             if not response:
@@ -1284,6 +1060,7 @@ Return only a single improved user story in this JSON format:
             
             if not cleaned_response:
                 print("[DEBUG] No JSON extracted from improvement response")
+                self.discard_cached_response()
                 return None
                 
             improved_story = json.loads(cleaned_response)
@@ -1301,6 +1078,7 @@ Return only a single improved user story in this JSON format:
             elif isinstance(improved_story, list) and len(improved_story) > 0:
                 return improved_story[0]  # Take first story if array returned
             else:
+                self.discard_cached_response()
                 return None
                 
         except Exception as e:
@@ -1309,4 +1087,5 @@ Return only a single improved user story in this JSON format:
             traceback.print_exc()
             print(f"Raw response that caused error: {response[:500] if response else 'None'}")
             print(f"Cleaned response: {cleaned_response[:200] if 'cleaned_response' in locals() else 'Not extracted'}")
+            self.discard_cached_response()
             return None
@@ -19,6 +19,7 @@ from auth.user_auth import (
     UserAuthManager, UserCreate, UserLogin, User, TokenData,
     auth_manager, IS_PRODUCTION
 )
+from utils.async_boundary import run_db
 
 # Create router
 router = APIRouter(prefix="/api/auth", tags=["authentication"])
@@ -96,7 +97,7 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
     """Dependency to get current authenticated user from JWT token."""
     
     token = credentials.credentials
-    payload = auth_manager.verify_token(token)
+    payload = await run_db(auth_manager.verify_token, token)
     
     if payload is None:
         raise AuthResponse.error("Invalid or expired token")
@@ -105,7 +106,7 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
     if user_id is None:
         raise AuthResponse.error("Invalid token payload")
     
-    user = auth_manager.get_user_by_id(user_id)
+    user = await run_db(auth_manager.get_user_by_id, user_id)
     if user is None:
         raise AuthResponse.error("User not found")
     
@@ -117,10 +118,10 @@ async def register_user(user_data: UserCreate):
     """Register a new user account."""
     try:
         # Create the user
-        user = auth_manager.register_user(user_data)
+        user = await run_db(auth_manager.register_user, user_data)
         
         # Create authentication tokens
-        tokens = auth_manager.create_tokens(user)
+        tokens = await run_db(auth_manager.create_tokens, user)
         
         # Return success response with user data and tokens
         response_data = {
@@ -177,26 +178,26 @@ async def login_user(login_data: UserLogin, request: Request):
             )
         
         # Check account lockout
-        if auth_manager.is_account_locked(login_data.username):
+        if await run_db(auth_manager.is_account_locked, login_data.username):
             logger.warning(f"Account locked for username: {login_data.username}")
-            auth_manager.track_login_attempt(login_data.username, client_ip, False)
+            await run_db(auth_manager.track_login_attempt, login_data.username, client_ip, False)
             raise AuthResponse.error(
                 f"Account temporarily locked due to too many failed attempts. Try again in {LOCKOUT_MINUTES} minutes.",
                 status.HTTP_423_LOCKED
             )
         
         # Authenticate user
-        user = auth_manager.authenticate_user(login_data.username, login_data.password)
+        user = await run_db(auth_manager.authenticate_user, login_data.username, login_data.password)
         if user is None:
             logger.warning(f"Failed login attempt for username: {login_data.username} from IP: {client_ip}")
-            auth_manager.track_login_attempt(login_data.username, client_ip, False)
+            await run_db(auth_manager.track_login_attempt, login_data.username, client_ip, False)
             raise AuthResponse.error("Invalid username or password")
         
         # Track successful login
-        auth_manager.track_login_attempt(login_data.username, client_ip, True)
+        await run_db(auth_manager.track_login_attempt, login_data.username, client_ip, True)
         
         # Create authentication tokens
-        tokens = auth_manager.create_tokens(user)
+        tokens = await run_db(auth_manager.create_tokens, user)
         
         # Return success response with user data and access token
         response_data = {
@@ -245,7 +246,7 @@ async def refresh_token(refresh_token: Optional[str] = Cookie(None)):
     
     try:
         # Create new access token
-        tokens = auth_manager.refresh_access_token(refresh_token)
+        tokens = await run_db(auth_manager.refresh_access_token, refresh_token)
         if tokens is None:
             raise AuthResponse.error("Invalid or expired refresh token")
         
@@ -275,7 +276,7 @@ async def logout_user(refresh_token: Optional[str] = Cookie(None)):
     
     try:
         # Invalidate refresh token
-        success = auth_manager.logout_user(refresh_token)
+        success = await run_db(auth_manager.logout_user, refresh_token)
         
         # Create response
         response = JSONResponse(
@@ -334,7 +335,7 @@ async def verify_token_endpoint(current_user: User = Depends(get_current_user)):
 async def cleanup_expired_sessions():
     """Clean up expired refresh token sessions (admin endpoint)."""
     try:
-        auth_manager.cleanup_expired_sessions()
+        await run_db(auth_manager.cleanup_expired_sessions)
         return AuthResponse.success(message="Expired sessions cleaned up")
     except Exception as e:
         logger.error(f"Session cleanup error: {str(e)}")
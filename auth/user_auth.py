@@ -16,6 +16,7 @@ from jose import JWTError, jwt
 from pydantic import BaseModel, EmailStr, validator
 import re
 from utils.safe_logger import get_safe_logger
+from utils.schema_migrations import add_column, ensure_schema
 
 
 # JWT Configuration
@@ -106,28 +107,21 @@ class UserAuthManager:
     def __init__(self, db_path: str = "agile_backlog.db"):
         self.db_path = db_path
         self.logger = get_safe_logger(__name__)
-        self._create_tables()
+        ensure_schema(self.db_path, 'user_auth', self._create_tables)
     
     def _migrate_database(self):
         """Migrate existing database to add new columns."""
-        try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                
-                # Check if jti column exists in user_sessions
-                try:
-                    cursor.execute("PRAGMA table_info(user_sessions)")
-                    columns = [col[1] for col in cursor.fetchall()]
-                    
-                    if 'jti' not in columns and len(columns) > 0:
-                        conn.execute("ALTER TABLE user_sessions ADD COLUMN jti TEXT")
-                        self.logger.info("Added jti column to user_sessions table")
-                        conn.commit()
-                except sqlite3.OperationalError:
-                    # Table doesn't exist yet, will be created in _create_tables
-                    pass
-        except Exception as e:
-            self.logger.warning(f"Database migration warning: {e}")
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            
+            # Check if jti column exists in user_sessions (no columns: table created in _create_tables)
+            cursor.execute("PRAGMA table_info(user_sessions)")
+            columns = [col[1] for col in cursor.fetchall()]
+            
+            if 'jti' not in columns and len(columns) > 0:
+                add_column(conn, 'user_sessions', 'jti TEXT')
+                self.logger.info("Added jti column to user_sessions table")
+                conn.commit()
     
     def _create_tables(self):
         """Create user authentication tables if they don't exist."""
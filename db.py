@@ -7,15 +7,47 @@ import sqlite3
 import os
 import json
 import logging
+import threading
+import time
 from datetime import datetime
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+
+from utils.blob_codec import decode_json, decode_text, encode_json
+from utils.schema_migrations import add_column, ensure_schema
 
 logger = logging.getLogger(__name__)
 
+# Columns of backlog_jobs that list views need (everything except the raw_summary blob)
+BACKLOG_JOB_LIST_COLUMNS = (
+    'id', 'user_email', 'project_name', 'epics_generated', 'features_generated',
+    'user_stories_generated', 'tasks_generated', 'test_cases_generated',
+    'execution_time_seconds', 'status', 'is_deleted', 'created_at',
+    'progress', 'current_action', 'current_agent', 'last_progress_update'
+)
+BACKLOG_JOB_COLUMNS = BACKLOG_JOB_LIST_COLUMNS + ('raw_summary', 'progress_etag', 'job_key')
+
+def encode_job_cursor(job: Dict[str, Any]) -> str:
+    """Keyset cursor of a backlog job row, for the page that follows it."""
+    return f"{job['created_at']}|{job['id']}"
+
+def decode_job_cursor(cursor: str) -> Tuple[str, int]:
+    """(created_at, id) of a keyset cursor; raises ValueError if it is malformed."""
+    created_at, separator, job_id = (cursor or '').rpartition('|')
+    if not separator or not created_at:
+        raise ValueError(f"Invalid job cursor: {cursor}")
+    return created_at, int(job_id)
+
+def _sql_blob_text(value):
+    """blob_text() SQL function: stored JSON as text, NULL if it cannot be decoded."""
+    try:
+        return decode_text(value)
+    except ValueError:
+        return None
+
 class Database:
     def __init__(self, db_path: str = "backlog_jobs.db"):
         self.db_path = db_path
-        self.init_database()
+        ensure_schema(self.db_path, 'database', self.init_database)
     
     def init_database(self):
         """Initialize database with required tables."""
@@ -78,30 +110,24 @@ class Database:
                 ''')
                 
                 # Add progress columns to existing backlog_jobs if they don't exist
-                try:
-                    cursor.execute("ALTER TABLE backlog_jobs ADD COLUMN progress INTEGER DEFAULT 0")
-                except sqlite3.OperationalError:
-                    pass  # Column already exists
+                add_column(cursor, 'backlog_jobs', 'progress INTEGER DEFAULT 0')
                 
-                try:
-                    cursor.execute("ALTER TABLE backlog_jobs ADD COLUMN current_action TEXT")
-                except sqlite3.OperationalError:
-                    pass  # Column already exists
+                add_column(cursor, 'backlog_jobs', 'current_action TEXT')
                     
-                try:
-                    cursor.execute("ALTER TABLE backlog_jobs ADD COLUMN current_agent TEXT")
-                except sqlite3.OperationalError:
-                    pass  # Column already exists
+                add_column(cursor, 'backlog_jobs', 'current_agent TEXT')
                     
-                try:
-                    cursor.execute("ALTER TABLE backlog_jobs ADD COLUMN last_progress_update TIMESTAMP")
-                except sqlite3.OperationalError:
-                    pass  # Column already exists
+                add_column(cursor, 'backlog_jobs', 'last_progress_update TIMESTAMP')
                     
-                try:
-                    cursor.execute("ALTER TABLE backlog_jobs ADD COLUMN progress_etag TEXT")
-                except sqlite3.OperationalError:
-                    pass  # Column already exists
+                add_column(cursor, 'backlog_jobs', 'progress_etag TEXT')
+                
+                # raw_summary may be stored compressed, so the workflow job ID it
+                # contains is kept in its own column for progress lookups
+                add_column(cursor, 'backlog_jobs', 'job_key TEXT')
+                
+                cursor.execute('''
+                    UPDATE backlog_jobs SET job_key = json_extract(raw_summary, '$.job_id')
+                    WHERE job_key IS NULL AND typeof(raw_summary) = 'text' AND json_valid(raw_summary)
+                ''')
                 
                 # Create user settings table with proper constraints
                 cursor.execute('''
@@ -159,51 +185,44 @@ class Database:
                     ON llm_configurations(user_id, is_active)
                 ''')
                 
+                # Job history indexes: equality filters first, then the (created_at, id)
+                # keyset order, with status last so the failed filter is checked in the index
+                cursor.execute('''
+                    CREATE INDEX IF NOT EXISTS idx_backlog_jobs_user_history 
+                    ON backlog_jobs(user_email, is_deleted, created_at DESC, id DESC, status)
+                ''')
+                
+                cursor.execute('''
+                    CREATE INDEX IF NOT EXISTS idx_backlog_jobs_history 
+                    ON backlog_jobs(is_deleted, created_at DESC, id DESC, status)
+                ''')
+                
+                cursor.execute('''
+                    CREATE INDEX IF NOT EXISTS idx_backlog_jobs_job_key 
+                    ON backlog_jobs(job_key)
+                ''')
+                
                 # Add missing columns if they don't exist (migrations)
-                try:
-                    cursor.execute('ALTER TABLE user_settings ADD COLUMN is_user_default BOOLEAN DEFAULT FALSE')
+                if add_column(cursor, 'user_settings', 'is_user_default BOOLEAN DEFAULT FALSE'):
                     logger.info("Added is_user_default column to user_settings table")
-                except sqlite3.OperationalError:
-                    # Column already exists
-                    pass
                 
-                try:
-                    cursor.execute('ALTER TABLE jobs ADD COLUMN updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP')
+                if add_column(cursor, 'jobs', 'updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP'):
                     logger.info("Added updated_at column to jobs table")
-                except sqlite3.OperationalError:
-                    # Column already exists
-                    pass
                 
-                try:
-                    cursor.execute('ALTER TABLE jobs ADD COLUMN result_data TEXT')
+                if add_column(cursor, 'jobs', 'result_data TEXT'):
                     logger.info("Added result_data column to jobs table")
-                except sqlite3.OperationalError:
-                    # Column already exists
-                    pass
 
                 # Add agent_name column to llm_configurations for per-agent model support
-                try:
-                    cursor.execute('ALTER TABLE llm_configurations ADD COLUMN agent_name TEXT')
+                if add_column(cursor, 'llm_configurations', 'agent_name TEXT'):
                     logger.info("Added agent_name column to llm_configurations table")
-                except sqlite3.OperationalError:
-                    # Column already exists
-                    pass
                 
                 # Add configuration_mode column to llm_configurations for mode persistence
-                try:
-                    cursor.execute('ALTER TABLE llm_configurations ADD COLUMN configuration_mode TEXT CHECK (configuration_mode IN ("global", "agent-specific") OR configuration_mode IS NULL)')
+                if add_column(cursor, 'llm_configurations', 'configuration_mode TEXT CHECK (configuration_mode IN ("global", "agent-specific") OR configuration_mode IS NULL)'):
                     logger.info("Added configuration_mode column to llm_configurations table")
-                except sqlite3.OperationalError:
-                    # Column already exists
-                    pass
                 
                 # Add agent_name column to llm_configurations for agent-specific configs
-                try:
-                    cursor.execute('ALTER TABLE llm_configurations ADD COLUMN agent_name TEXT')
+                if add_column(cursor, 'llm_configurations', 'agent_name TEXT'):
                     logger.info("Added agent_name column to llm_configurations table")
-                except sqlite3.OperationalError:
-                    # Column already exists
-                    pass
                 
                 # Create optimized visions table
                 cursor.execute('''
@@ -905,13 +924,14 @@ class Database:
                     INSERT INTO backlog_jobs (
                         user_email, project_name, epics_generated, features_generated,
                         user_stories_generated, tasks_generated, test_cases_generated,
-                        execution_time_seconds, raw_summary
+                        execution_time_seconds, raw_summary, job_key
                     )
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
                 ''', (
                     user_email, project_name, epics_generated, features_generated,
                     user_stories_generated, tasks_generated, test_cases_generated,
-                    execution_time_seconds, json.dumps(raw_summary) if raw_summary else None
+                    execution_time_seconds, encode_json(raw_summary) if raw_summary else None,
+                    raw_summary.get('job_id') if raw_summary else None
                 ))
                 job_id = cursor.lastrowid
                 conn.commit()
@@ -923,13 +943,47 @@ class Database:
     
     def get_backlog_jobs(self, user_email: str = None, exclude_test_generated: bool = False,
                         exclude_failed: bool = False, exclude_deleted: bool = True,
-                        limit: int = None) -> List[Dict[str, Any]]:
-        """Get backlog jobs with optional filtering."""
+                        limit: int = None, before: Optional[Tuple[str, int]] = None,
+                        columns: Optional[Sequence[str]] = None,
+                        summary_fields: Optional[Dict[str, str]] = None,
+                        parse_summary: bool = True) -> List[Dict[str, Any]]:
+        """
+        Get backlog jobs with optional filtering, newest first.
+        
+        Args:
+            limit: Maximum number of jobs to return
+            before: Keyset cursor (created_at, id) of the last job of the previous page
+            columns: Columns to load (all columns if None); see BACKLOG_JOB_LIST_COLUMNS
+            summary_fields: Values to extract from raw_summary in SQL, as {name: JSON path},
+                so list views can read a few summary values without returning the blob
+            parse_summary: Parse raw_summary JSON; if False it is returned as stored
+                and can be parsed on demand with load_job_summary()
+        """
+        selected = list(columns) if columns else list(BACKLOG_JOB_COLUMNS)
+        unknown = [column for column in selected if column not in BACKLOG_JOB_COLUMNS]
+        if unknown:
+            raise ValueError(f"Unknown backlog_jobs columns: {unknown}")
+        if before and 'created_at' not in selected:
+            selected.append('created_at')
+        if before and 'id' not in selected:
+            selected.append('id')
+        
         try:
             with sqlite3.connect(self.db_path) as conn:
                 conn.row_factory = sqlite3.Row
+                conn.create_function('blob_text', 1, _sql_blob_text, deterministic=True)
                 cursor = conn.cursor()
                 
+                select_params = []
+                select_list = list(selected)
+                for name, path in (summary_fields or {}).items():
+                    if not name.isidentifier():
+                        raise ValueError(f"Invalid summary field name: {name}")
+                    select_list.append(
+                        f"CASE WHEN json_valid(blob_text(raw_summary)) THEN json_extract(blob_text(raw_summary), ?) END AS {name}"
+                    )
+                    select_params.append(path)
+                
                 where_conditions = []
                 params = []
                 
@@ -943,29 +997,32 @@ class Database:
                 if exclude_failed:
                     where_conditions.append("status != 'failed'")
                 
+                if before:
+                    where_conditions.append("(created_at, id) < (?, ?)")
+                    params.extend([before[0], before[1]])
+                
                 where_clause = ""
                 if where_conditions:
                     where_clause = "WHERE " + " AND ".join(where_conditions)
                 
-                limit_clause = f"LIMIT {limit}" if limit else ""
+                limit_clause = ""
+                if limit:
+                    limit_clause = "LIMIT ?"
+                    params.append(int(limit))
                 
                 query = f'''
-                    SELECT * FROM backlog_jobs 
+                    SELECT {", ".join(select_list)} FROM backlog_jobs 
                     {where_clause}
-                    ORDER BY created_at DESC
+                    ORDER BY created_at DESC, id DESC
                     {limit_clause}
                 '''
                 
-                cursor.execute(query, params)
+                cursor.execute(query, select_params + params)
                 jobs = []
                 for row in cursor.fetchall():
-                    job = dict(row) 
-                    # Parse raw_summary JSON if it exists
-                    if job['raw_summary']:
-                        try:
-                            job['raw_summary'] = json.loads(job['raw_summary'])
-                        except json.JSONDecodeError:
-                            job['raw_summary'] = None
+                    job = dict(row)
+                    if parse_summary and 'raw_summary' in job:
+                        self.load_job_summary(job)
                     jobs.append(job)
                 
                 return jobs
@@ -973,6 +1030,18 @@ class Database:
             logger.error(f"Failed to get backlog jobs: {e}")
             return []
     
+    @staticmethod
+    def load_job_summary(job: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Parse a job's stored raw_summary in place (once) and return it."""
+        raw_summary = job.get('raw_summary')
+        if isinstance(raw_summary, (str, bytes)):
+            try:
+                raw_summary = decode_json(raw_summary)
+            except ValueError:
+                raw_summary = None
+            job['raw_summary'] = raw_summary
+        return raw_summary
+    
     def delete_backlog_job(self, job_id: int) -> bool:
         """Soft delete a backlog job."""
         try:
@@ -1017,13 +1086,13 @@ class Database:
             with sqlite3.connect(self.db_path, timeout=5.0) as conn:
                 cursor = conn.cursor()
                 
-                # Find job by job_id in raw_summary
+                # Find job by the job_id of its raw_summary
                 cursor.execute("""
                     SELECT id, progress, last_progress_update, progress_etag
                     FROM backlog_jobs 
-                    WHERE raw_summary LIKE ? AND is_deleted = 0
+                    WHERE job_key = ? AND is_deleted = 0
                     ORDER BY created_at DESC LIMIT 1
-                """, (f'%"job_id":"{job_id}"%',))
+                """, (job_id,))
                 
                 result = cursor.fetchone()
                 if not result:
@@ -1088,9 +1157,9 @@ class Database:
                     SELECT progress, current_action, current_agent, 
                            last_progress_update, progress_etag, status
                     FROM backlog_jobs 
-                    WHERE raw_summary LIKE ? AND is_deleted = 0
+                    WHERE job_key = ? AND is_deleted = 0
                     ORDER BY created_at DESC LIMIT 1
-                """, (f'%"job_id":"{job_id}"%',))
+                """, (job_id,))
                 
                 result = cursor.fetchone()
                 if not result:
@@ -1418,70 +1487,184 @@ def add_backlog_job(user_email: str, project_name: str, epics_generated: int = 0
 # DOMAIN MANAGEMENT FUNCTIONS
 # =====================================================
 
-def get_all_domains(include_inactive: bool = False) -> List[Dict[str, Any]]:
-    """Get all available domains with their subdomains."""
-    try:
-        db = Database()
-        with sqlite3.connect(db.db_path) as conn:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            
-            where_clause = "" if include_inactive else "WHERE d.is_active = TRUE"
-            
-            cursor.execute(f'''
-                SELECT 
-                    d.id, d.domain_key, d.display_name, d.description, 
-                    d.icon_name, d.color_code, d.is_active, d.sort_order
-                FROM domains d
-                {where_clause}
-                ORDER BY d.sort_order, d.display_name
-            ''')
-            
-            domains = []
-            for row in cursor.fetchall():
-                domain = dict(row)
-                
-                # Get subdomains for this domain
-                cursor.execute('''
-                    SELECT id, subdomain_key, display_name, description, is_active, sort_order
-                    FROM subdomains 
-                    WHERE domain_id = ? AND is_active = TRUE
-                    ORDER BY sort_order, display_name
-                ''', (domain['id'],))
-                
-                domain['subdomains'] = [dict(sub_row) for sub_row in cursor.fetchall()]
-                domains.append(domain)
-            
-            return domains
+DOMAIN_KNOWLEDGE_VERSION_KEY = 'domain_knowledge_version'
+DOMAIN_KNOWLEDGE_CHECK_INTERVAL_SECONDS = 5.0
+
+
+class DomainKnowledgeStore:
+    """
+    Process-wide, read-mostly copy of the domain tables.
+    
+    Domains, subdomains, patterns, user types and vocabulary are loaded once
+    into in-memory indexes keyed by domain ID. Writes that change them bump the
+    'domain_knowledge_version' counter in system_info; readers compare it with
+    the loaded version at most every few seconds and reload only when it
+    changed, so writes from other processes are picked up as well.
+    
+    Every getter raises sqlite3.Error (or ValueError) if the domain tables
+    cannot be read; the module-level helpers below log it and fall back.
+    """
+    
+    def __init__(self, db_path: str = "backlog_jobs.db",
+                 check_interval_seconds: float = DOMAIN_KNOWLEDGE_CHECK_INTERVAL_SECONDS):
+        self.db_path = db_path
+        self.check_interval_seconds = check_interval_seconds
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._version = None
+        self._checked_at = 0.0
+    
+    def _read_version(self, conn) -> str:
+        row = conn.execute('SELECT info_value FROM system_info WHERE info_key = ?',
+                           (DOMAIN_KNOWLEDGE_VERSION_KEY,)).fetchone()
+        return row[0] if row else '0'
+    
+    def _load(self, conn) -> Dict[str, Any]:
+        """Read all domain tables (raises sqlite3.Error / ValueError if they cannot be read)."""
+        conn.row_factory = sqlite3.Row
+        snapshot = {'domains': [], 'subdomains': {}, 'patterns': {}, 'user_types': {}, 'vocabulary': {}}
+        snapshot['domains'] = [dict(row) for row in conn.execute('''
+            SELECT id, domain_key, display_name, description, icon_name, color_code,
+                   is_active, sort_order, is_active = TRUE AS _active
+            FROM domains
+            ORDER BY display_name
+        ''')]
+        for row in conn.execute('''
+            SELECT domain_id, id, subdomain_key, display_name, description, is_active, sort_order
+            FROM subdomains
+            WHERE is_active = TRUE
+            ORDER BY sort_order, display_name
+        '''):
+            subdomain = dict(row)
+            snapshot['subdomains'].setdefault(subdomain.pop('domain_id'), []).append(subdomain)
+        for row in conn.execute('''
+            SELECT domain_id, subdomain_id, pattern_value FROM domain_patterns
+            WHERE is_active = TRUE
+            ORDER BY weight DESC, id
+        '''):
+            snapshot['patterns'].setdefault(row['domain_id'], []).append((row['subdomain_id'], row['pattern_value']))
+        for row in conn.execute('''
+            SELECT domain_id, subdomain_id, user_type_key, display_name, description, user_patterns
+            FROM domain_user_types
+            WHERE is_active = TRUE
+            ORDER BY sort_order, display_name
+        '''):
+            patterns = json.loads(row['user_patterns']) if row['user_patterns'] else []
+            snapshot['user_types'].setdefault(row['domain_id'], []).append(
+                (row['subdomain_id'], row['user_type_key'], row['display_name'], row['description'], tuple(patterns))
+            )
+        for row in conn.execute('''
+            SELECT domain_id, subdomain_id, category, term FROM domain_vocabulary
+            WHERE is_active = TRUE
+            ORDER BY term
+        '''):
+            snapshot['vocabulary'].setdefault(row['domain_id'], []).append(
+                (row['subdomain_id'], row['category'], row['term'])
+            )
+        snapshot['domains_by_key'] = {domain['domain_key']: domain for domain in snapshot['domains']}
+        return snapshot
+    
+    def _current(self) -> Dict[str, Any]:
+        """
+        Loaded snapshot, reloaded if the version counter changed since it was loaded.
+        
+        A failed load raises and is not cached, so the next call retries it
+        (e.g. once the domain tables have been created).
+        """
+        with self._lock:
+            now = time.time()
+            if self._snapshot is not None and now - self._checked_at < self.check_interval_seconds:
+                return self._snapshot
             
-    except Exception as e:
-        logger.error(f"Failed to get domains: {e}")
-        return []
+            with sqlite3.connect(self.db_path) as conn:
+                try:
+                    version = self._read_version(conn)
+                except sqlite3.Error:
+                    version = None
+                if self._snapshot is None or version is None or version != self._version:
+                    self._snapshot = None
+                    self._version = None
+                    snapshot = self._load(conn)
+                    self._snapshot, self._version = snapshot, version
+                    logger.info(f"Loaded domain knowledge version {version}: {len(snapshot['domains'])} domains")
+            self._checked_at = now
+            return self._snapshot
+    
+    def invalidate(self):
+        """Bump the version counter so every process reloads the domain tables."""
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute('''
+                INSERT OR IGNORE INTO system_info (info_key, info_value) VALUES (?, '0')
+            ''', (DOMAIN_KNOWLEDGE_VERSION_KEY,))
+            conn.execute('''
+                UPDATE system_info SET info_value = CAST(info_value AS INTEGER) + 1, updated_at = CURRENT_TIMESTAMP
+                WHERE info_key = ?
+            ''', (DOMAIN_KNOWLEDGE_VERSION_KEY,))
+            conn.commit()
+        with self._lock:
+            self._checked_at = 0.0
+    
+    def get_domains(self, include_inactive: bool = False) -> List[Dict[str, Any]]:
+        """Domains ordered by display name."""
+        snapshot = self._current()
+        return [
+            {key: domain[key] for key in ('id', 'domain_key', 'display_name', 'description', 'is_active')}
+            for domain in snapshot['domains'] if include_inactive or domain['_active']
+        ]
+    
+    def get_domain(self, domain_key: str) -> Optional[Dict[str, Any]]:
+        """Domain with its active subdomains, by key."""
+        snapshot = self._current()
+        domain = snapshot['domains_by_key'].get(domain_key)
+        if domain is None:
+            return None
+        result = {key: value for key, value in domain.items() if key != '_active'}
+        result['subdomains'] = [dict(subdomain) for subdomain in snapshot['subdomains'].get(domain['id'], [])]
+        return result
+    
+    def get_patterns(self, domain_id: int, subdomain_id: int = None) -> List[str]:
+        """Detection patterns of a domain (and subdomain), highest weight first."""
+        return [
+            value for pattern_subdomain, value in self._current()['patterns'].get(domain_id, [])
+            if pattern_subdomain is None or (subdomain_id and pattern_subdomain == subdomain_id)
+        ]
+    
+    def get_user_types(self, domain_id: int, subdomain_id: int = None) -> Dict[str, Dict[str, Any]]:
+        """User types of a domain (and subdomain), keyed by user type key."""
+        user_types = {}
+        for type_subdomain, key, display_name, description, patterns in self._current()['user_types'].get(domain_id, []):
+            if type_subdomain is None or (subdomain_id and type_subdomain == subdomain_id):
+                user_types[key] = {'display_name': display_name, 'description': description, 'patterns': list(patterns)}
+        return user_types
+    
+    def get_vocabulary(self, domain_id: int, subdomain_id: int = None, category: str = None) -> List[str]:
+        """Vocabulary terms of a domain (and subdomain), in term order."""
+        return [
+            term for term_subdomain, term_category, term in self._current()['vocabulary'].get(domain_id, [])
+            if (term_subdomain is None or (subdomain_id and term_subdomain == subdomain_id))
+            and (not category or term_category == category)
+        ]
+    
+    def get_vocabulary_by_domain_key(self) -> Dict[str, List[str]]:
+        """Domain-level vocabulary of every active domain, keyed by domain key."""
+        snapshot = self._current()
+        return {
+            domain['domain_key']: [
+                term for term_subdomain, _, term in snapshot['vocabulary'].get(domain['id'], [])
+                if term_subdomain is None
+            ]
+            for domain in snapshot['domains'] if domain['_active']
+        }
+
+
+# Shared by the domain functions below, the vision context extractor and the /api/domains endpoint
+domain_knowledge = DomainKnowledgeStore()
+
 
 def get_domain_patterns(domain_id: int, subdomain_id: int = None) -> List[str]:
     """Get patterns for domain detection."""
     try:
-        db = Database()
-        with sqlite3.connect(db.db_path) as conn:
-            cursor = conn.cursor()
-            
-            if subdomain_id:
-                cursor.execute('''
-                    SELECT pattern_value FROM domain_patterns 
-                    WHERE domain_id = ? AND (subdomain_id = ? OR subdomain_id IS NULL) 
-                    AND is_active = TRUE
-                    ORDER BY weight DESC
-                ''', (domain_id, subdomain_id))
-            else:
-                cursor.execute('''
-                    SELECT pattern_value FROM domain_patterns 
-                    WHERE domain_id = ? AND subdomain_id IS NULL 
-                    AND is_active = TRUE
-                    ORDER BY weight DESC
-                ''', (domain_id,))
-            
-            return [row[0] for row in cursor.fetchall()]
-            
+        return domain_knowledge.get_patterns(domain_id, subdomain_id)
     except Exception as e:
         logger.error(f"Failed to get domain patterns: {e}")
         return []
@@ -1489,40 +1672,7 @@ def get_domain_patterns(domain_id: int, subdomain_id: int = None) -> List[str]:
 def get_domain_user_types(domain_id: int, subdomain_id: int = None) -> Dict[str, Dict[str, Any]]:
     """Get user types for a domain."""
     try:
-        db = Database()
-        with sqlite3.connect(db.db_path) as conn:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            
-            if subdomain_id:
-                cursor.execute('''
-                    SELECT user_type_key, display_name, description, user_patterns
-                    FROM domain_user_types 
-                    WHERE domain_id = ? AND (subdomain_id = ? OR subdomain_id IS NULL)
-                    AND is_active = TRUE
-                    ORDER BY sort_order, display_name
-                ''', (domain_id, subdomain_id))
-            else:
-                cursor.execute('''
-                    SELECT user_type_key, display_name, description, user_patterns
-                    FROM domain_user_types 
-                    WHERE domain_id = ? AND subdomain_id IS NULL
-                    AND is_active = TRUE
-                    ORDER BY sort_order, display_name
-                ''', (domain_id,))
-            
-            user_types = {}
-            for row in cursor.fetchall():
-                row_dict = dict(row)
-                patterns = json.loads(row_dict['user_patterns']) if row_dict['user_patterns'] else []
-                user_types[row_dict['user_type_key']] = {
-                    'display_name': row_dict['display_name'],
-                    'description': row_dict['description'],
-                    'patterns': patterns
-                }
-            
-            return user_types
-            
+        return domain_knowledge.get_user_types(domain_id, subdomain_id)
     except Exception as e:
         logger.error(f"Failed to get domain user types: {e}")
         return {}
@@ -1530,32 +1680,7 @@ def get_domain_user_types(domain_id: int, subdomain_id: int = None) -> Dict[str,
 def get_domain_vocabulary(domain_id: int, subdomain_id: int = None, category: str = None) -> List[str]:
     """Get vocabulary terms for a domain."""
     try:
-        db = Database()
-        with sqlite3.connect(db.db_path) as conn:
-            cursor = conn.cursor()
-            
-            where_conditions = ["domain_id = ?", "is_active = TRUE"]
-            params = [domain_id]
-            
-            if subdomain_id:
-                where_conditions.append("(subdomain_id = ? OR subdomain_id IS NULL)")
-                params.append(subdomain_id)
-            else:
-                where_conditions.append("subdomain_id IS NULL")
-            
-            if category:
-                where_conditions.append("category = ?")
-                params.append(category)
-            
-            query = f'''
-                SELECT term FROM domain_vocabulary 
-                WHERE {" AND ".join(where_conditions)}
-                ORDER BY term
-            '''
-            
-            cursor.execute(query, params)
-            return [row[0] for row in cursor.fetchall()]
-            
+        return domain_knowledge.get_vocabulary(domain_id, subdomain_id, category)
     except Exception as e:
         logger.error(f"Failed to get domain vocabulary: {e}")
         return []
@@ -1646,9 +1771,11 @@ def submit_domain_request(request_data: Dict[str, Any]) -> str:
             
             request_id = cursor.lastrowid
             conn.commit()
-            
-            logger.info(f"Domain request submitted: {request_id}")
-            return str(request_id)
+        
+        # Approved requests change the domain tables; let readers reload
+        domain_knowledge.invalidate()
+        logger.info(f"Domain request submitted: {request_id}")
+        return str(request_id)
             
     except Exception as e:
         logger.error(f"Failed to submit domain request: {e}")
@@ -1704,32 +1831,10 @@ def get_domain_requests(status: str = None, user_id: str = None) -> List[Dict[st
         logger.error(f"Failed to get domain requests: {e}")
         return []
 
-def get_all_domains() -> List[Dict[str, Any]]:
+def get_all_domains(include_inactive: bool = False) -> List[Dict[str, Any]]:
     """Get all domains from the database."""
     try:
-        db = Database()
-        with sqlite3.connect(db.db_path) as conn:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            
-            cursor.execute('''
-                SELECT 
-                    id,
-                    domain_key,
-                    display_name,
-                    description,
-                    is_active
-                FROM domains
-                WHERE is_active = 1
-                ORDER BY display_name
-            ''')
-            
-            domains = []
-            for row in cursor.fetchall():
-                domains.append(dict(row))
-            
-            return domains
-            
+        return domain_knowledge.get_domains(include_inactive)
     except Exception as e:
         logger.error(f"Failed to get all domains: {e}")
         return []
@@ -1849,7 +1954,10 @@ def get_backlogs_from_optimized_vision(optimized_vision_id: int) -> List[Dict[st
                 ORDER BY bj.created_at DESC
             ''', (optimized_vision_id,))
             
-            return [dict(row) for row in cursor.fetchall()]
+            return [
+                {**dict(row), 'raw_summary': decode_text(row['raw_summary'])}
+                for row in cursor.fetchall()
+            ]
     except Exception as e:
         logger.error(f"Failed to get backlogs from optimized vision: {e}")
         return []
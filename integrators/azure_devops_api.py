@@ -8,7 +8,7 @@ Includes comprehensive test plan management following ADO best practices.
 
 import os
 import json
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Iterable, Iterator
 import requests
 from requests.auth import HTTPBasicAuth
 import base64
@@ -20,6 +20,8 @@ from urllib3.util.retry import Retry
 
 from config.config_loader import Config
 from clients.azure_devops_test_client import AzureDevOpsTestClient
+from integrators.work_item_reader import iter_work_items, WorkItemReadError
+from integrators.parent_candidate_index import ParentCandidateIndex
 
 class AzureDevOpsIntegrator:
     """
@@ -37,6 +39,18 @@ class AzureDevOpsIntegrator:
     - Test organization (Test Plan -> Test Suite -> Test Case)
     """
     
+    # Concurrent page requests for bulk work item reads (ADO throttles aggressive clients)
+    DETAILS_MAX_CONCURRENT_PAGES = 4
+    
+    # Parent candidate indexes are rebuilt after this many seconds
+    PARENT_INDEX_MAX_AGE_SECONDS = 300
+    
+    # Fields needed to score parent candidates for orphaned work items
+    PARENT_INDEX_FIELDS = [
+        "System.Id", "System.Title", "System.WorkItemType", "System.AreaPath",
+        "System.State", "Microsoft.VSTS.Common.Priority"
+    ]
+    
     def __init__(self, organization_url: str, project: str, personal_access_token: str = None, area_path: str = None, iteration_path: str = None):
         """Initialize Azure DevOps integration with configuration and explicit area/iteration paths."""
         # Parse organization from URL
@@ -83,6 +97,9 @@ class AzureDevOpsIntegrator:
         self.test_plans_url = f"{self.base_url}/testplan/plans"
         self.test_suites_url = f"{self.base_url}/testplan/suites"
         
+        # Parent type -> ParentCandidateIndex for orphaned work item matching
+        self._parent_indexes: Dict[str, ParentCandidateIndex] = {}
+        
         # Initialize test management client with error handling
         if self.enabled:
             try:
@@ -930,35 +947,39 @@ class AzureDevOpsIntegrator:
             self.logger.error(f"Failed to get work item relations for {work_item_id}: {e}")
             return []
 
-    def get_work_item_details(self, work_item_ids: List[int]) -> List[Dict]:
-        """Get detailed work item information for multiple IDs."""
+    def iter_work_item_details(self, work_item_ids: Iterable[int], fields: List[str] = None,
+                               expand_relations: bool = False) -> Iterator[Dict]:
+        """
+        Stream work items for the given IDs (see integrators.work_item_reader).
+        
+        Pages of up to 200 IDs are fetched concurrently through self.session
+        (at most DETAILS_MAX_CONCURRENT_PAGES in flight), failed pages are
+        retried, and only the requested fields are returned. With
+        expand_relations=True each item includes its 'relations'.
+        
+        Raises:
+            WorkItemReadError: If a page still fails after retries
+        """
         if not self.enabled:
             raise ValueError("Azure DevOps integration not configured")
         
+        return iter_work_items(
+            self.session, self.work_items_url, work_item_ids,
+            fields=fields, expand_relations=expand_relations, auth=self.auth,
+            max_concurrency=self.DETAILS_MAX_CONCURRENT_PAGES
+        )
+    
+    def get_work_item_details(self, work_item_ids: List[int], expand_relations: bool = False,
+                              fields: List[str] = None) -> List[Dict]:
+        """Get detailed work item information for multiple IDs."""
         if not work_item_ids:
             return []
         
-        # Azure DevOps API supports batch requests for up to 200 work items
-        batch_size = 200
-        all_work_items = []
-        
-        for i in range(0, len(work_item_ids), batch_size):
-            batch_ids = work_item_ids[i:i + batch_size]
-            ids_param = ','.join(str(id) for id in batch_ids)
-            
-            url = f"{self.project_base_url}/wit/workitems?ids={ids_param}&api-version=7.0"
-            
-            try:
-                response = requests.get(url, auth=self.auth)
-                response.raise_for_status()
-                batch_result = response.json()
-                all_work_items.extend(batch_result.get('value', []))
-                
-            except requests.exceptions.RequestException as e:
-                self.logger.error(f"Failed to get work item details for batch {batch_ids}: {e}")
-                continue
-        
-        return all_work_items
+        try:
+            return list(self.iter_work_item_details(work_item_ids, fields=fields, expand_relations=expand_relations))
+        except WorkItemReadError as e:
+            self.logger.error(f"Failed to get work item details: {e}")
+            raise
 
     def create_work_item_relation(self, source_id: int, target_id: int, relation_type: str) -> bool:
         """Create a relation between two work items."""
@@ -1413,8 +1434,8 @@ class AzureDevOpsIntegrator:
             'message': f'No changes found for field {field_name}'
         }
     
-    def get_work_items_by_type(self, work_item_type: str) -> List[Dict[str, Any]]:
-        """Retrieve all work items of a specific type."""
+    def get_work_items_by_type(self, work_item_type: str, fields: List[str] = None) -> List[Dict[str, Any]]:
+        """Retrieve all work items of a specific type (optionally only the given fields)."""
         if not self.enabled:
             raise ValueError("Azure DevOps integration not configured")
         
@@ -1438,7 +1459,7 @@ class AzureDevOpsIntegrator:
                 
                 if work_item_ids:
                     # Get detailed work item information
-                    work_items = self.get_work_item_details(work_item_ids)
+                    work_items = self.get_work_item_details(work_item_ids, fields=fields)
             
             return work_items
             
@@ -1491,6 +1512,36 @@ class AzureDevOpsIntegrator:
             self.logger.error(f"Failed to query work items of type {work_item_type}: {e}")
             return []
 
+    def query_work_items_changed_since(self, since: str, work_item_types: List[str] = None) -> List[int]:
+        """
+        Query IDs of work items whose System.ChangedDate is after the given ISO timestamp.
+        
+        Used by the local mirror for incremental sync; timePrecision makes WIQL
+        compare full timestamps instead of whole days.
+        """
+        if not self.enabled:
+            raise ValueError("Azure DevOps integration not configured")
+        
+        query_parts = [
+            "SELECT [System.Id] FROM workitems",
+            f"WHERE [System.TeamProject] = '{self.project}'",
+            f"AND [System.ChangedDate] > '{since}'"
+        ]
+        if work_item_types:
+            types_list = ", ".join(f"'{t}'" for t in work_item_types)
+            query_parts.append(f"AND [System.WorkItemType] IN ({types_list})")
+        query_parts.append("ORDER BY [System.ChangedDate] ASC")
+        
+        url = f"{self.project_base_url}/wit/wiql?timePrecision=true&api-version=7.0"
+        
+        try:
+            response = requests.post(url, json={"query": " ".join(query_parts)}, auth=self.auth, headers=self.wiql_headers)
+            response.raise_for_status()
+            return [item['id'] for item in response.json().get('workItems', [])]
+        except requests.exceptions.RequestException as e:
+            self.logger.error(f"Failed to query work items changed since {since}: {e}")
+            raise
+
     def get_work_item_parent(self, work_item_id: int) -> Optional[Dict[str, Any]]:
         """
         Get the parent work item using the relations field.
@@ -1516,6 +1567,50 @@ class AzureDevOpsIntegrator:
         
         return None
 
+    def get_parent_candidate_index(self, parent_type: str, refresh: bool = False) -> ParentCandidateIndex:
+        """
+        Get the in-memory candidate index for a parent work item type.
+        
+        The index is built from one field-projected fetch of all work items of
+        that type and reused by every orphan query until it is older than
+        PARENT_INDEX_MAX_AGE_SECONDS or a refresh is requested.
+        """
+        index = self._parent_indexes.get(parent_type)
+        if refresh or index is None or index.age_seconds() > self.PARENT_INDEX_MAX_AGE_SECONDS:
+            parent_work_items = self.get_work_items_by_type(parent_type, fields=self.PARENT_INDEX_FIELDS)
+            index = ParentCandidateIndex(parent_type, parent_work_items)
+            self._parent_indexes[parent_type] = index
+            self.logger.info(f"Built parent candidate index for {parent_type}: {len(index)} work items")
+        return index
+
+    def find_potential_parents_for_orphaned_work_items(self, work_items: List[Dict[str, Any]],
+                                                      search_strategy: str = 'comprehensive') -> Dict[int, List[Dict[str, Any]]]:
+        """
+        Find potential parents for many orphaned work items.
+        
+        Each parent type is downloaded and indexed once for the whole batch.
+        
+        Returns:
+            Dict of orphaned work item ID -> potential parents with confidence scores
+        """
+        if not self.enabled:
+            raise ValueError("Azure DevOps integration not configured")
+        
+        parent_types = {
+            self._get_expected_parent_type(work_item.get('fields', {}).get('System.WorkItemType', ''))
+            for work_item in work_items
+        }
+        for parent_type in filter(None, parent_types):
+            try:
+                self.get_parent_candidate_index(parent_type, refresh=True)
+            except Exception as e:
+                self.logger.error(f"Failed to build parent candidate index for {parent_type}: {e}")
+        
+        return {
+            work_item.get('id'): self.find_potential_parents_for_orphaned_work_item(work_item, search_strategy)
+            for work_item in work_items
+        }
+
     def find_potential_parents_for_orphaned_work_item(self, work_item: Dict[str, Any], 
                                                      search_strategy: str = 'comprehensive') -> List[Dict[str, Any]]:
         """
@@ -1584,11 +1679,15 @@ class AzureDevOpsIntegrator:
                                         area_path: str = None) -> List[Dict[str, Any]]:
         """Find potential parents by title similarity using semantic matching."""
         try:
-            # Get all work items of the parent type
-            parent_work_items = self.get_work_items_by_type(parent_type)
+            # Only parents with a non-zero title similarity or an area path bonus can pass
+            # the threshold: a shared title word, title containment or area path containment
+            index = self.get_parent_candidate_index(parent_type)
+            candidate_ids = (index.title_candidates(work_item_title)
+                             | index.title_containment_candidates(work_item_title)
+                             | index.area_path_containing(area_path))
             
             candidates = []
-            for parent in parent_work_items:
+            for parent in index.get_work_items(candidate_ids):
                 parent_title = parent.get('fields', {}).get('System.Title', '')
                 parent_area_path = parent.get('fields', {}).get('System.AreaPath', '')
                 
@@ -1615,35 +1714,28 @@ class AzureDevOpsIntegrator:
 
     def _find_parents_by_area_path(self, work_item_area_path: str, parent_type: str) -> List[Dict[str, Any]]:
         """Find potential parents by area path matching."""
-        try:
-            # Get all work items of the parent type in the same area path
-            parent_work_items = self.get_work_items_by_type(parent_type)
-            
+        relation_scores = {
+            'exact': 0.8,       # Exact match
+            'descendant': 0.6,  # Parent is in a sub-area of the work item's area
+            'ancestor': 0.4,    # Parent is in an enclosing area of the work item's area
+            'related': 0.3      # Common parent area
+        }
+        
+        def build_candidates() -> List[Dict[str, Any]]:
             candidates = []
-            for parent in parent_work_items:
-                parent_area_path = parent.get('fields', {}).get('System.AreaPath', '')
-                
-                # Check if area paths match or are related
-                if work_item_area_path and parent_area_path:
-                    if work_item_area_path == parent_area_path:
-                        score = 0.8  # Exact match
-                    elif work_item_area_path in parent_area_path:
-                        score = 0.6  # Work item is in a sub-area of parent
-                    elif parent_area_path in work_item_area_path:
-                        score = 0.4  # Parent is in a sub-area of work item
-                    else:
-                        # Check for common parent area
-                        common_parent = self._find_common_parent_area(work_item_area_path, parent_area_path)
-                        score = 0.3 if common_parent else 0.0
-                    
-                    if score > 0:
-                        candidates.append({
-                            'work_item': parent,
-                            'confidence_score': score,
-                            'match_reason': f'Area path match: {score:.2f}'
-                        })
-            
+            for parent, relation in index.area_path_relations(work_item_area_path):
+                score = relation_scores[relation]
+                candidates.append({
+                    'work_item': parent,
+                    'confidence_score': score,
+                    'match_reason': f'Area path match: {score:.2f}'
+                })
             return sorted(candidates, key=lambda x: x['confidence_score'], reverse=True)
+        
+        try:
+            # Area path trie lookup, shared by all orphans in the same area path
+            index = self.get_parent_candidate_index(parent_type)
+            return list(index.memoize('area_path', work_item_area_path, build_candidates))
             
         except Exception as e:
             self.logger.error(f"Error in area path search: {e}")
@@ -1651,12 +1743,9 @@ class AzureDevOpsIntegrator:
 
     def _find_parents_by_recent_activity(self, parent_type: str, area_path: str = None) -> List[Dict[str, Any]]:
         """Find potential parents by recent activity and state."""
-        try:
-            # Get recent work items of the parent type
-            parent_work_items = self.get_work_items_by_type(parent_type)
-            
+        def build_candidates() -> List[Dict[str, Any]]:
             candidates = []
-            for parent in parent_work_items:
+            for parent in index.work_items_by_id.values():
                 parent_state = parent.get('fields', {}).get('System.State', '')
                 parent_area_path = parent.get('fields', {}).get('System.AreaPath', '')
                 parent_priority = parent.get('fields', {}).get('Microsoft.VSTS.Common.Priority', 2)
@@ -1674,9 +1763,13 @@ class AzureDevOpsIntegrator:
                         'confidence_score': total_score,
                         'match_reason': f'Recent activity: State={state_score:.2f}, Priority={priority_score:.2f}, Area={area_score:.2f}'
                     })
-            
             return sorted(candidates, key=lambda x: x['confidence_score'], reverse=True)
-            
+
+        try:
+            # Scores only depend on the parent and the orphan's area path
+            index = self.get_parent_candidate_index(parent_type)
+            return list(index.memoize('recent_activity', area_path, build_candidates))
+
         except Exception as e:
             self.logger.error(f"Error in recent activity search: {e}")
             return []
@@ -0,0 +1,230 @@
+"""
+Parent Candidate Index
+
+In-memory index over all work items of one parent type, used to find
+candidate parents for orphaned work items. It is built from a single
+field-projected fetch and reused for every orphan query, so re-parenting
+hundreds of orphans costs one download per parent type instead of one per
+orphan and strategy.
+
+- Titles are tokenised into an inverted index (token -> work item IDs), so
+  title similarity is only scored for parents sharing at least one word.
+- Titles and area paths are also indexed by character trigram, so parents
+  whose title contains (or is contained in) the orphan's title, or whose
+  area path contains the orphan's, are found without a full scan.
+- Area paths are stored in a trie keyed by path segment, so exact, ancestor
+  and descendant area paths are found without scanning every parent.
+- Results that only depend on the orphan's area path are memoised.
+"""
+
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, Any, Callable, Iterable, Iterator, List, Optional, Set, Tuple
+
+
+def tokenize_title(title: str) -> Set[str]:
+    """Lowercase word set of a title (the same tokens title similarity compares)."""
+    return set((title or '').lower().split())
+
+
+def split_area_path(area_path: str) -> List[str]:
+    """Split an area path into its segments."""
+    return [part for part in (area_path or '').split('\\') if part]
+
+
+# Length of the character n-grams used for substring lookups
+NGRAM_SIZE = 3
+
+
+class _SubstringIndex:
+    """Character n-gram index over strings, answering substring containment queries."""
+
+    def __init__(self):
+        self.values: Dict[int, str] = {}
+        self.ngram_postings: Dict[str, Set[int]] = defaultdict(set)
+        self.ids_by_value: Dict[str, Set[int]] = defaultdict(set)
+
+    def add(self, work_item_id: int, value: str):
+        if not value:
+            return
+        self.values[work_item_id] = value
+        self.ids_by_value[value].add(work_item_id)
+        for ngram in _ngrams(value):
+            self.ngram_postings[ngram].add(work_item_id)
+
+    def containing(self, text: str) -> Set[int]:
+        """IDs whose value contains text."""
+        if not text:
+            return set()
+        ngrams = _ngrams(text)
+        if not ngrams:
+            # Too short for an n-gram: check every value
+            return {wi_id for wi_id, value in self.values.items() if text in value}
+        postings = sorted((self.ngram_postings.get(ngram, set()) for ngram in ngrams), key=len)
+        candidates = set(postings[0]).intersection(*postings[1:])
+        return {wi_id for wi_id in candidates if text in self.values[wi_id]}
+
+    def contained_in(self, text: str) -> Set[int]:
+        """IDs whose value is a substring of text."""
+        if not text:
+            return set()
+        lengths = {len(value) for value in self.ids_by_value if len(value) <= len(text)}
+        found: Set[int] = set()
+        for length in lengths:
+            for start in range(len(text) - length + 1):
+                found.update(self.ids_by_value.get(text[start:start + length], ()))
+        return found
+
+
+def _ngrams(text: str) -> Set[str]:
+    return {text[i:i + NGRAM_SIZE] for i in range(len(text) - NGRAM_SIZE + 1)}
+
+
+class _AreaPathNode:
+    """Trie node for one area path segment."""
+
+    __slots__ = ('children', 'work_item_ids')
+
+    def __init__(self):
+        self.children: Dict[str, '_AreaPathNode'] = {}
+        self.work_item_ids: List[int] = []
+
+
+class ParentCandidateIndex:
+    """Tokenised titles, inverted index and area path trie for one parent type."""
+
+    def __init__(self, parent_type: str, work_items: Iterable[Dict[str, Any]]):
+        self.parent_type = parent_type
+        self.built_at = time.time()
+        self.work_items_by_id: Dict[int, Dict[str, Any]] = {}
+        self.title_tokens: Dict[int, Set[str]] = {}
+        self.inverted_index: Dict[str, Set[int]] = defaultdict(set)
+        self.title_substrings = _SubstringIndex()
+        self.area_path_substrings = _SubstringIndex()
+        self.area_path_root = _AreaPathNode()
+        self._memo: Dict[Tuple[str, str], Any] = {}
+        self._lock = threading.Lock()
+
+        for work_item in work_items:
+            work_item_id = work_item.get('id')
+            if work_item_id is None:
+                continue
+            fields = work_item.get('fields', {})
+            self.work_items_by_id[work_item_id] = work_item
+
+            tokens = tokenize_title(fields.get('System.Title', ''))
+            self.title_tokens[work_item_id] = tokens
+            for token in tokens:
+                self.inverted_index[token].add(work_item_id)
+            self.title_substrings.add(work_item_id, (fields.get('System.Title') or '').lower())
+            self.area_path_substrings.add(work_item_id, fields.get('System.AreaPath') or '')
+
+            node = self.area_path_root
+            for segment in split_area_path(fields.get('System.AreaPath', '')):
+                node = node.children.setdefault(segment.lower(), _AreaPathNode())
+            node.work_item_ids.append(work_item_id)
+
+    def __len__(self) -> int:
+        return len(self.work_items_by_id)
+
+    def age_seconds(self) -> float:
+        """Seconds since the index was built."""
+        return time.time() - self.built_at
+
+    def get_work_items(self, work_item_ids: Iterable[int]) -> List[Dict[str, Any]]:
+        """Work items for the given IDs, in ascending ID order."""
+        return [self.work_items_by_id[wi_id] for wi_id in sorted(work_item_ids) if wi_id in self.work_items_by_id]
+
+    def title_candidates(self, title: str) -> Set[int]:
+        """IDs of parents whose title shares at least one word with the given title."""
+        candidates: Set[int] = set()
+        for token in tokenize_title(title):
+            candidates.update(self.inverted_index.get(token, ()))
+        return candidates
+
+    def title_containment_candidates(self, title: str) -> Set[int]:
+        """IDs of parents whose title contains, or is contained in, the given title (case-insensitive)."""
+        title = (title or '').lower()
+        return self.title_substrings.containing(title) | self.title_substrings.contained_in(title)
+
+    def area_path_containing(self, area_path: str) -> Set[int]:
+        """IDs of parents whose area path contains the given area path as a substring."""
+        return self.area_path_substrings.containing(area_path or '')
+
+    def area_subtree(self, area_path: str) -> Set[int]:
+        """IDs of parents at or below the given area path."""
+        node = self._find_node(area_path)
+        if node is None:
+            return set()
+        return {wi_id for subtree_node in self._walk(node) for wi_id in subtree_node.work_item_ids}
+
+    def area_path_relations(self, area_path: str) -> Iterator[Tuple[Dict[str, Any], str]]:
+        """
+        Yield (work_item, relation) for every parent sharing the area path's root.
+
+        relation is 'exact' (same area path), 'descendant' (parent is below the
+        area path), 'ancestor' (parent is above it) or 'related' (they only
+        share a common parent area).
+        """
+        segments = [segment.lower() for segment in split_area_path(area_path)]
+        if not segments:
+            return
+
+        root = self.area_path_root.children.get(segments[0])
+        if root is None:
+            return
+
+        # Walk down the orphan's path, classifying siblings of the path as 'related'
+        node = root
+        path_nodes = [root]
+        for segment in segments[1:]:
+            node = node.children.get(segment)
+            if node is None:
+                break
+            path_nodes.append(node)
+        reached_leaf = len(path_nodes) == len(segments)
+
+        on_path = {id(path_node) for path_node in path_nodes}
+        for depth, path_node in enumerate(path_nodes):
+            is_leaf = reached_leaf and depth == len(path_nodes) - 1
+            relation = 'exact' if is_leaf else 'ancestor'
+            for wi_id in path_node.work_item_ids:
+                yield self.work_items_by_id[wi_id], relation
+            for child in path_node.children.values():
+                if id(child) in on_path:
+                    continue
+                child_relation = 'descendant' if is_leaf else 'related'
+                for subtree_node in self._walk(child):
+                    for wi_id in subtree_node.work_item_ids:
+                        yield self.work_items_by_id[wi_id], child_relation
+
+    def memoize(self, strategy: str, area_path: str, build: Callable[[], Any]) -> Any:
+        """Cache a result that only depends on the strategy and the orphan's area path."""
+        key = (strategy, area_path or '')
+        with self._lock:
+            if key in self._memo:
+                return self._memo[key]
+        result = build()
+        with self._lock:
+            self._memo[key] = result
+        return result
+
+    def _find_node(self, area_path: str) -> Optional[_AreaPathNode]:
+        segments = split_area_path(area_path)
+        if not segments:
+            return None
+        node = self.area_path_root
+        for segment in segments:
+            node = node.children.get(segment.lower())
+            if node is None:
+                return None
+        return node
+
+    @staticmethod
+    def _walk(node: _AreaPathNode) -> Iterator[_AreaPathNode]:
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            yield current
+            stack.extend(current.children.values())
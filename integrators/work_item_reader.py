@@ -0,0 +1,97 @@
+"""
+Bulk Azure DevOps work item reader.
+
+Shared by AzureDevOpsIntegrator and the tools/ maintenance scripts. Work items
+are requested in pages of up to 200 IDs (the API limit) with only the fields
+the caller asks for. Pages are fetched concurrently with a bounded number in
+flight, failed pages are retried with backoff, and items are yielded page by
+page in request order, so callers can stream very large projects without
+holding every work item in memory.
+"""
+
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from collections import deque
+from typing import Dict, Any, Iterable, Iterator, List, Optional
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+PAGE_SIZE = 200  # Azure DevOps limit for workitems?ids=
+DEFAULT_MAX_CONCURRENCY = 4
+DEFAULT_MAX_RETRIES = 3
+
+
+class WorkItemReadError(Exception):
+    """Raised when a page of work items cannot be read after all retries."""
+    pass
+
+
+def iter_work_items(session: requests.Session, work_items_url: str, work_item_ids: Iterable[int],
+                    fields: Optional[List[str]] = None, expand_relations: bool = False,
+                    auth: Any = None, headers: Optional[Dict[str, str]] = None,
+                    max_concurrency: int = DEFAULT_MAX_CONCURRENCY, max_retries: int = DEFAULT_MAX_RETRIES,
+                    api_version: str = "7.0") -> Iterator[Dict[str, Any]]:
+    """
+    Stream work items for the given IDs.
+
+    Args:
+        session: HTTP session (reuses connections; may carry its own retry adapter)
+        work_items_url: '.../_apis/wit/workitems' URL for the project
+        work_item_ids: IDs to read (any iterable; consumed lazily page by page)
+        fields: Field reference names to return (None = all fields)
+        expand_relations: Include each item's 'relations' (the API does not allow
+            combining $expand with fields, so fields are ignored in that case)
+        auth: requests auth object, if not carried by headers
+        headers: Extra request headers (e.g. Basic auth used by the tools)
+        max_concurrency: Maximum pages in flight at once
+        max_retries: Attempts per page before raising WorkItemReadError
+
+    Yields:
+        Work item dicts in the order the IDs were given (deleted IDs are skipped)
+    """
+    params = {"api-version": api_version, "errorPolicy": "omit"}
+    if expand_relations:
+        if fields:
+            logger.debug("Ignoring field projection: $expand=relations cannot be combined with fields")
+        params["$expand"] = "relations"
+    elif fields:
+        params["fields"] = ",".join(fields)
+
+    def fetch_page(page_ids: List[int]) -> List[Dict[str, Any]]:
+        page_params = {**params, "ids": ",".join(str(wi_id) for wi_id in page_ids)}
+        last_error = None
+        for attempt in range(1, max_retries + 1):
+            try:
+                response = session.get(work_items_url, params=page_params, auth=auth, headers=headers, timeout=60)
+                response.raise_for_status()
+                # errorPolicy=omit returns null for deleted/inaccessible IDs
+                return [item for item in response.json().get('value', []) if item]
+            except (requests.exceptions.RequestException, ValueError) as e:
+                last_error = e
+                if attempt < max_retries:
+                    time.sleep(2 ** (attempt - 1))
+        raise WorkItemReadError(
+            f"Failed to read work items {page_ids[0]}..{page_ids[-1]} after {max_retries} attempts: {last_error}"
+        )
+
+    def pages() -> Iterator[List[int]]:
+        page = []
+        for wi_id in work_item_ids:
+            page.append(wi_id)
+            if len(page) == PAGE_SIZE:
+                yield page
+                page = []
+        if page:
+            yield page
+
+    with ThreadPoolExecutor(max_workers=max(1, max_concurrency)) as executor:
+        in_flight = deque()
+        for page_ids in pages():
+            in_flight.append(executor.submit(fetch_page, page_ids))
+            if len(in_flight) >= max_concurrency:
+                yield from in_flight.popleft().result()
+        while in_flight:
+            yield from in_flight.popleft().result()
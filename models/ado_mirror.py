@@ -0,0 +1,314 @@
+"""
+Local Azure DevOps Mirror
+
+This module keeps a local SQLite copy of a project's work items, hierarchy
+relations and test plan/suite membership. Sweeps and reports read from the
+mirror instead of re-downloading the whole project through WIQL and batch
+detail requests every time.
+
+Sync is incremental: only work items whose System.ChangedDate is after the
+stored watermark are re-fetched (adding or removing a link changes both
+items, so relations stay current). A full resync runs on first use, after
+full_resync_hours, or when an incremental sync fails; it also refreshes test
+plan/suite membership and drops work items deleted in Azure DevOps.
+"""
+
+import sqlite3
+import json
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, List, Any, Optional
+
+from utils.schema_migrations import ensure_schema
+
+HIERARCHY_RELATIONS = ('System.LinkTypes.Hierarchy-Forward', 'System.LinkTypes.Hierarchy-Reverse')
+
+
+class AdoWorkItemMirror:
+    """
+    Local SQLite mirror of Azure DevOps work items for one or more projects.
+    """
+
+    def __init__(self, db_path: str = "ado_mirror.db", full_resync_hours: int = 24,
+                 work_item_types: Optional[List[str]] = None):
+        """Initialize the mirror with database connection."""
+        self.db_path = db_path
+        self.full_resync_hours = full_resync_hours
+        self.work_item_types = work_item_types or ["Epic", "Feature", "User Story", "Task", "Test Case"]
+        self.logger = logging.getLogger("ado_mirror")
+        ensure_schema(self.db_path, 'ado_mirror', self._init_database)
+
+    def _init_database(self):
+        """Initialize the mirror tables."""
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS mirror_work_items (
+                    project TEXT NOT NULL,
+                    id INTEGER NOT NULL,
+                    work_item_type TEXT,
+                    title TEXT,
+                    state TEXT,
+                    area_path TEXT,
+                    changed_date TEXT,
+                    rev INTEGER,
+                    fields TEXT NOT NULL,  -- JSON serialized ADO fields
+                    synced_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    PRIMARY KEY (project, id)
+                )
+            """)
+
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS mirror_relations (
+                    project TEXT NOT NULL,
+                    source_id INTEGER NOT NULL,
+                    target_id INTEGER NOT NULL,
+                    rel TEXT NOT NULL,
+                    url TEXT,
+                    PRIMARY KEY (project, source_id, rel, target_id)
+                )
+            """)
+
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS mirror_test_membership (
+                    project TEXT NOT NULL,
+                    test_plan_id INTEGER NOT NULL,
+                    test_suite_id INTEGER NOT NULL,
+                    test_case_id INTEGER NOT NULL,
+                    PRIMARY KEY (project, test_plan_id, test_suite_id, test_case_id)
+                )
+            """)
+
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS mirror_sync_state (
+                    project TEXT PRIMARY KEY,
+                    watermark TEXT,
+                    last_full_sync TIMESTAMP,
+                    last_sync TIMESTAMP,
+                    work_item_count INTEGER DEFAULT 0
+                )
+            """)
+
+            # Create indexes for efficient querying
+            conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_mirror_type
+                ON mirror_work_items(project, work_item_type)
+            """)
+
+            conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_mirror_relation_target
+                ON mirror_relations(project, target_id)
+            """)
+
+            conn.commit()
+
+    def sync(self, ado_client, force_full: bool = False) -> Dict[str, Any]:
+        """
+        Bring the mirror up to date with Azure DevOps.
+
+        Args:
+            ado_client: AzureDevOpsIntegrator for the project
+            force_full: Skip the incremental path and re-download everything
+
+        Returns:
+            Sync summary (mode, updated item count, duration)
+        """
+        project = ado_client.project
+        state = self.get_sync_state(project)
+        start_time = datetime.now()
+
+        needs_full = force_full or not state or not state.get('watermark')
+        if not needs_full and state.get('last_full_sync'):
+            last_full = datetime.fromisoformat(state['last_full_sync'])
+            needs_full = datetime.now() - last_full > timedelta(hours=self.full_resync_hours)
+
+        if not needs_full:
+            try:
+                updated = self._incremental_sync(ado_client, project, state['watermark'])
+                return self._sync_summary('incremental', updated, start_time)
+            except Exception as e:
+                self.logger.warning(f"Incremental mirror sync failed for {project}, falling back to full resync: {e}")
+
+        updated = self._full_sync(ado_client, project)
+        return self._sync_summary('full', updated, start_time)
+
+    def _incremental_sync(self, ado_client, project: str, watermark: str) -> int:
+        """Re-fetch only the work items changed since the watermark."""
+        changed_ids = ado_client.query_work_items_changed_since(watermark, self.work_item_types)
+        if not changed_ids:
+            self._update_sync_state(project, watermark=watermark)
+            return 0
+
+        work_items = ado_client.get_work_item_details(changed_ids, expand_relations=True)
+        with sqlite3.connect(self.db_path) as conn:
+            self._upsert_work_items(conn, project, work_items)
+            new_watermark = self._max_changed_date(work_items) or watermark
+            self._update_sync_state(project, watermark=new_watermark, conn=conn)
+            conn.commit()
+
+        self.logger.info(f"Mirror incremental sync for {project}: {len(work_items)} changed work items")
+        return len(work_items)
+
+    def _full_sync(self, ado_client, project: str) -> int:
+        """Re-download every mirrored work item and the test plan/suite membership."""
+        all_ids = []
+        for work_item_type in self.work_item_types:
+            all_ids.extend(ado_client.query_work_items(work_item_type))
+
+        work_items = ado_client.get_work_item_details(all_ids, expand_relations=True)
+        membership = self._fetch_test_membership(ado_client)
+
+        with sqlite3.connect(self.db_path) as conn:
+            existing = conn.execute(
+                "SELECT COUNT(*) FROM mirror_work_items WHERE project = ?", (project,)
+            ).fetchone()[0]
+            if not work_items and existing:
+                # An empty result next to a populated mirror is a failed query, not an empty project
+                self.logger.warning(f"Full mirror sync for {project} returned no work items - keeping existing mirror")
+                return 0
+
+            conn.execute("DELETE FROM mirror_work_items WHERE project = ?", (project,))
+            conn.execute("DELETE FROM mirror_relations WHERE project = ?", (project,))
+            self._upsert_work_items(conn, project, work_items)
+
+            if membership is not None:
+                conn.execute("DELETE FROM mirror_test_membership WHERE project = ?", (project,))
+                conn.executemany(
+                    "INSERT OR IGNORE INTO mirror_test_membership VALUES (?, ?, ?, ?)",
+                    [(project, plan_id, suite_id, case_id) for plan_id, suite_id, case_id in membership]
+                )
+
+            now = datetime.now().isoformat()
+            self._update_sync_state(project, watermark=self._max_changed_date(work_items),
+                                    last_full_sync=now, conn=conn)
+            conn.commit()
+
+        self.logger.info(f"Mirror full sync for {project}: {len(work_items)} work items")
+        return len(work_items)
+
+    def _upsert_work_items(self, conn: sqlite3.Connection, project: str, work_items: List[Dict[str, Any]]):
+        """Insert or replace work items and their hierarchy relations."""
+        item_rows = []
+        relation_rows = []
+        for wi in work_items:
+            fields = wi.get('fields', {})
+            item_rows.append((
+                project, wi['id'], fields.get('System.WorkItemType'), fields.get('System.Title'),
+                fields.get('System.State'), fields.get('System.AreaPath'), fields.get('System.ChangedDate'),
+                wi.get('rev'), json.dumps(fields)
+            ))
+            for relation in wi.get('relations') or []:
+                if relation.get('rel') not in HIERARCHY_RELATIONS:
+                    continue
+                try:
+                    target_id = int(relation.get('url', '').rstrip('/').split('/')[-1])
+                except ValueError:
+                    continue
+                relation_rows.append((project, wi['id'], target_id, relation['rel'], relation.get('url')))
+
+        conn.executemany(
+            "DELETE FROM mirror_relations WHERE project = ? AND source_id = ?",
+            [(project, row[1]) for row in item_rows]
+        )
+        conn.executemany("""
+            INSERT OR REPLACE INTO mirror_work_items
+            (project, id, work_item_type, title, state, area_path, changed_date, rev, fields, synced_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+        """, item_rows)
+        conn.executemany(
+            "INSERT OR IGNORE INTO mirror_relations VALUES (?, ?, ?, ?, ?)", relation_rows
+        )
+
+    def _fetch_test_membership(self, ado_client) -> Optional[List[tuple]]:
+        """Fetch (plan, suite, test case) membership; None if the test plan API is unavailable."""
+        try:
+            membership = []
+            for plan in ado_client.get_test_plans():
+                for suite in ado_client.get_test_suites(plan['id']):
+                    for test_case in ado_client.get_test_cases_in_suite(plan['id'], suite['id']):
+                        case_id = test_case.get('workItem', {}).get('id') or test_case.get('id')
+                        if case_id:
+                            membership.append((plan['id'], suite['id'], int(case_id)))
+            return membership
+        except Exception as e:
+            self.logger.warning(f"Could not refresh test plan/suite membership: {e}")
+            return None
+
+    @staticmethod
+    def _max_changed_date(work_items: List[Dict[str, Any]]) -> Optional[str]:
+        changed_dates = [wi.get('fields', {}).get('System.ChangedDate') for wi in work_items]
+        changed_dates = [d for d in changed_dates if d]
+        return max(changed_dates) if changed_dates else None
+
+    def _update_sync_state(self, project: str, watermark: Optional[str], last_full_sync: Optional[str] = None,
+                           conn: Optional[sqlite3.Connection] = None):
+        """Record the watermark and sync times for a project."""
+        own_connection = conn is None
+        conn = conn or sqlite3.connect(self.db_path)
+        try:
+            count = conn.execute(
+                "SELECT COUNT(*) FROM mirror_work_items WHERE project = ?", (project,)
+            ).fetchone()[0]
+            conn.execute("""
+                INSERT INTO mirror_sync_state (project, watermark, last_full_sync, last_sync, work_item_count)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(project) DO UPDATE SET
+                    watermark = excluded.watermark,
+                    last_full_sync = COALESCE(excluded.last_full_sync, mirror_sync_state.last_full_sync),
+                    last_sync = excluded.last_sync,
+                    work_item_count = excluded.work_item_count
+            """, (project, watermark, last_full_sync, datetime.now().isoformat(), count))
+            if own_connection:
+                conn.commit()
+        finally:
+            if own_connection:
+                conn.close()
+
+    def _sync_summary(self, mode: str, updated: int, start_time: datetime) -> Dict[str, Any]:
+        return {
+            'mode': mode,
+            'updated_work_items': updated,
+            'duration_seconds': (datetime.now() - start_time).total_seconds()
+        }
+
+    def get_sync_state(self, project: str) -> Optional[Dict[str, Any]]:
+        """Get the stored watermark and sync times for a project."""
+        with sqlite3.connect(self.db_path) as conn:
+            conn.row_factory = sqlite3.Row
+            row = conn.execute("SELECT * FROM mirror_sync_state WHERE project = ?", (project,)).fetchone()
+            return dict(row) if row else None
+
+    def get_work_items(self, project: str, work_item_types: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Get mirrored work items in the Azure DevOps API shape.
+
+        Each item has 'id', 'rev', 'fields' and its hierarchy 'relations', so
+        code written against get_work_item_details(expand_relations=True) can
+        read from the mirror unchanged.
+        """
+        with sqlite3.connect(self.db_path) as conn:
+            query = "SELECT id, rev, fields FROM mirror_work_items WHERE project = ?"
+            params: List[Any] = [project]
+            if work_item_types:
+                query += f" AND work_item_type IN ({','.join('?' for _ in work_item_types)})"
+                params.extend(work_item_types)
+            rows = conn.execute(query + " ORDER BY id", params).fetchall()
+
+            relations: Dict[int, List[Dict[str, Any]]] = {}
+            for source_id, rel, url in conn.execute(
+                "SELECT source_id, rel, url FROM mirror_relations WHERE project = ?", (project,)
+            ):
+                relations.setdefault(source_id, []).append({'rel': rel, 'url': url})
+
+        return [
+            {'id': wi_id, 'rev': rev, 'fields': json.loads(fields), 'relations': relations.get(wi_id, [])}
+            for wi_id, rev, fields in rows
+        ]
+
+    def get_test_membership(self, project: str) -> List[Dict[str, int]]:
+        """Get mirrored test plan/suite/test case membership."""
+        with sqlite3.connect(self.db_path) as conn:
+            rows = conn.execute(
+                "SELECT test_plan_id, test_suite_id, test_case_id FROM mirror_test_membership WHERE project = ?",
+                (project,)
+            ).fetchall()
+        return [{'test_plan_id': plan, 'test_suite_id': suite, 'test_case_id': case} for plan, suite, case in rows]
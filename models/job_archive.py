@@ -0,0 +1,375 @@
+"""
+Job Archive
+
+This module moves completed jobs out of the hot databases. A job older than
+the retention period is written to a compressed per-job archive file (gzip
+JSON lines) together with its staged work items, quality metrics, LLM cache
+events and the backlog output files of its project; the hot rows and files
+are then deleted and the databases compacted with incremental VACUUM.
+
+Archives are indexed in the job database, so an archived job, or the latest
+archived backlog of a project, can be read back without knowing which file
+holds it. Old output files that belong to no job are archived by day.
+"""
+
+import glob
+import gzip
+import json
+import logging
+import os
+import re
+import sqlite3
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Any, Iterable, Optional, Union
+
+from utils.blob_codec import decode_json
+from utils.schema_migrations import ensure_schema
+
+# Project IDs as generated by the API server ("proj_YYYYmmdd_HHMMSS")
+PROJECT_ID_PATTERN = re.compile(r'proj_\d{8}_\d{6}')
+
+# Output files archived once they are older than the retention period
+OUTPUT_FILE_PATTERNS = ('backlog_*', 'intermediate_*', 'qa_completeness_report_*')
+
+# Pages freed per incremental VACUUM step
+VACUUM_PAGES = 2000
+
+
+class JobArchive:
+    """
+    Retention engine for completed backlog jobs.
+    """
+
+    def __init__(self, db_path: str = "backlog_jobs.db", staging_db_path: str = "agile_backlog.db",
+                 archive_dir: str = "output/archive", output_dir: str = "output",
+                 retention_days: int = 30, batch_size: int = 50):
+        """Initialize the archive with database connection."""
+        self.db_path = db_path
+        self.staging_db_path = staging_db_path
+        self.archive_dir = archive_dir
+        self.output_dir = output_dir
+        self.retention_days = retention_days
+        self.batch_size = batch_size
+        self.logger = logging.getLogger("job_archive")
+        ensure_schema(self.db_path, 'job_archive', self._init_database)
+
+    def _init_database(self):
+        """Initialize the archive index tables."""
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS job_archives (
+                    backlog_job_id INTEGER PRIMARY KEY,
+                    job_key TEXT,             -- Workflow job ID of the backlog job
+                    project_id TEXT,
+                    archive_path TEXT NOT NULL,
+                    record_count INTEGER DEFAULT 0,
+                    job_created_at TIMESTAMP,
+                    archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS archived_output_files (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    file_name TEXT NOT NULL,
+                    project_id TEXT,
+                    archive_path TEXT NOT NULL,
+                    modified_at REAL,
+                    archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+
+            conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_job_archives_job_key
+                ON job_archives(job_key)
+            """)
+
+            conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_archived_output_project
+                ON archived_output_files(project_id, modified_at)
+            """)
+
+            conn.commit()
+
+    def run(self, now: Optional[datetime] = None) -> Dict[str, Any]:
+        """
+        Archive completed jobs and output files older than the retention period.
+
+        Returns:
+            Run summary (archived jobs, archived files, duration)
+        """
+        start_time = datetime.now()
+        now = now or datetime.utcnow()
+        cutoff = now - timedelta(days=self.retention_days)
+
+        archived_jobs = 0
+        for job in self.find_archivable_jobs(cutoff):
+            try:
+                self.archive_job(job, cutoff)
+                archived_jobs += 1
+            except Exception as e:
+                self.logger.error(f"Failed to archive backlog job {job['id']}: {e}")
+
+        archived_files = self.archive_output_files(cutoff)
+
+        if archived_jobs or archived_files:
+            self.compact(self.db_path)
+            if os.path.exists(self.staging_db_path):
+                self.compact(self.staging_db_path)
+
+        summary = {
+            'archived_jobs': archived_jobs,
+            'archived_files': archived_files,
+            'cutoff': cutoff.isoformat(),
+            'duration_seconds': (datetime.now() - start_time).total_seconds()
+        }
+        self.logger.info(f"Job archive run: {summary}")
+        return summary
+
+    def find_archivable_jobs(self, cutoff: datetime) -> List[Dict[str, Any]]:
+        """Completed jobs created before the cutoff, oldest first (one batch)."""
+        with sqlite3.connect(self.db_path) as conn:
+            conn.row_factory = sqlite3.Row
+            cursor = conn.execute("""
+                SELECT * FROM backlog_jobs
+                WHERE status = 'completed' AND created_at < ?
+                ORDER BY created_at, id
+                LIMIT ?
+            """, (cutoff.strftime('%Y-%m-%d %H:%M:%S'), self.batch_size))
+            return [dict(row) for row in cursor.fetchall()]
+
+    def archive_job(self, job: Dict[str, Any], cutoff: Optional[datetime] = None) -> str:
+        """
+        Write one job and its related rows and files to its archive, then delete them.
+
+        Returns:
+            Path of the archive file
+        """
+        cutoff = cutoff or datetime.utcnow() - timedelta(days=self.retention_days)
+        job_key = job.get('job_key') or None
+        project_match = PROJECT_ID_PATTERN.search(job_key or '')
+        project_id = project_match.group(0) if project_match else None
+
+        records = [{'kind': 'backlog_job', 'data': {**job, 'raw_summary': self._decode(job.get('raw_summary'))}}]
+        metrics_ids = []
+        if job_key:
+            records.extend(self._job_table_records(job_key, metrics_ids))
+        # Newer backlog files of the project belong to its later jobs and stay
+        output_files = self._project_output_files(project_id, cutoff) if project_id else []
+        records.extend(self._output_file_record(path) for path in output_files)
+
+        archive_path = os.path.join(self.archive_dir, f"backlog_job_{job['id']}.jsonl.gz")
+        self._write_archive(archive_path, records)
+
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("""
+                INSERT OR REPLACE INTO job_archives
+                (backlog_job_id, job_key, project_id, archive_path, record_count, job_created_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, (job['id'], job_key, project_id, archive_path, len(records), job.get('created_at')))
+            self._register_output_files(conn, output_files, archive_path, project_id)
+
+            conn.execute("DELETE FROM backlog_jobs WHERE id = ?", (job['id'],))
+            if job_key:
+                if metrics_ids:
+                    placeholders = ', '.join('?' * len(metrics_ids))
+                    conn.execute(f"DELETE FROM quality_attempts WHERE metrics_id IN ({placeholders})", metrics_ids)
+                self._delete_if_table(conn, 'quality_metrics', job_key)
+                self._delete_if_table(conn, 'llm_cache_events', job_key)
+            conn.commit()
+
+        if job_key and os.path.exists(self.staging_db_path):
+            with sqlite3.connect(self.staging_db_path) as conn:
+                self._delete_if_table(conn, 'work_item_staging', job_key)
+                conn.commit()
+
+        for path in output_files:
+            os.remove(path)
+
+        self.logger.info(f"Archived backlog job {job['id']} ({job_key}): {len(records)} records -> {archive_path}")
+        return archive_path
+
+    def archive_output_files(self, cutoff: datetime) -> int:
+        """Archive output files last modified before the cutoff into per-day archives."""
+        by_day: Dict[str, List[str]] = {}
+        for path in self._output_files(OUTPUT_FILE_PATTERNS, cutoff):
+            day = datetime.fromtimestamp(os.path.getmtime(path)).strftime('%Y%m%d')
+            by_day.setdefault(day, []).append(path)
+
+        archived = 0
+        for day, paths in sorted(by_day.items()):
+            archive_path = os.path.join(self.archive_dir, f"output_{day}.jsonl.gz")
+            # Appends a gzip member, so earlier runs for the same day are kept
+            self._write_archive(archive_path, [self._output_file_record(path) for path in paths], append=True)
+            with sqlite3.connect(self.db_path) as conn:
+                for path in paths:
+                    project_match = PROJECT_ID_PATTERN.search(os.path.basename(path))
+                    self._register_output_files(conn, [path], archive_path,
+                                                project_match.group(0) if project_match else None)
+                conn.commit()
+            for path in paths:
+                os.remove(path)
+            archived += len(paths)
+        return archived
+
+    def compact(self, db_path: str):
+        """Return free pages to the file system with incremental VACUUM."""
+        with sqlite3.connect(db_path) as conn:
+            if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+                # auto_vacuum can only be switched on by a full VACUUM (once per database)
+                conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+                conn.execute("VACUUM")
+                self.logger.info(f"Enabled incremental vacuum for {db_path}")
+            else:
+                conn.execute(f"PRAGMA incremental_vacuum({VACUUM_PAGES})")
+
+    def load_archived_job(self, job: Union[int, str]) -> Optional[Dict[str, Any]]:
+        """
+        Rehydrate an archived job.
+        
+        Args:
+            job: Backlog job ID, or workflow job ID (latest archived job with that ID)
+
+        Returns:
+            The backlog job row plus its archived staging rows, quality metrics,
+            cache events and output files, or None if the job is not archived
+        """
+        with sqlite3.connect(self.db_path) as conn:
+            if isinstance(job, int):
+                row = conn.execute("SELECT archive_path FROM job_archives WHERE backlog_job_id = ?",
+                                   (job,)).fetchone()
+            else:
+                row = conn.execute("""
+                    SELECT archive_path FROM job_archives WHERE job_key = ?
+                    ORDER BY job_created_at DESC, backlog_job_id DESC LIMIT 1
+                """, (job,)).fetchone()
+        if not row or not os.path.exists(row[0]):
+            return None
+
+        archived = {'backlog_job': None, 'work_item_staging': [], 'quality_metrics': [],
+                    'quality_attempts': [], 'llm_cache_events': [], 'output_files': {}}
+        for record in self._read_archive(row[0]):
+            if record['kind'] == 'backlog_job':
+                archived['backlog_job'] = record['data']
+            elif record['kind'] == 'output_file':
+                archived['output_files'][record['name']] = record['content']
+            else:
+                archived[record['kind']].append(record['data'])
+        return archived
+
+    def find_archived_backlogs(self, project_id: str) -> List[Dict[str, Any]]:
+        """
+        Archived backlog files of a project whose archive still exists, newest first.
+
+        Each entry holds the archived_output_files row: id, file_name,
+        archive_path and modified_at (together they identify the archived copy).
+        """
+        with sqlite3.connect(self.db_path) as conn:
+            conn.row_factory = sqlite3.Row
+            rows = conn.execute("""
+                SELECT id, file_name, archive_path, modified_at FROM archived_output_files
+                WHERE project_id = ? AND file_name LIKE 'backlog%.json'
+                ORDER BY modified_at DESC, id DESC
+            """, (project_id,)).fetchall()
+        return [dict(row) for row in rows if os.path.exists(row['archive_path'])]
+
+    def read_archived_backlog(self, entry: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Backlog JSON of an entry of find_archived_backlogs, or None if its archive lacks the file."""
+        content = None
+        for record in self._read_archive(entry['archive_path']):
+            if record['kind'] == 'output_file' and record['name'] == entry['file_name']:
+                content = record['content']  # Last copy wins
+        return json.loads(content) if content is not None else None
+
+    def load_archived_backlog(self, project_id: str) -> Optional[Dict[str, Any]]:
+        """Latest archived backlog JSON of a project, or None."""
+        for entry in self.find_archived_backlogs(project_id):
+            backlog = self.read_archived_backlog(entry)
+            if backlog is not None:
+                return backlog
+        return None
+
+    def _job_table_records(self, job_key: str, metrics_ids: List[int]) -> Iterable[Dict[str, Any]]:
+        """Archive records of the job's staging rows, quality metrics and cache events."""
+        records = []
+        if os.path.exists(self.staging_db_path):
+            with sqlite3.connect(self.staging_db_path) as conn:
+                conn.row_factory = sqlite3.Row
+                for row in self._select_if_table(conn, 'work_item_staging', job_key):
+                    records.append({'kind': 'work_item_staging',
+                                    'data': {**row, 'generated_data': self._decode(row['generated_data'])}})
+
+        with sqlite3.connect(self.db_path) as conn:
+            conn.row_factory = sqlite3.Row
+            for row in self._select_if_table(conn, 'quality_metrics', job_key):
+                metrics_ids.append(row['id'])
+                records.append({'kind': 'quality_metrics', 'data': row})
+            if metrics_ids:
+                placeholders = ', '.join('?' * len(metrics_ids))
+                for row in conn.execute(f"SELECT * FROM quality_attempts WHERE metrics_id IN ({placeholders})",
+                                        metrics_ids):
+                    records.append({'kind': 'quality_attempts', 'data': dict(row)})
+            for row in self._select_if_table(conn, 'llm_cache_events', job_key):
+                records.append({'kind': 'llm_cache_events', 'data': row})
+        return records
+
+    def _select_if_table(self, conn: sqlite3.Connection, table: str, job_key: str) -> List[Dict[str, Any]]:
+        try:
+            return [dict(row) for row in conn.execute(f"SELECT * FROM {table} WHERE job_id = ?", (job_key,))]
+        except sqlite3.OperationalError:
+            return []  # Table not created in this database
+
+    def _delete_if_table(self, conn: sqlite3.Connection, table: str, job_key: str):
+        try:
+            conn.execute(f"DELETE FROM {table} WHERE job_id = ?", (job_key,))
+        except sqlite3.OperationalError:
+            pass  # Table not created in this database
+
+    def _project_output_files(self, project_id: str, cutoff: datetime) -> List[str]:
+        return self._output_files([f"backlog_*_{project_id}.json", f"backlog_*_{project_id}.yaml"], cutoff)
+
+    def _output_files(self, patterns: Iterable[str], cutoff: datetime) -> List[str]:
+        """Output files matching the patterns that were last modified before the (UTC) cutoff."""
+        cutoff_timestamp = cutoff.replace(tzinfo=timezone.utc).timestamp()
+        paths = set()
+        for pattern in patterns:
+            paths.update(
+                path for path in glob.glob(os.path.join(self.output_dir, pattern))
+                if os.path.isfile(path) and os.path.getmtime(path) < cutoff_timestamp
+            )
+        return sorted(paths)
+
+    def _output_file_record(self, path: str) -> Dict[str, Any]:
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            content = f.read()
+        return {'kind': 'output_file', 'name': os.path.basename(path),
+                'modified_at': os.path.getmtime(path), 'content': content}
+
+    def _register_output_files(self, conn: sqlite3.Connection, paths: List[str],
+                               archive_path: str, project_id: Optional[str]):
+        conn.executemany("""
+            INSERT INTO archived_output_files (file_name, project_id, archive_path, modified_at)
+            VALUES (?, ?, ?, ?)
+        """, [(os.path.basename(path), project_id, archive_path, os.path.getmtime(path)) for path in paths])
+
+    def _write_archive(self, archive_path: str, records: List[Dict[str, Any]], append: bool = False):
+        os.makedirs(os.path.dirname(archive_path) or '.', exist_ok=True)
+        target = archive_path if append else f"{archive_path}.tmp"
+        with gzip.open(target, 'at' if append else 'wt', encoding='utf-8') as f:
+            for record in records:
+                f.write(json.dumps(record, default=str) + '\n')
+        if not append:
+            os.replace(target, archive_path)
+
+    def _read_archive(self, archive_path: str) -> Iterable[Dict[str, Any]]:
+        with gzip.open(archive_path, 'rt', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+    @staticmethod
+    def _decode(value: Any) -> Any:
+        try:
+            return decode_json(value)
+        except ValueError:
+            return value if isinstance(value, str) else None
@@ -6,12 +6,18 @@ Azure DevOps upload, enabling resumable operations and zero data loss.
 """
 
 import sqlite3
-import json
 import logging
 from datetime import datetime
 from typing import Dict, List, Any, Optional, Tuple
 from enum import Enum
 
+from utils.blob_codec import decode_json, encode_json
+from utils.schema_migrations import add_column, ensure_schema
+
+# Placeholder for a nested copy of another staged item's data: test plans and
+# test suites reference their feature/user story row instead of embedding it
+STAGING_REF_KEY = '$staging_ref'
+
 
 class WorkItemStatus(Enum):
     """Status enumeration for work item staging."""
@@ -43,7 +49,7 @@ class WorkItemStaging:
         """Initialize work item staging with database connection."""
         self.db_path = db_path
         self.logger = logging.getLogger("work_item_staging")
-        self._init_database()
+        ensure_schema(self.db_path, 'work_item_staging', self._init_database)
     
     def _init_database(self):
         """Initialize the work item staging table."""
@@ -60,14 +66,17 @@ class WorkItemStaging:
                     status TEXT NOT NULL DEFAULT 'pending',
                     retry_count INTEGER DEFAULT 0,
                     error_message TEXT,
-                    generated_data TEXT NOT NULL,  -- JSON serialized work item data
+                    generated_data TEXT NOT NULL,  -- JSON serialized work item data (possibly compressed)
                     hierarchy_level INTEGER NOT NULL,  -- 0=Epic, 1=Feature, 2=UserStory, 3=Task/TestCase
+                    data_ref_id INTEGER,      -- Staged item whose data generated_data references
                     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                     uploaded_at TIMESTAMP,
                     last_retry_at TIMESTAMP
                 )
             """)
             
+            add_column(conn, 'work_item_staging', 'data_ref_id INTEGER')
+            
             # Create indexes for efficient querying
             conn.execute("""
                 CREATE INDEX IF NOT EXISTS idx_job_status 
@@ -129,11 +138,11 @@ class WorkItemStaging:
                     if has_test_cases:
                         test_plan_data = {
                             'title': f"Test Plan: {feature_data.get('title', 'Feature')}",
-                            'feature_data': feature_data
+                            'feature_data': {STAGING_REF_KEY: feature_id}
                         }
                         test_plan_id = self._stage_work_item(
                             conn, job_id, WorkItemType.TEST_PLAN, test_plan_data,
-                            parent_id=feature_id, hierarchy_level=1
+                            parent_id=feature_id, hierarchy_level=1, data_ref_id=feature_id
                         )
                         staged_count += 1
                     
@@ -157,12 +166,12 @@ class WorkItemStaging:
                         if user_story_data.get('test_cases') and test_plan_id:
                             test_suite_data = {
                                 'title': f"Test Suite: {user_story_data.get('title', 'User Story')}",
-                                'user_story_data': user_story_data,
+                                'user_story_data': {STAGING_REF_KEY: user_story_id},
                                 'test_plan_id': test_plan_id
                             }
                             test_suite_id = self._stage_work_item(
                                 conn, job_id, WorkItemType.TEST_SUITE, test_suite_data,
-                                parent_id=test_plan_id, hierarchy_level=3
+                                parent_id=test_plan_id, hierarchy_level=3, data_ref_id=user_story_id
                             )
                             staged_count += 1
                             
@@ -177,12 +186,12 @@ class WorkItemStaging:
                     if feature_data.get('test_cases') and test_plan_id:
                         default_suite_data = {
                             'title': f"Default Test Suite: {feature_data.get('title', 'Feature')}",
-                            'feature_data': feature_data,
+                            'feature_data': {STAGING_REF_KEY: feature_id},
                             'test_plan_id': test_plan_id
                         }
                         default_suite_id = self._stage_work_item(
                             conn, job_id, WorkItemType.TEST_SUITE, default_suite_data,
-                            parent_id=test_plan_id, hierarchy_level=3
+                            parent_id=test_plan_id, hierarchy_level=3, data_ref_id=feature_id
                         )
                         staged_count += 1
                         
@@ -200,20 +209,22 @@ class WorkItemStaging:
     
     def _stage_work_item(self, conn: sqlite3.Connection, job_id: str, 
                         work_item_type: WorkItemType, work_item_data: Dict[str, Any],
-                        parent_id: Optional[int] = None, hierarchy_level: int = 0) -> int:
+                        parent_id: Optional[int] = None, hierarchy_level: int = 0,
+                        data_ref_id: Optional[int] = None) -> int:
         """Stage a single work item and return its local ID."""
         
         cursor = conn.execute("""
             INSERT INTO work_item_staging 
-            (job_id, work_item_type, title, local_parent_id, generated_data, hierarchy_level)
-            VALUES (?, ?, ?, ?, ?, ?)
+            (job_id, work_item_type, title, local_parent_id, generated_data, hierarchy_level, data_ref_id)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
         """, (
             job_id,
             work_item_type.value,
             work_item_data.get('title', 'Untitled'),
             parent_id,
-            json.dumps(work_item_data),
-            hierarchy_level
+            encode_json(work_item_data),
+            hierarchy_level,
+            data_ref_id
         ))
         
         return cursor.lastrowid
@@ -278,11 +289,36 @@ class WorkItemStaging:
             items = []
             for row in rows:
                 item = dict(row)
-                item['generated_data'] = json.loads(item['generated_data'])
+                item['generated_data'] = decode_json(item['generated_data'])
                 items.append(item)
             
+            self._resolve_data_refs(conn, items)
             return items
     
+    def _resolve_data_refs(self, conn: sqlite3.Connection, items: List[Dict[str, Any]]):
+        """Replace data references in the items' generated data with the referenced items' data."""
+        ref_ids = {item['data_ref_id'] for item in items if item.get('data_ref_id')}
+        if not ref_ids:
+            return
+        
+        placeholders = ', '.join('?' * len(ref_ids))
+        cursor = conn.execute(
+            f"SELECT id, generated_data FROM work_item_staging WHERE id IN ({placeholders})",
+            list(ref_ids)
+        )
+        referenced = {row[0]: row[1] for row in cursor.fetchall()}
+        
+        for item in items:
+            data = item['generated_data']
+            for key, value in data.items():
+                if isinstance(value, dict) and set(value) == {STAGING_REF_KEY}:
+                    stored = referenced.get(value[STAGING_REF_KEY])
+                    if stored is None:
+                        self.logger.warning(f"Staged item {item['id']} references missing item {value[STAGING_REF_KEY]}")
+                        continue
+                    # Decoded per item so callers never share nested dicts
+                    data[key] = decode_json(stored)
+    
     def update_upload_status(self, staging_id: int, status: WorkItemStatus,
                            ado_id: Optional[int] = None, error_message: Optional[str] = None):
         """Update the upload status of a staged work item."""
@@ -325,10 +361,15 @@ class WorkItemStaging:
         with sqlite3.connect(self.db_path) as conn:
             if keep_failed:
                 # Keep failed items for retry
+                # Items whose data is referenced by items kept for retry stay as well
                 conn.execute("""
                     DELETE FROM work_item_staging 
                     WHERE job_id = ? AND status = 'success'
-                """, (job_id,))
+                    AND id NOT IN (
+                        SELECT data_ref_id FROM work_item_staging
+                        WHERE job_id = ? AND status != 'success' AND data_ref_id IS NOT NULL
+                    )
+                """, (job_id, job_id))
                 self.logger.info(f"Cleaned up successful work items for job {job_id}")
             else:
                 # Remove all items for this job
@@ -19,6 +19,7 @@ from dataclasses import dataclass, asdict
 from enum import Enum
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import queue
+from collections import deque
 
 from config.config_loader import Config
 from agents.epic_strategist import EpicStrategist
@@ -32,6 +33,9 @@ from utils.logger import setup_logger
 from utils.notifier import Notifier
 from utils.ollama_model_manager import ollama_manager
 from utils.enhanced_parallel_processor import enhanced_processor, StageConfig, RateLimitConfig
+from utils.context_budget import ContextBudgetManager
+from utils.text_feature_cache import TextFeatureCache
+from utils.near_duplicate_detector import NearDuplicateDetector
 from integrators.azure_devops_api import AzureDevOpsIntegrator
 
 
@@ -73,39 +77,55 @@ class WorkflowMetrics:
         if self.errors is None:
             self.errors = []
 
+# Work item kinds counted in WorkflowMetrics.artifacts_created
+ARTIFACT_KINDS = ('epics', 'features', 'user_stories', 'tasks', 'test_cases')
+
 class WorkflowMonitor:
-    """Real-time workflow monitoring and dashboard system"""
+    """
+    Real-time workflow monitoring and dashboard system.
+
+    Artifact counts are event driven: the supervisor reports each batch of
+    items as it attaches them to their parent (record_artifacts), which adjusts
+    the running totals by the difference to that parent's previous count. A
+    single-pass recount at stage boundaries corrects for items removed by
+    deduplication or remediation. Every update is sent to the dashboard
+    callbacks and kept in a fixed-size history ring buffer that holds at most
+    one snapshot per history_interval_seconds (later snapshots in the same
+    interval replace the earlier one).
+    """
     
-    def __init__(self, supervisor_instance):
+    def __init__(self, supervisor_instance, history_size: int = 1000, history_interval_seconds: float = 1.0):
         self.supervisor = supervisor_instance
         self.workflow_metrics = {}
         self.monitoring_active = False
-        self.monitor_thread = None
         self.dashboard_callbacks = []
-        self.metrics_history = []
+        self.metrics_history = deque(maxlen=history_size)
+        self.history_interval_seconds = history_interval_seconds
+        self._last_history_time = None
+        self._parent_counts = {}  # workflow_id -> {kind: {id(parent): count}}
+        self._lock = threading.Lock()
         
     def start_monitoring(self, workflow_id: str):
         """Start monitoring a workflow execution"""
-        self.workflow_metrics[workflow_id] = WorkflowMetrics(
-            workflow_id=workflow_id,
-            status=WorkflowStatus.RUNNING,
-            start_time=datetime.now(),
-            current_stage="initialization"
-        )
-        
+        with self._lock:
+            self.workflow_metrics[workflow_id] = WorkflowMetrics(
+                workflow_id=workflow_id,
+                status=WorkflowStatus.RUNNING,
+                start_time=datetime.now(),
+                current_stage="initialization",
+                artifacts_created={kind: 0 for kind in ARTIFACT_KINDS}
+            )
+            self._parent_counts[workflow_id] = {kind: {} for kind in ARTIFACT_KINDS}
         self.monitoring_active = True
-        self.monitor_thread = threading.Thread(
-            target=self._monitor_loop,
-            args=(workflow_id,),
-            daemon=True
-        )
-        self.monitor_thread.start()
+        self._notify_dashboard_update(workflow_id, self.workflow_metrics[workflow_id])
         
-    def stop_monitoring(self, workflow_id: str):
+    def stop_monitoring(self, workflow_id: str, status: WorkflowStatus = WorkflowStatus.COMPLETED):
         """Stop monitoring a workflow"""
         if workflow_id in self.workflow_metrics:
-            self.workflow_metrics[workflow_id].status = WorkflowStatus.COMPLETED
+            self.workflow_metrics[workflow_id].status = status
             self.monitoring_active = False
+            self._parent_counts.pop(workflow_id, None)
+            self._notify_dashboard_update(workflow_id, self.workflow_metrics[workflow_id])
             
     def update_stage_progress(self, workflow_id: str, stage: str, progress: float):
         """Update current stage progress"""
@@ -114,6 +134,55 @@ class WorkflowMonitor:
             metrics.current_stage = stage
             metrics.progress_percentage = progress
             self._notify_dashboard_update(workflow_id, metrics)
+    
+    def record_artifacts(self, workflow_id: str, kind: str, parent: Any, items: Optional[list]):
+        """
+        Record the items of one kind now attached to a parent.
+
+        Args:
+            workflow_id: Monitored workflow
+            kind: One of ARTIFACT_KINDS
+            parent: Object the items belong to (the workflow data for epics)
+            items: The parent's current items of that kind (or their count)
+        """
+        count = items if isinstance(items, int) else len(items or [])
+        with self._lock:
+            parents = self._parent_counts.get(workflow_id, {}).get(kind)
+            if parents is None:
+                return
+            previous = parents.get(id(parent), 0)
+            parents[id(parent)] = count
+            metrics = self.workflow_metrics[workflow_id]
+            metrics.artifacts_created[kind] = metrics.artifacts_created.get(kind, 0) + count - previous
+        if count != previous:
+            self._notify_dashboard_update(workflow_id, metrics)
+    
+    def recount_artifacts(self, workflow_id: str):
+        """Recount all artifacts from the workflow data in one pass over the tree."""
+        workflow_data = getattr(self.supervisor, 'workflow_data', None)
+        if workflow_id not in self.workflow_metrics or not workflow_data:
+            return
+        parents = {kind: {} for kind in ARTIFACT_KINDS}
+        epics = workflow_data.get('epics') or []
+        parents['epics'][id(workflow_data)] = len(epics)
+        for epic in epics:
+            features = epic.get('features') or []
+            parents['features'][id(epic)] = len(features)
+            for feature in features:
+                stories = feature.get('user_stories') or []
+                parents['user_stories'][id(feature)] = len(stories)
+                test_cases = 0
+                for story in stories:
+                    parents['tasks'][id(story)] = len(story.get('tasks') or [])
+                    test_cases += len(story.get('test_cases') or [])
+                parents['test_cases'][id(feature)] = test_cases
+        with self._lock:
+            if workflow_id not in self._parent_counts:
+                return
+            self._parent_counts[workflow_id] = parents
+            metrics = self.workflow_metrics[workflow_id]
+            metrics.artifacts_created = {kind: sum(parents[kind].values()) for kind in ARTIFACT_KINDS}
+        self._notify_dashboard_update(workflow_id, metrics)
             
     def update_agent_metrics(self, workflow_id: str, agent_name: str, 
                            duration: float, success: bool, error: str = None):
@@ -187,7 +256,7 @@ class WorkflowMonitor:
                 name: asdict(agent_metrics) 
                 for name, agent_metrics in metrics.agents_metrics.items()
             },
-            'artifacts_created': metrics.artifacts_created,
+            'artifacts_created': dict(metrics.artifacts_created),
             'errors': metrics.errors[-10:],  # Last 10 errors
             'execution_time': (datetime.now() - metrics.start_time).total_seconds()
         }
@@ -196,56 +265,22 @@ class WorkflowMonitor:
         """Register a callback for dashboard updates"""
         self.dashboard_callbacks.append(callback)
         
-    def _monitor_loop(self, workflow_id: str):
-        """Main monitoring loop"""
-        while self.monitoring_active:
-            try:
-                # Update artifacts count
-                if hasattr(self.supervisor, 'workflow_data') and self.supervisor.workflow_data:
-                    self._update_artifacts_count(workflow_id)
-                    
-                # Store metrics snapshot for historical analysis
-                if workflow_id in self.workflow_metrics:
-                    snapshot = self.get_dashboard_data(workflow_id)
-                    snapshot['timestamp'] = datetime.now().isoformat()
-                    self.metrics_history.append(snapshot)
-                    
-                    # Keep only last 1000 snapshots
-                    if len(self.metrics_history) > 1000:
-                        self.metrics_history = self.metrics_history[-1000:]
-                        
-                time.sleep(1)  # Update every second
-                
-            except Exception as e:
-                self.supervisor.logger.error(f"Monitoring error: {e}")
-                
-    def _update_artifacts_count(self, workflow_id: str):
-        """Update artifacts count from workflow data"""
-        if workflow_id not in self.workflow_metrics:
-            return
-            
-        metrics = self.workflow_metrics[workflow_id]
-        workflow_data = self.supervisor.workflow_data
-        
-        metrics.artifacts_created = {
-            'epics': len(workflow_data.get('epics', [])),
-            'features': sum(len(e.get('features', [])) for e in workflow_data.get('epics', [])),
-            'user_stories': sum(len(f.get('user_stories', [])) 
-                               for e in workflow_data.get('epics', []) 
-                               for f in e.get('features', [])),
-            'tasks': sum(len(s.get('tasks', [])) 
-                        for e in workflow_data.get('epics', []) 
-                        for f in e.get('features', []) 
-                        for s in f.get('user_stories', [])),
-            'test_cases': sum(len(s.get('test_cases', [])) 
-                             for e in workflow_data.get('epics', []) 
-                             for f in e.get('features', []) 
-                             for s in f.get('user_stories', []))
-        }
-        
     def _notify_dashboard_update(self, workflow_id: str, metrics: WorkflowMetrics):
-        """Notify registered dashboard callbacks of updates"""
+        """Record a history snapshot and notify registered dashboard callbacks of updates"""
         dashboard_data = self.get_dashboard_data(workflow_id)
+        dashboard_data['timestamp'] = datetime.now().isoformat()
+        
+        # Time-based downsampling: one snapshot per history interval, the latest wins
+        now = time.monotonic()
+        with self._lock:
+            if (self.metrics_history and self._last_history_time is not None
+                    and now - self._last_history_time < self.history_interval_seconds
+                    and self.metrics_history[-1]['workflow_id'] == workflow_id):
+                self.metrics_history[-1] = dashboard_data
+            else:
+                self.metrics_history.append(dashboard_data)
+                self._last_history_time = now
+        
         for callback in self.dashboard_callbacks:
             try:
                 callback(dashboard_data)
@@ -349,6 +384,24 @@ class WorkflowSupervisor:
         agents['developer_agent'] = DeveloperAgent(self.config, user_id=self.user_id)
         agents['qa_lead_agent'] = QALeadAgent(self.config, user_id=self.user_id)  # Replaces deprecated agent
         
+        # One context budget per job so vision/epic/feature summaries are built once
+        self.context_budget = ContextBudgetManager(self.config.settings, job_id=self.job_id)
+        for agent in agents.values():
+            agent.set_context_budget(self.context_budget)
+        qa_lead = agents['qa_lead_agent']
+        for sub_agent in (qa_lead.test_plan_agent, qa_lead.test_suite_agent, qa_lead.test_case_agent):
+            sub_agent.set_context_budget(self.context_budget)
+        
+        # One text feature cache per job so validators and assessors analyse each text once
+        self.text_feature_cache = TextFeatureCache(self.config.settings, job_id=self.job_id)
+        for agent in agents.values():
+            agent.set_text_feature_cache(self.text_feature_cache)
+        
+        # One near-duplicate detector per job so reworded items are dropped before further generation
+        self.near_duplicates = NearDuplicateDetector(self.config.settings, job_id=self.job_id)
+        for agent in agents.values():
+            agent.set_near_duplicate_detector(self.near_duplicates)
+        
         # Set Azure DevOps integrator for agents that need it
         if hasattr(self, 'azure_integrator') and self.azure_integrator is not None:
             for agent_name, agent in agents.items():
@@ -622,6 +675,8 @@ class WorkflowSupervisor:
                 config=self.config.settings,
                 supervisor_callback=self.receive_sweeper_report
             )
+            if getattr(self, 'text_feature_cache', None) is not None:
+                self.sweeper_agent.text_features = self.text_feature_cache
         return self.sweeper_agent
 
     def _sweeper_validate_and_get_incomplete(self, stage: str) -> list:
@@ -716,7 +771,7 @@ class WorkflowSupervisor:
         
         # Helper function to update progress with optional sub-progress
         def update_progress(stage_index: int, action: str, sub_progress: float = 0.0):
-            if progress_callback:
+            if progress_callback or enable_monitoring:
                 base_progress = stage_progress_mapping.get(stage_index, 30)
                 
                 # Add sub-progress within the current stage
@@ -729,7 +784,10 @@ class WorkflowSupervisor:
                     stage_range = 100 - base_progress
                     final_progress = base_progress + (stage_range * sub_progress)
                 
-                progress_callback(int(final_progress), action)
+                if progress_callback:
+                    progress_callback(int(final_progress), action)
+                if enable_monitoring:
+                    self.workflow_monitor.update_stage_progress(workflow_id, action, final_progress)
         
         # Generate unique workflow ID
         workflow_id = f"workflow_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
@@ -850,6 +908,8 @@ class WorkflowSupervisor:
             for stage_index, stage in enumerate(stages_to_run):
                 self.logger.info(f"Executing stage: {stage}")
                 update_progress(stage_index + 1, f"Executing {stage}")
+                if enable_monitoring:
+                    self.workflow_monitor.recount_artifacts(workflow_id)
                 self.sweeper_retry_tracker[stage] = {}
                 max_retries = 5
                 completed = False
@@ -1005,6 +1065,8 @@ class WorkflowSupervisor:
             
             # Final processing
             try:
+                if enable_monitoring:
+                    self.workflow_monitor.recount_artifacts(workflow_id)
                 self._finalize_workflow_data()
                 
                 # Azure DevOps integration is now handled in the stage execution
@@ -1022,10 +1084,14 @@ class WorkflowSupervisor:
                 
                 # Final progress update
                 update_progress(total_stages + 1, "Backlog generation completed")
+                if enable_monitoring:
+                    self.workflow_monitor.stop_monitoring(workflow_id)
                 return self.workflow_data
                 
             except Exception as e:
                 self.logger.error(f"Error in final processing: {e}")
+                if enable_monitoring:
+                    self.workflow_monitor.stop_monitoring(workflow_id)
                 # Don't fail the entire workflow for final processing errors
                 # Just log the error and return the workflow data
                 return self.workflow_data
@@ -1035,6 +1101,8 @@ class WorkflowSupervisor:
             self.execution_metadata['errors'].append(str(e))
             self.execution_metadata['end_time'] = datetime.now()
             self.logger.info(f"Workflow execution failed at {self.execution_metadata['end_time']}")
+            if enable_monitoring:
+                self.workflow_monitor.stop_monitoring(workflow_id, WorkflowStatus.FAILED)
             
             # Calculate execution time even on failure
             if self.execution_metadata['start_time'] and self.execution_metadata['end_time']:
@@ -1167,6 +1235,7 @@ class WorkflowSupervisor:
                 raise ValueError("Epic generation failed - no valid epics produced")
             
             self.workflow_data['epics'] = epics[0]
+            self._record_artifacts('epics', self.workflow_data, epics[0])
             
             if max_epics:
                 self.logger.info(f"Generated {len(epics[0])} epics (limited to {max_epics})")
@@ -1177,6 +1246,7 @@ class WorkflowSupervisor:
             self.logger.error(f"Epic generation failed: {e}")
             # CRITICAL: Do NOT create fallback epics - fail cleanly instead
             self.workflow_data['epics'] = []
+            self._record_artifacts('epics', self.workflow_data, [])
             self.execution_metadata['errors'].append(f"Epic generation failed: {str(e)}")
             raise RuntimeError(f"Epic generation failed completely: {e}")
     
@@ -1230,6 +1300,7 @@ class WorkflowSupervisor:
             self.logger.warning(f"DEBUG: Found {len(epics) - len(valid_epics)} invalid epics out of {len(epics)} total")
             epics = valid_epics
             self.workflow_data['epics'] = valid_epics
+            self._record_artifacts('epics', self.workflow_data, valid_epics)
         
         # Use enhanced parallel processor for feature decomposition
         def process_epic_for_features(epic, context_data, **kwargs):
@@ -1255,6 +1326,7 @@ class WorkflowSupervisor:
                     epic, features = result
                     if i < len(epics) and isinstance(epics[i], dict):
                         epics[i]['features'] = features
+                        self._record_artifacts('features', epics[i], features)
                     else:
                         self.logger.warning(f"Could not assign features to epic at index {i}")
                 else:
@@ -1270,9 +1342,15 @@ class WorkflowSupervisor:
                     self.logger.info(f"Decomposing epic: {epic.get('title', 'Untitled')}")
                     features = agent.decompose_epic(epic, context, max_features=max_features)
                     epic['features'] = features
+                    self._record_artifacts('features', epic, features)
                 else:
                     self.logger.error(f"DEBUG: Skipping invalid epic of type {type(epic)}: {epic}")
                     epic['features'] = []
+        
+        # Features are decomposed per epic; drop copies generated under different epics
+        dropped = self.near_duplicates.deduplicate_children(epics, 'features', label='feature')
+        if dropped:
+            self.logger.info(f"Dropped {dropped} near-duplicate features across epics")
     
     def _execute_user_story_decomposition(self):
         """Execute user story decomposition stage (parallelized if enabled)."""
@@ -1337,6 +1415,7 @@ class WorkflowSupervisor:
                     feature_index = future_to_feature[future]
                     feature, user_stories = future.result()
                     features[feature_index][1]['user_stories'] = user_stories
+                    self._record_artifacts('user_stories', features[feature_index][1], user_stories)
         else:
             for epic, feature in features:
                 self.logger.info(f"Decomposing feature to user stories: {feature.get('title', 'Untitled')}")
@@ -1345,6 +1424,14 @@ class WorkflowSupervisor:
                 story_context['epic_context'] = epic.get('description', '')
                 user_stories = agent.decompose_feature_to_user_stories(feature, context=story_context, max_user_stories=max_user_stories)
                 feature['user_stories'] = user_stories
+                self._record_artifacts('user_stories', feature, user_stories)
+        
+        # User stories are decomposed per feature; drop copies generated under different features
+        dropped = self.near_duplicates.deduplicate_children(
+            [feature for _, feature in features], 'user_stories', label='user story'
+        )
+        if dropped:
+            self.logger.info(f"Dropped {dropped} near-duplicate user stories across features")
     
     def _retry_incomplete_developer_tasks(self, incomplete_items):
         """
@@ -1383,6 +1470,7 @@ class WorkflowSupervisor:
                                 
                                 if tasks and len(tasks) > 0:
                                     user_story['tasks'] = tasks
+                                    self._record_artifacts('tasks', user_story, tasks)
                                     successful_retries += 1
                                     self.logger.info(f"Successfully generated {len(tasks)} tasks for {story_title}")
                                 else:
@@ -1441,6 +1529,7 @@ class WorkflowSupervisor:
                     story_index = future_to_story[future]
                     user_story, tasks, has_approved_tasks = future.result()
                     user_stories[story_index][2]['tasks'] = tasks
+                    self._record_artifacts('tasks', user_stories[story_index][2], tasks)
                     processed_stories += 1
                     if has_approved_tasks:
                         stories_with_approved_tasks += 1
@@ -1457,6 +1546,7 @@ class WorkflowSupervisor:
                 task_context['feature_context'] = feature.get('description', '')
                 tasks = agent.generate_tasks(user_story, task_context)
                 user_story['tasks'] = tasks
+                self._record_artifacts('tasks', user_story, tasks)
                 processed_stories += 1
                 # Check if any tasks were approved (not empty list)
                 if tasks and len(tasks) > 0:
@@ -1499,6 +1589,7 @@ class WorkflowSupervisor:
                     feature_index = future_to_feature[future]
                     feature, result = future.result()
                     # Test plan is already set on the feature object by _process_feature_qa
+                    self._record_test_cases(feature)
                     processed_qa_items += 1
                     if update_progress_callback and total_qa_items > 0:
                         sub_progress = processed_qa_items / total_qa_items
@@ -1508,11 +1599,22 @@ class WorkflowSupervisor:
                 self.logger.info(f"Processing QA for feature: {feature.get('title', 'Untitled')}")
                 result = agent._process_feature_qa(epic, feature, context, area_path, 0, 0)
                 # Test plan is already set on the feature object by _process_feature_qa
+                self._record_test_cases(feature)
                 processed_qa_items += 1
                 if update_progress_callback and total_qa_items > 0:
                     sub_progress = processed_qa_items / total_qa_items
                     update_progress_callback(stage_index, f"Generating QA ({processed_qa_items}/{total_qa_items})", sub_progress)
     
+    def _record_artifacts(self, kind: str, parent: Any, items: Optional[list]):
+        """Report the items attached to a parent to the workflow monitor."""
+        if self.current_workflow_id:
+            self.workflow_monitor.record_artifacts(self.current_workflow_id, kind, parent, items)
+    
+    def _record_test_cases(self, feature: Dict[str, Any]):
+        """Report the test cases generated for a feature's user stories."""
+        self._record_artifacts('test_cases', feature,
+                               sum(len(story.get('test_cases') or []) for story in feature.get('user_stories', [])))
+    
     def _sanitize_unicode_for_logging(self, text: str) -> str:
         """Sanitize Unicode characters for Windows console logging."""
         try:
@@ -0,0 +1,131 @@
+"""
+Tests for the local SQLite mirror of Azure DevOps work items.
+"""
+
+from agents.backlog_sweeper_agent import BacklogSweeperAgent, SWEEP_WORK_ITEM_TYPES
+from models.ado_mirror import AdoWorkItemMirror
+
+ADO_URL = 'https://dev.azure.com/org/Proj/_apis/wit/workItems'
+
+
+def _work_item(wi_id, work_item_type, title, changed_date, parent_id=None):
+    relations = []
+    if parent_id is not None:
+        relations.append({'rel': 'System.LinkTypes.Hierarchy-Reverse', 'url': f'{ADO_URL}/{parent_id}'})
+    return {
+        'id': wi_id, 'rev': 1, 'relations': relations,
+        'fields': {'System.WorkItemType': work_item_type, 'System.Title': title,
+                   'System.State': 'New', 'System.ChangedDate': changed_date},
+    }
+
+
+class FakeAdoClient:
+    """Azure DevOps client over an in-memory project that records the queries it receives."""
+
+    project = 'Proj'
+
+    def __init__(self, work_items):
+        self.work_items = {wi['id']: wi for wi in work_items}
+        self.watermarks = []
+        self.detail_requests = []
+
+    def query_work_items(self, work_item_type):
+        return [wi_id for wi_id, wi in self.work_items.items()
+                if wi['fields']['System.WorkItemType'] == work_item_type]
+
+    def query_work_items_changed_since(self, watermark, work_item_types):
+        self.watermarks.append(watermark)
+        return [wi_id for wi_id, wi in self.work_items.items() if wi['fields']['System.ChangedDate'] > watermark]
+
+    def get_work_item_details(self, ids, expand_relations=False):
+        self.detail_requests.append(sorted(ids))
+        return [self.work_items[wi_id] for wi_id in ids]
+
+    def get_test_plans(self):
+        return [{'id': 1}]
+
+    def get_test_suites(self, plan_id):
+        return [{'id': 10}]
+
+    def get_test_cases_in_suite(self, plan_id, suite_id):
+        return [{'workItem': {'id': 4}}]
+
+
+def _client():
+    return FakeAdoClient([
+        _work_item(1, 'Epic', 'Scheduling', '2025-01-01T10:00:00Z'),
+        _work_item(2, 'Feature', 'Online booking', '2025-01-02T10:00:00Z', parent_id=1),
+        _work_item(3, 'User Story', 'Book a slot', '2025-01-03T10:00:00Z', parent_id=2),
+        _work_item(4, 'Test Case', 'Slot is reserved', '2025-01-03T11:00:00Z', parent_id=3),
+    ])
+
+
+def test_first_sync_is_full(tmp_path):
+    mirror = AdoWorkItemMirror(str(tmp_path / 'mirror.db'))
+    client = _client()
+
+    summary = mirror.sync(client)
+    assert (summary['mode'], summary['updated_work_items']) == ('full', 4)
+
+    state = mirror.get_sync_state('Proj')
+    assert state['watermark'] == '2025-01-03T11:00:00Z'
+    assert state['work_item_count'] == 4
+    items = mirror.get_work_items('Proj', ['Feature', 'User Story'])
+    assert [(wi['id'], wi['fields']['System.Title']) for wi in items] == [(2, 'Online booking'), (3, 'Book a slot')]
+    assert items[0]['relations'] == [{'rel': 'System.LinkTypes.Hierarchy-Reverse', 'url': f'{ADO_URL}/1'}]
+    assert mirror.get_test_membership('Proj') == [{'test_plan_id': 1, 'test_suite_id': 10, 'test_case_id': 4}]
+
+
+def test_incremental_sync_fetches_changes_since_watermark(tmp_path):
+    mirror = AdoWorkItemMirror(str(tmp_path / 'mirror.db'))
+    client = _client()
+    mirror.sync(client)
+
+    # Story 3 is retitled and moved under a new feature 5
+    client.work_items[5] = _work_item(5, 'Feature', 'Reminders', '2025-01-04T09:00:00Z', parent_id=1)
+    client.work_items[3] = _work_item(3, 'User Story', 'Book a time slot', '2025-01-04T10:00:00Z', parent_id=5)
+    client.detail_requests.clear()
+
+    summary = mirror.sync(client)
+    assert (summary['mode'], summary['updated_work_items']) == ('incremental', 2)
+    assert client.watermarks == ['2025-01-03T11:00:00Z']
+    assert client.detail_requests == [[3, 5]]
+    assert mirror.get_sync_state('Proj')['watermark'] == '2025-01-04T10:00:00Z'
+
+    story = next(wi for wi in mirror.get_work_items('Proj') if wi['id'] == 3)
+    assert story['fields']['System.Title'] == 'Book a time slot'
+    assert story['relations'] == [{'rel': 'System.LinkTypes.Hierarchy-Reverse', 'url': f'{ADO_URL}/5'}]
+    assert mirror.get_sync_state('Proj')['work_item_count'] == 5
+
+    # Nothing changed: the watermark is kept and no details are fetched
+    client.detail_requests.clear()
+    assert mirror.sync(client)['updated_work_items'] == 0
+    assert client.detail_requests == []
+    assert mirror.get_sync_state('Proj')['watermark'] == '2025-01-04T10:00:00Z'
+
+
+def test_full_resync_drops_deleted_work_items(tmp_path):
+    mirror = AdoWorkItemMirror(str(tmp_path / 'mirror.db'))
+    client = _client()
+    mirror.sync(client)
+
+    del client.work_items[4]
+    assert mirror.sync(client, force_full=True)['mode'] == 'full'
+    assert [wi['id'] for wi in mirror.get_work_items('Proj')] == [1, 2, 3]
+
+
+def test_sweep_reads_work_items_through_the_mirror(tmp_path):
+    sweeper = BacklogSweeperAgent.__new__(BacklogSweeperAgent)
+    sweeper.ado_client = _client()
+    sweeper.mirror = AdoWorkItemMirror(str(tmp_path / 'mirror.db'), work_item_types=SWEEP_WORK_ITEM_TYPES)
+    sweeper.work_item_index = None
+
+    index = sweeper.load_work_item_index()
+    assert index.get_parents(3) == [2]
+
+    # A refresh syncs incrementally and indexes the mirror's copy
+    sweeper.ado_client.work_items[3] = _work_item(3, 'User Story', 'Book a slot', '2025-01-05T10:00:00Z', parent_id=1)
+    sweeper.ado_client.detail_requests.clear()
+    index = sweeper.load_work_item_index(refresh=True)
+    assert index.get_parents(3) == [1]
+    assert sweeper.ado_client.detail_requests == [[3]]
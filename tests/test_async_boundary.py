@@ -0,0 +1,44 @@
+"""
+Tests for the DB/I-O thread pools and the event loop lag monitor.
+"""
+
+import asyncio
+import threading
+import time
+
+from utils.async_boundary import EventLoopLagMonitor, run_db, run_io
+
+
+def _blocking_call():
+    time.sleep(0.3)
+
+
+def test_blocking_calls_run_off_the_loop():
+    async def scenario():
+        loop_thread = threading.get_ident()
+        db_thread = await run_db(threading.get_ident)
+        io_result = await run_io(lambda value, scale=1: value * scale, 21, scale=2)
+        return loop_thread, db_thread, io_result
+
+    loop_thread, db_thread, io_result = asyncio.run(scenario())
+    assert db_thread != loop_thread
+    assert io_result == 42
+
+
+def test_lag_monitor_records_blocking_callsite():
+    monitor = EventLoopLagMonitor(interval_seconds=0.02, threshold_seconds=0.05)
+
+    async def scenario():
+        task = asyncio.create_task(monitor.run())
+        await asyncio.sleep(0.1)
+        _blocking_call()
+        await asyncio.sleep(0.1)
+        task.cancel()
+
+    asyncio.run(scenario())
+    snapshot = monitor.snapshot()
+
+    assert snapshot['max_lag_ms'] >= 200
+    assert snapshot['stall_count'] == 1
+    assert snapshot['top_callsites'][0]['callsite'].startswith('tests/test_async_boundary.py:')
+    assert snapshot['top_callsites'][0]['callsite'].endswith('in _blocking_call')
@@ -0,0 +1,38 @@
+"""
+Tests for keyset-paginated, projected backlog job queries.
+"""
+
+from db import BACKLOG_JOB_LIST_COLUMNS, Database, decode_job_cursor, encode_job_cursor
+
+
+def _database(tmp_path):
+    database = Database(str(tmp_path / "jobs.db"))
+    for index in range(5):
+        database.add_backlog_job('a@example.com', f'project {index}',
+                                 raw_summary={'job_id': f'job_{index}', 'azure_config': {'project': 'Contoso'}})
+    database.add_backlog_job('b@example.com', 'other project')
+    return database
+
+
+def test_keyset_pages_do_not_overlap(tmp_path):
+    database = _database(tmp_path)
+
+    first = database.get_backlog_jobs('a@example.com', limit=2)
+    second = database.get_backlog_jobs('a@example.com', limit=2, before=decode_job_cursor(encode_job_cursor(first[-1])))
+    last = database.get_backlog_jobs('a@example.com', limit=2, before=decode_job_cursor(encode_job_cursor(second[-1])))
+
+    assert [job['project_name'] for job in first + second + last] == [f'project {index}' for index in range(4, -1, -1)]
+    assert first[0]['raw_summary']['job_id'] == 'job_4'
+
+
+def test_projection_skips_summary_blob(tmp_path):
+    database = _database(tmp_path)
+
+    jobs = database.get_backlog_jobs('a@example.com', limit=1, columns=BACKLOG_JOB_LIST_COLUMNS,
+                                     summary_fields={'summary_job_id': '$.job_id', 'project': '$.azure_config.project'})
+    assert 'raw_summary' not in jobs[0]
+    assert (jobs[0]['summary_job_id'], jobs[0]['project']) == ('job_4', 'Contoso')
+
+    job = database.get_backlog_jobs('a@example.com', limit=1, parse_summary=False)[0]
+    assert isinstance(job['raw_summary'], str)
+    assert Database.load_job_summary(job)['job_id'] == 'job_4'
@@ -0,0 +1,56 @@
+"""
+Tests for compressed JSON blob storage in the job and staging tables.
+"""
+
+import sqlite3
+
+from db import Database
+from models.work_item_staging import WorkItemStaging, WorkItemStatus
+from utils.blob_codec import decode_json, encode_json
+
+STORY = {
+    'title': 'Book an appointment',
+    'user_story': 'As a patient, I want to book an appointment online so that I avoid phone queues',
+    'acceptance_criteria': ['Given an open slot, When I select it, Then it is reserved for me'],
+    'test_cases': [{'title': 'Reserve an open slot', 'steps': [{'action': 'Select slot', 'expected_result': 'Reserved'}]}]
+}
+BACKLOG = {'epics': [{'title': 'Scheduling', 'features': [{'title': 'Online booking', 'user_stories': [STORY]}]}]}
+
+
+def test_codec_round_trips_and_reads_legacy_text():
+    summary = {'job_id': 'job_1', 'staging_summary': {'total_items': 12}, 'notes': 'x' * 200}
+    assert isinstance(encode_json(summary), bytes)
+    assert decode_json(encode_json(summary)) == summary
+    assert encode_json({'job_id': 'job_1'}) == '{"job_id": "job_1"}'  # small documents stay text
+    assert decode_json('{"job_id": "job_1"}') == {'job_id': 'job_1'}
+
+
+def test_job_summary_is_compressed_and_found_by_job_id(tmp_path):
+    database = Database(str(tmp_path / "jobs.db"))
+    database.add_backlog_job('a@example.com', 'Clinic', raw_summary={'job_id': 'job_7', 'notes': 'n' * 300})
+    database.update_job_progress('job_7', 40, 'Decomposing features', force_write=True)
+
+    job = database.get_backlog_jobs('a@example.com', summary_fields={'summary_job_id': '$.job_id'})[0]
+    assert job['raw_summary']['job_id'] == job['summary_job_id'] == 'job_7'
+    assert database.get_job_progress('job_7')['progress'] == 40
+
+
+def test_staged_test_suites_reference_story_data(tmp_path):
+    staging = WorkItemStaging(str(tmp_path / "staging.db"))
+    staging.stage_backlog('job_1', BACKLOG)
+
+    with sqlite3.connect(staging.db_path) as conn:
+        stored = dict(conn.execute("SELECT work_item_type, generated_data FROM work_item_staging").fetchall())
+    assert '$staging_ref' in decode_json(stored['Test Suite'])['user_story_data']
+
+    queue = staging.get_upload_queue('job_1')
+    suite = next(item for item in queue if item['work_item_type'] == 'Test Suite')
+    assert suite['generated_data']['user_story_data'] == STORY
+
+    # The story stays staged while the suite that references it is kept for retry
+    for item in queue:
+        failed = item['work_item_type'] in ('Test Plan', 'Test Suite')
+        staging.update_upload_status(item['id'], WorkItemStatus.FAILED if failed else WorkItemStatus.SUCCESS, ado_id=1)
+    staging.cleanup_successful_job('job_1')
+    retry = staging.get_upload_queue('job_1', WorkItemStatus.FAILED)
+    assert next(item for item in retry if item['work_item_type'] == 'Test Suite')['generated_data']['user_story_data'] == STORY
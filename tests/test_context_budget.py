@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Context Budget Tests - budget-fitted vision/epic/feature context.
+"""
+import sys
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from utils.context_budget import ContextBudgetManager, summarize_text
+
+VISION = (
+    "# Vision\nRideShare connects riders and drivers in real time.\n\n"
+    "## Goals\n" + "Riders get matched with nearby drivers in under two minutes. " * 60 +
+    "\n\n## Safety\nEvery driver is background checked before the first ride.\n"
+)
+
+
+class TestContextBudget:
+    """Tests for token budgeting and the per-job summary cache."""
+
+    def test_small_context_is_untouched(self):
+        manager = ContextBudgetManager({})
+        context = {'product_vision': 'Short vision.', 'domain': 'transportation'}
+        assert manager.fit_context(context, 'llama3.1:8b') is context
+
+    def test_oversized_vision_fits_budget(self):
+        manager = ContextBudgetManager({'context_budget': {'default_context_window': 1000}})
+        fitted = manager.fit_context({'product_vision': VISION}, 'llama3.1:8b')
+        budget = manager.get_field_budget('product_vision', 'llama3.1:8b')
+        assert manager.count_tokens(fitted['product_vision'], 'llama3.1:8b') <= budget + 1
+        assert '# Vision' in fitted['product_vision']
+
+    def test_summary_is_cached_per_job(self):
+        manager = ContextBudgetManager({'context_budget': {'default_context_window': 1000}}, job_id='job-1')
+        first = manager.fit_context({'product_vision': VISION}, 'llama3.1:8b')
+        second = manager.fit_context({'product_vision': VISION}, 'llama3.1:8b')
+        assert first['product_vision'] is second['product_vision']
+        assert manager.get_stats()['summaries_built'] == 1
+
+    def test_larger_context_window_keeps_more(self):
+        manager = ContextBudgetManager({'context_budget': {'context_windows': {'gpt-': 128000}}})
+        assert manager.fit_context({'product_vision': VISION}, 'gpt-5-mini')['product_vision'] == VISION
+        assert len(summarize_text(VISION, 500)) <= 500
+
+    def test_prefix_reuse_does_not_skew_measured_ratio(self):
+        from utils.ollama_client import PromptCacheStats
+        stats = PromptCacheStats()
+        # Cold call whose prefix Ollama already cached: only the tail was evaluated
+        stats.record('llama3.1:8b', 'shared system prompt', 4000, 100)
+        assert stats.chars_per_token('llama3.1:8b') is None
+
+        stats.record('llama3.1:8b', 'system prompt A', 4000, 800)
+        stats.record('llama3.1:8b', 'system prompt B', 4000, 700)
+        stats.record('llama3.1:8b', 'system prompt C', 4000, 1000)
+        assert stats.chars_per_token('llama3.1:8b') == 4.0
@@ -0,0 +1,94 @@
+"""
+Tests for the in-memory domain knowledge store.
+"""
+
+import sqlite3
+
+import pytest
+
+from db import Database, DomainKnowledgeStore
+from utils.vision_context_extractor import VisionContextExtractor
+
+
+def _create_domain_db(path):
+    Database(str(path))
+    with sqlite3.connect(str(path)) as conn:
+        conn.executescript('''
+            CREATE TABLE domains (id INTEGER PRIMARY KEY, domain_key TEXT, display_name TEXT, description TEXT,
+                                  icon_name TEXT, color_code TEXT, is_active BOOLEAN DEFAULT TRUE, sort_order INTEGER DEFAULT 0);
+            CREATE TABLE subdomains (id INTEGER PRIMARY KEY, domain_id INTEGER, subdomain_key TEXT, display_name TEXT,
+                                     description TEXT, is_active BOOLEAN DEFAULT TRUE, sort_order INTEGER DEFAULT 0);
+            CREATE TABLE domain_patterns (id INTEGER PRIMARY KEY, domain_id INTEGER, subdomain_id INTEGER,
+                                          pattern_value TEXT, weight REAL DEFAULT 1.0, is_active BOOLEAN DEFAULT TRUE);
+            CREATE TABLE domain_user_types (id INTEGER PRIMARY KEY, domain_id INTEGER, subdomain_id INTEGER, user_type_key TEXT,
+                                            display_name TEXT, description TEXT, user_patterns TEXT,
+                                            is_active BOOLEAN DEFAULT TRUE, sort_order INTEGER DEFAULT 0);
+            CREATE TABLE domain_vocabulary (id INTEGER PRIMARY KEY, domain_id INTEGER, subdomain_id INTEGER, category TEXT,
+                                            term TEXT, is_active BOOLEAN DEFAULT TRUE);
+            INSERT INTO domains (id, domain_key, display_name) VALUES (1, 'healthcare', 'Healthcare'), (2, 'finance', 'Finance');
+            INSERT INTO subdomains (id, domain_id, subdomain_key, display_name) VALUES (10, 1, 'telehealth', 'Telehealth');
+            INSERT INTO domain_patterns (domain_id, subdomain_id, pattern_value, weight)
+                VALUES (1, NULL, 'patient', 1.0), (1, NULL, 'clinical', 2.0), (1, 10, 'video visit', 1.5);
+            INSERT INTO domain_user_types (domain_id, subdomain_id, user_type_key, display_name, user_patterns)
+                VALUES (1, NULL, 'patients', 'Patients', '["patient"]');
+            INSERT INTO domain_vocabulary (domain_id, subdomain_id, category, term)
+                VALUES (1, NULL, 'processes', 'triage'), (1, 10, 'processes', 'virtual waiting room');
+        ''')
+
+
+def test_store_serves_domain_tables_and_reloads_on_version_change(tmp_path):
+    db_path = tmp_path / "domains.db"
+    _create_domain_db(db_path)
+    store = DomainKnowledgeStore(str(db_path), check_interval_seconds=0)
+
+    assert [domain['domain_key'] for domain in store.get_domains()] == ['finance', 'healthcare']
+    assert store.get_patterns(1) == ['clinical', 'patient']
+    assert store.get_patterns(1, 10) == ['clinical', 'video visit', 'patient']
+    assert store.get_user_types(1) == {'patients': {'display_name': 'Patients', 'description': None, 'patterns': ['patient']}}
+    assert store.get_vocabulary(1, 10) == ['triage', 'virtual waiting room']
+    assert store.get_domain('healthcare')['subdomains'][0]['subdomain_key'] == 'telehealth'
+
+    with sqlite3.connect(str(db_path)) as conn:
+        conn.execute("UPDATE domains SET is_active = FALSE WHERE domain_key = 'finance'")
+    assert len(store.get_domains()) == 2  # not reloaded until the version changes
+
+    store.invalidate()
+    assert [domain['domain_key'] for domain in store.get_domains()] == ['healthcare']
+
+
+def test_vision_extractor_uses_domain_vocabulary(tmp_path):
+    db_path = tmp_path / "domains.db"
+    _create_domain_db(db_path)
+    extractor = VisionContextExtractor(DomainKnowledgeStore(str(db_path)))
+
+    assert 'triage' in extractor._extract_domain_vocabulary("A patient triage app for clinical teams")
+
+
+
+def test_vision_extractor_logs_unreadable_domain_store(tmp_path, caplog):
+    db_path = tmp_path / "domains.db"
+    Database(str(db_path))
+
+    VisionContextExtractor(DomainKnowledgeStore(str(db_path)))
+    assert 'Domain knowledge vocabulary unavailable' in caplog.text
+
+    class BrokenStore:
+        def get_vocabulary_by_domain_key(self):
+            raise KeyError('domain_key')
+
+    with pytest.raises(KeyError):
+        VisionContextExtractor(BrokenStore())
+
+def test_failed_load_is_not_cached(tmp_path):
+    db_path = tmp_path / "domains.db"
+    Database(str(db_path))
+    store = DomainKnowledgeStore(str(db_path), check_interval_seconds=60)
+
+    for getter in (store.get_domains, lambda: store.get_patterns(1), lambda: store.get_user_types(1),
+                   lambda: store.get_vocabulary(1)):
+        with pytest.raises(sqlite3.OperationalError):
+            getter()
+
+    _create_domain_db(db_path)
+    assert [domain['domain_key'] for domain in store.get_domains()] == ['finance', 'healthcare']
+    assert store.get_patterns(1) == ['clinical', 'patient']
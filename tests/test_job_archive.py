@@ -0,0 +1,90 @@
+"""
+Tests for archiving completed jobs out of the hot databases.
+"""
+
+import json
+import os
+import sqlite3
+from datetime import datetime, timedelta
+
+from db import Database
+from models.job_archive import JobArchive
+from models.work_item_staging import WorkItemStaging
+from utils.quality_metrics_tracker import QualityMetricsTracker
+
+JOB_ID = 'job_20250101_120000_proj_20250101_115900'
+PROJECT_ID = 'proj_20250101_115900'
+BACKLOG = {'epics': [{'title': 'Scheduling', 'features': [{'title': 'Online booking', 'user_stories': []}]}]}
+
+
+def _setup(tmp_path):
+    db_path, staging_path = str(tmp_path / "jobs.db"), str(tmp_path / "staging.db")
+    database = Database(db_path)
+    database.add_backlog_job('a@example.com', 'Clinic', raw_summary={'job_id': JOB_ID})
+    database.add_backlog_job('a@example.com', 'Other', raw_summary={'job_id': 'job_20250301_120000_proj_20250301_115900'})
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("UPDATE backlog_jobs SET created_at = '2025-01-01 12:00:00' WHERE job_key = ?", (JOB_ID,))
+    WorkItemStaging(staging_path).stage_backlog(JOB_ID, BACKLOG)
+    QualityMetricsTracker(db_path).start_tracking(JOB_ID, 'epic_strategist', 'Epic', 'Scheduling', {'domain': 'healthcare'})
+
+    output_dir = tmp_path / "output"
+    output_dir.mkdir()
+    backlog_file = output_dir / f"backlog_20250101_120500_{PROJECT_ID}.json"
+    backlog_file.write_text(json.dumps(BACKLOG))
+    old = datetime(2025, 1, 1, 12, 5).timestamp()
+    os.utime(backlog_file, (old, old))
+
+    archive = JobArchive(db_path=db_path, staging_db_path=staging_path, archive_dir=str(tmp_path / "archive"),
+                         output_dir=str(output_dir), retention_days=30)
+    return archive, database, backlog_file
+
+
+def test_old_completed_job_is_archived_and_rehydrated(tmp_path):
+    archive, database, backlog_file = _setup(tmp_path)
+
+    summary = archive.run(now=datetime(2025, 3, 2))
+    assert summary['archived_jobs'] == 1
+    assert [job['project_name'] for job in database.get_backlog_jobs()] == ['Other']
+    assert not backlog_file.exists()
+    with sqlite3.connect(archive.staging_db_path) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM work_item_staging").fetchone()[0] == 0
+
+    archived = archive.load_archived_job(JOB_ID)
+    assert archived['backlog_job']['raw_summary'] == {'job_id': JOB_ID}
+    assert len(archived['work_item_staging']) == 2
+    assert archived['quality_metrics'][0]['agent_name'] == 'epic_strategist'
+    assert archive.load_archived_backlog(PROJECT_ID) == BACKLOG
+
+
+def test_rearchived_backlog_gets_a_new_identity(tmp_path):
+    archive, database, backlog_file = _setup(tmp_path)
+    assert archive.find_archived_backlogs(PROJECT_ID) == []
+
+    archive.run(now=datetime(2025, 3, 2))
+    first = archive.find_archived_backlogs(PROJECT_ID)
+    assert [entry['file_name'] for entry in first] == [backlog_file.name]
+
+    # A later job of the same project archives a newer backlog
+    job_key = f'job_20250110_120000_{PROJECT_ID}'
+    database.add_backlog_job('a@example.com', 'Clinic', raw_summary={'job_id': job_key})
+    with sqlite3.connect(archive.db_path) as conn:
+        conn.execute("UPDATE backlog_jobs SET created_at = '2025-01-10 12:00:00' WHERE job_key = ?", (job_key,))
+    newer_backlog = {'epics': [{'title': 'Billing', 'features': []}]}
+    newer_file = backlog_file.with_name(f"backlog_20250110_120500_{PROJECT_ID}.json")
+    newer_file.write_text(json.dumps(newer_backlog))
+    newer = datetime(2025, 1, 10, 12, 5).timestamp()
+    os.utime(newer_file, (newer, newer))
+    archive.run(now=datetime(2025, 3, 2))
+
+    latest = archive.find_archived_backlogs(PROJECT_ID)[0]
+    assert latest['file_name'] == newer_file.name
+    assert (latest['id'], latest['modified_at']) != (first[0]['id'], first[0]['modified_at'])
+    assert archive.read_archived_backlog(latest) == newer_backlog
+    assert archive.load_archived_backlog(PROJECT_ID) == newer_backlog
+
+def test_recent_jobs_stay_hot(tmp_path):
+    archive, database, backlog_file = _setup(tmp_path)
+
+    assert archive.run(now=datetime(2025, 1, 15))['archived_jobs'] == 0
+    assert len(database.get_backlog_jobs()) == 2
+    assert backlog_file.exists()
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+JSON Extractor Tests - single-pass extraction from LLM responses.
+"""
+import json
+import sys
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from utils.json_extractor import JSONExtractor
+
+
+class TestJSONExtractor:
+    """Response shapes seen from real models."""
+
+    def test_fenced_block_with_prose_brackets(self):
+        response = 'Based on the feature [above]:\n```json\n[{"title": "A"}, {"title": "B"}]\n```\nDone {really}.'
+        assert JSONExtractor.parse_json_from_response(response) == [{"title": "A"}, {"title": "B"}]
+
+    def test_trailing_commas_are_repaired(self):
+        response = '[{"title": "A", "tags": ["x", "y",],},]'
+        assert JSONExtractor.parse_json_from_response(response) == [{"title": "A", "tags": ["x", "y"]}]
+
+    def test_brackets_inside_strings_are_ignored(self):
+        response = '{"description": "Use [brackets] and {braces} and \\"quotes\\"", "n": 1}'
+        assert JSONExtractor.parse_json_from_response(response)["n"] == 1
+
+    def test_truncated_response_keeps_complete_items(self):
+        response = '[{"title": "A", "steps": ["1"]}, {"title": "B", "steps": ["1", "2'
+        assert JSONExtractor.parse_json_from_response(response) == [{"title": "A", "steps": ["1"]}]
+
+    def test_unclosed_prose_bracket_before_json(self):
+        response = 'Result (see [notes) {"title": "A", "description": "B"}'
+        assert JSONExtractor.parse_json_from_response(response) == {"title": "A", "description": "B"}
+
+    def test_single_work_item_wrapped_for_legacy_callers(self):
+        response = 'Here it is: {"title": "A", "user_story": "As a farmer..."}'
+        assert json.loads(JSONExtractor.extract_json_from_response(response)) == [
+            {"title": "A", "user_story": "As a farmer..."}
+        ]
+
+    def test_raw_newlines_in_strings(self):
+        cleaned = JSONExtractor.extract_json_from_response('[{"title": "line one\nline two"}]')
+        assert json.loads(cleaned)[0]["title"] == "line one\nline two"
+
+    def test_no_json(self):
+        assert JSONExtractor.extract_json_from_response("No structured content here.") is None
+        assert JSONExtractor.parse_json_from_response("") is None
@@ -0,0 +1,49 @@
+"""
+Tests for streamed, compressed JSON responses.
+"""
+
+import gzip
+import json
+
+from utils.json_streaming import (
+    compress_chunks, etag_matches, iter_backlog_ndjson, iter_json, negotiate_encoding
+)
+
+BACKLOG = {
+    "project": "Demo",
+    "epics": [{
+        "title": "Checkout",
+        "features": [{
+            "title": "Payments",
+            "user_stories": [{"title": "Pay by card", "test_cases": [{"steps": [{"action": "pay"}]}]}]
+        }]
+    }, {"title": "Search", "features": []}]
+}
+
+
+def test_streamed_document_matches_json():
+    body = b''.join(iter_json({"success": True, "data": BACKLOG}))
+
+    assert json.loads(body) == {"success": True, "data": BACKLOG}
+    assert json.loads(gzip.decompress(b''.join(compress_chunks(iter_json(BACKLOG), 'gzip')))) == BACKLOG
+
+
+def test_ndjson_records_walk_the_tree():
+    records = [json.loads(line) for line in b''.join(iter_backlog_ndjson(BACKLOG)).splitlines()]
+
+    assert [(r['type'], r.get('path')) for r in records] == [
+        ('backlog', None), ('epic', [0]), ('feature', [0, 0]), ('user_story', [0, 0, 0]), ('epic', [1])
+    ]
+    assert records[0]['data'] == {"project": "Demo"}
+    assert 'features' not in records[1]['data']
+    assert records[3]['data']['test_cases'] == [{"steps": [{"action": "pay"}]}]
+
+
+def test_encoding_negotiation_and_etags():
+    assert negotiate_encoding("gzip, deflate") == 'gzip'
+    assert negotiate_encoding("gzip;q=0, identity") is None
+    assert negotiate_encoding(None) is None
+
+    assert etag_matches('"abc", W/"def"', '"def"')
+    assert etag_matches('*', 'W/"x"')
+    assert not etag_matches('"abc"', '"abcd"')
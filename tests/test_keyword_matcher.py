@@ -0,0 +1,38 @@
+"""
+Tests for the shared keyword matcher.
+"""
+
+import random
+
+from utils.keyword_matcher import KeywordMatcher, get_keyword_matcher
+from utils.vision_context_extractor import VisionContextExtractor
+
+
+def test_automaton_matches_substring_semantics():
+    extractor = VisionContextExtractor()
+    matcher = KeywordMatcher(extractor.industry_patterns)
+    assert matcher.uses_automaton
+
+    words = [keyword for keywords in extractor.industry_patterns.values() for keyword in keywords] + ['with', 'it']
+    rng = random.Random(7)
+    for _ in range(200):
+        text = ' '.join(rng.choice(words) for _ in range(rng.randint(0, 40))).lower()
+        assert matcher.find(text) == {keyword for keyword in matcher.keywords if keyword in text}
+
+
+def test_group_counts_and_shared_matchers():
+    groups = {'healthcare': ['patient', 'clinical'], 'finance': ['payment', 'portfolio']}
+    matcher = get_keyword_matcher(groups)
+
+    assert matcher is get_keyword_matcher(dict(groups))
+    assert not matcher.uses_automaton
+    assert matcher.group_counts('patient portal for clinical payments') == {'healthcare': 2, 'finance': 1}
+    assert matcher.contains_any('portfolio review', 'finance')
+    assert matcher.count('no matches here', 'healthcare') == 0
+
+
+def test_detect_domain():
+    extractor = VisionContextExtractor()
+
+    assert extractor._detect_domain('A platform for patients and clinical staff in every hospital') == 'healthcare'
+    assert extractor._detect_domain('') is None
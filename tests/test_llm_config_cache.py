@@ -0,0 +1,73 @@
+"""
+Tests for the versioned per-user LLM configuration caches.
+"""
+
+import pytest
+
+from utils import llm_config_manager as config_module
+from utils.llm_config_manager import LLMConfigManager, invalidate_llm_config
+from utils.unified_llm_config import UnifiedLLMConfigManager
+
+
+@pytest.fixture(autouse=True)
+def frozen_clock(monkeypatch):
+    """Keep the version stamps' age window fixed unless a test moves it."""
+    clock = [1000.0]
+    monkeypatch.setattr(config_module.time, 'monotonic', lambda: clock[0])
+    return clock
+
+
+def test_active_configuration_is_cached_per_user_until_invalidated(monkeypatch):
+    loads = []
+
+    def get_active_llm_configuration(user_id):
+        loads.append(user_id)
+        return {'name': f'{user_id}-config', 'provider': 'ollama', 'model': f'model-{user_id}'}
+
+    monkeypatch.setattr(config_module.db, 'get_active_llm_configuration', get_active_llm_configuration)
+    manager = LLMConfigManager()
+
+    assert manager.get_active_configuration('alice')['model'] == 'model-alice'
+    assert manager.get_active_configuration('bob')['model'] == 'model-bob'
+    assert manager.get_active_configuration('alice')['model'] == 'model-alice'
+    assert loads == ['alice', 'bob']
+
+    invalidate_llm_config('bob')
+    manager.get_active_configuration('alice')
+    manager.get_active_configuration('bob')
+    assert loads == ['alice', 'bob', 'bob']
+
+
+def test_resolved_agent_config_is_reused_until_the_user_writes(monkeypatch):
+    manager = UnifiedLLMConfigManager(settings_file='config/settings.yaml')
+    lookups = []
+
+    def get_agent_specific_config(user_id, agent_name):
+        lookups.append((user_id, agent_name))
+        return {'provider': 'ollama', 'model': 'qwen2.5:14b', 'preset': 'fast'}
+
+    monkeypatch.setattr(manager, '_get_agent_specific_config', get_agent_specific_config)
+
+    config = manager.get_config('epic_strategist', 'carol')
+    assert (config.provider, config.model, config.source) == ('ollama', 'qwen2.5:14b', 'fallback -> database[epic_strategist]')
+    manager.get_config('epic_strategist', 'carol')
+    assert manager.get_config('epic_strategist', 'carol', {'model': 'llama3'}).model == 'llama3'
+    assert lookups == [('carol', 'epic_strategist')]
+
+    invalidate_llm_config('carol')
+    manager.get_config('epic_strategist', 'carol')
+    assert lookups == [('carol', 'epic_strategist')] * 2
+
+
+def test_cached_configuration_expires_for_writes_from_elsewhere(monkeypatch, frozen_clock):
+    models = ['llama3']
+    monkeypatch.setattr(config_module.db, 'get_active_llm_configuration',
+                        lambda user_id: {'name': 'config', 'provider': 'ollama', 'model': models[-1]})
+    manager = LLMConfigManager()
+    assert manager.get_active_configuration('dave')['model'] == 'llama3'
+
+    # Another process rewrites the configuration without invalidating this one's cache
+    models.append('qwen2.5:14b')
+    assert manager.get_active_configuration('dave')['model'] == 'llama3'
+    frozen_clock[0] += config_module.LLMConfigVersions.MAX_AGE_SECONDS
+    assert manager.get_active_configuration('dave')['model'] == 'qwen2.5:14b'
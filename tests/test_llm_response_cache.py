@@ -0,0 +1,109 @@
+"""
+Tests for the exact and approximate LLM response cache tiers.
+"""
+
+from utils.llm_response_cache import LLMResponseCache
+
+SYSTEM_PROMPT = (
+    "You are a senior product owner for a healthcare scheduling platform. Improve the feature below so it "
+    "reaches a GOOD rating: state the business value for clinics and patients, write testable acceptance "
+    "criteria in Given/When/Then form, keep the scope to one release and respond with a single JSON object."
+)
+IMPROVE = "Feature: Patient appointment booking. Weaknesses: acceptance criteria are vague; business value missing."
+IMPROVE_REWORDED = "Feature: Patient appointment booking. Weaknesses: acceptance criteria are vague; business value is missing."
+
+
+def _cache(agents=('feature_decomposer_agent',)):
+    return LLMResponseCache({'llm_response_cache': {'enabled': True, 'semantic': {'agents': list(agents)}}})
+
+
+def test_exact_and_semantic_hits_for_opted_in_agent():
+    cache = _cache()
+    miss = cache.lookup('feature_decomposer_agent', 'llama3', None, SYSTEM_PROMPT, IMPROVE)
+    assert miss.tier == 'miss'
+    cache.store(miss, '{"title": "Improved"}')
+
+    assert cache.lookup('feature_decomposer_agent', 'llama3', None, SYSTEM_PROMPT, IMPROVE).tier == 'exact'
+    semantic = cache.lookup('feature_decomposer_agent', 'llama3', None, SYSTEM_PROMPT, IMPROVE_REWORDED)
+    assert semantic.tier == 'semantic' and semantic.response == '{"title": "Improved"}'
+
+    # Other models and unrelated prompts do not share entries
+    assert cache.lookup('feature_decomposer_agent', 'qwen2.5', None, SYSTEM_PROMPT, IMPROVE_REWORDED).tier == 'miss'
+    assert cache.lookup('feature_decomposer_agent', 'llama3', None, "Write test cases.", "Login page").tier == 'miss'
+
+
+def test_semantic_tier_is_opt_in_and_rejected_hits_are_evicted():
+    cache = _cache(agents=())
+    cache.store(cache.lookup('feature_decomposer_agent', 'llama3', None, SYSTEM_PROMPT, IMPROVE), 'response')
+    assert cache.lookup('feature_decomposer_agent', 'llama3', None, SYSTEM_PROMPT, IMPROVE_REWORDED).tier == 'miss'
+
+    cache = _cache()
+    cache.store(cache.lookup('feature_decomposer_agent', 'llama3', None, SYSTEM_PROMPT, IMPROVE), 'response')
+    hit = cache.lookup('feature_decomposer_agent', 'llama3', None, SYSTEM_PROMPT, IMPROVE_REWORDED)
+    cache.reject(hit)
+    assert cache.lookup('feature_decomposer_agent', 'llama3', None, SYSTEM_PROMPT, IMPROVE).tier == 'miss'
+    assert cache.get_stats()['rejected'] == 1
+
+
+def test_disabled_cache_never_looks_up():
+    cache = LLMResponseCache({})
+    assert cache.lookup('epic_strategist', 'llama3', None, SYSTEM_PROMPT, IMPROVE) is None
+
+
+def _agent_with_cache(monkeypatch, responses):
+    """Agent whose LLM calls pop the given responses, with the response cache enabled."""
+    import sys
+    import threading
+    import types
+
+    from agents.base_agent import Agent, CircuitBreaker
+
+    monkeypatch.setitem(sys.modules, 'utils.quality_metrics_tracker',
+                        types.SimpleNamespace(quality_tracker=types.SimpleNamespace(record_cache_event=lambda *a, **k: None)))
+    agent = Agent.__new__(Agent)
+    agent.name = 'feature_decomposer_agent'
+    agent.llm_provider = 'openai'
+    agent.model = 'gpt-test'
+    agent.timeout_seconds = 10
+    agent.execution_count = agent.success_count = agent.error_count = 0
+    agent.structured_output_enabled = False
+    agent.circuit_breaker = CircuitBreaker()
+    agent.response_cache = _cache(agents=())
+    agent._cache_state = threading.local()
+    agent.get_prompt_messages = lambda context, user_input, model=None: (SYSTEM_PROMPT, user_input)
+    agent._prepare_request_payload = lambda system_prompt, user_input, model=None: {}
+    agent._make_api_request = lambda payload: responses.pop(0)
+    agent._process_response = lambda response: response
+    return agent
+
+
+def test_retry_after_bad_rating_reaches_llm(monkeypatch):
+    responses = ['{"title": "Weak"}', '{"title": "Better"}', '{"title": "Unused"}']
+    agent = _agent_with_cache(monkeypatch, responses)
+
+    assert agent.run(IMPROVE) == '{"title": "Weak"}'
+    agent.record_cache_outcome('FAIR', 55)
+    assert agent.run(IMPROVE) == '{"title": "Better"}'
+    agent.record_cache_outcome('GOOD', 80)
+    assert agent.run(IMPROVE) == '{"title": "Better"}'  # accepted responses stay cached
+    assert responses == ['{"title": "Unused"}']
+
+
+def test_unparseable_typed_response_is_not_cached(monkeypatch):
+    responses = ['Sorry, I cannot help with that.', '[{"title": "Booking", "description": "Book visits"}]']
+    agent = _agent_with_cache(monkeypatch, responses)
+
+    assert agent.run(IMPROVE, output_type='features') == 'Sorry, I cannot help with that.'
+    assert agent.run(IMPROVE, output_type='features').startswith('[')
+    assert responses == []
+
+
+def test_disabled_cache_does_not_parse_responses(monkeypatch):
+    agent = _agent_with_cache(monkeypatch, ['[{"title": "Booking"}]'])
+    agent.response_cache = LLMResponseCache({})
+
+    def fail(*args):
+        raise AssertionError("response parsed for a disabled cache")
+
+    agent._is_cacheable_response = fail
+    assert agent.run(IMPROVE, output_type='features') == '[{"title": "Booking"}]'
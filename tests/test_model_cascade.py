@@ -0,0 +1,106 @@
+"""
+Tests for the draft-then-refine model cascade of the feature decomposer.
+"""
+
+import json
+import threading
+import types
+
+from agents.feature_decomposer_agent import FeatureDecomposerAgent
+from utils.model_fallback_manager import ModelFallbackManager
+
+
+def _settings(accept_ratings=None):
+    cascade = {
+        'enabled': True,
+        'providers': ['ollama'],
+        'agents': {'feature_decomposer_agent': {'draft_model': 'draft-8b', 'refine_model': None}},
+    }
+    if accept_ratings:
+        cascade['accept_ratings'] = accept_ratings
+    return {'model_cascade': cascade}
+
+
+def _agent(settings, refined_rating='GOOD'):
+    """Feature decomposer whose assessor returns each feature's 'rating' and whose LLM returns one refined feature."""
+    agent = FeatureDecomposerAgent.__new__(FeatureDecomposerAgent)
+    agent.max_quality_retries = 2
+    agent.model_cascade = ModelFallbackManager()
+    agent.model_cascade.configure_cascade(settings, 'feature_decomposer_agent', 'ollama', 'refine-70b')
+    agent._cache_state = threading.local()
+    agent.near_duplicates = types.SimpleNamespace(deduplicate=lambda items, **kwargs: items)
+    agent.feature_quality_assessor = types.SimpleNamespace(
+        assess_feature=lambda feature, *args: types.SimpleNamespace(rating=feature['rating'], score=50),
+        format_assessment_log=lambda *args: '',
+    )
+    agent._create_feature_improvement_prompt = lambda feature, *args: f"Improve {feature['title']}"
+    agent.refine_calls = []
+
+    def run(user_input, context=None, output_type=None, model=None):
+        agent.refine_calls.append(model)
+        return json.dumps({'title': 'Refined', 'rating': refined_rating})
+
+    agent.run = run
+    return agent
+
+
+def test_draft_rated_good_is_accepted_without_refinement():
+    agent = _agent(_settings())
+    approved = agent._assess_and_improve_feature_quality([{'title': 'Booking', 'rating': 'GOOD'}], {}, {}, '')
+
+    assert [feature['title'] for feature in approved] == ['Booking']
+    assert agent.refine_calls == []
+    summary = agent.model_cascade.get_cascade_summary()
+    assert (summary['accepted_on_draft'], summary['refined']) == (1, 0)
+
+
+def test_draft_below_accept_ratings_is_refined_with_refine_model():
+    agent = _agent(_settings())
+    approved = agent._assess_and_improve_feature_quality([{'title': 'Booking', 'rating': 'FAIR'}], {}, {}, '')
+
+    assert [feature['title'] for feature in approved] == ['Refined']
+    assert agent.refine_calls == ['refine-70b']
+    summary = agent.model_cascade.get_cascade_summary()
+    assert (summary['accepted_on_draft'], summary['refined']) == (0, 1)
+
+
+def test_configured_accept_ratings_decide_acceptance():
+    agent = _agent(_settings(accept_ratings=['EXCELLENT', 'GOOD', 'FAIR']))
+    approved = agent._assess_and_improve_feature_quality([{'title': 'Booking', 'rating': 'FAIR'}], {}, {}, '')
+
+    assert [feature['title'] for feature in approved] == ['Booking']
+    assert agent.refine_calls == []
+
+    agent = _agent(_settings(accept_ratings=['EXCELLENT']), refined_rating='EXCELLENT')
+    approved = agent._assess_and_improve_feature_quality([{'title': 'Booking', 'rating': 'GOOD'}], {}, {}, '')
+
+    assert [feature['title'] for feature in approved] == ['Refined']
+    assert agent.refine_calls == ['refine-70b']
+
+
+def test_disabled_cascade_uses_default_accept_ratings():
+    settings = _settings(accept_ratings=['EXCELLENT', 'GOOD', 'FAIR'])
+    settings['model_cascade']['enabled'] = False
+    agent = _agent(settings)
+    approved = agent._assess_and_improve_feature_quality([{'title': 'Booking', 'rating': 'FAIR'}], {}, {}, '')
+
+    assert [feature['title'] for feature in approved] == ['Refined']
+    assert agent.refine_calls == [None]
+
+def test_generation_keeps_the_configured_ollama_provider():
+    agent = FeatureDecomposerAgent.__new__(FeatureDecomposerAgent)
+    agent.model = 'llama3.1:8b'
+    agent.llm_provider = 'ollama'
+    agent.ollama_provider = configured = object()
+    agent._cascade_providers = {}
+    agent.model_cascade = ModelFallbackManager()
+    used_providers = []
+
+    def run_with_timeout(user_input, context, timeout=None, output_type=None, model=None):
+        used_providers.append(agent.ollama_provider)
+        return ''
+
+    agent._run_with_timeout = run_with_timeout
+    assert agent.decompose_epic({'title': 'Scheduling'}) == []
+    assert used_providers == [configured]
+    assert agent.ollama_provider is configured
@@ -0,0 +1,64 @@
+"""
+Tests for near-duplicate detection of generated work items.
+"""
+
+import json
+import types
+
+from agents.feature_decomposer_agent import FeatureDecomposerAgent
+from utils.model_fallback_manager import ModelFallbackManager
+from utils.near_duplicate_detector import NearDuplicateDetector
+
+LOGIN = {
+    'title': 'User login with email',
+    'description': 'As a registered user I want to log in with my email and password so that I can access my account dashboard.',
+    'acceptance_criteria': ['Given valid credentials, When I log in, Then I see my dashboard'],
+}
+LOGIN_REWORDED = {
+    'title': 'User login with email address',
+    'description': 'As a registered user I want to log in with my email and password so I can access my account dashboard.',
+    'acceptance_criteria': ['Given a locked account, When I log in, Then I see an error'],
+}
+RESET = {
+    'title': 'Password reset',
+    'description': 'As a user I want to reset my forgotten password via an emailed link so that I can regain access.',
+}
+
+
+def test_reworded_items_are_dropped_keeping_the_first():
+    detector = NearDuplicateDetector({})
+
+    assert detector.deduplicate([LOGIN, RESET, LOGIN_REWORDED]) == [LOGIN, RESET]
+    assert detector.deduplicate([RESET], existing=[LOGIN]) == [RESET]
+    assert detector.deduplicate([LOGIN_REWORDED], existing=[LOGIN]) == []
+    assert detector.get_stats()['dropped'] == 2
+
+
+def test_merge_and_cross_parent_deduplication():
+    detector = NearDuplicateDetector({'near_duplicates': {'action': 'merge'}})
+    kept = dict(LOGIN, acceptance_criteria=list(LOGIN['acceptance_criteria']))
+    epics = [{'features': [kept]}, {'features': [dict(LOGIN_REWORDED), dict(RESET)]}]
+
+    assert detector.deduplicate_children(epics, 'features') == 1
+    assert [len(epic['features']) for epic in epics] == [1, 1]
+    assert kept['acceptance_criteria'] == LOGIN['acceptance_criteria'] + LOGIN_REWORDED['acceptance_criteria']
+
+
+def test_disabled_detector_keeps_everything():
+    detector = NearDuplicateDetector({'near_duplicates': {'enabled': False}})
+    assert detector.deduplicate([LOGIN, LOGIN]) == [LOGIN, LOGIN]
+
+
+def test_dropped_feature_is_replaced_to_reach_the_limit():
+    agent = FeatureDecomposerAgent.__new__(FeatureDecomposerAgent)
+    agent.max_quality_retries = 2
+    agent.model_cascade = ModelFallbackManager()
+    agent.near_duplicates = NearDuplicateDetector({})
+    agent.feature_quality_assessor = types.SimpleNamespace(
+        assess_feature=lambda *args: types.SimpleNamespace(rating='GOOD', score=80),
+        format_assessment_log=lambda *args: '',
+    )
+    agent.run_with_template = lambda *args: json.dumps([LOGIN_REWORDED, RESET])
+
+    approved = agent._assess_and_improve_feature_quality([LOGIN, LOGIN_REWORDED], {}, {}, '', target_count=2)
+    assert approved == [LOGIN, RESET]
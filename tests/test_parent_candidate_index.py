@@ -0,0 +1,83 @@
+"""
+Tests for the orphaned work item parent candidate index.
+"""
+
+import logging
+
+from integrators.parent_candidate_index import ParentCandidateIndex
+
+
+def _work_item(work_item_id, title, area_path):
+    return {'id': work_item_id, 'fields': {'System.Title': title, 'System.AreaPath': area_path}}
+
+
+PARENTS = [
+    _work_item(1, 'User login with MFA', 'Proj\\Identity'),
+    _work_item(2, 'Password reset flow', 'Proj\\Identity\\Recovery'),
+    _work_item(3, 'Invoice export', 'Proj\\Billing'),
+    _work_item(4, 'Project roadmap', 'Proj'),
+    _work_item(5, 'Other project item', 'Other\\Area'),
+]
+
+
+def test_title_candidates_and_area_subtree():
+    index = ParentCandidateIndex('User Story', PARENTS)
+
+    assert index.title_candidates('Verify login with valid MFA code') == {1}
+    assert index.title_candidates('Unrelated words only') == set()
+    assert index.area_subtree('Proj\\Identity') == {1, 2}
+    assert index.area_subtree('proj\\identity\\recovery') == {2}
+    assert index.area_subtree('Proj\\Missing') == set()
+
+
+def test_area_path_relations():
+    index = ParentCandidateIndex('User Story', PARENTS)
+
+    relations = {work_item['id']: relation for work_item, relation in index.area_path_relations('Proj\\Identity')}
+
+    assert relations == {1: 'exact', 2: 'descendant', 3: 'related', 4: 'ancestor'}
+
+
+def test_containment_candidates():
+    index = ParentCandidateIndex('Feature', [
+        _work_item(1, 'Payments processing', 'Proj\\Billing'),
+        _work_item(2, 'UI', 'Proj\\Web'),
+        _work_item(3, 'Reporting', 'Proj\\Billing\\Reports'),
+    ])
+
+    assert index.title_candidates('Payment') == set()
+    assert index.title_containment_candidates('Payment') == {1}
+    assert index.title_containment_candidates('New ui theme') == {2}
+    assert index.area_path_containing('Billing') == {1, 3}
+    assert index.area_path_containing('Proj\\Billing\\Reports') == {3}
+
+
+def test_title_similarity_search_matches_full_scan():
+    from integrators.azure_devops_api import AzureDevOpsIntegrator
+
+    parents = PARENTS + [
+        _work_item(6, 'Payments processing', 'Proj\\Billing'),
+        _work_item(7, 'Audit', 'Ops\\Proj\\Billing\\Audit'),
+    ]
+    integrator = AzureDevOpsIntegrator.__new__(AzureDevOpsIntegrator)
+    integrator.logger = logging.getLogger(__name__)
+    integrator.get_parent_candidate_index = lambda parent_type: ParentCandidateIndex(parent_type, parents)
+
+    def full_scan(title, area_path):
+        matched = set()
+        for parent in parents:
+            fields = parent['fields']
+            score = integrator._calculate_title_similarity(title, fields['System.Title'])
+            if area_path and area_path in fields['System.AreaPath']:
+                score += 0.3
+            if score > 0.2:
+                matched.add(parent['id'])
+        return matched
+
+    for title, area_path in [('Payment', None), ('Payment', 'Proj\\Billing'), ('login', 'Identity'),
+                             ('Invoice export', 'Other'), ('x', 'Proj')]:
+        found = {candidate['work_item']['id']
+                 for candidate in integrator._find_parents_by_title_similarity(title, 'Feature', area_path)}
+        assert found == full_scan(title, area_path), (title, area_path)
+    assert 6 in {candidate['work_item']['id']
+                 for candidate in integrator._find_parents_by_title_similarity('Payment', 'Feature')}
@@ -0,0 +1,41 @@
+"""
+Tests for the sequence-numbered progress journal.
+"""
+
+from utils.progress_channel import ProgressJournal
+
+
+def test_publish_emits_only_changed_fields():
+    journal = ProgressJournal()
+    received = []
+    journal.add_listener(received.append)
+
+    first = journal.publish('job', {'status': 'running', 'progress': 10, 'artifactCounts': {'epics': 1, 'features': 0}})
+    second = journal.publish('job', {'status': 'running', 'progress': 20, 'artifactCounts': {'epics': 1, 'features': 3}})
+    assert journal.publish('job', {'progress': 20}) is None
+    third = journal.publish('job', {'createdItemIds': [7, 8]})
+    fourth = journal.publish('job', {'createdItemIds': [7, 8, 9]})
+
+    assert [event['seq'] for event in received] == [1, 2, 3, 4]
+    assert first['changes']['status'] == 'running'
+    assert second['changes'] == {'progress': 20, 'artifactCounts': {'features': 3}}
+    assert third['changes'] == {'createdItemIds': [7, 8]}
+    assert fourth['changes'] == {'createdItemIds': [9]}
+    assert journal.snapshot('job')['state'] == {
+        'status': 'running', 'progress': 20, 'artifactCounts': {'epics': 1, 'features': 3}, 'createdItemIds': [7, 8, 9]
+    }
+
+
+def test_resume_replays_missed_deltas_or_sends_snapshot():
+    journal = ProgressJournal(history_size=3)
+    for progress in range(10, 60, 10):
+        journal.publish('job', {'progress': progress})
+
+    assert [event['seq'] for event in journal.resume('job', 3)] == [4, 5]
+    assert journal.resume('job', 5) == []
+
+    snapshot, = journal.resume('job', 1)  # deltas 2 and 3 are no longer kept
+    assert snapshot['type'] == 'snapshot'
+    assert snapshot['seq'] == 5 and snapshot['state'] == {'progress': 50}
+    assert journal.resume('job', 0)[0]['type'] == 'snapshot'
+    assert journal.resume('unknown', 0) == []
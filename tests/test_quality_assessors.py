@@ -0,0 +1,62 @@
+"""
+Tests for batch quality assessment.
+"""
+
+from utils.epic_quality_assessor_v2 import EpicQualityAssessor
+from utils.task_quality_assessor import TaskQualityAssessor
+from utils.user_story_quality_assessor_v2 import UserStoryQualityAssessor
+
+VISION = ("Enable smallholder farmers to monitor crop yield, soil moisture and irrigation "
+          "from a mobile app, reducing water use by 30% within 12 months.")
+
+
+def test_assess_many_matches_single_item_assessment():
+    epics = [
+        {'title': 'Crop Yield Monitoring for Farmers', 'description': 'Enable farmers to track crop yield and soil data on mobile within 5 seconds.'},
+        {'title': 'Reporting', 'description': 'Reports.'},
+    ]
+    epic_assessor = EpicQualityAssessor()
+    batch = epic_assessor.assess_many(epics, {'domain': 'agriculture', 'product_vision': VISION})
+    assert batch == [epic_assessor.assess_epic(epic, 'agriculture', VISION) for epic in epics]
+
+    feature = {'title': 'Soil Moisture Alerts', 'description': 'Mobile alerts when soil moisture drops below irrigation thresholds.'}
+    story_text = 'As a Manager, I want soil moisture alerts so that I can schedule irrigation.'
+    stories = [
+        {'title': 'Moisture alerts', 'user_story': story_text, 'description': story_text + ' Alerts are pushed to the mobile app.',
+         'story_points': 3, 'acceptance_criteria': ['Given a sensor, When moisture drops, Then an alert is sent'] * 3},
+    ]
+    story_assessor = UserStoryQualityAssessor()
+    batch = story_assessor.assess_many(stories, {'feature': feature, 'domain': 'agriculture', 'product_vision': VISION})
+    assert batch == [story_assessor.assess_user_story(story, feature, 'agriculture', VISION) for story in stories]
+
+    tasks = [
+        {'title': 'Implement moisture alert API endpoint', 'description': 'Create a FastAPI endpoint backed by PostgreSQL for soil moisture sensor alerts.',
+         'time_estimate': 4, 'complexity': 'Medium', 'story_points': 2},
+        {'title': 'Misc', 'description': ''},
+    ]
+    task_assessor = TaskQualityAssessor()
+    batch = task_assessor.assess_many(tasks, {'user_story': stories[0], 'domain': 'agriculture', 'product_vision': VISION})
+    assert batch == [task_assessor.assess_task(task, stories[0], 'agriculture', VISION) for task in tasks]
+    assert batch[0].score > batch[1].score
+
+
+def test_text_feature_cache_is_shared_and_bounded():
+    from utils.quality_validator import WorkItemQualityValidator
+    from utils.text_feature_cache import TextFeatureCache
+
+    cache = TextFeatureCache({'text_feature_cache': {'max_entries': 2}}, job_id='job-1')
+    validator = WorkItemQualityValidator()
+    validator.set_text_feature_cache(cache)
+    criteria = ['Given a user, when they save, then the form is stored within 2 seconds',
+                'User can see a better dashboard', 'System shows errors']
+
+    first = validator.validate_acceptance_criteria(criteria)
+    second = validator.validate_acceptance_criteria(criteria)
+
+    assert first == second
+    assert first[1] == ["Criteria 2 contains vague language. Make it more specific and measurable"]
+    stats = cache.get_stats()
+    assert stats['entries'] == 2
+    assert stats['evictions'] >= 1
+    assert cache.is_given_when_then('Given a, When b, Then c')
+    assert cache.tokens('Soil moisture ALERTS') == {'soil', 'moisture', 'alerts'}
@@ -0,0 +1,65 @@
+"""
+Tests for schema-version gated table setup.
+"""
+
+import sqlite3
+
+import pytest
+
+from auth.user_auth import UserAuthManager
+from utils import schema_migrations
+from utils.schema_migrations import add_column, ensure_schema
+
+
+def test_setup_runs_once_per_version(tmp_path, monkeypatch):
+    db_path = str(tmp_path / "app.db")
+    runs = []
+    monkeypatch.setitem(schema_migrations.SCHEMA_VERSIONS, 'database', 1)
+
+    assert ensure_schema(db_path, 'database', lambda: runs.append(1)) is True
+    assert ensure_schema(db_path, 'database', lambda: runs.append(1)) is False
+    schema_migrations._checked.clear()  # a new process reads the stored version
+    assert ensure_schema(db_path, 'database', lambda: runs.append(1)) is False
+    assert ensure_schema(db_path, 'work_item_staging', lambda: runs.append(2)) is True
+
+    monkeypatch.setitem(schema_migrations.SCHEMA_VERSIONS, 'database', 2)
+    assert ensure_schema(db_path, 'database', lambda: runs.append(3)) is True
+    assert runs == [1, 2, 3]
+
+
+def test_failed_setup_is_retried(tmp_path):
+    db_path = str(tmp_path / "app.db")
+
+    def failing_setup():
+        raise RuntimeError("disk full")
+
+    try:
+        ensure_schema(db_path, 'quality_metrics', failing_setup)
+    except RuntimeError:
+        pass
+    assert ensure_schema(db_path, 'quality_metrics', lambda: None) is True
+
+
+def test_failed_column_migration_leaves_version_unrecorded(tmp_path):
+    db_path = str(tmp_path / "auth.db")
+    with sqlite3.connect(db_path) as conn:
+        # A view cannot be altered, so the jti column migration fails
+        conn.execute("CREATE VIEW user_sessions AS SELECT 1 AS id")
+
+    with pytest.raises(sqlite3.OperationalError):
+        UserAuthManager(db_path)
+    assert schema_migrations._stored_version(db_path, 'user_auth') == 0
+
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("DROP VIEW user_sessions")
+    UserAuthManager(db_path)
+    assert schema_migrations._stored_version(db_path, 'user_auth') == schema_migrations.SCHEMA_VERSIONS['user_auth']
+
+
+def test_add_column_ignores_only_existing_columns(tmp_path):
+    with sqlite3.connect(str(tmp_path / "cols.db")) as conn:
+        conn.execute("CREATE TABLE t (id INTEGER)")
+        assert add_column(conn, 't', 'name TEXT') is True
+        assert add_column(conn, 't', 'name TEXT') is False
+        with pytest.raises(sqlite3.OperationalError):
+            add_column(conn, 'missing', 'name TEXT')
@@ -0,0 +1,38 @@
+"""
+Tests for the startup import profiler and lazy loading of the generation stack.
+"""
+
+import os
+import shutil
+
+from utils.startup_profiler import aggregate_by_package, format_report, parse_importtime, run_importtime
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+TRACE = """import time: self [us] | cumulative | imported package
+import time:       100 |        100 |     yaml.error
+import time:       300 |        400 |   yaml
+import time:        50 |         50 |   config.config_loader
+import time:       200 |        650 | config
+"""
+
+
+def test_trace_is_aggregated_per_package():
+    timings = parse_importtime(TRACE)
+
+    assert [(t.module, t.depth) for t in timings] == [
+        ('yaml.error', 2), ('yaml', 1), ('config.config_loader', 1), ('config', 0)
+    ]
+    assert aggregate_by_package(timings) == [('yaml', 400, 2), ('config', 250, 2)]
+    assert 'config: 0.7 ms total, 4 modules' in format_report('config', timings)
+
+
+def test_server_import_does_not_load_generation_stack(tmp_path, monkeypatch):
+    shutil.copytree(os.path.join(PROJECT_ROOT, 'config'), tmp_path / 'config')
+    monkeypatch.setenv('PYTHONPATH', PROJECT_ROOT)
+    trace = run_importtime('unified_api_server', cwd=str(tmp_path))
+    modules = {timing.module for timing in parse_importtime(trace)}
+
+    assert 'unified_api_server' in modules
+    assert 'supervisor.supervisor' not in modules
+    assert 'agents.base_agent' not in modules
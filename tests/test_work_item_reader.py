@@ -0,0 +1,101 @@
+"""
+Tests for the bulk Azure DevOps work item reader.
+"""
+
+import threading
+
+import pytest
+import requests
+
+from integrators import work_item_reader
+from integrators.work_item_reader import PAGE_SIZE, WorkItemReadError, iter_work_items
+
+URL = 'https://dev.azure.com/org/Proj/_apis/wit/workitems'
+
+
+class FakeResponse:
+    def __init__(self, value):
+        self.value = value
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return {'value': self.value}
+
+
+class FakeSession:
+    """Batch endpoint stub that records requests and the number of pages in flight."""
+
+    def __init__(self, delay=lambda ids: 0.0, failures=0, missing=()):
+        self.delay = delay
+        self.failures = failures
+        self.missing = set(missing)
+        self.requests = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+
+    def get(self, url, params=None, auth=None, headers=None, timeout=None):
+        ids = [int(wi_id) for wi_id in params['ids'].split(',')]
+        with self.lock:
+            self.requests.append(params)
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            fail = self.failures > 0
+            self.failures -= 1
+        try:
+            threading.Event().wait(self.delay(ids))  # time.sleep is patched out for backoff
+            if fail:
+                raise requests.exceptions.ConnectionError('connection reset')
+            return FakeResponse([None if wi_id in self.missing else {'id': wi_id} for wi_id in ids])
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(work_item_reader.time, 'sleep', lambda seconds: None)
+
+
+def test_items_are_yielded_in_request_order():
+    ids = list(range(1, 4 * PAGE_SIZE + 1))
+    # Later pages answer first
+    session = FakeSession(delay=lambda page: 0.05 if page[0] == 1 else 0.0, missing={7})
+
+    items = list(iter_work_items(session, URL, iter(ids), fields=['System.Title']))
+
+    assert [item['id'] for item in items] == [wi_id for wi_id in ids if wi_id != 7]
+    assert len(session.requests) == 4
+    assert all(params['fields'] == 'System.Title' and len(params['ids'].split(',')) == PAGE_SIZE
+               for params in session.requests)
+
+
+def test_expand_relations_drops_field_projection():
+    session = FakeSession()
+    list(iter_work_items(session, URL, [1, 2], fields=['System.Title'], expand_relations=True))
+
+    assert session.requests[0]['$expand'] == 'relations'
+    assert 'fields' not in session.requests[0]
+
+
+def test_failed_page_is_retried():
+    session = FakeSession(failures=2)
+    assert [item['id'] for item in iter_work_items(session, URL, [1, 2], max_retries=3)] == [1, 2]
+    assert len(session.requests) == 3
+
+
+def test_page_failing_every_retry_raises():
+    session = FakeSession(failures=10)
+    with pytest.raises(WorkItemReadError, match='1..2 after 3 attempts'):
+        list(iter_work_items(session, URL, [1, 2], max_retries=3))
+    assert len(session.requests) == 3
+
+
+def test_pages_in_flight_are_bounded():
+    session = FakeSession(delay=lambda page: 0.02)
+    items = list(iter_work_items(session, URL, range(10 * PAGE_SIZE), max_concurrency=3))
+
+    assert len(items) == 10 * PAGE_SIZE
+    assert 1 < session.max_in_flight <= 3
@@ -0,0 +1,67 @@
+"""
+Tests for the event-driven artifact counters of the workflow monitor.
+"""
+
+import logging
+import types
+
+from supervisor.supervisor import WorkflowMonitor, WorkflowStatus
+
+
+def _monitor(workflow_data, **kwargs):
+    supervisor = types.SimpleNamespace(workflow_data=workflow_data, logger=logging.getLogger(__name__))
+    monitor = WorkflowMonitor(supervisor, **kwargs)
+    monitor.start_monitoring('wf')
+    return monitor
+
+
+def test_record_artifacts_applies_per_parent_deltas():
+    data = {'epics': []}
+    monitor = _monitor(data)
+    received = []
+    monitor.register_dashboard_callback(received.append)
+
+    epic = {'title': 'Epic'}
+    monitor.record_artifacts('wf', 'epics', data, [epic])
+    monitor.record_artifacts('wf', 'features', epic, [{}, {}, {}])
+    # Regenerating a parent's items replaces its previous count
+    monitor.record_artifacts('wf', 'features', epic, [{}, {}])
+    monitor.record_artifacts('wf', 'test_cases', {}, 4)
+    monitor.record_artifacts('unknown', 'epics', data, [epic])
+
+    counts = monitor.get_dashboard_data('wf')['artifacts_created']
+    assert counts == {'epics': 1, 'features': 2, 'user_stories': 0, 'tasks': 0, 'test_cases': 4}
+    assert received[-1]['artifacts_created'] == counts
+
+
+def test_recount_corrects_removed_items():
+    story = {'tasks': [{}, {}], 'test_cases': [{}]}
+    feature = {'user_stories': [story, {'tasks': [{}]}]}
+    data = {'epics': [{'features': [feature]}, {'features': []}]}
+    monitor = _monitor(data)
+    monitor.record_artifacts('wf', 'tasks', story, story['tasks'])
+
+    story['tasks'].pop()
+    monitor.recount_artifacts('wf')
+    assert monitor.get_dashboard_data('wf')['artifacts_created'] == {
+        'epics': 2, 'features': 1, 'user_stories': 2, 'tasks': 2, 'test_cases': 1
+    }
+
+    # Deltas after a recount build on the recounted per-parent counts
+    monitor.record_artifacts('wf', 'tasks', story, [{}, {}, {}])
+    assert monitor.get_dashboard_data('wf')['artifacts_created']['tasks'] == 4
+
+
+def test_history_is_downsampled_and_bounded():
+    monitor = _monitor({'epics': []}, history_size=3, history_interval_seconds=60)
+    for progress in range(10):
+        monitor.update_stage_progress('wf', 'stage', progress)
+    assert len(monitor.metrics_history) == 1
+    assert monitor.metrics_history[-1]['progress_percentage'] == 9
+
+    monitor.history_interval_seconds = 0
+    for progress in range(10):
+        monitor.update_stage_progress('wf', 'stage', progress)
+    monitor.stop_monitoring('wf', WorkflowStatus.FAILED)
+    assert len(monitor.metrics_history) == 3
+    assert monitor.metrics_history[-1]['status'] == WorkflowStatus.FAILED.value
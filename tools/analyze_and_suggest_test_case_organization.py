@@ -18,6 +18,10 @@ import base64
 import json
 from typing import List, Dict, Any, Optional, Tuple
 from dotenv import load_dotenv
+
+# Add project root to path for the shared work item reader
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from integrators.work_item_reader import iter_work_items
 from datetime import datetime
 from collections import defaultdict
 
@@ -115,7 +119,7 @@ class TestCaseAnalyzer:
             return []
     
     def get_work_item_details(self, work_item_ids: List[int], fields: List[str] = None) -> List[Dict[str, Any]]:
-        """Get detailed information for work items in batches."""
+        """Get detailed information for work items (concurrent pages, retried, projected fields)."""
         if not work_item_ids:
             return []
         
@@ -126,35 +130,12 @@ class TestCaseAnalyzer:
                 "System.AreaPath", "System.State", "System.CreatedDate"
             ]
         
-        all_work_items = []
-        batch_size = 200  # Azure DevOps API limit
-        
-        log(f"Fetching work item details in batches of {batch_size}...")
+        log(f"Fetching details for {len(work_item_ids)} work items...")
         
-        for i in range(0, len(work_item_ids), batch_size):
-            batch_ids = work_item_ids[i:i + batch_size]
-            batch_number = (i // batch_size) + 1
-            
-            ids_param = ','.join(map(str, batch_ids))
-            fields_param = ','.join(fields)
-            
-            try:
-                response = requests.get(
-                    f"{self.wit_url}/workitems?ids={ids_param}&fields={fields_param}&api-version=7.1",
-                    headers=self.headers
-                )
-                
-                response.raise_for_status()
-                data = response.json()
-                
-                work_items = data.get('value', [])
-                all_work_items.extend(work_items)
-                
-                log(f"Fetched {len(work_items)} work items in batch {batch_number}")
-                
-            except requests.exceptions.RequestException as e:
-                log(f"Error fetching work items batch {batch_number}: {e}")
-                continue
+        all_work_items = list(iter_work_items(
+            requests.Session(), f"{self.wit_url}/workitems", work_item_ids,
+            fields=fields, headers=self.headers, api_version="7.1"
+        ))
         
         log(f"Total work items fetched: {len(all_work_items)}")
         return all_work_items
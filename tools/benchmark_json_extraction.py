@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Benchmark for JSONExtractor on realistic LLM responses.
+
+The corpus is built from real model outputs already stored in test_results/
+(user stories and tasks generated during model testing - no customer data).
+Each output is wrapped in the response shapes we see from Ollama/OpenAI:
+prose around a fenced block, trailing commas, stray prose brackets, truncated
+endings, and 30-60KB responses padded the way 70B models pad them.
+
+Usage:
+    python tools/benchmark_json_extraction.py [--iterations N] [--size-kb KB]
+"""
+
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.json_extractor import JSONExtractor
+
+CORPUS_GLOB = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'test_results', '*.json')
+
+
+def load_corpus_items():
+    """Load generated work item lists (user stories / tasks) from test_results."""
+    item_lists = []
+    for path in sorted(glob.glob(CORPUS_GLOB)):
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        for key in ('user_stories', 'tasks'):
+            if isinstance(data.get(key), list) and data[key]:
+                item_lists.append((os.path.basename(path), data[key]))
+    return item_lists
+
+
+def build_responses(items, size_kb):
+    """Wrap one item list in the response shapes seen from real models."""
+    body = json.dumps(items, indent=2)
+
+    # Pad the list up to the target size, as long 70B responses are
+    large_items = list(items)
+    while len(json.dumps(large_items, indent=2)) < size_kb * 1024:
+        large_items.extend(items)
+    large_body = json.dumps(large_items, indent=2)
+
+    trailing_commas = body.replace('\n  }', ',\n  }').replace('\n]', ',\n]')
+    truncated = large_body[:int(len(large_body) * 0.9)]
+
+    return {
+        'clean': (body, items),
+        'fenced_with_prose': (
+            f"Here are the items based on the feature [see context above]:\n\n```json\n{body}\n```\n\n"
+            "Each item follows the {title, description} format requested.", items
+        ),
+        'trailing_commas': (trailing_commas, items),
+        'large_fenced': (f"Sure! Below is the full list.\n```json\n{large_body}\n```", large_items),
+        'large_truncated': (truncated, None),
+    }
+
+
+def legacy_candidate_scan(response):
+    """Reference: try json.loads from every opening bracket (the old quadratic pattern)."""
+    for i, char in enumerate(response):
+        if char in '[{':
+            depth = 0
+            for j in range(i, len(response)):
+                if response[j] in '[{':
+                    depth += 1
+                elif response[j] in ']}':
+                    depth -= 1
+                    if depth == 0:
+                        try:
+                            return json.loads(response[i:j + 1])
+                        except ValueError:
+                            break
+    return None
+
+
+def time_call(func, response, iterations):
+    start = time.perf_counter()
+    result = None
+    for _ in range(iterations):
+        result = func(response)
+    return (time.perf_counter() - start) / iterations * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark JSON extraction on LLM responses")
+    parser.add_argument('--iterations', type=int, default=20)
+    parser.add_argument('--size-kb', type=int, default=48, help='Target size of the large responses')
+    args = parser.parse_args()
+
+    item_lists = load_corpus_items()
+    if not item_lists:
+        print("No corpus found in test_results/")
+        return 1
+
+    print("JSON Extraction Benchmark")
+    print("=" * 86)
+    print(f"{'source':<40} {'shape':<18} {'size':>8} {'scanner ms':>10} {'legacy ms':>9}  ok")
+    print("-" * 86)
+
+    failures = 0
+    totals = {'scanner': 0.0, 'legacy': 0.0}
+    for source, items in item_lists:
+        for shape, (response, expected) in build_responses(items, args.size_kb).items():
+            scanner_ms, value = time_call(JSONExtractor.parse_json_from_response, response, args.iterations)
+            legacy_ms, _ = time_call(legacy_candidate_scan, response, max(1, args.iterations // 4))
+            totals['scanner'] += scanner_ms
+            totals['legacy'] += legacy_ms
+
+            if expected is not None:
+                ok = value == expected
+            else:
+                # Truncated responses must still yield the complete leading items
+                ok = isinstance(value, list) and len(value) > 0
+            failures += 0 if ok else 1
+            print(f"{source[:40]:<40} {shape:<18} {len(response) // 1024:>6}KB {scanner_ms:>10.2f} "
+                  f"{legacy_ms:>9.2f}  {'yes' if ok else 'NO'}")
+
+    print("-" * 86)
+    print(f"Total scanner: {totals['scanner']:.1f}ms   legacy reference: {totals['legacy']:.1f}ms   failures: {failures}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,8 +3,12 @@
 Check Azure DevOps integration status for the latest job
 """
 
+import os
 import sqlite3
-import json
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.blob_codec import decode_json
 
 def check_azure_integration():
     """Check if Azure DevOps integration worked for the latest job."""
@@ -31,7 +35,7 @@ def check_azure_integration():
         
         if raw_summary:
             try:
-                summary = json.loads(raw_summary)
+                summary = decode_json(raw_summary)
                 print(f"\n📊 Job Summary:")
                 print(f"   Epics: {summary.get('epics_generated', 0)}")
                 print(f"   Features: {summary.get('features_generated', 0)}")
@@ -53,8 +57,8 @@ def check_azure_integration():
                 else:
                     print(f"\n❌ No Azure DevOps integration data found")
                     
-            except json.JSONDecodeError:
-                print(f"❌ Could not parse job summary JSON")
+            except ValueError:
+                print(f"❌ Could not decode job summary")
         else:
             print(f"❌ No raw summary data found")
         
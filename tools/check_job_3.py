@@ -1,5 +1,9 @@
+import os
 import sqlite3
-import json
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.blob_codec import decode_json
 
 conn = sqlite3.connect('backlog_jobs.db')
 cursor = conn.cursor()
@@ -7,7 +11,7 @@ cursor.execute('SELECT raw_summary FROM backlog_jobs WHERE id = 3')
 result = cursor.fetchone()
 
 if result and result[0]:
-    summary = json.loads(result[0])
+    summary = decode_json(result[0])
     print("Job 3 Details:")
     print(f"Project: {summary.get('project_name', 'Not found')}")
     print(f"Epics: {summary.get('epics_generated', 0)}")
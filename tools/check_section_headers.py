@@ -4,6 +4,7 @@ Script to check what section headers exist in Azure DevOps work items
 """
 
 import os
+import sys
 import re
 import requests
 import base64
@@ -11,6 +12,10 @@ import json
 from typing import List, Dict, Any, Set
 from dotenv import load_dotenv
 
+# Add project root to path for the shared work item reader
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from integrators.work_item_reader import iter_work_items
+
 # Load environment variables
 load_dotenv()
 
@@ -69,40 +74,19 @@ class SectionHeaderChecker:
             return []
     
     def get_work_item_details(self, work_item_ids: List[int]) -> List[Dict[str, Any]]:
-        """Get detailed information for work items in batches."""
+        """Get detailed information for work items (concurrent pages, retried, projected fields)."""
         if not work_item_ids:
             return []
         
-        all_work_items = []
-        batch_size = 200  # Azure DevOps API limit
-        
         print("🔄 Fetching work item details...")
         
-        for i in range(0, len(work_item_ids), batch_size):
-            batch_ids = work_item_ids[i:i + batch_size]
-            batch_number = (i // batch_size) + 1
-            
-            ids_param = ','.join(map(str, batch_ids))
-            
-            try:
-                response = requests.get(
-                    f"{self.base_url}/workitems?ids={ids_param}&fields=System.Id,System.Title,System.WorkItemType,System.Description&api-version=7.1",
-                    headers=self.headers
-                )
-                
-                response.raise_for_status()
-                data = response.json()
-                
-                work_items = data.get('value', [])
-                all_work_items.extend(work_items)
-                
-                print(f"📄 Fetched {len(work_items)} items (batch {batch_number})")
-                
-            except requests.exceptions.RequestException as e:
-                print(f"❌ Error fetching work items batch {batch_number}: {e}")
-                continue
+        all_work_items = list(iter_work_items(
+            requests.Session(), f"{self.base_url}/workitems", work_item_ids,
+            fields=["System.Id", "System.Title", "System.WorkItemType", "System.Description"],
+            headers=self.headers, api_version="7.1"
+        ))
         
-        print(f"📊 Total work items fetched: {len(all_work_items)}")
+        print(f"📄 Fetched {len(all_work_items)} work items")
         return all_work_items
     
     def find_section_headers(self, work_items: List[Dict[str, Any]]) -> Set[str]:
@@ -14,6 +14,10 @@ import json
 from typing import List, Dict, Any
 from dotenv import load_dotenv
 
+# Add project root to path for the shared work item reader
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from integrators.work_item_reader import iter_work_items
+
 # Set UTF-8 encoding for Windows console
 if sys.platform.startswith('win'):
     import codecs
@@ -94,29 +98,14 @@ class WorkItemDescriptionFixer:
             return []
     
     def get_work_item_details(self, work_item_ids: List[int]) -> List[Dict[str, Any]]:
-        """Get detailed information for work items in batches."""
+        """Get detailed information for work items (concurrent pages, retried, projected fields)."""
         print("📋 Fetching work item details...")
         
-        work_items = []
-        batch_size = 200  # Azure DevOps API limit
-        
-        for i in range(0, len(work_item_ids), batch_size):
-            batch_ids = work_item_ids[i:i + batch_size]
-            ids_param = ','.join(map(str, batch_ids))
-            
-            try:
-                response = requests.get(
-                    f"{self.base_url}/workitems?ids={ids_param}&fields=System.Id,System.Title,System.WorkItemType,System.Description&api-version=7.1",
-                    headers=self.headers
-                )
-                response.raise_for_status()
-                
-                batch_items = response.json().get('value', [])
-                work_items.extend(batch_items)
-                print(f"📥 Fetched {len(batch_items)} items (batch {i//batch_size + 1})")
-                
-            except requests.exceptions.RequestException as e:
-                print(f"❌ Failed to fetch batch starting at {i}: {e}")
+        work_items = list(iter_work_items(
+            requests.Session(), f"{self.base_url}/workitems", work_item_ids,
+            fields=["System.Id", "System.Title", "System.WorkItemType", "System.Description"],
+            headers=self.headers, api_version="7.1"
+        ))
         
         print(f"📊 Total work items fetched: {len(work_items)}")
         return work_items
@@ -17,6 +17,10 @@ import base64
 import json
 from typing import List, Dict, Any, Optional
 from dotenv import load_dotenv
+
+# Add project root to path for the shared work item reader
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from integrators.work_item_reader import iter_work_items
 from datetime import datetime
 
 # Set UTF-8 encoding for Windows console
@@ -119,9 +123,8 @@ class TestCaseReorganizer:
             return []
     
     def get_work_item_details(self, work_item_ids: List[int], fields: List[str] = None) -> List[Dict[str, Any]]:
-        """Get detailed information for work items in batches."""
+        """Get detailed information for work items (concurrent pages, retried, projected fields)."""
         if not work_item_ids:
-            log("No work item IDs provided to get_work_item_details.")
             return []
         
         # Default fields to retrieve
@@ -131,37 +134,12 @@ class TestCaseReorganizer:
                 "System.AreaPath", "System.State", "System.CreatedDate"
             ]
         
-        all_work_items = []
-        batch_size = 200  # Azure DevOps API limit
-        
-        log(f"Fetching work item details in batches of {batch_size}...")
+        log(f"Fetching details for {len(work_item_ids)} work items...")
         
-        for i in range(0, len(work_item_ids), batch_size):
-            batch_ids = work_item_ids[i:i + batch_size]
-            batch_number = (i // batch_size) + 1
-            
-            ids_param = ','.join(map(str, batch_ids))
-            fields_param = ','.join(fields)
-            
-            log(f"Fetching batch {batch_number}: IDs {ids_param}")
-            
-            try:
-                response = requests.get(
-                    f"{self.wit_url}/workitems?ids={ids_param}&fields={fields_param}&api-version=7.1",
-                    headers=self.headers
-                )
-                
-                response.raise_for_status()
-                data = response.json()
-                
-                work_items = data.get('value', [])
-                all_work_items.extend(work_items)
-                
-                log(f"Fetched {len(work_items)} work items in batch {batch_number}")
-                
-            except requests.exceptions.RequestException as e:
-                log(f"Error fetching work items batch {batch_number}: {e}")
-                continue
+        all_work_items = list(iter_work_items(
+            requests.Session(), f"{self.wit_url}/workitems", work_item_ids,
+            fields=fields, headers=self.headers, api_version="7.1"
+        ))
         
         log(f"Total work items fetched: {len(all_work_items)}")
         return all_work_items
@@ -17,6 +17,7 @@ from requests.auth import HTTPBasicAuth
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from config.config_loader import Config
+from integrators.work_item_reader import iter_work_items
 
 
 class WorkItemPathUpdater:
@@ -95,32 +96,16 @@ class WorkItemPathUpdater:
             raise
     
     def get_work_items_details(self, work_item_ids: List[str]) -> List[Dict[str, Any]]:
-        """Get detailed information for work items."""
+        """Get detailed information for work items (concurrent pages, retried, projected fields)."""
         if not work_item_ids:
             return []
         
-        # Azure DevOps limits batch requests to 200 items
-        batch_size = 200
-        all_work_items = []
-        
-        for i in range(0, len(work_item_ids), batch_size):
-            batch_ids = work_item_ids[i:i + batch_size]
-            ids_param = ','.join(batch_ids)
-            
-            url = f"{self.project_base_url}/wit/workitems?ids={ids_param}&fields=System.Id,System.Title,System.WorkItemType,System.AreaPath,System.IterationPath,System.State&api-version=7.0"
-            
-            try:
-                response = requests.get(url, auth=self.auth)
-                response.raise_for_status()
-                
-                result = response.json()
-                all_work_items.extend(result.get('value', []))
-                
-            except requests.exceptions.RequestException as e:
-                self.logger.error(f"Failed to get work item details for batch: {e}")
-                raise
-        
-        return all_work_items
+        return list(iter_work_items(
+            requests.Session(), f"{self.project_base_url}/wit/workitems", work_item_ids,
+            fields=["System.Id", "System.Title", "System.WorkItemType", "System.AreaPath",
+                    "System.IterationPath", "System.State"],
+            auth=self.auth
+        ))
     
     def update_work_item_paths(self, work_item_id: int, current_area: str, current_iteration: str) -> bool:
         """Update area and iteration paths for a work item."""
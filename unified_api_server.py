@@ -26,7 +26,7 @@ from typing import Dict, Any, List, Optional
 from contextlib import asynccontextmanager
 
 import uvicorn
-from fastapi import FastAPI, HTTPException, BackgroundTasks, Request, Query, Depends
+from fastapi import FastAPI, HTTPException, BackgroundTasks, Request, Query, Depends, WebSocket, WebSocketDisconnect
 from fastapi.responses import StreamingResponse
 import asyncio
 import json as json_module
@@ -40,8 +40,9 @@ from dataclasses import dataclass
 current_dir = os.path.dirname(os.path.abspath(__file__))
 sys.path.insert(0, current_dir)
 
+# The generation stack (supervisor, agents, ADO integrator, quality assessors)
+# is imported on first use by the job runners, not at startup.
 try:
-    from supervisor.supervisor import WorkflowSupervisor
     from config.config_loader import Config
     from utils.logger import setup_logger
     from utils.project_context import ProjectContext
@@ -49,6 +50,14 @@ try:
     from db import db
     from utils.settings_manager import SettingsManager
     from utils.user_id_resolver import user_id_resolver
+    from utils.llm_config_manager import invalidate_llm_config
+    from utils.async_boundary import EventLoopLagMonitor, configure_executors, run_db, run_io, shutdown_executors
+    from utils.json_streaming import (
+        NDJSON_MEDIA_TYPE, file_etag, iter_backlog_ndjson, iter_json, json_response, load_json_file,
+        not_modified, streaming_json_response
+    )
+    from utils.json_streaming import dumps as json_dumps
+    from utils.progress_channel import ProgressJournal
     from auth.auth_routes import router as auth_router, get_current_user
     from auth.user_auth import auth_manager, IS_PRODUCTION, User
 except ImportError as e:
@@ -125,6 +134,9 @@ def set_active_job(job_id: str, job_data: Dict[str, Any]):
     }
     broadcast_progress_update(job_id, progress_data)
     
+    # Sequence-numbered deltas for the WebSocket progress channel
+    progress_journal.publish(job_id, {key: job_data[key] for key in PROGRESS_CHANNEL_FIELDS if key in job_data})
+    
     # Throttled database persistence (fallback for polling)
     try:
         db.update_job_progress(
@@ -235,6 +247,23 @@ settings_manager = SettingsManager(config.settings)
 # Thread pool for CPU-intensive AI tasks
 ai_thread_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="AI_Worker")
 
+# Progress journal behind the WebSocket progress channel (/api/progress/ws)
+progress_channel_config = config.settings.get('progress_channel', {}) or {}
+PROGRESS_CHANNEL_FIELDS = ('status', 'progress', 'currentAction', 'currentAgent', 'error', 'artifactCounts', 'createdItemIds')
+progress_journal = ProgressJournal(
+    history_size=int(progress_channel_config.get('history_size', 256)),
+    max_jobs=int(progress_channel_config.get('max_jobs', 500))
+)
+
+# Bounded pools for blocking DB and I/O calls made by async handlers (see utils/async_boundary.py)
+async_boundary_config = config.settings.get('async_boundary', {}) or {}
+configure_executors(async_boundary_config.get('db_workers'), async_boundary_config.get('io_workers'))
+lag_monitor_config = async_boundary_config.get('lag_monitor', {}) or {}
+event_loop_monitor = EventLoopLagMonitor(
+    interval_seconds=float(lag_monitor_config.get('interval_ms', 100)) / 1000,
+    threshold_seconds=float(lag_monitor_config.get('threshold_ms', 100)) / 1000
+)
+
 # Disable FastAPI access logs completely
 uvicorn_access_logger = logging.getLogger("uvicorn.access")
 uvicorn_access_logger.setLevel(logging.ERROR)
@@ -250,6 +279,36 @@ async def distribute_sse_progress():
         except Exception:
             pass
 
+# Retention engine for completed jobs (created on first use)
+job_archive_config = config.settings.get('job_archive', {}) or {}
+_job_archive = None
+
+def get_job_archive():
+    """Get the job archive configured by the job_archive settings block."""
+    global _job_archive
+    if _job_archive is None:
+        from models.job_archive import JobArchive
+        _job_archive = JobArchive(
+            db_path=db.db_path,
+            staging_db_path=job_archive_config.get('staging_db_path', 'agile_backlog.db'),
+            archive_dir=job_archive_config.get('archive_dir', 'output/archive'),
+            output_dir=job_archive_config.get('output_dir', 'output'),
+            retention_days=int(job_archive_config.get('retention_days', 30)),
+            batch_size=int(job_archive_config.get('batch_size', 50))
+        )
+    return _job_archive
+
+async def run_job_archive():
+    """Archive completed jobs past the retention period, every interval_hours."""
+    interval_seconds = float(job_archive_config.get('interval_hours', 24)) * 3600
+    while True:
+        try:
+            # DB pool, not the AI pool: the run (and its VACUUM) must not hold a generation slot
+            await run_db(lambda: get_job_archive().run())
+        except Exception as e:
+            logger.error(f"Job archive run failed: {e}")
+        await asyncio.sleep(interval_seconds)
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Handle application lifespan events."""
@@ -267,6 +326,13 @@ async def lifespan(app: FastAPI):
 
     # Start SSE progress distribution task
     asyncio.create_task(distribute_sse_progress())
+    
+    if job_archive_config.get('enabled', False):
+        asyncio.create_task(run_job_archive())
+
+    lag_monitor_task = None
+    if lag_monitor_config.get('enabled', True):
+        lag_monitor_task = asyncio.create_task(event_loop_monitor.run())
 
     logger.info("Unified API Server started successfully")
     
@@ -278,9 +344,13 @@ async def lifespan(app: FastAPI):
     # Save active jobs to disk on shutdown
     # save_active_jobs() # Removed as per edit
 
+    if lag_monitor_task is not None:
+        lag_monitor_task.cancel()
+
     # Shutdown thread pool
     logger.info("Shutting down AI thread pool...")
     ai_thread_pool.shutdown(wait=True)
+    shutdown_executors(wait=True)
     logger.info("AI thread pool shutdown complete")
 
 # Initialize FastAPI app with lifespan
@@ -526,14 +596,19 @@ async def test_endpoint():
 @app.get("/api/health")
 async def health_check():
     """Health check endpoint."""
-    build_version = db.get_build_version()
+    build_version = await run_db(db.get_build_version)
     return {"status": "healthy", "timestamp": datetime.now().isoformat(), "version": "2.1.0", "build": build_version}
 
+@app.get("/api/health/event-loop")
+async def event_loop_health(top: int = Query(10, ge=1, le=50)):
+    """Event loop lag statistics and the callsites that blocked the loop most often."""
+    return {"success": True, "data": event_loop_monitor.snapshot(top)}
+
 @app.get("/api/build-version")
 async def get_build_version():
     """Get current build version from database."""
     try:
-        build_version = db.get_build_version()
+        build_version = await run_db(db.get_build_version)
         return {"build_version": build_version, "timestamp": datetime.now().isoformat()}
     except Exception as e:
         logger.error(f"Failed to get build version: {e}")
@@ -1004,9 +1079,9 @@ async def get_optimized_visions(
     """Get user's optimized visions."""
     try:
         from db import Database
-        db = Database()
+        db = await run_db(Database)
         
-        visions = db.get_optimized_visions(current_user.id, limit)
+        visions = await run_db(db.get_optimized_visions, current_user.id, limit)
         
         return {
             "success": True,
@@ -1025,9 +1100,9 @@ async def get_optimized_vision(
     """Get a specific optimized vision."""
     try:
         from db import Database
-        db = Database()
+        db = await run_db(Database)
         
-        vision = db.get_optimized_vision_by_id(vision_id)
+        vision = await run_db(db.get_optimized_vision_by_id, vision_id)
         
         if not vision:
             raise HTTPException(status_code=404, detail="Optimized vision not found")
@@ -1037,7 +1112,7 @@ async def get_optimized_vision(
             raise HTTPException(status_code=403, detail="Access denied")
         
         # Get associated backlogs
-        backlogs = db.get_backlogs_from_optimized_vision(vision_id)
+        backlogs = await run_db(db.get_backlogs_from_optimized_vision, vision_id)
         vision['backlogs'] = backlogs
         
         return {
@@ -1174,29 +1249,70 @@ async def generate_test_artifacts(project_id: str, background_tasks: BackgroundT
         logger.error(f"❌ {error_msg}")
         raise HTTPException(status_code=500, detail=error_msg)
 
+def _archived_backlog_etag(entry: Dict[str, Any]) -> str:
+    """ETag of an archived backlog copy (archived_output_files row and source modification time)."""
+    return f'"archive-{entry["id"]}-{int((entry["modified_at"] or 0) * 1000)}"'
+
+def _backlog_format_etag(etag: str, format: str) -> str:
+    """ETag of a backlog representation; NDJSON responses get their own tag."""
+    return etag[:-1] + '-ndjson"' if format == "ndjson" else etag
+
 @app.get("/api/projects/{project_id}/backlog")
-async def get_project_backlog(project_id: str):
-    """Get generated backlog for a project."""
+async def get_project_backlog(
+    project_id: str,
+    request: Request,
+    format: str = Query("json", pattern="^(json|ndjson)$", description="json: one document; ndjson: one record per work item")
+):
+    """
+    Get generated backlog for a project.
+
+    The backlog is streamed item by item (as one JSON document or as NDJSON
+    records), compressed as negotiated by Accept-Encoding, and tagged with an
+    ETag so unchanged backlogs are answered with 304.
+    """
     # Look for the most recent backlog file for this project
     output_dir = Path("output")
     backlog_files = list(output_dir.glob(f"backlog_*_{project_id}.json"))
     
-    if not backlog_files:
-        # Look for any recent backlog file as fallback
-        backlog_files = list(output_dir.glob("backlog_*.json"))
-        if not backlog_files:
-            raise HTTPException(status_code=404, detail="No backlog found for project")
+    if backlog_files:
+        latest_backlog = max(backlog_files, key=lambda x: x.stat().st_mtime)
+        etag = file_etag(latest_backlog)
+        backlog_data = None
+    else:
+        # Backlogs of archived jobs are read back from the job archive. An archived
+        # copy never changes, so its archive row identifies the content.
+        job_archive = await run_db(get_job_archive)
+        archived = await run_db(job_archive.find_archived_backlogs, project_id)
+        backlog_data = None
+        if archived:
+            cached = not_modified(request, _backlog_format_etag(_archived_backlog_etag(archived[0]), format))
+            if cached is not None:
+                return cached
+        for entry in archived:
+            backlog_data = await run_io(job_archive.read_archived_backlog, entry)
+            if backlog_data is not None:
+                etag = _archived_backlog_etag(entry)
+                break
+        
+        if backlog_data is None:
+            # Look for any recent backlog file as fallback
+            backlog_files = list(output_dir.glob("backlog_*.json"))
+            if not backlog_files:
+                raise HTTPException(status_code=404, detail="No backlog found for project")
+            latest_backlog = max(backlog_files, key=lambda x: x.stat().st_mtime)
+            etag = file_etag(latest_backlog)
     
-    # Get the most recent file
-    latest_backlog = max(backlog_files, key=lambda x: x.stat().st_mtime)
+    etag = _backlog_format_etag(etag, format)
+    cached = not_modified(request, etag)
+    if cached is not None:
+        return cached
     
-    with open(latest_backlog, 'r') as f:
-        backlog_data = json.load(f)
+    if backlog_data is None:
+        backlog_data = await run_io(load_json_file, latest_backlog)
     
-    return {
-        "success": True,
-        "data": backlog_data
-    }
+    if format == "ndjson":
+        return streaming_json_response(request, iter_backlog_ndjson(backlog_data), etag, NDJSON_MEDIA_TYPE)
+    return streaming_json_response(request, iter_json({"success": True, "data": backlog_data}), etag)
 
 # Azure DevOps and AI Validation Endpoints
 @app.post("/api/validate-azure")
@@ -1422,6 +1538,7 @@ def run_backlog_generation_sync(job_id: str, project_info: Dict[str, Any]):
     
     try:
         logger.info(f"Starting backlog generation for job {job_id}")
+        from supervisor.supervisor import WorkflowSupervisor
         
         # Update job status to running (job is already initialized)
         set_active_job(job_id, {"status": "running", "currentAction": "Starting workflow execution..."})
@@ -1606,12 +1723,14 @@ def run_backlog_generation_sync(job_id: str, project_info: Dict[str, Any]):
             try:
                 # Merge with existing job data to preserve metadata
                 current_job_data = get_active_job(job_id) or {}
+                workflow_metrics = supervisor.workflow_monitor.get_dashboard_data(supervisor.current_workflow_id) if supervisor.current_workflow_id else {}
                 set_active_job(job_id, {
                     **current_job_data,
                     "progress": progress,
                     "currentAction": action,
                     "currentAgent": action.split()[0] if action else "Supervisor",
-                    "status": "running"
+                    "status": "running",
+                    "artifactCounts": workflow_metrics.get('artifacts_created') or current_job_data.get('artifactCounts', {})
                 })
                 logger.info(f"📊 Progress update for job {job_id}: {progress}% - {action}")
             except Exception as e:
@@ -1741,7 +1860,12 @@ Domain: {project_domain}
                         logger.error(f"   Azure integration error: {azure_result['error']}")
 
             # Update job status
-            set_active_job(job_id, {"status": "completed", "progress": 100, "currentAction": "Completed", "endTime": datetime.now()})
+            created_items = (results.get('azure_integration') or {}).get('work_items_created') if isinstance(results, dict) else None
+            set_active_job(job_id, {
+                "status": "completed", "progress": 100, "currentAction": "Completed", "endTime": datetime.now(),
+                "createdItemIds": [item['id'] for item in created_items if isinstance(item, dict) and item.get('id')]
+                                  if isinstance(created_items, list) else []
+            })
 
             return {"job_id": job_id, "status": "completed", "results": results}
 
@@ -1911,6 +2035,108 @@ async def update_test_job(job_id: str, progress: int = 50):
         logger.error(f"Failed to update test job: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.websocket("/api/progress/ws")
+async def progress_websocket(websocket: WebSocket, token: Optional[str] = None):
+    """
+    Progress of many jobs on one socket, as sequence-numbered deltas.
+
+    Authenticate with ?token=<access token>, then send
+    {"action": "subscribe", "jobs": {"<job_id>": <last seq applied, or 0>}} or
+    {"action": "unsubscribe", "jobs": ["<job_id>"]}. For each subscribed job
+    the server sends the missed deltas (or a snapshot), then every new delta
+    (see utils/progress_channel.py), followed by {"type": "subscribed"} once
+    the job is caught up. If the client falls too far behind, the socket is
+    closed with code 1013 and the client resubscribes with its last sequence.
+    """
+    payload = await run_db(auth_manager.verify_token, token) if token else None
+    user = await run_db(auth_manager.get_user_by_id, payload.get("user_id")) if payload else None
+    if user is None:
+        await websocket.close(code=1008)
+        return
+    await websocket.accept()
+    
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue(maxsize=int(progress_channel_config.get('queue_size', 1000)))
+    last_sent: Dict[str, int] = {}  # job_id -> sequence the client is at
+    overflowed = asyncio.Event()
+    
+    def enqueue(event: Dict[str, Any]):
+        try:
+            queue.put_nowait(event)
+        except asyncio.QueueFull:
+            overflowed.set()
+    
+    def on_delta(event: Dict[str, Any]):
+        # Called from the thread that published the delta
+        if event['jobId'] in last_sent:
+            loop.call_soon_threadsafe(enqueue, event)
+    
+    async def send_event(event: Dict[str, Any]):
+        await websocket.send_text(json_dumps(event).decode('utf-8'))
+        last_sent[event['jobId']] = event['seq']
+    
+    async def send_error(message: str, job_id: Optional[str] = None):
+        error = {'type': 'error', 'jobId': job_id, 'message': message} if job_id else {'type': 'error', 'message': message}
+        await websocket.send_text(json_dumps(error).decode('utf-8'))
+    
+    async def receive_commands():
+        while True:
+            message = await websocket.receive_json()
+            if not isinstance(message, dict):
+                await send_error("Commands must be JSON objects")
+                continue
+            action = message.get("action")
+            jobs = message.get("jobs") or {}
+            if action == "subscribe" and isinstance(jobs, dict):
+                for job_id, after_seq in jobs.items():
+                    # A malformed sequence is reported to the client instead of ending the socket
+                    after_seq = 0 if after_seq is None else after_seq
+                    if not isinstance(after_seq, int) or isinstance(after_seq, bool) or after_seq < 0:
+                        await send_error(f"Invalid sequence for job: {after_seq!r}", job_id)
+                        continue
+                    job_data = get_active_job(job_id)
+                    if job_data and 'userId' in job_data and job_data.get('userId') != str(user.id):
+                        await send_error("You don't have access to this job", job_id)
+                        continue
+                    last_sent[job_id] = after_seq
+                    enqueue({'type': 'sync', 'jobId': job_id})
+            elif action == "unsubscribe" and isinstance(jobs, (dict, list)):
+                for job_id in jobs:
+                    if isinstance(job_id, str):
+                        last_sent.pop(job_id, None)
+            else:
+                await send_error(f"Unknown action: {action}")
+    
+    async def send_events():
+        while not overflowed.is_set():
+            event = await queue.get()
+            job_id = event['jobId']
+            if job_id not in last_sent:
+                continue  # Unsubscribed
+            if event['type'] == 'delta' and event['seq'] <= last_sent[job_id]:
+                continue  # Already covered by a snapshot or earlier delta
+            if event['type'] == 'delta' and event['seq'] == last_sent[job_id] + 1:
+                await send_event(event)
+                continue
+            # Subscription or gap: catch up from the journal
+            for missed in progress_journal.resume(job_id, last_sent[job_id]):
+                await send_event(missed)
+            if event['type'] == 'sync':
+                await websocket.send_text(json_dumps({'type': 'subscribed', 'jobId': job_id, 'seq': last_sent[job_id]}).decode('utf-8'))
+        await websocket.close(code=1013)
+    
+    progress_journal.add_listener(on_delta)
+    tasks = [asyncio.create_task(receive_commands()), asyncio.create_task(send_events())]
+    try:
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            if task.exception() and not isinstance(task.exception(), WebSocketDisconnect):
+                logger.warning(f"Progress WebSocket closed with error: {task.exception()}")
+    finally:
+        progress_journal.remove_listener(on_delta)
+        for task in tasks:
+            task.cancel()
+
 @app.get("/api/progress/stream/{job_id}")
 async def stream_progress(job_id: str, request: Request, current_user: User = Depends(get_current_user)):
     """Stream progress updates for a specific job using Server-Sent Events."""
@@ -2035,7 +2261,7 @@ async def get_user_settings(session_id: str = None, current_user: User = Depends
     user_id = str(current_user.id)
     
     try:
-        settings = settings_manager.get_all_settings(user_id, session_id)
+        settings = await run_db(settings_manager.get_all_settings, user_id, session_id)
         return {
             "success": True,
             "data": settings
@@ -2050,8 +2276,8 @@ async def save_user_settings(request: SettingsRequest, current_user: User = Depe
     user_id = str(current_user.id)
     
     try:
-        success = settings_manager.save_all_settings(
-            user_id, request.settings, request.scope, request.session_id
+        success = await run_db(
+            settings_manager.save_all_settings, user_id, request.settings, request.scope, request.session_id
         )
         
         if success:
@@ -2072,7 +2298,7 @@ async def get_work_item_limits(session_id: str = None, current_user: User = Depe
     user_id = str(current_user.id)
     
     try:
-        limits_with_flags = settings_manager.get_work_item_limits_with_flags(user_id, session_id)
+        limits_with_flags = await run_db(settings_manager.get_work_item_limits_with_flags, user_id, session_id)
         return {
             "success": True,
             "data": limits_with_flags
@@ -2098,8 +2324,8 @@ async def save_work_item_limits(request: WorkItemLimitsRequest, current_user: Us
         # Determine if this is a custom user default
         is_user_default = getattr(request, 'is_user_default', request.scope == 'user_default')
         
-        success = settings_manager.save_work_item_limits(
-            user_id, limits, request.scope, request.session_id, is_user_default
+        success = await run_db(
+            settings_manager.save_work_item_limits, user_id, limits, request.scope, request.session_id, is_user_default
         )
         
         if success:
@@ -2121,7 +2347,7 @@ async def delete_work_item_limits(scope: str = Query('user_default'), current_us
     user_id = str(current_user.id)
     
     try:
-        success = db.delete_user_settings(user_id, 'work_item_limits', scope)
+        success = await run_db(db.delete_user_settings, user_id, 'work_item_limits', scope)
         
         if success:
             return {
@@ -2141,7 +2367,7 @@ async def get_visual_settings(session_id: str = None, current_user: User = Depen
     user_id = str(current_user.id)
     
     try:
-        settings = settings_manager.get_visual_settings(user_id, session_id)
+        settings = await run_db(settings_manager.get_visual_settings, user_id, session_id)
         return {
             "success": True,
             "data": {
@@ -2162,8 +2388,8 @@ async def save_visual_settings(request: VisualSettingsRequest, current_user: Use
             'glow_intensity': request.glow_intensity
         }
         
-        success = settings_manager.save_visual_settings(
-            user_id, settings, request.scope, request.session_id
+        success = await run_db(
+            settings_manager.save_visual_settings, user_id, settings, request.scope, request.session_id
         )
         
         if success:
@@ -2184,7 +2410,7 @@ async def delete_session_settings(request: SessionDeleteRequest, current_user: U
     user_id = str(current_user.id)
     
     try:
-        success = settings_manager.delete_session_settings(request.session_id)
+        success = await run_db(settings_manager.delete_session_settings, request.session_id)
         
         if success:
             return {
@@ -2204,7 +2430,7 @@ async def get_setting_history(setting_type: str = None, current_user: User = Dep
     user_id = str(current_user.id)
     
     try:
-        history = settings_manager.get_setting_history(user_id, setting_type)
+        history = await run_db(settings_manager.get_setting_history, user_id, setting_type)
         return {
             "success": True,
             "data": history
@@ -2221,98 +2447,103 @@ async def get_llm_configurations(current_user: User = Depends(get_current_user))
     
     try:
         import sqlite3
-        # Set a timeout to handle database locks
-        conn = sqlite3.connect('backlog_jobs.db', timeout=10.0)
-        conn.execute("PRAGMA journal_mode=WAL")  # Use Write-Ahead Logging for better concurrency
-        cursor = conn.cursor()
-        
-        # First, try to get the user's configuration mode preference from user_settings
-        configuration_mode = 'global'  # Default
-        
-        # Check user_settings first
-        cursor.execute('''
-            SELECT setting_value 
-            FROM user_settings 
-            WHERE user_id = ? AND setting_type = 'llm_config' AND setting_key = 'configuration_mode'
-            AND (scope = 'user_default' OR scope = 'session')
-            ORDER BY CASE 
-                WHEN scope = 'user_default' THEN 1 
-                WHEN scope = 'session' THEN 2 
-                ELSE 3 
-            END, updated_at DESC
-            LIMIT 1
-        ''', (user_id,))
-        
-        settings_row = cursor.fetchone()
-        if settings_row:
-            configuration_mode = settings_row[0]
-            logger.info(f"GET /api/llm-configurations/{user_id} - Found configuration_mode from user_settings: {configuration_mode}")
-        else:
-            # Fallback to checking llm_configurations
+        
+        def read_configurations():
+            # Set a timeout to handle database locks
+            conn = sqlite3.connect('backlog_jobs.db', timeout=10.0)
+            conn.execute("PRAGMA journal_mode=WAL")  # Use Write-Ahead Logging for better concurrency
+            cursor = conn.cursor()
+        
+            # First, try to get the user's configuration mode preference from user_settings
+            configuration_mode = 'global'  # Default
+        
+            # Check user_settings first
+            cursor.execute('''
+                SELECT setting_value 
+                FROM user_settings 
+                WHERE user_id = ? AND setting_type = 'llm_config' AND setting_key = 'configuration_mode'
+                AND (scope = 'user_default' OR scope = 'session')
+                ORDER BY CASE 
+                    WHEN scope = 'user_default' THEN 1 
+                    WHEN scope = 'session' THEN 2 
+                    ELSE 3 
+                END, updated_at DESC
+                LIMIT 1
+            ''', (user_id,))
+        
+            settings_row = cursor.fetchone()
+            if settings_row:
+                configuration_mode = settings_row[0]
+                logger.info(f"GET /api/llm-configurations/{user_id} - Found configuration_mode from user_settings: {configuration_mode}")
+            else:
+                # Fallback to checking llm_configurations
+                try:
+                    cursor.execute('''
+                        SELECT configuration_mode 
+                        FROM llm_configurations 
+                        WHERE user_id = ? AND is_active = 1
+                        ORDER BY updated_at DESC
+                        LIMIT 1
+                    ''', (user_id,))
+                
+                    mode_row = cursor.fetchone()
+                    if mode_row and mode_row[0]:
+                        configuration_mode = mode_row[0]
+                        logger.info(f"GET /api/llm-configurations/{user_id} - Found configuration_mode from llm_configurations: {configuration_mode}")
+                except sqlite3.OperationalError:
+                    # Column doesn't exist in older schema
+                    pass
+        
+            # Get all active configurations for the user
+            # Try with new columns first, fall back to old schema if needed
             try:
                 cursor.execute('''
-                    SELECT configuration_mode 
+                    SELECT agent_name, provider, model, preset, is_active, configuration_mode
                     FROM llm_configurations 
                     WHERE user_id = ? AND is_active = 1
-                    ORDER BY updated_at DESC
-                    LIMIT 1
+                    ORDER BY updated_at DESC, agent_name
                 ''', (user_id,))
-                
-                mode_row = cursor.fetchone()
-                if mode_row and mode_row[0]:
-                    configuration_mode = mode_row[0]
-                    logger.info(f"GET /api/llm-configurations/{user_id} - Found configuration_mode from llm_configurations: {configuration_mode}")
-            except sqlite3.OperationalError:
-                # Column doesn't exist in older schema
-                pass
-        
-        # Get all active configurations for the user
-        # Try with new columns first, fall back to old schema if needed
-        try:
-            cursor.execute('''
-                SELECT agent_name, provider, model, preset, is_active, configuration_mode
-                FROM llm_configurations 
-                WHERE user_id = ? AND is_active = 1
-                ORDER BY updated_at DESC, agent_name
-            ''', (user_id,))
             
-            configs = []
+                configs = []
             
-            for row in cursor.fetchall():
-                configs.append({
-                    'agent_name': row[0],
-                    'provider': row[1],
-                    'model': row[2],
-                    'preset': row[3],
-                    'is_active': row[4],
-                    'configuration_mode': configuration_mode  # Use the mode from user_settings, not the row
-                })
-        except sqlite3.OperationalError:
-            # Fallback for older schema without agent_name column
-            cursor.execute('''
-                SELECT name, provider, model, preset, is_active
-                FROM llm_configurations 
-                WHERE user_id = ? AND is_active = 1
-                ORDER BY updated_at DESC, name
-            ''', (user_id,))
+                for row in cursor.fetchall():
+                    configs.append({
+                        'agent_name': row[0],
+                        'provider': row[1],
+                        'model': row[2],
+                        'preset': row[3],
+                        'is_active': row[4],
+                        'configuration_mode': configuration_mode  # Use the mode from user_settings, not the row
+                    })
+            except sqlite3.OperationalError:
+                # Fallback for older schema without agent_name column
+                cursor.execute('''
+                    SELECT name, provider, model, preset, is_active
+                    FROM llm_configurations 
+                    WHERE user_id = ? AND is_active = 1
+                    ORDER BY updated_at DESC, name
+                ''', (user_id,))
             
-            configs = []
+                configs = []
             
-            for row in cursor.fetchall():
-                # Extract agent name from the name field
-                name_parts = row[0].split('_')
-                agent_name = name_parts[0] if name_parts else 'global'
+                for row in cursor.fetchall():
+                    # Extract agent name from the name field
+                    name_parts = row[0].split('_')
+                    agent_name = name_parts[0] if name_parts else 'global'
                 
-                configs.append({
-                    'agent_name': agent_name,
-                    'provider': row[1],
-                    'model': row[2],
-                    'preset': row[3],
-                    'is_active': row[4],
-                    'configuration_mode': configuration_mode
-                })
+                    configs.append({
+                        'agent_name': agent_name,
+                        'provider': row[1],
+                        'model': row[2],
+                        'preset': row[3],
+                        'is_active': row[4],
+                        'configuration_mode': configuration_mode
+                    })
+        
+            conn.close()
+            return configs, configuration_mode, settings_row is not None
         
-        conn.close()
+        configs, configuration_mode, mode_from_settings = await run_db(read_configurations)
         
         response = {
             "success": True,
@@ -2320,7 +2551,7 @@ async def get_llm_configurations(current_user: User = Depends(get_current_user))
             "configuration_mode": configuration_mode
         }
         logger.info(f"GET /api/llm-configurations/{user_id} - Returning {len(configs)} configs with mode: {configuration_mode}")
-        logger.debug(f"Configuration mode source: {'user_settings' if settings_row else 'llm_configurations fallback'}")
+        logger.debug(f"Configuration mode source: {'user_settings' if mode_from_settings else 'llm_configurations fallback'}")
         
         return response
     except Exception as e:
@@ -2342,64 +2573,70 @@ async def save_llm_configurations(configurations: List[AgentLLMConfigRequest], c
     
     try:
         import sqlite3
-        # Set a timeout to handle database locks
-        conn = sqlite3.connect('backlog_jobs.db', timeout=10.0)
-        conn.execute("PRAGMA journal_mode=WAL")  # Use Write-Ahead Logging for better concurrency
-        cursor = conn.cursor()
-        
-        # First, deactivate all existing configurations for this user
-        cursor.execute('''
-            UPDATE llm_configurations 
-            SET is_active = 0, updated_at = CURRENT_TIMESTAMP
-            WHERE user_id = ?
-        ''', (user_id,))
-        
-        # Get the configuration mode from the first config (they should all be the same)
-        configuration_mode = configurations[0].configuration_mode if configurations else 'global'
-        
-        # Insert new configurations
-        for config in configurations:
-            # Use custom_model if provided, otherwise use the regular model
-            model_to_save = config.custom_model if config.custom_model else config.model
+        
+        def write_configurations():
+            # Set a timeout to handle database locks
+            conn = sqlite3.connect('backlog_jobs.db', timeout=10.0)
+            conn.execute("PRAGMA journal_mode=WAL")  # Use Write-Ahead Logging for better concurrency
+            cursor = conn.cursor()
+        
+            # First, deactivate all existing configurations for this user
+            cursor.execute('''
+                UPDATE llm_configurations 
+                SET is_active = 0, updated_at = CURRENT_TIMESTAMP
+                WHERE user_id = ?
+            ''', (user_id,))
+        
+            # Get the configuration mode from the first config (they should all be the same)
+            configuration_mode = configurations[0].configuration_mode if configurations else 'global'
+        
+            # Insert new configurations
+            for config in configurations:
+                # Use custom_model if provided, otherwise use the regular model
+                model_to_save = config.custom_model if config.custom_model else config.model
             
-            # Generate a name for this configuration
-            config_name = f"{config.agent_name}_{config.provider}_{user_id}"
+                # Generate a name for this configuration
+                config_name = f"{config.agent_name}_{config.provider}_{user_id}"
             
-            # Use INSERT OR REPLACE to handle existing configurations
+                # Use INSERT OR REPLACE to handle existing configurations
+                cursor.execute('''
+                    INSERT OR REPLACE INTO llm_configurations 
+                    (user_id, name, agent_name, provider, model, preset, is_active, configuration_mode, api_key, base_url, created_at, updated_at)
+                    VALUES (?, ?, ?, ?, ?, ?, 1, ?, '', '', 
+                        COALESCE((SELECT created_at FROM llm_configurations WHERE user_id = ? AND name = ?), CURRENT_TIMESTAMP),
+                        CURRENT_TIMESTAMP)
+                ''', (user_id, config_name, config.agent_name, config.provider, model_to_save, config.preset, configuration_mode,
+                      user_id, config_name))
+        
+            # Also save the configuration mode to user_settings
             cursor.execute('''
-                INSERT OR REPLACE INTO llm_configurations 
-                (user_id, name, agent_name, provider, model, preset, is_active, configuration_mode, api_key, base_url, created_at, updated_at)
-                VALUES (?, ?, ?, ?, ?, ?, 1, ?, '', '', 
-                    COALESCE((SELECT created_at FROM llm_configurations WHERE user_id = ? AND name = ?), CURRENT_TIMESTAMP),
+                INSERT OR REPLACE INTO user_settings 
+                (user_id, setting_type, setting_key, setting_value, scope, is_user_default, created_at, updated_at)
+                VALUES (?, 'llm_config', 'configuration_mode', ?, 'user_default', 1, 
+                    COALESCE((SELECT created_at FROM user_settings 
+                              WHERE user_id = ? AND setting_type = 'llm_config' AND setting_key = 'configuration_mode' 
+                              AND scope = 'user_default'), CURRENT_TIMESTAMP),
                     CURRENT_TIMESTAMP)
-            ''', (user_id, config_name, config.agent_name, config.provider, model_to_save, config.preset, configuration_mode,
-                  user_id, config_name))
-        
-        # Also save the configuration mode to user_settings
-        cursor.execute('''
-            INSERT OR REPLACE INTO user_settings 
-            (user_id, setting_type, setting_key, setting_value, scope, is_user_default, created_at, updated_at)
-            VALUES (?, 'llm_config', 'configuration_mode', ?, 'user_default', 1, 
-                COALESCE((SELECT created_at FROM user_settings 
-                          WHERE user_id = ? AND setting_type = 'llm_config' AND setting_key = 'configuration_mode' 
-                          AND scope = 'user_default'), CURRENT_TIMESTAMP),
-                CURRENT_TIMESTAMP)
-        ''', (user_id, configuration_mode, user_id))
-        
-        conn.commit()
-        
-        logger.info(f"Saved {len(configurations)} LLM configurations for user {user_id} with mode: {configuration_mode}")
-        
-        # Verify what was saved
-        cursor.execute('''
-            SELECT agent_name, configuration_mode, is_active 
-            FROM llm_configurations 
-            WHERE user_id = ? AND is_active = 1
-        ''', (user_id,))
-        saved_configs = cursor.fetchall()
-        logger.info(f"Verification - Active configs after save: {saved_configs}")
-        
-        conn.close()
+            ''', (user_id, configuration_mode, user_id))
+        
+            conn.commit()
+            invalidate_llm_config(user_id)
+        
+            logger.info(f"Saved {len(configurations)} LLM configurations for user {user_id} with mode: {configuration_mode}")
+        
+            # Verify what was saved
+            cursor.execute('''
+                SELECT agent_name, configuration_mode, is_active 
+                FROM llm_configurations 
+                WHERE user_id = ? AND is_active = 1
+            ''', (user_id,))
+            saved_configs = cursor.fetchall()
+            logger.info(f"Verification - Active configs after save: {saved_configs}")
+        
+            conn.close()
+            return configuration_mode
+        
+        configuration_mode = await run_db(write_configurations)
         
         return {
             "success": True,
@@ -2440,7 +2677,8 @@ async def get_ollama_models():
         if not os.path.exists(ollama_path):
             return {"models": [], "error": f"Ollama not found at {ollama_path}"}
         
-        result = subprocess.run(
+        result = await run_io(
+            subprocess.run,
             [ollama_path, "list"],
             capture_output=True,
             text=True,
@@ -2499,7 +2737,7 @@ async def get_llm_configurations(current_user: User = Depends(get_current_user))
     try:
         user_id = str(current_user.id)
         
-        configurations = db.get_llm_configurations(user_id)
+        configurations = await run_db(db.get_llm_configurations, user_id)
         return {"configurations": configurations}
     except Exception as e:
         logger.error(f"Failed to get LLM configurations: {e}")
@@ -2511,7 +2749,7 @@ async def get_active_llm_configuration(current_user: User = Depends(get_current_
     try:
         user_id = str(current_user.id)
         
-        configuration = db.get_active_llm_configuration(user_id)
+        configuration = await run_db(db.get_active_llm_configuration, user_id)
         if not configuration:
             # Return default configuration from environment
             env_config = load_env_config()
@@ -2536,7 +2774,8 @@ async def save_llm_configuration(config: LLMConfigurationRequest, current_user:
     try:
         user_id = str(current_user.id)
         
-        success = db.save_llm_configuration(
+        success = await run_db(
+            db.save_llm_configuration,
             user_id=user_id,
             name=config.name,
             provider=config.provider,
@@ -2549,6 +2788,7 @@ async def save_llm_configuration(config: LLMConfigurationRequest, current_user:
         )
         
         if success:
+            invalidate_llm_config(user_id)
             return {"message": "LLM configuration saved successfully"}
         else:
             raise HTTPException(status_code=500, detail="Failed to save LLM configuration")
@@ -2562,8 +2802,9 @@ async def activate_llm_configuration(name: str, current_user: User = Depends(get
     try:
         user_id = str(current_user.id)
         
-        success = db.set_active_llm_configuration(user_id, name)
+        success = await run_db(db.set_active_llm_configuration, user_id, name)
         if success:
+            invalidate_llm_config(user_id)
             return {"message": f"LLM configuration '{name}' activated successfully"}
         else:
             raise HTTPException(status_code=500, detail="Failed to activate LLM configuration")
@@ -2577,8 +2818,9 @@ async def delete_llm_configuration(name: str, current_user: User = Depends(get_c
     try:
         user_id = str(current_user.id)
         
-        success = db.delete_llm_configuration(user_id, name)
+        success = await run_db(db.delete_llm_configuration, user_id, name)
         if success:
+            invalidate_llm_config(user_id)
             return {"message": f"LLM configuration '{name}' deleted successfully"}
         else:
             raise HTTPException(status_code=500, detail="Failed to delete LLM configuration")
@@ -2592,8 +2834,9 @@ async def initialize_default_llm_configurations(current_user: User = Depends(get
     try:
         user_id = str(current_user.id)
         
-        success = db.create_default_llm_configurations(user_id)
+        success = await run_db(db.create_default_llm_configurations, user_id)
         if success:
+            invalidate_llm_config(user_id)
             return {"message": "Default LLM configurations created successfully"}
         else:
             raise HTTPException(status_code=500, detail="Failed to create default LLM configurations")
@@ -2604,22 +2847,33 @@ async def initialize_default_llm_configurations(current_user: User = Depends(get
 # Backlog Jobs Management Endpoints
 @app.get("/api/backlog/jobs")
 async def get_backlog_jobs(
+    request: Request,
     user_email: str,
     exclude_test_generated: bool = True,
     exclude_failed: bool = True,
-    exclude_deleted: bool = True
+    exclude_deleted: bool = True,
+    limit: int = Query(6, ge=1, le=100, description="Number of jobs to return"),
+    cursor: Optional[str] = Query(None, description="Keyset cursor of the last job of the previous page")
 ):
     """Get backlog jobs for a user."""
     try:
-        # Call the database method with limit of 6 for recent projects
-        jobs = db.get_backlog_jobs(
+        from db import decode_job_cursor
+        before = decode_job_cursor(cursor) if cursor else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    try:
+        # Default limit of 6 for recent projects
+        jobs = await run_db(
+            db.get_backlog_jobs,
             user_email=user_email, 
             exclude_test_generated=exclude_test_generated, 
             exclude_failed=exclude_failed, 
             exclude_deleted=exclude_deleted,
-            limit=6
+            limit=limit,
+            before=before
         )
-        return jobs
+        return json_response(request, jobs)
     except Exception as e:
         logger.error(f"Failed to get backlog jobs: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to get backlog jobs: {str(e)}")
@@ -2628,7 +2882,7 @@ async def get_backlog_jobs(
 async def delete_backlog_job(job_id: int):
     """Delete a backlog job."""
     try:
-        success = db.delete_backlog_job(job_id)
+        success = await run_db(db.delete_backlog_job, job_id)
         if success:
             return {"status": "success", "message": f"Job {job_id} deleted successfully"}
         else:
@@ -2643,20 +2897,10 @@ async def get_domains():
     """Get all available domains."""
     logger.info("Domains API endpoint called")
     try:
-        # Direct database query
-        import sqlite3
-        db_path = "backlog_jobs.db"
-        with sqlite3.connect(db_path) as conn:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            cursor.execute('''
-                SELECT id, domain_key, display_name, description, is_active
-                FROM domains 
-                WHERE is_active = 1 
-                ORDER BY display_name
-            ''')
-            domains = [dict(row) for row in cursor.fetchall()]
-            
+        # Served from the in-memory domain knowledge store (reloaded when the domain tables change)
+        from db import domain_knowledge
+        domains = await run_db(domain_knowledge.get_domains)
+        
         logger.info(f"Successfully retrieved {len(domains)} domains from database")
         return domains
     except Exception as e:
@@ -2744,7 +2988,7 @@ async def check_vision_quality(request: dict, current_user: User = Depends(get_c
 async def get_optimized_visions(current_user: User = Depends(get_current_user)):
     """Get all optimized visions for the authenticated user."""
     try:
-        visions = db.get_optimized_visions(str(current_user.id))
+        visions = await run_db(db.get_optimized_visions, str(current_user.id))
         return {
             "success": True,
             "data": visions
@@ -2757,7 +3001,7 @@ async def get_optimized_visions(current_user: User = Depends(get_current_user)):
 async def get_optimized_vision(vision_id: int, current_user: User = Depends(get_current_user)):
     """Get a specific optimized vision by ID."""
     try:
-        vision = db.get_optimized_vision_by_id(vision_id, str(current_user.id))
+        vision = await run_db(db.get_optimized_vision_by_id, vision_id, str(current_user.id))
         if not vision:
             raise HTTPException(status_code=404, detail="Optimized vision not found")
         
@@ -2813,18 +3057,23 @@ async def reset_agent_llm_configurations(current_user: User = Depends(get_curren
     
     try:
         import sqlite3
-        conn = sqlite3.connect('backlog_jobs.db')
-        cursor = conn.cursor()
         
-        # Deactivate all configurations for this user
-        cursor.execute('''
-            UPDATE llm_configurations 
-            SET is_active = 0, updated_at = CURRENT_TIMESTAMP
-            WHERE user_id = ?
-        ''', (user_id,))
+        def deactivate_configurations():
+            conn = sqlite3.connect('backlog_jobs.db')
+            cursor = conn.cursor()
+        
+            # Deactivate all configurations for this user
+            cursor.execute('''
+                UPDATE llm_configurations 
+                SET is_active = 0, updated_at = CURRENT_TIMESTAMP
+                WHERE user_id = ?
+            ''', (user_id,))
         
-        conn.commit()
-        conn.close()
+            conn.commit()
+            conn.close()
+        
+        await run_db(deactivate_configurations)
+        invalidate_llm_config(user_id)
         
         logger.info(f"Reset LLM configurations for user {user_id}")
         
@@ -2843,7 +3092,7 @@ async def reset_agent_llm_configurations(current_user: User = Depends(get_curren
 async def get_build_version():
     """Get current build version."""
     try:
-        build_version = db.get_build_version()
+        build_version = await run_db(db.get_build_version)
         return {
             "build_version": build_version,
             "timestamp": datetime.now().isoformat()
@@ -2886,7 +3135,7 @@ async def get_job_progress(job_id: str, if_none_match: str = None, current_user:
             return progress_data
         
         # Fallback to database
-        db_progress = db.get_job_progress(job_id)
+        db_progress = await run_db(db.get_job_progress, job_id)
         if db_progress:
             # Check conditional request
             if if_none_match and if_none_match == db_progress.get("etag"):
@@ -2937,22 +3186,43 @@ async def get_active_jobs(current_user: User = Depends(get_current_user)):
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/jobs/history")
-async def get_job_history(limit: int = Query(6, description="Number of recent jobs to return")):
+async def get_job_history(request: Request,
+                          limit: int = Query(6, description="Number of recent jobs to return"),
+                          cursor: Optional[str] = Query(None, description="Keyset cursor of the last job of the previous page")):
     """Get trimmed job history for efficient Project History display."""
+    from db import BACKLOG_JOB_LIST_COLUMNS, decode_job_cursor, encode_job_cursor
+    try:
+        before = decode_job_cursor(cursor) if cursor else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
     try:
         logger.info(f"📋 Getting job history with limit: {limit}")
         
-        # Get recent backlog jobs from database with limit
-        recent_jobs = db.get_backlog_jobs(limit=limit)
+        # List columns only; the few summary values shown are extracted in SQL
+        recent_jobs = await run_db(
+            db.get_backlog_jobs,
+            limit=limit,
+            before=before,
+            columns=BACKLOG_JOB_LIST_COLUMNS,
+            summary_fields={
+                'summary_job_id': '$.job_id',
+                'summary_azure_project': '$.azure_config.project',
+                'summary_staging': '$.staging_summary',
+                'summary_test_artifacts': '$.test_artifacts_included'
+            }
+        )
         logger.info(f"📊 Retrieved {len(recent_jobs)} recent jobs from database")
         
         # Add computed fields for easier frontend consumption
         for job in recent_jobs:
             try:
-                # Parse raw_summary safely
-                raw_summary = job.get('raw_summary', {})
-                if isinstance(raw_summary, str):
-                    raw_summary = json.loads(raw_summary)
+                authoritative_job_id = job.pop('summary_job_id', None)
+                azure_project = job.pop('summary_azure_project', None)
+                staging_summary = job.pop('summary_staging', None)
+                if isinstance(staging_summary, str):
+                    staging_summary = json.loads(staging_summary)
+                test_artifacts_included = job.pop('summary_test_artifacts', None)
                 
                 # Add computed fields
                 job['computed'] = {
@@ -2964,11 +3234,11 @@ async def get_job_history(limit: int = Query(6, description="Number of recent jo
                         job.get('test_cases_generated', 0),
                         job.get('test_plans_generated', 0)
                     ]),
-                    'has_azure_config': bool(raw_summary.get('azure_config', {}).get('project')),
-                    'job_id_source': 'authoritative' if raw_summary.get('job_id') else 'fallback',
-                    'authoritative_job_id': raw_summary.get('job_id'),
-                    'staging_available': bool(raw_summary.get('staging_summary', {})),
-                    'test_artifacts_included': raw_summary.get('test_artifacts_included', False)
+                    'has_azure_config': bool(azure_project),
+                    'job_id_source': 'authoritative' if authoritative_job_id else 'fallback',
+                    'authoritative_job_id': authoritative_job_id,
+                    'staging_available': bool(staging_summary),
+                    'test_artifacts_included': bool(test_artifacts_included)
                 }
                 
             except Exception as e:
@@ -2982,11 +3252,12 @@ async def get_job_history(limit: int = Query(6, description="Number of recent jo
                     'test_artifacts_included': False
                 }
         
-        return {
+        return json_response(request, {
             "jobs": recent_jobs,
             "total_returned": len(recent_jobs),
-            "limit_applied": limit
-        }
+            "limit_applied": limit,
+            "next_cursor": encode_job_cursor(recent_jobs[-1]) if limit and len(recent_jobs) == limit else None
+        })
         
     except Exception as e:
         logger.error(f"Error getting job history: {str(e)}")
@@ -3020,7 +3291,8 @@ async def retry_failed_uploads(request: RetryFailedUploadsRequest):
         cmd = [sys.executable, retry_script, job_id, action]
         logger.info(f"Executing: {' '.join(cmd)}")
         
-        result = subprocess.run(
+        result = await run_io(
+            subprocess.run,
             cmd,
             capture_output=True,
             text=True,
@@ -3174,7 +3446,8 @@ async def optimize_vision_async(request: VisionOptimizationRequest, background_t
     """Start async vision optimization and return job ID immediately."""
     try:
         # Create job in database
-        job_id = db.create_vision_optimization_job(
+        job_id = await run_db(
+            db.create_vision_optimization_job,
             user_id=str(current_user.id),
             original_vision=request.original_vision,
             domains=request.domains
@@ -3208,7 +3481,7 @@ async def optimize_vision_async(request: VisionOptimizationRequest, background_t
 async def get_vision_optimization_status(job_id: str, current_user: User = Depends(get_current_user)):
     """Check status of vision optimization job."""
     try:
-        job_status = db.get_vision_job_status(job_id, str(current_user.id))
+        job_status = await run_db(db.get_vision_job_status, job_id, str(current_user.id))
         
         if not job_status:
             raise HTTPException(status_code=404, detail="Job not found")
@@ -3267,7 +3540,7 @@ async def optimize_vision(request: VisionOptimizationRequest, current_user: User
         optimizer = VisionOptimizerAgent(config, str(current_user.id))
         
         # Run optimization
-        result = optimizer.optimize_vision(request.original_vision, request.domains)
+        result = await run_io(optimizer.optimize_vision, request.original_vision, request.domains)
         
         # Prepare response
         response_data = {
@@ -3299,7 +3572,8 @@ async def optimize_vision(request: VisionOptimizationRequest, current_user: User
         
         # Save to database if acceptable
         if response_data["is_acceptable"]:
-            vision_id = db.save_optimized_vision(
+            vision_id = await run_db(
+                db.save_optimized_vision,
                 user_id=str(current_user.id),
                 original_vision=request.original_vision,
                 optimized_vision=result["optimized_vision"],
@@ -3361,7 +3635,7 @@ async def get_optimized_visions(
 ):
     """Get saved optimized visions for the current user."""
     try:
-        visions = db.get_optimized_visions(str(current_user.id), limit)
+        visions = await run_db(db.get_optimized_visions, str(current_user.id), limit)
         return visions
         
     except Exception as e:
@@ -3369,6 +3643,20 @@ async def get_optimized_visions(
         raise HTTPException(status_code=500, detail=f"Failed to get optimized visions: {str(e)}")
 
 if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Agile Backlog Automation API server")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="Report the import-time cost of each module at startup and exit")
+    parser.add_argument("--profile-top", type=int, default=25,
+                        help="Number of rows per table in the startup profile")
+    args = parser.parse_args()
+
+    if args.profile_startup:
+        from utils.startup_profiler import profile_startup
+        print(profile_startup("unified_api_server", top=args.profile_top, cwd=current_dir))
+        sys.exit(0)
+
     uvicorn.run(
         "unified_api_server:app",
         host="0.0.0.0",
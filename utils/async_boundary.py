@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Async Boundary - keep blocking calls off the API server's event loop.
+
+Async FastAPI handlers must not call SQLite, subprocesses or outbound HTTP
+directly: while one call blocks, every other request and SSE stream waits.
+Blocking work is handed to one of two bounded thread pools instead:
+
+- run_db():  SQLite reads and writes (Database, SettingsManager, auth)
+- run_io():  subprocesses and outbound HTTP
+
+EventLoopLagMonitor measures how late the loop wakes up from a short sleep
+and, when the loop stalls, records the stack of the code blocking it, so
+remaining blocking callsites show up in /api/health/event-loop.
+"""
+
+import asyncio
+import functools
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DB_WORKERS = 8
+DEFAULT_IO_WORKERS = 8
+
+_lock = threading.Lock()
+_executors: Dict[str, ThreadPoolExecutor] = {}
+_worker_counts = {'db': DEFAULT_DB_WORKERS, 'io': DEFAULT_IO_WORKERS}
+
+
+def configure_executors(db_workers: Optional[int] = None, io_workers: Optional[int] = None):
+    """Set the pool sizes (takes effect for pools not created yet)."""
+    with _lock:
+        if db_workers:
+            _worker_counts['db'] = int(db_workers)
+        if io_workers:
+            _worker_counts['io'] = int(io_workers)
+
+
+def get_executor(kind: str) -> ThreadPoolExecutor:
+    """Bounded pool for 'db' or 'io' calls, created on first use."""
+    with _lock:
+        executor = _executors.get(kind)
+        if executor is None:
+            executor = ThreadPoolExecutor(max_workers=_worker_counts[kind],
+                                          thread_name_prefix=f"{kind.upper()}_Worker")
+            _executors[kind] = executor
+        return executor
+
+
+def shutdown_executors(wait: bool = True):
+    """Shut down both pools (they are recreated if used again)."""
+    with _lock:
+        executors = list(_executors.values())
+        _executors.clear()
+    for executor in executors:
+        executor.shutdown(wait=wait)
+
+
+async def run_db(func: Callable, *args, **kwargs) -> Any:
+    """Run a blocking database call in the DB pool."""
+    return await asyncio.get_running_loop().run_in_executor(
+        get_executor('db'), functools.partial(func, *args, **kwargs))
+
+
+async def run_io(func: Callable, *args, **kwargs) -> Any:
+    """Run a blocking subprocess or outbound HTTP call in the I/O pool."""
+    return await asyncio.get_running_loop().run_in_executor(
+        get_executor('io'), functools.partial(func, *args, **kwargs))
+
+
+class EventLoopLagMonitor:
+    """
+    Event loop lag sampler with blocking-callsite capture.
+
+    A heartbeat task sleeps interval_seconds on the loop and records how late
+    it woke up. A watchdog thread checks the heartbeat; once it is overdue by
+    threshold_seconds, the loop thread's current stack is captured and the
+    innermost project frame is counted as the blocking callsite.
+    """
+
+    def __init__(self, interval_seconds: float = 0.1, threshold_seconds: float = 0.1,
+                 max_samples: int = 1000, max_stalls: int = 50, project_root: Optional[str] = None):
+        self.interval_seconds = interval_seconds
+        self.threshold_seconds = threshold_seconds
+        self.project_root = os.path.realpath(project_root or os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        self._lags = deque(maxlen=max_samples)
+        self._stalls = deque(maxlen=max_stalls)
+        self._callsites = Counter()
+        self._max_lag = 0.0
+        self._lock = threading.Lock()
+        self._last_tick = None
+        self._captured_tick = None
+        self._loop_thread_id = None
+        self._stopped = threading.Event()
+        self._watchdog = None
+
+    async def run(self):
+        """Heartbeat loop; run it as a task on the loop to be monitored."""
+        self._loop_thread_id = threading.get_ident()
+        self._last_tick = time.monotonic()
+        self._stopped.clear()
+        self._watchdog = threading.Thread(target=self._watch, name="EventLoopWatchdog", daemon=True)
+        self._watchdog.start()
+        try:
+            while True:
+                expected = time.monotonic() + self.interval_seconds
+                await asyncio.sleep(self.interval_seconds)
+                now = time.monotonic()
+                lag = max(0.0, now - expected)
+                with self._lock:
+                    self._last_tick = now
+                    self._lags.append(lag)
+                    self._max_lag = max(self._max_lag, lag)
+        finally:
+            self._stopped.set()
+
+    def _watch(self):
+        while not self._stopped.wait(self.interval_seconds / 2):
+            with self._lock:
+                last_tick = self._last_tick
+            blocked = time.monotonic() - last_tick - self.interval_seconds
+            if blocked < self.threshold_seconds or last_tick == self._captured_tick:
+                continue
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            self._captured_tick = last_tick
+            self._record_stall(traceback.extract_stack(frame), blocked)
+
+    def _record_stall(self, stack: traceback.StackSummary, blocked: float):
+        own_file = os.path.realpath(__file__)
+        project_frames = [
+            entry for entry in stack
+            if os.path.realpath(entry.filename).startswith(self.project_root + os.sep)
+            and os.path.realpath(entry.filename) != own_file
+        ]
+        innermost = (project_frames or list(stack))[-1]
+        callsite = f"{os.path.relpath(innermost.filename, self.project_root)}:{innermost.lineno} in {innermost.name}"
+        with self._lock:
+            self._callsites[callsite] += 1
+            self._stalls.append({
+                'callsite': callsite,
+                'blocked_ms': round(blocked * 1000, 1),
+                'detected_at': datetime.now().isoformat(),
+                'stack': [f"{entry.filename}:{entry.lineno} in {entry.name}" for entry in stack[-8:]],
+            })
+        logger.warning(f"Event loop blocked for {blocked * 1000:.0f} ms at {callsite}")
+
+    def snapshot(self, top: int = 10) -> Dict[str, Any]:
+        """Lag statistics (ms) and the most frequent blocking callsites."""
+        with self._lock:
+            lags = sorted(self._lags)
+            stalls: List[Dict[str, Any]] = list(self._stalls)
+            callsites = self._callsites.most_common(top)
+            stall_count = sum(self._callsites.values())
+            max_lag = self._max_lag
+
+        def percentile(fraction: float) -> float:
+            return round(lags[min(len(lags) - 1, int(len(lags) * fraction))] * 1000, 1) if lags else 0.0
+
+        return {
+            'running': self._watchdog is not None and not self._stopped.is_set(),
+            'samples': len(lags),
+            'p50_lag_ms': percentile(0.5),
+            'p99_lag_ms': percentile(0.99),
+            'max_lag_ms': round(max_lag * 1000, 1),
+            'stall_count': stall_count,
+            'top_callsites': [{'callsite': callsite, 'count': count} for callsite, count in callsites],
+            'recent_stalls': stalls[-top:],
+        }
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Blob Codec - compressed storage of JSON documents in SQLite columns.
+
+Job summaries (backlog_jobs.raw_summary) and staged work items
+(work_item_staging.generated_data) are JSON documents with a small, fixed
+vocabulary of keys and phrases. They are stored as zlib streams compressed
+with a preset dictionary of that vocabulary, which matters most for the many
+small rows where plain zlib has no history to work with.
+
+Stored blobs start with a header naming the dictionary version, so the
+dictionary can be extended later without rewriting old rows. Values without
+the header are legacy plain JSON text and are decoded unchanged.
+"""
+
+import json
+import zlib
+from typing import Any, Dict, Optional, Union
+
+# Header of compressed blobs: magic bytes followed by the dictionary version
+BLOB_MAGIC = b'\x1fJZ'
+
+# Documents shorter than this are stored as plain JSON text
+MIN_COMPRESS_BYTES = 128
+
+# Preset dictionary fragments, least frequent first (zlib favours the end of
+# the dictionary). Formatted the way json.dumps() writes them.
+_DICTIONARY_FRAGMENTS_V1 = (
+    # Job summaries
+    '"ado_summary": {', '"staging_summary": {', '"by_type": {', '"by_status": {',
+    '"pending": ', '"uploading": ', '"success": ', '"failed": ', '"skipped": ', '"total_items": ',
+    '"azure_config": {', '"organization_url": "https://dev.azure.com/', '"project": "', '"area_path": "',
+    '"iteration_path": "', '"execution_time_seconds": ', '"created_at": "', '"test_artifacts_included": ',
+    '"epics_generated": ', '"features_generated": ', '"user_stories_generated": ', '"tasks_generated": ',
+    '"test_cases_generated": ', '"project_name": "', '"job_id": "',
+    # Test artifacts
+    '"test_plan_id": ', '"feature_data": {', '"user_story_data": {', '"preconditions": [', '"test_data": ',
+    '"expected_result": "', '"action": "', '"steps": [', '"test_type": "', '"automation_candidate": ',
+    '"Test Plan: ', '"Test Suite: ', '"Default Test Suite: ',
+    # Work items
+    '"business_value": "', '"success_criteria": [', '"dependencies": [', '"risks": [', '"tags": [',
+    '"definition_of_done": [', '"estimated_hours": ', '"category": "', '"user_type": "',
+    '"technical_considerations": [', '"ui_ux_requirements": [', '"tasks": [', '"test_cases": [',
+    '"user_stories": [', '"features": [', '"priority": "Low"', '"priority": "Medium"', '"priority": "High"',
+    '"story_points": ', '" so that ', ' I want to ', '"user_story": "As a ', '", "Then ', ' When ',
+    '"Given ', '"acceptance_criteria": [', '"description": "', '"title": "',
+)
+
+_DICTIONARIES: Dict[int, bytes] = {
+    1: ''.join(_DICTIONARY_FRAGMENTS_V1).encode('utf-8'),
+}
+CURRENT_DICTIONARY_VERSION = 1
+
+
+def compress_text(text: str, dictionary_version: int = CURRENT_DICTIONARY_VERSION) -> bytes:
+    """Compress text into a headered blob."""
+    compressor = zlib.compressobj(level=6, zdict=_DICTIONARIES[dictionary_version])
+    payload = compressor.compress(text.encode('utf-8')) + compressor.flush()
+    return BLOB_MAGIC + bytes([dictionary_version]) + payload
+
+
+def decode_text(value: Union[bytes, str, None]) -> Optional[str]:
+    """Stored column value as JSON text (compressed blobs are decompressed, text is returned as is)."""
+    if value is None or isinstance(value, str):
+        return value
+    value = bytes(value)
+    if not value.startswith(BLOB_MAGIC):
+        return value.decode('utf-8')
+    dictionary = _DICTIONARIES.get(value[len(BLOB_MAGIC)])
+    if dictionary is None:
+        raise ValueError(f"Unknown blob dictionary version: {value[len(BLOB_MAGIC)]}")
+    try:
+        decompressor = zlib.decompressobj(zdict=dictionary)
+        text = decompressor.decompress(value[len(BLOB_MAGIC) + 1:]) + decompressor.flush()
+    except zlib.error as e:
+        raise ValueError(f"Corrupt compressed blob: {e}") from e
+    return text.decode('utf-8')
+
+
+def encode_json(document: Any, compress: bool = True) -> Union[bytes, str]:
+    """Serialize a document for storage, compressed unless it is small."""
+    text = json.dumps(document)
+    if not compress or len(text) < MIN_COMPRESS_BYTES:
+        return text
+    blob = compress_text(text)
+    return blob if len(blob) < len(text) else text
+
+
+def decode_json(value: Union[bytes, str, None]) -> Any:
+    """Deserialize a stored document (compressed or legacy text)."""
+    text = decode_text(value)
+    return json.loads(text) if text else None
@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+Context Budget Manager - fits vision/epic/feature context into per-model token budgets.
+
+Every feature, story, task and test case prompt embeds the product vision and
+the parent epic/feature context. After vision optimisation these grow to tens
+of KB, which slows prompt evaluation on Ollama, costs tokens on cloud providers
+and overflows the context window of 8B models.
+
+One manager is shared by all agents of a job. Oversized fields are replaced by
+an extractive summary (headings plus the highest-scoring sentences, in their
+original order) that fits the field's share of the model's context window.
+Summaries are computed once per (field, content, budget) and cached for the job.
+"""
+
+import hashlib
+import logging
+import re
+import threading
+from collections import Counter, OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, Any, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_SENTENCE_SPLIT = re.compile(r'(?<=[.!?])\s+(?=[A-Z0-9"\'(*-])')
+_WORD = re.compile(r"[a-z][a-z0-9'-]{2,}")
+_HEADING = re.compile(r'^\s*(#{1,6}\s|\*\*[^*]+\*\*:?\s*$|[A-Z][A-Za-z /&-]{2,60}:\s*$)')
+
+# Common words that carry no domain signal when scoring sentences
+_STOPWORDS = frozenset("""
+the and for with that this from will are was were have has had not but can all any our their its
+into than then them they there these those who what when where which while would could should
+also more most such each other been being about over under only very just your you use using
+""".split())
+
+# Fallback chars-per-token ratios by model family (English prose)
+DEFAULT_CHARS_PER_TOKEN = {
+    'gpt': 4.0,
+    'qwen': 3.6,
+    'llama': 3.8,
+    'mistral': 3.6,
+    'grok': 4.0,
+}
+
+
+@dataclass
+class ContextBudgetConfig:
+    """Configuration for context budgeting."""
+    enabled: bool = True
+    default_context_window: int = 8192
+    # Substring of the model name -> context window in tokens (longest match wins)
+    context_windows: Dict[str, int] = field(default_factory=dict)
+    # Share of the context window each field may use
+    field_shares: Dict[str, float] = field(default_factory=lambda: {
+        'product_vision': 0.25,
+        'epic_context': 0.08,
+        'feature_context': 0.08,
+    })
+    min_field_tokens: int = 150
+    max_cached_summaries: int = 256
+
+
+class ContextBudgetManager:
+    """Counts tokens per model and caches budget-fitted context summaries for one job."""
+
+    def __init__(self, settings: Dict[str, Any] = None, job_id: Optional[str] = None):
+        self.job_id = job_id
+        self.config = self._load_config(settings or {})
+        self._lock = threading.Lock()
+        self._summaries: "OrderedDict[Tuple[str, str, int], str]" = OrderedDict()
+        self.stats = {'fields_fitted': 0, 'summaries_built': 0, 'cache_hits': 0, 'tokens_saved': 0}
+
+    def _load_config(self, settings: Dict[str, Any]) -> ContextBudgetConfig:
+        """Load context budget configuration from settings dict."""
+        budget_config = settings.get('context_budget', {}) or {}
+        defaults = ContextBudgetConfig()
+        return ContextBudgetConfig(
+            enabled=budget_config.get('enabled', defaults.enabled),
+            default_context_window=budget_config.get('default_context_window', defaults.default_context_window),
+            context_windows=budget_config.get('context_windows', {}) or {},
+            field_shares=budget_config.get('field_shares', defaults.field_shares) or defaults.field_shares,
+            min_field_tokens=budget_config.get('min_field_tokens', defaults.min_field_tokens),
+            max_cached_summaries=budget_config.get('max_cached_summaries', defaults.max_cached_summaries)
+        )
+
+    def chars_per_token(self, model: str) -> float:
+        """Chars-per-token ratio for a model, measured from Ollama when available."""
+        from utils.ollama_client import prompt_cache_stats
+        measured = prompt_cache_stats.chars_per_token(model)
+        if measured:
+            return measured
+        model_name = (model or '').lower()
+        for family, ratio in DEFAULT_CHARS_PER_TOKEN.items():
+            if family in model_name:
+                return ratio
+        return 4.0
+
+    def count_tokens(self, text: str, model: str) -> int:
+        """Estimate the token count of text for the given model."""
+        if not text:
+            return 0
+        return int(len(text) / self.chars_per_token(model)) + 1
+
+    def get_context_window(self, model: str) -> int:
+        """Context window in tokens for a model (longest configured name match wins)."""
+        model_name = (model or '').lower()
+        matches = [key for key in self.config.context_windows if key.lower() in model_name]
+        if matches:
+            return int(self.config.context_windows[max(matches, key=len)])
+        return self.config.default_context_window
+
+    def get_field_budget(self, field_name: str, model: str) -> Optional[int]:
+        """Token budget for a context field, or None if the field is not budgeted."""
+        share = self.config.field_shares.get(field_name)
+        if not share:
+            return None
+        return max(int(self.get_context_window(model) * share), self.config.min_field_tokens)
+
+    def fit_context(self, context: Dict[str, Any], model: str) -> Dict[str, Any]:
+        """
+        Return a copy of context with oversized budgeted fields summarised.
+
+        Args:
+            context: Prompt template context
+            model: Model the prompt is sent to
+
+        Returns:
+            Context dict safe to render (original is never modified)
+        """
+        if not self.config.enabled or not context:
+            return context
+
+        fitted = None
+        for field_name in self.config.field_shares:
+            text = context.get(field_name)
+            if not isinstance(text, str) or not text:
+                continue
+            budget = self.get_field_budget(field_name, model)
+            tokens = self.count_tokens(text, model)
+            if budget is None or tokens <= budget:
+                continue
+
+            if fitted is None:
+                fitted = dict(context)
+            fitted[field_name] = self.get_summary(field_name, text, budget, model)
+            with self._lock:
+                self.stats['fields_fitted'] += 1
+                self.stats['tokens_saved'] += tokens - self.count_tokens(fitted[field_name], model)
+
+        return fitted if fitted is not None else context
+
+    def get_summary(self, field_name: str, text: str, budget_tokens: int, model: str) -> str:
+        """Get the cached budget-fitted summary of text, building it on first use."""
+        max_chars = int(budget_tokens * self.chars_per_token(model))
+        key = (field_name, hashlib.sha1(text.encode('utf-8')).hexdigest(), max_chars)
+        with self._lock:
+            if key in self._summaries:
+                self._summaries.move_to_end(key)
+                self.stats['cache_hits'] += 1
+                return self._summaries[key]
+
+        summary = summarize_text(text, max_chars)
+        logger.info(f"[CONTEXT BUDGET] Summarised {field_name} for job {self.job_id}: "
+                    f"{len(text)} -> {len(summary)} chars (budget {budget_tokens} tokens, {model})")
+
+        with self._lock:
+            self._summaries[key] = summary
+            self.stats['summaries_built'] += 1
+            while len(self._summaries) > self.config.max_cached_summaries:
+                self._summaries.popitem(last=False)
+        return summary
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get budgeting statistics for this job."""
+        with self._lock:
+            return {**self.stats, 'job_id': self.job_id, 'cached_summaries': len(self._summaries)}
+
+
+def summarize_text(text: str, max_chars: int) -> str:
+    """
+    Extractive summary of text within max_chars.
+
+    Headings are always kept (they carry the document structure); sentences are
+    scored by the frequency of their content words across the whole text, with
+    a bonus for the first sentence of each section, and the best ones are kept
+    in their original order.
+    """
+    if len(text) <= max_chars:
+        return text
+
+    units = _split_units(text)
+    frequencies = Counter(word for unit in units for word in _content_words(unit[1]))
+
+    scored = []
+    for index, (kind, unit, section_start, _) in enumerate(units):
+        if kind == 'heading':
+            score = float('inf')
+        else:
+            words = _content_words(unit)
+            score = sum(frequencies[word] for word in set(words)) / (len(words) ** 0.5 + 1)
+            if section_start:
+                score *= 1.5
+        scored.append((score, index))
+
+    selected = set()
+    seen_sentences = set()
+    used = 0
+    for score, index in sorted(scored, key=lambda item: (-item[0], item[1])):
+        kind, unit = units[index][0], units[index][1]
+        normalized = ' '.join(unit.lower().split())
+        length = len(unit) + 1
+        # Repeated sentences (common after vision optimisation) are kept once
+        if (kind == 'sentence' and normalized in seen_sentences) or used + length > max_chars:
+            continue
+        seen_sentences.add(normalized)
+        selected.add(index)
+        used += length
+
+    # Rebuild paragraphs from the kept units, dropping headings whose section was cut entirely
+    lines: List[str] = []
+    pending_heading = None
+    last_paragraph = None
+    for index in sorted(selected):
+        kind, unit, _, paragraph = units[index]
+        if kind == 'heading':
+            pending_heading = unit
+            last_paragraph = None
+            continue
+        if pending_heading:
+            lines.append(pending_heading)
+            pending_heading = None
+        if paragraph == last_paragraph:
+            lines[-1] = f"{lines[-1]} {unit}"
+        else:
+            lines.append(unit)
+        last_paragraph = paragraph
+
+    return '\n'.join(lines) if lines else text[:max_chars]
+
+
+def _split_units(text: str) -> List[Tuple[str, str, bool, int]]:
+    """Split text into (kind, unit, starts_section, paragraph) headings and sentences."""
+    units = []
+    paragraphs = re.split(r'\n\s*\n|\n(?=\s*(?:[-*\u2022#]|\d+[.)]\s))', text)
+    for paragraph_index, paragraph in enumerate(paragraphs):
+        section_start = True
+        for line in paragraph.strip().splitlines():
+            line = line.strip()
+            if not line:
+                continue
+            if _HEADING.match(line):
+                units.append(('heading', line, False, paragraph_index))
+                section_start = True
+                continue
+            for sentence in _SENTENCE_SPLIT.split(line):
+                if sentence.strip():
+                    units.append(('sentence', sentence.strip(), section_start, paragraph_index))
+                    section_start = False
+    return units
+
+
+def _content_words(text: str) -> List[str]:
+    return [word for word in _WORD.findall(text.lower()) if word not in _STOPWORDS]
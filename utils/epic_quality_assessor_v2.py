@@ -7,6 +7,14 @@ import re
 from typing import Dict, List, Any
 from dataclasses import dataclass
 
+from utils.keyword_matcher import get_keyword_matcher
+
+# Meaningful words used for alignment overlap
+KEYWORD_PATTERN = re.compile(r'\b\w{4,}\b')
+
+# Measurable targets (percentages, thresholds, durations)
+MEASURABLE_PATTERN = re.compile(r'\d+[%\s]|<\d+|>\d+|\d+\s*(second|minute|hour|day)')
+
 @dataclass
 class QualityAssessment:
     rating: str  # EXCELLENT, GOOD, FAIR, POOR
@@ -36,9 +44,50 @@ class EpicQualityAssessor:
         
         # User role patterns - including domain-specific users
         self.user_patterns = r'\b(User|Customer|Student|Patient|Driver|Rider|Commuter|Manager|Admin|Teacher|Operator|Farmer|Smallholder|Agri-Lender|Cooperative|Aggregator|NGO|MFI|Lender)\b'
+        self.user_regex = re.compile(self.user_patterns, re.I)
+        
+        # Actionable description verbs
+        self.action_verbs = ['enable', 'provide', 'deliver', 'create', 'implement', 'achieve', 'reduce', 'increase']
+        
+        # Term tables compiled once and shared by all assessor instances
+        keyword_groups = {f'domain:{name}': terms for name, terms in self.domain_terms.items()}
+        keyword_groups['platform'] = self.platform_terms
+        keyword_groups['action'] = self.action_verbs
+        self.keyword_matcher = get_keyword_matcher(keyword_groups)
         
     def assess_epic(self, epic: Dict[str, Any], domain: str, product_vision: str) -> QualityAssessment:
         """Assess epic quality based on streamlined criteria."""
+        return self.assess_many([epic], {'domain': domain, 'product_vision': product_vision})[0]
+    
+    def assess_many(self, epics: List[Dict[str, Any]], context: Dict[str, Any]) -> List[QualityAssessment]:
+        """
+        Assess a batch of epics against the same product vision.
+        
+        The vision is tokenised once for the whole batch instead of once per epic.
+        
+        Args:
+            epics: Epics to assess
+            context: Shared context with 'domain' and 'product_vision'
+        
+        Returns:
+            One QualityAssessment per epic, in order
+        """
+        shared = self._prepare_context(context.get('domain', ''), context.get('product_vision', ''))
+        return [self._assess_epic(epic, shared) for epic in epics]
+    
+    def _prepare_context(self, domain: str, product_vision: str) -> Dict[str, Any]:
+        """Tokenise the shared vision and domain context once per batch."""
+        vision_lower = product_vision.lower() if product_vision else ""
+        return {
+            'domain': domain,
+            'vision_title_terms': vision_lower.split()[:20],  # Key vision terms
+            'vision_keywords': set(KEYWORD_PATTERN.findall(vision_lower)),  # Extract meaningful words
+            'domain_terms': self.domain_terms.get(domain, [])
+        }
+    
+    def _assess_epic(self, epic: Dict[str, Any], shared: Dict[str, Any]) -> QualityAssessment:
+        """Score one epic against prepared shared context."""
+        domain = shared['domain']
         title = epic.get('title', '').strip()
         description = epic.get('description', '').strip()
         
@@ -60,7 +109,6 @@ class EpicQualityAssessor:
         
         # Clean text for analysis
         combined_text = f"{title} {description}".lower()
-        vision_lower = product_vision.lower() if product_vision else ""
         
         # 1. Title Quality (15 points)
         if len(title) <= 60:
@@ -69,16 +117,15 @@ class EpicQualityAssessor:
         else:
             specific_issues.append(f"Title too long ({len(title)} chars, max 60)")
             
-        if any(term in title.lower() for term in vision_lower.split()[:20]):  # Check key vision terms
+        if any(term in title.lower() for term in shared['vision_title_terms']):  # Check key vision terms
             score += 5
             strengths.append("Title uses vision terminology")
         else:
             weaknesses.append("Title doesn't reflect vision terminology")
         
         # 2. Vision Alignment (20 points)
-        vision_keywords = set(re.findall(r'\b\w{4,}\b', vision_lower))  # Extract meaningful words
-        epic_keywords = set(re.findall(r'\b\w{4,}\b', combined_text))
-        overlap = len(vision_keywords & epic_keywords)
+        epic_keywords = set(KEYWORD_PATTERN.findall(combined_text))
+        overlap = len(shared['vision_keywords'] & epic_keywords)
         
         if overlap >= 10:
             score += 20
@@ -91,7 +138,8 @@ class EpicQualityAssessor:
         
         # 3. User Specificity (15 points)
         # Check both title AND description for user mentions
-        if re.search(self.user_patterns, title, re.I) or re.search(self.user_patterns, description, re.I):
+        users_found = bool(self.user_regex.search(title) or self.user_regex.search(description))
+        if users_found:
             score += 15
             strengths.append("Identifies target users")
         else:
@@ -99,7 +147,7 @@ class EpicQualityAssessor:
             weaknesses.append("Add WHO will use this (e.g., Smallholder Farmers, Agri-Lenders)")
         
         # 4. Platform/Technology (15 points)
-        platform_found = any(term in combined_text for term in self.platform_terms)
+        platform_found = self.keyword_matcher.contains_any(combined_text, 'platform')
         if platform_found:
             score += 15
             strengths.append("Includes platform/technology details")
@@ -107,8 +155,8 @@ class EpicQualityAssessor:
             weaknesses.append("Missing platform specifics (mobile, web, etc.)")
         
         # 5. Domain Terminology (15 points)
-        domain_terms = self.domain_terms.get(domain, [])
-        domain_count = sum(1 for term in domain_terms if term in combined_text)
+        domain_terms = shared['domain_terms']
+        domain_count = self.keyword_matcher.count(combined_text, f'domain:{domain}')
         
         if domain_count >= 3:
             score += 15
@@ -120,15 +168,14 @@ class EpicQualityAssessor:
             specific_issues.append(f"No {domain}-specific terminology found")
         
         # 6. Measurable Outcomes (10 points)
-        if re.search(r'\d+[%\s]|<\d+|>\d+|\d+\s*(second|minute|hour|day)', description):
+        if MEASURABLE_PATTERN.search(description):
             score += 10
             strengths.append("Includes measurable outcomes")
         else:
             weaknesses.append("No measurable targets or metrics")
         
         # 7. Actionable Description (10 points)
-        action_verbs = ['enable', 'provide', 'deliver', 'create', 'implement', 'achieve', 'reduce', 'increase']
-        if any(verb in description.lower() for verb in action_verbs):
+        if self.keyword_matcher.contains_any(description.lower(), 'action'):
             score += 10
             strengths.append("Clear actionable language")
         else:
@@ -137,9 +184,9 @@ class EpicQualityAssessor:
         # Generate improvement suggestions
         improvement_suggestions = []
         if score < 75:
-            if not any(term in combined_text for term in domain_terms):
+            if domain_count == 0:
                 improvement_suggestions.append(f"Include {domain} terms like: {', '.join(domain_terms[:3])}")
-            if not re.search(self.user_patterns, title, re.I) and not re.search(self.user_patterns, description, re.I):
+            if not users_found:
                 improvement_suggestions.append("Specify target users from the vision")
             if not platform_found:
                 improvement_suggestions.append("Add platform details (mobile, web, cloud, etc.)")
@@ -7,6 +7,11 @@ import re
 from typing import Dict, List, Any
 from dataclasses import dataclass
 
+from utils.keyword_matcher import get_keyword_matcher
+
+# Meaningful words used for alignment overlap
+KEYWORD_PATTERN = re.compile(r'\b\w{4,}\b')
+
 @dataclass
 class QualityAssessment:
     rating: str  # EXCELLENT, GOOD, FAIR, POOR
@@ -29,6 +34,11 @@ class FeatureQualityAssessor:
         # Value indicators
         self.value_patterns = r'\d+[%\s]|<\d+|>\d+|\d+x|reduces|increases|enables|improves|accelerates'
         
+        # Patterns and term tables compiled once
+        self.user_regex = re.compile(self.user_patterns, re.I)
+        self.value_regex = re.compile(self.value_patterns, re.I)
+        self.keyword_matcher = get_keyword_matcher({'platform': self.platform_terms})
+        
     def assess_feature(self, feature: Dict[str, Any], epic: Dict[str, Any], 
                       domain: str, product_vision: str) -> QualityAssessment:
         """Assess feature quality based on streamlined criteria."""
@@ -70,8 +80,8 @@ class FeatureQualityAssessor:
             weaknesses.append("Title doesn't reflect epic terminology")
         
         # 2. Epic Support (20 points)
-        epic_keywords = set(re.findall(r'\b\w{4,}\b', epic_text))
-        feature_keywords = set(re.findall(r'\b\w{4,}\b', combined_text))
+        epic_keywords = set(KEYWORD_PATTERN.findall(epic_text))
+        feature_keywords = set(KEYWORD_PATTERN.findall(combined_text))
         overlap = len(epic_keywords & feature_keywords)
         
         if overlap >= 5:
@@ -84,7 +94,8 @@ class FeatureQualityAssessor:
             specific_issues.append("Weak connection to parent epic")
         
         # 3. User Specificity (15 points)
-        if re.search(self.user_patterns, description, re.I) or re.search(self.user_patterns, title, re.I):
+        users_in_description = bool(self.user_regex.search(description))
+        if users_in_description or self.user_regex.search(title):
             score += 15
             strengths.append("Identifies target users")
         else:
@@ -92,7 +103,7 @@ class FeatureQualityAssessor:
             weaknesses.append("Add WHO will use this feature")
         
         # 4. Platform/Technology (15 points)
-        platform_found = any(term in combined_text for term in self.platform_terms)
+        platform_found = self.keyword_matcher.contains_any(combined_text, 'platform')
         if platform_found:
             score += 15
             strengths.append("Includes platform/technology details")
@@ -100,7 +111,8 @@ class FeatureQualityAssessor:
             weaknesses.append("Missing platform specifics (mobile, web, etc.)")
         
         # 5. Business Value (15 points)
-        if business_value and re.search(self.value_patterns, business_value, re.I):
+        value_measurable = bool(business_value and self.value_regex.search(business_value))
+        if value_measurable:
             score += 15
             strengths.append("Clear measurable business value")
         elif business_value:
@@ -128,13 +140,13 @@ class FeatureQualityAssessor:
         # Generate improvement suggestions
         improvement_suggestions = []
         if score < 75:
-            if not re.search(self.user_patterns, description, re.I):
+            if not users_in_description:
                 improvement_suggestions.append("Specify which users from the epic will use this")
             if not platform_found:
                 improvement_suggestions.append("Add platform details (mobile app, web dashboard, etc.)")
             if overlap < 5:
                 improvement_suggestions.append("Use more specific terms from the parent epic")
-            if not re.search(self.value_patterns, business_value or "", re.I):
+            if not value_measurable:
                 improvement_suggestions.append("Add measurable business value (percentages, time savings, etc.)")
         
         # Determine rating
@@ -4,220 +4,226 @@ JSON Extraction Utility for LLM Responses.
 
 This module provides robust JSON extraction from verbose LLM responses,
 specifically designed to handle CodeLlama's tendency to be explanatory.
+
+Extraction is a single linear scan: only structural characters are visited
+(via one precompiled regex), top-level JSON values are delimited with a
+bracket stack, trailing commas and truncated endings are repaired while
+scanning, and each candidate span is decoded at most once. Long 70B
+responses no longer pay for repeated json.loads over overlapping substrings.
 """
 
 import json
 import re
 import logging
-from typing import Optional, Dict, List, Any
+from typing import Optional, Dict, List, Any, Iterator, Tuple
 
 logger = logging.getLogger(__name__)
 
+# Only these characters change scanner state - everything else is skipped by the regex engine
+_STRUCTURAL_CHARS = re.compile(r'[\[\]{}",\\]')
+_CLOSERS = {'[': ']', '{': '}'}
+
+# Fields that identify a bare work item object that callers expect as a one-item list
+_WORK_ITEM_KEYS = ('title', 'user_story', 'description')
+
+
 class JSONExtractor:
     """Robust JSON extractor for LLM responses."""
-    
+
+    # Bounded re-scans after a candidate fails to decode (keeps extraction linear)
+    MAX_RESCANS = 8
+
     @staticmethod
     def extract_json_from_response(response: str) -> Optional[str]:
         """
-        Extract JSON content from LLM response using multiple strategies.
-        
+        Extract JSON content from LLM response.
+
         Args:
             response: Raw LLM response text
-            
+
         Returns:
             Cleaned JSON string or None if no valid JSON found
         """
-        if not response or not response.strip():
+        value, text = JSONExtractor._find_best_value(response)
+        if text is None:
             return None
-            
-        # Strategy 1: Find JSON array/object in code blocks
-        json_content = JSONExtractor._extract_from_code_blocks(response)
-        if json_content:
-            return json_content
-            
-        # Strategy 2: Find JSON by bracket matching
-        json_content = JSONExtractor._extract_by_bracket_matching(response)
-        if json_content:
-            return json_content
-            
-        # Strategy 3: Extract from "```json" blocks specifically  
-        json_content = JSONExtractor._extract_from_json_blocks(response)
-        if json_content:
-            return json_content
-            
-        # Strategy 4: Look for JSON-like patterns
-        json_content = JSONExtractor._extract_json_patterns(response)
-        if json_content:
-            return json_content
-            
-        # Strategy 5: Try to parse the entire response as JSON
-        try:
-            json.loads(response.strip())
-            return response.strip()
-        except:
-            pass
-            
-        return None
-    
+
+        # A single work item object is returned as a one-item array
+        if isinstance(value, dict) and any(key in value for key in _WORK_ITEM_KEYS):
+            value = [value]
+        # Re-serialize so callers' strict json.loads accepts repaired/raw-newline content
+        return json.dumps(value, ensure_ascii=False)
+
+    @staticmethod
+    def parse_json_from_response(response: str) -> Optional[Any]:
+        """
+        Find, repair and decode the main JSON value in an LLM response.
+
+        Args:
+            response: Raw LLM response text
+
+        Returns:
+            Decoded JSON value (list or dict) or None if no valid JSON found
+        """
+        value, _ = JSONExtractor._find_best_value(response)
+        return value
+
     @staticmethod
-    def _extract_from_code_blocks(response: str) -> Optional[str]:
-        """Extract JSON from markdown code blocks."""
-        # Look for ```json or ``` blocks
-        patterns = [
-            r'```json\s*\n(.*?)\n```',
-            r'```\s*\n(\[.*?\])\s*\n```',
-            r'```\s*\n(\{.*?\})\s*\n```',
-        ]
-        
-        for pattern in patterns:
-            matches = re.findall(pattern, response, re.DOTALL)
-            for match in matches:
+    def _find_best_value(response: str) -> Tuple[Optional[Any], Optional[str]]:
+        """Scan the response once and return the largest decodable top-level value and its text."""
+        if not response or not response.strip():
+            return None, None
+
+        best_value, best_text = None, None
+        failed_text = None
+        rescans = 0
+        position = 0
+
+        while position is not None:
+            restart = None
+            for start, candidate in JSONExtractor._iter_candidates(response, position):
                 try:
-                    json.loads(match.strip())
-                    return match.strip()
-                except:
+                    value = json.loads(candidate, strict=False)
+                except ValueError:
+                    if failed_text is None or len(candidate) > len(failed_text):
+                        failed_text = candidate
+                    # The opening bracket may have been prose - rescan just past it
+                    if rescans < JSONExtractor.MAX_RESCANS:
+                        rescans += 1
+                        restart = start + 1
+                        break
                     continue
-        return None
-    
-    @staticmethod
-    def _extract_from_json_blocks(response: str) -> Optional[str]:
-        """Extract specifically from ```json blocks."""
-        pattern = r'```json\s*\n(.*?)\n```'
-        matches = re.findall(pattern, response, re.DOTALL | re.IGNORECASE)
-        
-        for match in matches:
-            try:
-                json.loads(match.strip())
-                return match.strip()
-            except:
-                continue
-        return None
-    
-    @staticmethod
-    def _extract_by_bracket_matching(response: str) -> Optional[str]:
-        """Extract JSON by matching brackets."""
-        # Find JSON arrays
-        array_match = JSONExtractor._find_balanced_brackets(response, '[', ']')
-        if array_match:
-            try:
-                json.loads(array_match)
-                return array_match
-            except:
-                pass
-        
-        # Find JSON objects and wrap in array if needed
-        object_match = JSONExtractor._find_balanced_brackets(response, '{', '}')
-        if object_match:
+                if best_text is None or len(candidate) > len(best_text):
+                    best_value, best_text = value, candidate
+            position = restart
+
+        if best_text is None and failed_text is not None:
+            # Last resort for quoting problems the scanner does not repair
+            cleaned = JSONExtractor.clean_json_string(failed_text)
             try:
-                parsed = json.loads(object_match)
-                # If it's a single object with user story fields, wrap in array
-                if isinstance(parsed, dict) and any(key in parsed for key in ['title', 'user_story', 'description']):
-                    return f"[{object_match}]"
-                return object_match
-            except:
-                pass
-                
-        return None
-    
+                return json.loads(cleaned, strict=False), cleaned
+            except ValueError:
+                logger.debug("No decodable JSON value found in response")
+
+        return best_value, best_text
+
     @staticmethod
-    def _find_balanced_brackets(text: str, open_bracket: str, close_bracket: str) -> Optional[str]:
-        """Find balanced bracket pairs and extract content."""
-        start_idx = text.find(open_bracket)
-        if start_idx == -1:
-            return None
-            
-        bracket_count = 0
-        for i, char in enumerate(text[start_idx:], start_idx):
-            if char == open_bracket:
-                bracket_count += 1
-            elif char == close_bracket:
-                bracket_count -= 1
-                if bracket_count == 0:
-                    return text[start_idx:i+1]
-        return None
-    
+    def _iter_candidates(text: str, position: int = 0) -> Iterator[Tuple[int, str]]:
+        """
+        Yield (start, repaired_text) for each top-level JSON array/object span.
+
+        Repairs applied during the scan:
+        - trailing commas before a closing bracket are dropped
+        - a response truncated mid-value is cut back to the last complete
+          element and its open brackets are closed
+        """
+        stack: List[str] = []
+        start = None
+        in_string = False
+        skip_to = -1
+        last_comma = -1
+        dropped: List[int] = []
+        safe_end = None
+        safe_stack: List[str] = []
+
+        for match in _STRUCTURAL_CHARS.finditer(text, position):
+            i = match.start()
+            if i < skip_to:
+                continue
+            char = text[i]
+
+            if in_string:
+                if char == '\\':
+                    skip_to = i + 2
+                elif char == '"':
+                    in_string = False
+                continue
+
+            if start is None:
+                if char in _CLOSERS:
+                    start, stack = i, [char]
+                    dropped, last_comma, safe_end = [], -1, None
+                continue
+
+            if char == '"':
+                in_string = True
+            elif char in _CLOSERS:
+                stack.append(char)
+            elif char == ',':
+                last_comma = i
+            elif char in ']}':
+                if last_comma > start and not text[last_comma + 1:i].strip():
+                    dropped.append(last_comma)
+                last_comma = -1
+                if _CLOSERS[stack[-1]] != char:
+                    # Mismatched bracket - not JSON, let the caller rescan
+                    yield start, text[start:i + 1]
+                    start, stack = None, []
+                    continue
+                stack.pop()
+                if stack:
+                    safe_end, safe_stack = i + 1, list(stack)
+                else:
+                    yield start, JSONExtractor._splice(text, start, i + 1, dropped)
+                    start = None
+
+        if start is not None:
+            # Truncated response - keep complete elements and close what is still open
+            if safe_end is None:
+                yield start, text[start:]
+            else:
+                closers = ''.join(_CLOSERS[b] for b in reversed(safe_stack))
+                body = JSONExtractor._splice(text, start, safe_end, dropped).rstrip()
+                if body.endswith(','):
+                    body = body[:-1]
+                yield start, body + closers
+
     @staticmethod
-    def _extract_json_patterns(response: str) -> Optional[str]:
-        """Extract using JSON-like patterns."""
-        # Strategy 1: Look for complete JSON arrays with proper structure
-        array_patterns = [
-            r'\[\s*\{.*?"title".*?"user_story".*?\}\s*\]',  # User story specific
-            r'\[\s*\{.*?\}\s*(?:,\s*\{.*?\}\s*)*\]',       # Multiple objects
-            r'\[\s*\{.*?\}\s*\]',                          # Single object
-            r'\[\s*".*?"\s*\]',                            # String array
-        ]
-        
-        for pattern in array_patterns:
-            matches = re.findall(pattern, response, re.DOTALL)
-            for match in matches:
-                try:
-                    json.loads(match)
-                    return match
-                except:
-                    # Try cleaning the match
-                    cleaned = JSONExtractor.clean_json_string(match)
-                    try:
-                        json.loads(cleaned)
-                        return cleaned
-                    except:
-                        continue
-        
-        # Strategy 2: Look for object patterns using balanced bracket matching
-        # Find objects that contain "title" and "user_story" fields
-        title_start = response.find('"title"')
-        if title_start != -1:
-            # Find the opening brace before "title"
-            for i in range(title_start, -1, -1):
-                if response[i] == '{':
-                    # Extract balanced object starting from this brace
-                    obj_match = JSONExtractor._find_balanced_brackets(response[i:], '{', '}')
-                    if obj_match and '"title"' in obj_match and '"user_story"' in obj_match:
-                        try:
-                            json.loads(obj_match)
-                            return f"[{obj_match}]"  # Wrap single object in array
-                        except:
-                            # Try cleaning the match
-                            cleaned = JSONExtractor.clean_json_string(obj_match)
-                            try:
-                                json.loads(cleaned)
-                                return f"[{cleaned}]"  # Wrap single object in array
-                            except:
-                                continue
-                    break
-                    
-        return None
-    
+    def _splice(text: str, start: int, end: int, dropped: List[int]) -> str:
+        """Return text[start:end] without the dropped (trailing comma) positions."""
+        if not dropped:
+            return text[start:end]
+        parts = []
+        cursor = start
+        for index in dropped:
+            if index >= end:
+                break
+            parts.append(text[cursor:index])
+            cursor = index + 1
+        parts.append(text[cursor:end])
+        return ''.join(parts)
+
     @staticmethod
     def clean_json_string(json_str: str) -> str:
         """Clean and fix common JSON formatting issues."""
         if not json_str:
             return json_str
-            
+
         # Remove leading/trailing whitespace
         cleaned = json_str.strip()
-        
+
         # Remove markdown formatting
         cleaned = re.sub(r'^```json\s*\n?', '', cleaned, flags=re.MULTILINE)
         cleaned = re.sub(r'\n?```\s*$', '', cleaned, flags=re.MULTILINE)
-        
+
         # Fix common JSON issues
         # Fix unquoted property names
         cleaned = re.sub(r'(\w+):', r'"\1":', cleaned)
-        
+
         # Fix single quotes to double quotes
         cleaned = cleaned.replace("'", '"')
-        
+
         # Fix trailing commas
         cleaned = re.sub(r',(\s*[}\]])', r'\1', cleaned)
-        
+
         return cleaned
-    
+
     @staticmethod
     def validate_and_parse_json(json_str: str) -> Optional[Any]:
         """Validate and parse JSON string."""
         if not json_str:
             return None
-            
+
         try:
             # First try parsing as-is
             return json.loads(json_str)
@@ -228,4 +234,4 @@ class JSONExtractor:
                 return json.loads(cleaned)
             except json.JSONDecodeError as e:
                 logger.debug(f"Failed to parse JSON: {e}")
-                return None
\ No newline at end of file
+                return None
@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+JSON Streaming - fast, streamed and compressed JSON responses.
+
+Generated backlogs with test steps run to many MB. Instead of building the
+whole response body with the default JSON encoder, large payloads are:
+
+- serialized with orjson when it is installed (json otherwise),
+- streamed: the epic -> feature -> user story tree is walked lazily and each
+  item is serialized on its own, as one JSON document or as NDJSON records,
+- compressed with brotli or gzip as negotiated by Accept-Encoding,
+- tagged with an ETag so unchanged payloads are answered with 304.
+"""
+
+import hashlib
+import json
+import os
+import zlib
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+from fastapi import Request
+from fastapi.responses import Response, StreamingResponse
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Child lists of the backlog tree, streamed item by item
+TREE_KEYS = {'epics': 'epic', 'features': 'feature', 'user_stories': 'user_story'}
+
+# Streamed output is coalesced into chunks of about this size
+STREAM_CHUNK_BYTES = 64 * 1024
+
+# Bodies smaller than this are sent uncompressed
+MIN_COMPRESS_BYTES = 1024
+
+NDJSON_MEDIA_TYPE = 'application/x-ndjson'
+
+
+def dumps(value: Any) -> bytes:
+    """Serialize a value to JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(value, default=str, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(value, default=str, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def loads(data: bytes) -> Any:
+    """Parse JSON bytes."""
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+
+def load_json_file(path) -> Any:
+    """Read and parse a JSON file."""
+    with open(path, 'rb') as f:
+        return loads(f.read())
+
+
+def iter_json(value: Any) -> Iterator[bytes]:
+    """
+    Serialize a value as one JSON document, piece by piece.
+
+    Dicts are written key by key and the lists under TREE_KEYS element by
+    element, so only one work item is serialized at a time; all other values
+    are serialized whole.
+    """
+    if not isinstance(value, dict):
+        yield dumps(value)
+        return
+    yield b'{'
+    for index, (key, item) in enumerate(value.items()):
+        yield (b',' if index else b'') + dumps(str(key)) + b':'
+        if isinstance(item, dict):
+            yield from iter_json(item)
+        elif key in TREE_KEYS and isinstance(item, list):
+            yield b'['
+            for child_index, child in enumerate(item):
+                if child_index:
+                    yield b','
+                yield from iter_json(child)
+            yield b']'
+        else:
+            yield dumps(item)
+    yield b'}'
+
+
+def iter_backlog_ndjson(backlog: Dict[str, Any]) -> Iterator[bytes]:
+    """
+    Backlog as NDJSON records, parents before children.
+
+    The first record ({"type": "backlog"}) carries the top-level fields other
+    than epics. Every work item follows as {"type": "epic" | "feature" |
+    "user_story", "path": [...], "data": {...}}, where path holds the indexes
+    of the item and its ancestors and data omits the child list.
+    """
+    yield dumps({'type': 'backlog', 'data': {k: v for k, v in backlog.items() if k != 'epics'}}) + b'\n'
+    yield from _iter_tree_records(backlog, 'epics', [])
+
+
+def _iter_tree_records(parent: Dict[str, Any], key: str, path) -> Iterator[bytes]:
+    for index, item in enumerate(parent.get(key) or []):
+        item_path = path + [index]
+        children = [child_key for child_key in TREE_KEYS if child_key != key and isinstance(item.get(child_key), list)]
+        data = {k: v for k, v in item.items() if k not in children} if children else item
+        yield dumps({'type': TREE_KEYS[key], 'path': item_path, 'data': data}) + b'\n'
+        for child_key in children:
+            yield from _iter_tree_records(item, child_key, item_path)
+
+
+def coalesce(chunks: Iterable[bytes], size: int = STREAM_CHUNK_BYTES) -> Iterator[bytes]:
+    """Join small chunks into chunks of about the given size."""
+    buffer = []
+    buffered = 0
+    for chunk in chunks:
+        buffer.append(chunk)
+        buffered += len(chunk)
+        if buffered >= size:
+            yield b''.join(buffer)
+            buffer, buffered = [], 0
+    if buffer:
+        yield b''.join(buffer)
+
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """Preferred supported content coding: 'br', 'gzip' or None."""
+    accepted = set()
+    for coding in (accept_encoding or '').split(','):
+        name, _, params = coding.strip().partition(';')
+        if params.strip().replace(' ', '') in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000'):
+            continue
+        accepted.add(name.strip().lower())
+    if brotli is not None and 'br' in accepted:
+        return 'br'
+    if 'gzip' in accepted:
+        return 'gzip'
+    return None
+
+
+def compress_chunks(chunks: Iterable[bytes], encoding: str) -> Iterator[bytes]:
+    """Compress a chunk stream with 'br' or 'gzip'."""
+    if encoding == 'br':
+        compressor = brotli.Compressor(quality=4)
+        for chunk in chunks:
+            output = compressor.process(chunk)
+            if output:
+                yield output
+        yield compressor.finish()
+        return
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits 31: gzip container
+    for chunk in chunks:
+        output = compressor.compress(chunk)
+        if output:
+            yield output
+    yield compressor.flush()
+
+
+def file_etag(path) -> str:
+    """ETag of a file derived from its name, size and modification time."""
+    stat = os.stat(path)
+    identity = f"{os.path.basename(path)}:{stat.st_size}:{stat.st_mtime_ns}"
+    return '"' + hashlib.sha1(identity.encode('utf-8')).hexdigest()[:16] + '"'
+
+
+def content_etag(body: bytes) -> str:
+    """Weak ETag of a response body."""
+    return 'W/"' + hashlib.sha1(body).hexdigest()[:16] + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: Optional[str]) -> bool:
+    """True if an If-None-Match header matches the ETag (weak comparison)."""
+    if not if_none_match or not etag:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    bare = etag[2:] if etag.startswith('W/') else etag
+    return any((tag.strip()[2:] if tag.strip().startswith('W/') else tag.strip()) == bare
+               for tag in if_none_match.split(','))
+
+
+def _cache_headers(etag: Optional[str]) -> Dict[str, str]:
+    headers = {'Vary': 'Accept-Encoding', 'Cache-Control': 'private, no-cache'}
+    if etag:
+        headers['ETag'] = etag
+    return headers
+
+
+def json_response(request: Request, value: Any, etag: Optional[str] = None) -> Response:
+    """
+    JSON response serialized in one go, compressed if large enough.
+
+    Without an explicit ETag a weak ETag of the body is used, which saves the
+    transfer (not the query) when the client already has the payload.
+    """
+    body = dumps(value)
+    etag = etag or content_etag(body)
+    headers = _cache_headers(etag)
+    if etag_matches(request.headers.get('if-none-match'), etag):
+        return Response(status_code=304, headers=headers)
+
+    encoding = negotiate_encoding(request.headers.get('accept-encoding')) if len(body) >= MIN_COMPRESS_BYTES else None
+    if encoding:
+        body = b''.join(compress_chunks([body], encoding))
+        headers['Content-Encoding'] = encoding
+    return Response(content=body, media_type='application/json', headers=headers)
+
+
+def streaming_json_response(request: Request, chunks: Iterable[bytes], etag: Optional[str] = None,
+                            media_type: str = 'application/json') -> StreamingResponse:
+    """Streamed response of serialized chunks, compressed as negotiated."""
+    headers = _cache_headers(etag)
+    chunks = coalesce(chunks)
+    encoding = negotiate_encoding(request.headers.get('accept-encoding'))
+    if encoding:
+        chunks = compress_chunks(chunks, encoding)
+        headers['Content-Encoding'] = encoding
+    return StreamingResponse(chunks, media_type=media_type, headers=headers)
+
+
+def not_modified(request: Request, etag: str) -> Optional[Response]:
+    """304 response if the request's If-None-Match matches the ETag, else None."""
+    if etag_matches(request.headers.get('if-none-match'), etag):
+        return Response(status_code=304, headers=_cache_headers(etag))
+    return None
@@ -0,0 +1,158 @@
+"""
+Keyword Matcher
+
+Shared multi-pattern substring matcher for domain detection and quality
+assessment. Keyword tables are grouped by label (a domain, a user type, a
+term category) and compiled once; a single scan of the text then reports
+every keyword it contains, with the same semantics as `keyword in text`.
+
+Large tables (the vision extractor's hundreds of industry, user type and
+vocabulary terms) are compiled into an Aho-Corasick automaton, so the text is
+scanned once instead of once per keyword. Small tables, like the assessors'
+platform or role lists, are faster with CPython's native substring search, so
+they keep it behind the same interface.
+
+Matching is case-sensitive: callers lowercase the text, and keywords are kept
+as written in their tables.
+"""
+
+import threading
+from collections import OrderedDict, deque
+from typing import Dict, FrozenSet, Iterable, List, Mapping, Optional, Set, Tuple
+
+# Below this many distinct keywords, native `in` scans beat the automaton
+AUTOMATON_MIN_KEYWORDS = 64
+
+_MAX_CACHED_MATCHERS = 64
+
+
+class KeywordMatcher:
+    """Finds which keywords of labelled keyword groups occur in a text."""
+
+    def __init__(self, groups: Mapping[str, Iterable[str]]):
+        self.groups: Dict[str, Tuple[str, ...]] = {label: tuple(keywords) for label, keywords in groups.items()}
+        self.keywords: Tuple[str, ...] = tuple(OrderedDict.fromkeys(
+            keyword for keywords in self.groups.values() for keyword in keywords if keyword
+        ))
+        self.uses_automaton = len(self.keywords) >= AUTOMATON_MIN_KEYWORDS
+        self._transitions: List[Dict[str, int]] = []
+        self._outputs: List[Optional[FrozenSet[str]]] = []
+        self._last: Tuple[Optional[str], FrozenSet[str]] = (None, frozenset())
+        if self.uses_automaton:
+            self._build_automaton()
+
+    def find(self, text: str) -> FrozenSet[str]:
+        """Distinct keywords occurring in text (repeat calls with the same text are free)."""
+        last_text, last_found = self._last
+        if text == last_text:
+            return last_found
+
+        if not text:
+            found = frozenset()
+        elif self.uses_automaton:
+            found = self._scan(text)
+        else:
+            found = frozenset(keyword for keyword in self.keywords if keyword in text)
+
+        self._last = (text, found)
+        return found
+
+    def contains_any(self, text: str, label: str) -> bool:
+        """True if any keyword of the group occurs in text."""
+        if self.uses_automaton:
+            found = self.find(text)
+            return any(keyword in found for keyword in self.groups.get(label, ()))
+        return any(keyword in text for keyword in self.groups.get(label, ()))
+
+    def matches(self, text: str, label: str) -> List[str]:
+        """Keywords of the group occurring in text, in table order."""
+        if self.uses_automaton:
+            found = self.find(text)
+            return [keyword for keyword in self.groups.get(label, ()) if keyword in found]
+        return [keyword for keyword in self.groups.get(label, ()) if keyword in text]
+
+    def count(self, text: str, label: str) -> int:
+        """Number of the group's keywords occurring in text."""
+        return len(self.matches(text, label))
+
+    def group_counts(self, text: str, labels: Iterable[str] = None) -> Dict[str, int]:
+        """Matched keyword count per group (groups without matches omitted), in table order."""
+        found = self.find(text)
+        counts = {}
+        for label in (labels if labels is not None else self.groups):
+            score = sum(1 for keyword in self.groups.get(label, ()) if keyword in found)
+            if score > 0:
+                counts[label] = score
+        return counts
+
+    def _build_automaton(self) -> None:
+        # Trie of keywords
+        goto: List[Dict[str, int]] = [{}]
+        outputs: List[Set[str]] = [set()]
+        for keyword in self.keywords:
+            state = 0
+            for char in keyword:
+                next_state = goto[state].get(char)
+                if next_state is None:
+                    goto.append({})
+                    outputs.append(set())
+                    next_state = len(goto) - 1
+                    goto[state][char] = next_state
+                state = next_state
+            outputs[state].add(keyword)
+
+        # Failure links in breadth-first order, folded into a full transition table
+        # so scanning never has to follow failure links
+        fail = [0] * len(goto)
+        transitions: List[Dict[str, int]] = [dict(goto[0])] + [{} for _ in goto[1:]]
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            transitions[state] = dict(transitions[fail[state]])
+            transitions[state].update(goto[state])
+            outputs[state] |= outputs[fail[state]]
+            for char, next_state in goto[state].items():
+                fail[next_state] = transitions[fail[state]].get(char, 0)
+                queue.append(next_state)
+
+        # Drop transitions back to the root; a missing entry means state 0
+        self._transitions = [{char: target for char, target in row.items() if target} for row in transitions]
+        self._outputs = [frozenset(output) if output else None for output in outputs]
+
+    def _scan(self, text: str) -> FrozenSet[str]:
+        transitions = self._transitions
+        outputs = self._outputs
+        state = 0
+        found: Set[str] = set()
+        for char in text:
+            state = transitions[state].get(char, 0)
+            output = outputs[state]
+            if output is not None:
+                found |= output
+        return frozenset(found)
+
+
+_matchers: "OrderedDict[Tuple, KeywordMatcher]" = OrderedDict()
+_matchers_lock = threading.Lock()
+
+
+def get_keyword_matcher(groups: Mapping[str, Iterable[str]]) -> KeywordMatcher:
+    """
+    Get a compiled matcher for the keyword groups.
+
+    Matchers are cached by content, so every extractor or assessor instance
+    built from the same tables shares one compiled automaton.
+    """
+    key = tuple((label, tuple(keywords)) for label, keywords in groups.items())
+    with _matchers_lock:
+        matcher = _matchers.get(key)
+        if matcher is not None:
+            _matchers.move_to_end(key)
+            return matcher
+
+    matcher = KeywordMatcher(dict(key))
+    with _matchers_lock:
+        _matchers[key] = matcher
+        while len(_matchers) > _MAX_CACHED_MATCHERS:
+            _matchers.popitem(last=False)
+    return matcher
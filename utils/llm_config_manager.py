@@ -8,19 +8,60 @@ a unified interface for agents to get their LLM settings.
 
 import os
 import logging
-from typing import Dict, Any, Optional
+import threading
+import time
+from typing import Dict, Any, Optional, Tuple
 from db import db
 from utils.user_id_resolver import user_id_resolver
 
 logger = logging.getLogger(__name__)
 
+class LLMConfigVersions:
+    """
+    Version stamps for cached LLM configurations.
+    
+    Every write to a user's LLM configurations bumps that user's version, so
+    caches keyed by user compare stamps. Writes this process is not told about
+    (tools/, direct SQL, other server processes) are picked up because stamps
+    also change every MAX_AGE_SECONDS.
+    """
+    
+    MAX_AGE_SECONDS = 5.0
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._global_version = 0
+        self._user_versions: Dict[str, int] = {}
+    
+    def get(self, user_id: Optional[str]) -> Tuple[int, int, int]:
+        """Current (global, user, age window) version stamp."""
+        with self._lock:
+            return (self._global_version, self._user_versions.get(user_id, 0),
+                    int(time.monotonic() // self.MAX_AGE_SECONDS))
+    
+    def bump(self, user_id: Optional[str] = None):
+        """Invalidate one user's cached configurations (all users if user_id is None)."""
+        with self._lock:
+            if user_id is None:
+                self._global_version += 1
+            else:
+                self._user_versions[user_id] = self._user_versions.get(user_id, 0) + 1
+
+# Shared by LLMConfigManager and UnifiedLLMConfigManager
+llm_config_versions = LLMConfigVersions()
+
+def invalidate_llm_config(user_id: str = None):
+    """Invalidate cached LLM configurations after a user's configurations were written."""
+    llm_config_versions.bump(user_id)
+    logger.info(f"Invalidated cached LLM configuration for {'all users' if user_id is None else f'user {user_id}'}")
+
 class LLMConfigManager:
     """Manages LLM configurations from database with environment fallback."""
     
     def __init__(self):
-        self._cached_config = None
-        self._cache_timestamp = None
-        self._cache_duration = 5  # Cache for 5 seconds (much shorter for responsiveness)
+        # user_id -> (version stamp, configuration)
+        self._cache: Dict[str, Tuple[Tuple[int, int, int], Dict[str, Any]]] = {}
+        self._cache_lock = threading.Lock()
     
     def get_active_configuration(self, user_id: str = None, force_refresh: bool = False) -> Dict[str, Any]:
         """
@@ -37,8 +78,11 @@ class LLMConfigManager:
             user_id = user_id_resolver.get_default_user_id()
         
         # Check cache first (unless force_refresh is True)
-        if not force_refresh and self._is_cache_valid():
-            return self._cached_config
+        version = llm_config_versions.get(user_id)
+        if not force_refresh:
+            cached_config = self._get_cached_config(user_id, version)
+            if cached_config is not None:
+                return cached_config
         
         # Try to get from database
         config = db.get_active_llm_configuration(user_id)
@@ -46,13 +90,13 @@ class LLMConfigManager:
         if config:
             # Convert database config to standard format
             standard_config = self._convert_db_config_to_standard(config)
-            self._cache_config(standard_config)
+            self._cache_config(user_id, version, standard_config)
             logger.info(f"📋 Loaded active LLM config from database: {config['name']} ({config['provider']})")
             return standard_config
         
         # Fallback to environment variables
         env_config = self._load_from_environment()
-        self._cache_config(env_config)
+        self._cache_config(user_id, version, env_config)
         logger.info(f"📋 Loaded LLM config from environment: {env_config['provider']}")
         return env_config
     
@@ -82,24 +126,23 @@ class LLMConfigManager:
             'is_default': True
         }
     
-    def _is_cache_valid(self) -> bool:
-        """Check if cached configuration is still valid."""
-        if not self._cached_config or not self._cache_timestamp:
-            return False
-        
-        import time
-        return (time.time() - self._cache_timestamp) < self._cache_duration
+    def _get_cached_config(self, user_id: str, version: Tuple[int, int, int]) -> Optional[Dict[str, Any]]:
+        """Cached configuration for the user, if it was loaded at the current version."""
+        with self._cache_lock:
+            cached = self._cache.get(user_id)
+        if cached and cached[0] == version:
+            return cached[1]
+        return None
     
-    def _cache_config(self, config: Dict[str, Any]):
-        """Cache the configuration."""
-        self._cached_config = config
-        import time
-        self._cache_timestamp = time.time()
+    def _cache_config(self, user_id: str, version: Tuple[int, int, int], config: Dict[str, Any]):
+        """Cache the user's configuration with the version it was loaded at."""
+        with self._cache_lock:
+            self._cache[user_id] = (version, config)
     
     def clear_cache(self):
         """Clear the configuration cache."""
-        self._cached_config = None
-        self._cache_timestamp = None
+        with self._cache_lock:
+            self._cache.clear()
         logger.info("🧹 Cleared LLM configuration cache")
     
     def force_refresh_configuration(self, user_id: str = None) -> Dict[str, Any]:
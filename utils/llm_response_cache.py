@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+LLM Response Cache - exact and approximate reuse of past LLM responses.
+
+Responses are stored per (agent, model, output type) scope. The exact tier
+returns a response only for an identical system prompt and user input. The
+approximate tier, used only by agents listed under semantic.agents, also
+returns the response of a past prompt whose word shingles are similar enough
+(Jaccard >= semantic.similarity_threshold): candidates come from MinHash/LSH
+buckets, so a lookup never scans the whole cache. Improvement prompts and
+templated vision-to-epic prompts are often near-repeats across retries and
+jobs.
+
+Entries are provisional: agents report the quality rating of the item built
+from a response (and discard responses they could not parse), and entries
+whose items are rated below the accept ratings are evicted so a retry of the
+same prompt reaches the LLM instead of getting the same response back.
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, Any, FrozenSet, List, Optional, Set, Tuple
+
+from utils.minhash import MinHasher
+
+
+@dataclass
+class SemanticCacheConfig:
+    """Configuration for the approximate (LSH) cache tier."""
+    agents: Tuple[str, ...] = ()
+    similarity_threshold: float = 0.9
+    shingle_size: int = 3
+    num_permutations: int = 64
+    bands: int = 16
+
+
+@dataclass
+class LLMResponseCacheConfig:
+    """Configuration for the LLM response cache."""
+    enabled: bool = False
+    max_entries: int = 2048
+    ttl_seconds: int = 86400
+    semantic: SemanticCacheConfig = field(default_factory=SemanticCacheConfig)
+
+
+@dataclass
+class CacheLookup:
+    """Result of a cache lookup; pass it back to store() on a miss."""
+    tier: str  # 'exact', 'semantic' or 'miss'
+    scope: Tuple[str, str, str]
+    key: str
+    response: Optional[str] = None
+    similarity: float = 1.0
+    shingles: Optional[FrozenSet[str]] = None
+    band_keys: Optional[List[Tuple[int, Tuple[int, ...]]]] = None
+
+    @property
+    def hit(self) -> bool:
+        return self.tier != 'miss'
+
+
+@dataclass
+class _CacheEntry:
+    response: str
+    scope: Tuple[str, str, str]
+    created_at: float
+    shingles: Optional[FrozenSet[str]] = None
+    band_keys: Optional[List[Tuple[int, Tuple[int, ...]]]] = None
+
+
+class LLMResponseCache:
+    """Process-wide LRU cache of LLM responses with an opt-in approximate tier."""
+
+    def __init__(self, settings: Dict[str, Any] = None):
+        self.config = self._load_config(settings or {})
+        semantic = self.config.semantic
+        self.minhasher = MinHasher(semantic.shingle_size, semantic.num_permutations, semantic.bands)
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, _CacheEntry]" = OrderedDict()
+        self._buckets: Dict[Tuple, Set[str]] = {}
+        self.stats = {'exact_hits': 0, 'semantic_hits': 0, 'misses': 0, 'evictions': 0, 'rejected': 0}
+
+    def _load_config(self, settings: Dict[str, Any]) -> LLMResponseCacheConfig:
+        """Load response cache configuration from settings dict."""
+        cache_config = settings.get('llm_response_cache', {}) or {}
+        semantic_config = cache_config.get('semantic', {}) or {}
+        defaults = LLMResponseCacheConfig()
+        semantic_defaults = SemanticCacheConfig()
+        return LLMResponseCacheConfig(
+            enabled=cache_config.get('enabled', defaults.enabled),
+            max_entries=int(cache_config.get('max_entries', defaults.max_entries)),
+            ttl_seconds=int(cache_config.get('ttl_seconds', defaults.ttl_seconds)),
+            semantic=SemanticCacheConfig(
+                agents=tuple(semantic_config.get('agents') or semantic_defaults.agents),
+                similarity_threshold=float(semantic_config.get('similarity_threshold', semantic_defaults.similarity_threshold)),
+                shingle_size=int(semantic_config.get('shingle_size', semantic_defaults.shingle_size)),
+                num_permutations=int(semantic_config.get('num_permutations', semantic_defaults.num_permutations)),
+                bands=int(semantic_config.get('bands', semantic_defaults.bands))
+            )
+        )
+
+    def semantic_enabled_for(self, agent_name: str) -> bool:
+        """True if the agent opted in to approximate hits."""
+        return self.config.enabled and agent_name in self.config.semantic.agents
+
+    def lookup(self, agent_name: str, model: str, output_type: Optional[str],
+               system_prompt: str, user_input: str) -> Optional[CacheLookup]:
+        """
+        Look up a response for a prompt.
+
+        Returns None when the cache is disabled, otherwise a CacheLookup whose
+        tier tells whether (and how) it hit.
+        """
+        if not self.config.enabled:
+            return None
+
+        scope = (agent_name, model or '', output_type or '')
+        key = hashlib.sha1('\x00'.join((*scope, system_prompt or '', user_input or '')).encode('utf-8')).hexdigest()
+        now = time.time()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now - entry.created_at <= self.config.ttl_seconds:
+                self._entries.move_to_end(key)
+                self.stats['exact_hits'] += 1
+                return CacheLookup(tier='exact', scope=scope, key=key, response=entry.response)
+
+        if not self.semantic_enabled_for(agent_name):
+            with self._lock:
+                self.stats['misses'] += 1
+            return CacheLookup(tier='miss', scope=scope, key=key)
+
+        shingles = self.minhasher.shingles(f"{system_prompt}\n{user_input}")
+        band_keys = self.minhasher.band_keys(self.minhasher.signature(shingles))
+
+        with self._lock:
+            candidates = set()
+            for band_key in band_keys:
+                candidates.update(self._buckets.get((scope, band_key), ()))
+
+            best_key, best_similarity = None, 0.0
+            for candidate_key in candidates:
+                candidate = self._entries.get(candidate_key)
+                if candidate is None or candidate.shingles is None or now - candidate.created_at > self.config.ttl_seconds:
+                    continue
+                similarity = self.minhasher.jaccard(shingles, candidate.shingles)
+                if similarity > best_similarity:
+                    best_key, best_similarity = candidate_key, similarity
+
+            if best_key is not None and best_similarity >= self.config.semantic.similarity_threshold:
+                self._entries.move_to_end(best_key)
+                self.stats['semantic_hits'] += 1
+                return CacheLookup(tier='semantic', scope=scope, key=best_key,
+                                   response=self._entries[best_key].response, similarity=best_similarity)
+
+            self.stats['misses'] += 1
+        return CacheLookup(tier='miss', scope=scope, key=key, similarity=best_similarity,
+                           shingles=shingles, band_keys=band_keys)
+
+    def store(self, lookup: Optional[CacheLookup], response: str) -> None:
+        """Store the response for a missed lookup."""
+        if lookup is None or lookup.hit or not response:
+            return
+
+        entry = _CacheEntry(response=response, scope=lookup.scope, created_at=time.time(),
+                            shingles=lookup.shingles, band_keys=lookup.band_keys)
+        with self._lock:
+            self._remove(lookup.key)
+            self._entries[lookup.key] = entry
+            for band_key in entry.band_keys or ():
+                self._buckets.setdefault((entry.scope, band_key), set()).add(lookup.key)
+            while len(self._entries) > self.config.max_entries:
+                oldest_key = next(iter(self._entries))
+                self._remove(oldest_key)
+                self.stats['evictions'] += 1
+
+    def reject(self, lookup: Optional[CacheLookup]) -> None:
+        """Evict the entry a lookup was served from or stored to (its response was unusable or rated poorly)."""
+        if lookup is None:
+            return
+        with self._lock:
+            if self._remove(lookup.key):
+                self.stats['rejected'] += 1
+
+    def _remove(self, key: str) -> bool:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+        for band_key in entry.band_keys or ():
+            bucket = self._buckets.get((entry.scope, band_key))
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del self._buckets[(entry.scope, band_key)]
+        return True
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics."""
+        with self._lock:
+            return {**self.stats, 'entries': len(self._entries)}
+
+
+_response_cache: Optional[LLMResponseCache] = None
+_response_cache_lock = threading.Lock()
+
+
+def get_llm_response_cache(settings: Dict[str, Any] = None) -> LLMResponseCache:
+    """Get the process-wide response cache (created from the first settings seen)."""
+    global _response_cache
+    with _response_cache_lock:
+        if _response_cache is None:
+            _response_cache = LLMResponseCache(settings)
+        return _response_cache
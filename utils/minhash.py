@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+MinHash signatures and LSH banding over word shingles.
+
+Shared by the near-duplicate detector and the approximate LLM response cache.
+Texts are split into lowercase word shingles; each shingle set is summarised
+by a fixed-length MinHash signature whose band slices are used as bucket keys,
+so texts with high Jaccard similarity land in a common bucket with high
+probability. Permutations are seeded, so signatures are stable across runs.
+"""
+
+import random
+import re
+import zlib
+from typing import FrozenSet, Iterable, List, Tuple
+
+# Words of the normalised text
+WORD_PATTERN = re.compile(r'\w+')
+
+# Mersenne prime modulus for the MinHash permutations
+_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+
+class MinHasher:
+    """Word shingling, MinHash signatures and LSH band keys."""
+
+    def __init__(self, shingle_size: int = 2, num_permutations: int = 64, bands: int = 16, seed: int = 0x5EED):
+        self.shingle_size = max(1, shingle_size)
+        self.rows = max(1, num_permutations // max(1, bands))
+        self.bands = max(1, num_permutations // self.rows)
+        rng = random.Random(seed)
+        self._permutations = [
+            (rng.randrange(1, _PRIME), rng.randrange(0, _PRIME))
+            for _ in range(self.bands * self.rows)
+        ]
+
+    def shingles(self, text: str) -> FrozenSet[str]:
+        """Word shingles of the lowercased text."""
+        words = WORD_PATTERN.findall((text or '').lower())
+        size = self.shingle_size
+        if len(words) <= size:
+            return frozenset([' '.join(words)]) if words else frozenset()
+        return frozenset(' '.join(words[i:i + size]) for i in range(len(words) - size + 1))
+
+    def signature(self, shingles: Iterable[str]) -> Tuple[int, ...]:
+        """MinHash signature of a shingle set (empty for an empty set)."""
+        hashes = [zlib.crc32(shingle.encode('utf-8')) for shingle in shingles]
+        if not hashes:
+            return ()
+        return tuple(
+            min((a * h + b) % _PRIME for h in hashes) & _MAX_HASH
+            for a, b in self._permutations
+        )
+
+    def band_keys(self, signature: Tuple[int, ...]) -> List[Tuple[int, Tuple[int, ...]]]:
+        """LSH bucket keys (band index, band slice) of a signature."""
+        if not signature:
+            return []
+        return [
+            (band, signature[band * self.rows:(band + 1) * self.rows])
+            for band in range(self.bands)
+        ]
+
+    @staticmethod
+    def jaccard(first: FrozenSet[str], second: FrozenSet[str]) -> float:
+        """Exact Jaccard similarity of two shingle sets."""
+        if not first or not second:
+            return 0.0
+        return len(first & second) / len(first | second)
@@ -4,9 +4,12 @@ Model Fallback Manager - Handles intelligent model switching for quality optimiz
 
 import time
 from typing import List, Dict, Any, Optional, Tuple
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from utils.safe_logger import get_safe_logger
 
+# Quality ratings that approve an item as-is (configurable only for an enabled cascade)
+DEFAULT_ACCEPT_RATINGS = ("EXCELLENT", "GOOD")
+
 @dataclass
 class ModelConfig:
     """Configuration for a specific model."""
@@ -16,6 +19,14 @@ class ModelConfig:
     max_attempts: int
     strengths: List[str]  # What this model is good at
     
+@dataclass
+class CascadeConfig:
+    """Draft-then-refine cascade for one agent."""
+    enabled: bool = False
+    draft_model: Optional[str] = None   # Fast model that generates every item
+    refine_model: Optional[str] = None  # Larger model used only for items below the accept ratings
+    accept_ratings: List[str] = field(default_factory=lambda: list(DEFAULT_ACCEPT_RATINGS))
+
 @dataclass 
 class ModelAttempt:
     """Record of a model attempt."""
@@ -33,6 +44,10 @@ class ModelFallbackManager:
         self.logger = get_safe_logger(__name__)
         self.attempt_history: List[ModelAttempt] = []
         
+        # Proactive draft-then-refine cascade (see configure_cascade)
+        self.cascade = CascadeConfig()
+        self.cascade_stats = {"drafted": 0, "accepted_on_draft": 0, "refined": 0}
+        
         # Define model hierarchy for epic generation
         # Order: qwen2.5:14b first (better quality), then llama3.1:8b (faster fallback)
         self.epic_models = [
@@ -159,6 +174,71 @@ class ModelFallbackManager:
         
         return summary
     
+    def configure_cascade(self, settings: Dict[str, Any], agent_name: str, provider: str,
+                          default_model: str) -> CascadeConfig:
+        """
+        Load the draft-then-refine cascade for an agent from settings.
+        
+        Unlike the epic fallback above, which switches models after failures, the
+        cascade generates every item with a fast draft model and sends only the
+        items the quality assessors rate below the accept ratings to the larger
+        refine model (the agent's configured model unless overridden).
+        accept_ratings only apply while the cascade is enabled; otherwise items
+        are approved with DEFAULT_ACCEPT_RATINGS.
+        """
+        cascade_settings = settings.get('model_cascade', {}) or {}
+        agent_settings = (cascade_settings.get('agents', {}) or {}).get(agent_name, {}) or {}
+        providers = cascade_settings.get('providers', ['ollama'])
+        
+        draft_model = agent_settings.get('draft_model')
+        refine_model = agent_settings.get('refine_model') or default_model
+        enabled = bool(cascade_settings.get('enabled', False) and provider in providers
+                       and draft_model and draft_model != refine_model)
+        accept_ratings = cascade_settings.get('accept_ratings') if enabled else None
+        
+        self.cascade = CascadeConfig(
+            enabled=enabled,
+            draft_model=draft_model if enabled else None,
+            refine_model=refine_model if enabled else None,
+            accept_ratings=list(accept_ratings or DEFAULT_ACCEPT_RATINGS)
+        )
+        if enabled:
+            self.logger.info(f"[MODEL CASCADE] {agent_name}: draft with {draft_model}, refine with {refine_model}")
+        return self.cascade
+    
+    def get_draft_model(self) -> Optional[str]:
+        """Model for initial generation (None = the agent's configured model)."""
+        return self.cascade.draft_model if self.cascade.enabled else None
+    
+    def get_refine_model(self) -> Optional[str]:
+        """Model for improving items rated below the accept ratings (None = the agent's configured model)."""
+        return self.cascade.refine_model if self.cascade.enabled else None
+    
+    def is_accepted(self, rating: str) -> bool:
+        """True if a rating meets the configured accept ratings (the item needs no refinement)."""
+        return rating in self.cascade.accept_ratings
+    
+    def record_cascade_result(self, rating: str, refined: bool):
+        """Record whether a drafted item was accepted as-is or sent to the refine model."""
+        if not self.cascade.enabled:
+            return
+        self.cascade_stats["drafted"] += 1
+        if refined:
+            self.cascade_stats["refined"] += 1
+        elif rating in self.cascade.accept_ratings:
+            self.cascade_stats["accepted_on_draft"] += 1
+    
+    def get_cascade_summary(self) -> Dict[str, Any]:
+        """Get draft acceptance statistics for the cascade."""
+        drafted = self.cascade_stats["drafted"]
+        return {
+            "enabled": self.cascade.enabled,
+            "draft_model": self.cascade.draft_model,
+            "refine_model": self.cascade.refine_model,
+            **self.cascade_stats,
+            "draft_acceptance_rate": self.cascade_stats["accepted_on_draft"] / drafted if drafted else 0.0
+        }
+    
     def reset_attempts(self):
         """Reset attempt history for a new generation cycle."""
         self.attempt_history.clear()
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Near Duplicate Detector - drops reworded copies of generated work items.
+
+Over-generation and replacement cycles often return the same feature or user
+story twice with slightly different wording, and every copy would otherwise
+get its own tasks and test cases generated. Items are compared locally:
+their title and description text is split into word shingles, summarised as
+MinHash signatures and bucketed with locality-sensitive hashing, so only
+items sharing a bucket have their exact shingle Jaccard similarity checked.
+The first item of each duplicate group is kept; later copies are dropped, or
+merged into it when the action is 'merge'.
+"""
+
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Dict, Any, FrozenSet, List, Optional, Sequence, Tuple
+
+from utils.minhash import MinHasher
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class NearDuplicateConfig:
+    """Configuration for near-duplicate detection."""
+    enabled: bool = True
+    shingle_size: int = 2
+    similarity_threshold: float = 0.7
+    num_permutations: int = 64
+    bands: int = 16
+    action: str = 'drop'  # 'drop' or 'merge'
+    text_fields: Tuple[str, ...] = ('title', 'user_story', 'description')
+    merge_fields: Tuple[str, ...] = ('acceptance_criteria',)
+
+
+class NearDuplicateDetector:
+    """MinHash/LSH near-duplicate detection for generated work items of one job."""
+
+    def __init__(self, settings: Dict[str, Any] = None, job_id: Optional[str] = None):
+        self.job_id = job_id
+        self.config = self._load_config(settings or {})
+        self.minhasher = MinHasher(self.config.shingle_size, self.config.num_permutations, self.config.bands)
+        self._lock = threading.Lock()
+        self.stats = {'compared': 0, 'dropped': 0, 'merged': 0}
+
+    def _load_config(self, settings: Dict[str, Any]) -> NearDuplicateConfig:
+        """Load near-duplicate configuration from settings dict."""
+        dedup_config = settings.get('near_duplicates', {}) or {}
+        defaults = NearDuplicateConfig()
+        return NearDuplicateConfig(
+            enabled=dedup_config.get('enabled', defaults.enabled),
+            shingle_size=max(1, int(dedup_config.get('shingle_size', defaults.shingle_size))),
+            similarity_threshold=float(dedup_config.get('similarity_threshold', defaults.similarity_threshold)),
+            num_permutations=max(1, int(dedup_config.get('num_permutations', defaults.num_permutations))),
+            bands=max(1, int(dedup_config.get('bands', defaults.bands))),
+            action=dedup_config.get('action', defaults.action),
+            text_fields=tuple(dedup_config.get('text_fields', defaults.text_fields)),
+            merge_fields=tuple(dedup_config.get('merge_fields', defaults.merge_fields))
+        )
+
+    def item_text(self, item: Any) -> str:
+        """Text an item is compared on (configured fields of a dict, or the string itself)."""
+        if isinstance(item, str):
+            return item
+        if not isinstance(item, dict):
+            return ''
+        return ' '.join(str(item.get(field_name) or '') for field_name in self.config.text_fields)
+
+    def shingles(self, text: str) -> FrozenSet[str]:
+        """Word shingles of the lowercased text."""
+        return self.minhasher.shingles(text)
+
+    def find_duplicates(self, items: Sequence[Any], reference_count: int = 0) -> Dict[int, int]:
+        """
+        Find near-duplicates in a list of items.
+
+        Args:
+            items: Items in priority order (earlier items win)
+            reference_count: Number of leading items that are only compared
+                against, never reported as duplicates (e.g. already approved items)
+
+        Returns:
+            Mapping of duplicate index -> index of the earlier item it duplicates
+        """
+        if not self.config.enabled or len(items) < 2:
+            return {}
+
+        shingle_sets = [self.shingles(self.item_text(item)) for item in items]
+        buckets: Dict[Tuple[int, Tuple[int, ...]], List[int]] = {}
+        duplicates: Dict[int, int] = {}
+        compared = 0
+
+        for index, shingle_set in enumerate(shingle_sets):
+            band_keys = self.minhasher.band_keys(self.minhasher.signature(shingle_set))
+            if not band_keys:
+                continue
+
+            if index >= reference_count:
+                candidates = sorted({
+                    candidate for key in band_keys for candidate in buckets.get(key, ())
+                })
+                for candidate in candidates:
+                    compared += 1
+                    if self.minhasher.jaccard(shingle_set, shingle_sets[candidate]) >= self.config.similarity_threshold:
+                        duplicates[index] = candidate
+                        break
+                if index in duplicates:
+                    continue
+
+            for key in band_keys:
+                buckets.setdefault(key, []).append(index)
+
+        with self._lock:
+            self.stats['compared'] += compared
+        return duplicates
+
+    def merge_into(self, kept: Any, duplicate: Any) -> None:
+        """Merge the duplicate's list fields into the kept item (new entries only)."""
+        if not isinstance(kept, dict) or not isinstance(duplicate, dict):
+            return
+        for field_name in self.config.merge_fields:
+            extra = duplicate.get(field_name)
+            if not isinstance(extra, list):
+                continue
+            current = kept.get(field_name)
+            if not isinstance(current, list):
+                current = [] if current in (None, '') else [current]
+            seen = {str(entry).strip().lower() for entry in current}
+            for entry in extra:
+                if str(entry).strip().lower() not in seen:
+                    current.append(entry)
+                    seen.add(str(entry).strip().lower())
+            kept[field_name] = current
+
+    def deduplicate(self, items: Sequence[Any], existing: Sequence[Any] = (), label: str = 'item') -> List[Any]:
+        """
+        Remove near-duplicates from items, keeping the first of each group.
+
+        Items duplicating an entry of existing are removed as well (merged into
+        that entry when the action is 'merge'); existing itself is not returned.
+        """
+        items = list(items or [])
+        if not self.config.enabled or not items:
+            return items
+
+        existing = list(existing or [])
+        combined = existing + items
+        duplicates = self.find_duplicates(combined, reference_count=len(existing))
+        if not duplicates:
+            return items
+
+        for duplicate_index, kept_index in duplicates.items():
+            if self.config.action == 'merge':
+                self.merge_into(combined[kept_index], combined[duplicate_index])
+            self._log_duplicate(label, combined[duplicate_index], combined[kept_index])
+
+        self._record(len(duplicates))
+        return [item for index, item in enumerate(combined[len(existing):], start=len(existing))
+                if index not in duplicates]
+
+    def deduplicate_children(self, parents: Sequence[Dict[str, Any]], child_key: str, label: str = 'item') -> int:
+        """
+        Remove near-duplicate children across all parents (e.g. features of every epic).
+
+        Children are compared in parent order, so the copy under the earliest
+        parent is kept. Returns the number of children removed.
+        """
+        if not self.config.enabled:
+            return 0
+
+        owners = []
+        children = []
+        for parent in parents:
+            if not isinstance(parent, dict):
+                continue
+            for child in parent.get(child_key) or []:
+                owners.append(parent)
+                children.append(child)
+
+        duplicates = self.find_duplicates(children)
+        if not duplicates:
+            return 0
+
+        for duplicate_index, kept_index in duplicates.items():
+            if self.config.action == 'merge':
+                self.merge_into(children[kept_index], children[duplicate_index])
+            self._log_duplicate(label, children[duplicate_index], children[kept_index])
+
+        dropped_ids = {id(children[index]) for index in duplicates}
+        for parent in {id(owner): owner for owner in owners}.values():
+            parent[child_key] = [child for child in parent[child_key] if id(child) not in dropped_ids]
+
+        self._record(len(duplicates))
+        return len(duplicates)
+
+    def _log_duplicate(self, label: str, duplicate: Any, kept: Any) -> None:
+        action = 'Merged' if self.config.action == 'merge' else 'Dropped'
+        logger.info(f"[NEAR DUPLICATE] {action} {label} '{self.item_text(duplicate)[:80]}' "
+                    f"(duplicates '{self.item_text(kept)[:80]}')")
+
+    def _record(self, count: int) -> None:
+        with self._lock:
+            self.stats['dropped'] += count
+            if self.config.action == 'merge':
+                self.stats['merged'] += count
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get detection statistics for this job."""
+        with self._lock:
+            return {**self.stats, 'job_id': self.job_id}
@@ -8,20 +8,105 @@ agent system. Supports GPU acceleration via CUDA and multiple model options.
 
 import os
 import json
+import hashlib
 import logging
+import threading
 import requests
+from collections import OrderedDict
 from typing import Dict, Any, Optional, List
 from datetime import datetime
 import time
 
 logger = logging.getLogger(__name__)
 
+
+class PromptCacheStats:
+    """
+    Tracks how much of each prompt Ollama/llama.cpp reused from its KV cache.
+    
+    Ollama only reports prompt_eval_count - the tokens it actually evaluated.
+    The first call with a new system prompt is a cold evaluation and gives a
+    chars-per-token ratio for that model; later calls use the ratio to estimate
+    the full prompt size, and the difference is the cached prefix.
+    
+    A prompt new to this process may still hit a prefix Ollama cached earlier
+    (another process, or a prompt sharing the prefix), which inflates its ratio.
+    Ratios outside a plausible range are ignored, and the lowest plausible one
+    is kept, since cached tokens can only make a measurement too high.
+    """
+    
+    MAX_TRACKED_PREFIXES = 512
+    MIN_CHARS_PER_TOKEN = 2.0
+    MAX_CHARS_PER_TOKEN = 6.0
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._seen_prefixes = OrderedDict()
+        self._chars_per_token: Dict[str, float] = {}
+        self._totals: Dict[str, Dict[str, int]] = {}
+    
+    def record(self, model: str, system_prompt: str, prompt_chars: int, prompt_eval_count: int) -> Optional[float]:
+        """Record one generation and return its estimated cache hit rate (None when cold)."""
+        prefix_key = (model, hashlib.md5((system_prompt or '').encode('utf-8')).hexdigest())
+        with self._lock:
+            totals = self._totals.setdefault(model, {'calls': 0, 'prompt_tokens': 0, 'cached_tokens': 0})
+            totals['calls'] += 1
+            
+            cold = prefix_key not in self._seen_prefixes
+            self._seen_prefixes[prefix_key] = True
+            self._seen_prefixes.move_to_end(prefix_key)
+            while len(self._seen_prefixes) > self.MAX_TRACKED_PREFIXES:
+                self._seen_prefixes.popitem(last=False)
+            
+            if cold and prompt_eval_count:
+                measured = prompt_chars / prompt_eval_count
+                current = self._chars_per_token.get(model)
+                if self.MIN_CHARS_PER_TOKEN <= measured <= self.MAX_CHARS_PER_TOKEN and (
+                        current is None or measured < current):
+                    self._chars_per_token[model] = measured
+            
+            ratio = self._chars_per_token.get(model)
+            if not ratio:
+                return None
+            
+            estimated_tokens = max(int(prompt_chars / ratio), prompt_eval_count)
+            cached_tokens = 0 if cold else estimated_tokens - prompt_eval_count
+            totals['prompt_tokens'] += estimated_tokens
+            totals['cached_tokens'] += cached_tokens
+            return None if cold else cached_tokens / max(estimated_tokens, 1)
+    
+    def chars_per_token(self, model: str) -> Optional[float]:
+        """Measured chars-per-token ratio for a model (None until a cold call was seen)."""
+        with self._lock:
+            return self._chars_per_token.get(model)
+
+    def summary(self, model: str = None) -> Dict[str, Any]:
+        """Get cache reuse totals for one model, or all models."""
+        with self._lock:
+            models = [model] if model else list(self._totals.keys())
+            result = {}
+            for name in models:
+                totals = self._totals.get(name, {'calls': 0, 'prompt_tokens': 0, 'cached_tokens': 0})
+                result[name] = {
+                    **totals,
+                    'hit_rate': totals['cached_tokens'] / totals['prompt_tokens'] if totals['prompt_tokens'] else 0.0
+                }
+            return result[model] if model else result
+
+
+# Process-wide stats shared by all Ollama clients
+prompt_cache_stats = PromptCacheStats()
+
+
 class OllamaClient:
     """Ollama client for local LLM inference."""
     
-    def __init__(self, base_url: str = "http://localhost:11434", model: str = "llama3.1:8b"):
+    def __init__(self, base_url: str = "http://localhost:11434", model: str = "llama3.1:8b",
+                 keep_alive: Optional[str] = None):
         self.base_url = base_url
         self.model = model
+        # How long Ollama keeps the model (and its prompt KV cache) loaded between calls
+        self.keep_alive = keep_alive
         self.session = requests.Session()
         # Don't set session timeout - we'll use per-request timeouts instead
         
@@ -46,7 +131,8 @@ class OllamaClient:
                 system_prompt: str = None,
                 temperature: float = 0.7,
                 max_tokens: int = 8000,
-                stream: bool = False) -> Dict[str, Any]:
+                stream: bool = False,
+                output_format: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
         Generate text using Ollama.
         
@@ -56,6 +142,7 @@ class OllamaClient:
             temperature: Sampling temperature (0.0-1.0)
             max_tokens: Maximum tokens to generate
             stream: Whether to stream the response
+            output_format: JSON schema to constrain the response to (Ollama 'format')
             
         Returns:
             Dictionary with 'content' and metadata
@@ -81,6 +168,10 @@ class OllamaClient:
                 },
                 "stream": stream
             }
+            if output_format:
+                payload["format"] = output_format
+            if self.keep_alive:
+                payload["keep_alive"] = self.keep_alive
             
             logger.info(f"[OLLAMA] Generating with Ollama model: {self.model}")
             logger.debug(f"[OLLAMA] Request payload: {json.dumps(payload, indent=2)}")
@@ -106,6 +197,13 @@ class OllamaClient:
             logger.info(f"[OLLAMA] Generated {len(content)} characters in {generation_time:.2f}s")
             logger.info(f"[OLLAMA] Tokens used: {tokens_used}")
             
+            prompt_eval_count = data.get("prompt_eval_count", 0)
+            cache_hit_rate = prompt_cache_stats.record(
+                self.model, system_prompt, sum(len(m["content"]) for m in messages), prompt_eval_count
+            )
+            if cache_hit_rate is not None:
+                logger.info(f"[OLLAMA] Prompt cache: evaluated {prompt_eval_count} prompt tokens ({cache_hit_rate:.0%} reused from KV cache)")
+            
             return {
                 "content": content,
                 "model": self.model,
@@ -113,6 +211,8 @@ class OllamaClient:
                 "tokens_used": tokens_used,
                 "total_duration": data.get("total_duration", 0),
                 "load_duration": data.get("load_duration", 0),
+                "prompt_eval_count": prompt_eval_count,
+                "prompt_cache_hit_rate": cache_hit_rate,
                 "prompt_eval_duration": data.get("prompt_eval_duration", 0),
                 "eval_duration": data.get("eval_duration", 0)
             }
@@ -219,13 +319,14 @@ class OllamaProvider:
         self.config = config
         self.model = config.get("model", "llama3.1:8b")
         self.base_url = config.get("base_url", "http://localhost:11434")
-        self.client = OllamaClient(base_url=self.base_url, model=self.model)
+        self.client = OllamaClient(base_url=self.base_url, model=self.model, keep_alive=config.get("keep_alive"))
         
     def generate_response(self, 
                          system_prompt: str, 
                          user_input: str, 
                          temperature: float = None,
-                         max_tokens: int = None) -> str:
+                         max_tokens: int = None,
+                         output_format: Optional[Dict[str, Any]] = None) -> str:
         """Generate response using Ollama."""
         try:
             # Use values from config if not explicitly provided
@@ -238,7 +339,8 @@ class OllamaProvider:
                 prompt=user_input,
                 system_prompt=system_prompt,
                 temperature=temp,
-                max_tokens=tokens
+                max_tokens=tokens,
+                output_format=output_format
             )
             
             # Log cost estimate
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Progress Channel - sequence-numbered progress deltas for the WebSocket channel.
+
+Every job's progress state (stage, counts, newly created item IDs, ...) is
+kept in a ProgressJournal. Each change is published as a delta carrying only
+the changed fields and a per-job sequence number that increases by one per
+delta. The journal keeps the most recent deltas of every job, so a client
+that reconnects sends the last sequence it applied and receives only the
+deltas it missed; clients too far behind get one full snapshot instead.
+
+Delta fields are applied as follows:
+- dict values are merged one level deep (e.g. artifactCounts),
+- APPEND_FIELDS carry only the new entries, appended to the list,
+- all other values replace the previous value.
+"""
+
+import copy
+import threading
+from collections import OrderedDict, deque
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+# List fields whose deltas carry only new entries
+APPEND_FIELDS = ('createdItemIds',)
+
+ProgressListener = Callable[[Dict[str, Any]], None]
+
+
+class _JobJournal:
+    def __init__(self, history_size: int):
+        self.seq = 0
+        self.state: Dict[str, Any] = {}
+        self.history = deque(maxlen=history_size)
+
+
+class ProgressJournal:
+    """Thread-safe per-job progress state with a bounded history of deltas."""
+
+    def __init__(self, history_size: int = 256, max_jobs: int = 500):
+        self.history_size = history_size
+        self.max_jobs = max_jobs
+        self._jobs: "OrderedDict[str, _JobJournal]" = OrderedDict()
+        self._listeners: List[ProgressListener] = []
+        self._lock = threading.Lock()
+
+    def publish(self, job_id: str, fields: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Record new values of a job's progress fields.
+
+        Fields not given keep their value. Returns the delta event, or None if
+        nothing changed.
+        """
+        with self._lock:
+            journal = self._jobs.get(job_id)
+            if journal is None:
+                journal = self._jobs[job_id] = _JobJournal(self.history_size)
+                while len(self._jobs) > self.max_jobs:
+                    self._jobs.popitem(last=False)
+            else:
+                self._jobs.move_to_end(job_id)
+
+            changes = _diff(journal.state, fields)
+            if not changes:
+                return None
+            _apply(journal.state, changes)
+            journal.seq += 1
+            event = {
+                'type': 'delta',
+                'jobId': job_id,
+                'seq': journal.seq,
+                'changes': changes,
+                'timestamp': datetime.now().isoformat()
+            }
+            journal.history.append(event)
+            listeners = list(self._listeners)
+
+        for listener in listeners:
+            listener(event)
+        return event
+
+    def snapshot(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Full state of a job at its current sequence."""
+        with self._lock:
+            journal = self._jobs.get(job_id)
+            if journal is None:
+                return None
+            return {
+                'type': 'snapshot',
+                'jobId': job_id,
+                'seq': journal.seq,
+                'state': copy.deepcopy(journal.state),
+                'timestamp': datetime.now().isoformat()
+            }
+
+    def resume(self, job_id: str, after_seq: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Events a client that applied up to after_seq needs to catch up.
+
+        Returns the missed deltas if they are all still in the history, a
+        single snapshot otherwise (or for after_seq None/0), and an empty list
+        for unknown jobs or clients already up to date.
+        """
+        with self._lock:
+            journal = self._jobs.get(job_id)
+            if journal is None or (after_seq and after_seq == journal.seq):
+                return []
+            if after_seq and after_seq < journal.seq and journal.history and journal.history[0]['seq'] <= after_seq + 1:
+                return [event for event in journal.history if event['seq'] > after_seq]
+        snapshot = self.snapshot(job_id)
+        return [snapshot] if snapshot else []
+
+    def add_listener(self, listener: ProgressListener):
+        """Call listener(event) for every delta of every job (from the publishing thread)."""
+        with self._lock:
+            self._listeners.append(listener)
+
+    def remove_listener(self, listener: ProgressListener):
+        with self._lock:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+
+def _diff(state: Dict[str, Any], fields: Dict[str, Any]) -> Dict[str, Any]:
+    changes = {}
+    for key, value in fields.items():
+        old = state.get(key)
+        if key in APPEND_FIELDS and isinstance(value, list):
+            old = old or []
+            new_entries = value[len(old):] if value[:len(old)] == old else [v for v in value if v not in old]
+            if new_entries:
+                changes[key] = list(new_entries)
+        elif isinstance(value, dict) and isinstance(old, dict):
+            changed = {k: v for k, v in value.items() if old.get(k) != v or k not in old}
+            if changed:
+                changes[key] = copy.deepcopy(changed)
+        elif key not in state or old != value:
+            changes[key] = copy.deepcopy(value)
+    return changes
+
+
+def _apply(state: Dict[str, Any], changes: Dict[str, Any]):
+    for key, value in changes.items():
+        if key in APPEND_FIELDS:
+            state.setdefault(key, []).extend(value)
+        elif isinstance(value, dict) and isinstance(state.get(key), dict):
+            state[key].update(copy.deepcopy(value))
+        else:
+            state[key] = copy.deepcopy(value)
@@ -1,13 +1,26 @@
 import os
 import json
 import hashlib
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
 from string import Template
 from datetime import datetime
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Template variables that change per work item (or per call). In the shared-prefix
+# layout they are rendered as <name> placeholders so the system prompt is identical
+# across calls of the same agent, and their values are sent after it.
+VOLATILE_VARIABLES = frozenset({
+    'timestamp',
+    'max_epics', 'max_features', 'max_user_stories', 'max_tasks',
+    'epic_title', 'epic_description', 'epic_priority', 'epic_context',
+    'feature_title', 'feature_description', 'feature_priority', 'feature_context',
+    'feature_ui_ux_requirements', 'feature_technical_considerations', 'feature_business_value',
+    'user_story_title', 'user_story_description', 'user_story_acceptance_criteria',
+    'acceptance_criteria_text', 'user_stories_text', 'priority',
+})
+
 class PromptTemplateManager:
     """Manages modular, template-based prompts with dynamic context injection and versioning."""
     
@@ -140,6 +153,39 @@ class PromptTemplateManager:
             logger.error(f"Error generating prompt for {agent_name}: {e}")
             raise ValueError(f"Failed to generate prompt for {agent_name}: {e}")
     
+    def get_prompt_parts(self, agent_name: str, context: Dict[str, Any] = None) -> Tuple[str, str]:
+        """
+        Generate a prompt split into a stable prefix and a per-item block.
+        
+        Stable content (template text, product vision, domain context) stays in the
+        system prompt; per-item variables become <name> placeholders whose values are
+        returned separately so callers can send them last. Repeated calls of the same
+        agent then share the whole system prompt, letting Ollama/llama.cpp reuse the
+        prompt KV cache instead of re-evaluating the vision context every time.
+        
+        Args:
+            agent_name: Name of the agent (matches template filename without .txt)
+            context: Dictionary of variables to substitute in the template
+            
+        Returns:
+            Tuple of (stable system prompt, per-item details block - may be empty)
+        """
+        context = context or {}
+        required_vars = self.template_metadata.get(agent_name, {}).get('required_variables', [])
+        volatile_vars = [var for var in required_vars if var in VOLATILE_VARIABLES and var != 'timestamp']
+
+        # Let get_prompt report missing variables instead of masking them with placeholders
+        if not volatile_vars or any(var not in context for var in volatile_vars):
+            return self.get_prompt(agent_name, context), ''
+
+        # A per-call timestamp would break the shared prefix on every request
+        stable_context = {**context, **{var: f"<{var}>" for var in volatile_vars}, 'timestamp': ''}
+        system_prompt = self.get_prompt(agent_name, stable_context)
+        
+        item_lines = [f"<{var}>: {context[var]}" for var in volatile_vars]
+        item_block = "ITEM DETAILS (values for the <placeholders> in the instructions):\n" + "\n".join(item_lines)
+        return system_prompt, item_block
+    
     def _get_fallback_value(self, variable: str) -> str:
         """Provide fallback values for missing template variables."""
         fallbacks = {
@@ -18,6 +18,8 @@ from typing import Dict, List, Any, Optional
 from dataclasses import dataclass, asdict
 from pathlib import Path
 
+from utils.schema_migrations import ensure_schema
+
 logger = logging.getLogger(__name__)
 
 @dataclass
@@ -71,7 +73,7 @@ class QualityMetricsTracker:
     
     def __init__(self, db_path: str = "backlog_jobs.db"):
         self.db_path = db_path
-        self.init_database()
+        ensure_schema(self.db_path, 'quality_metrics', self.init_database)
     
     def init_database(self):
         """Initialize quality metrics tracking tables."""
@@ -128,11 +130,27 @@ class QualityMetricsTracker:
                 )
             ''')
             
+            # LLM response cache lookups and the quality of items built from hits
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS llm_cache_events (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    job_id TEXT,
+                    agent_name TEXT NOT NULL,
+                    event TEXT NOT NULL,  -- 'lookup' or 'outcome'
+                    tier TEXT NOT NULL,  -- 'exact', 'semantic' or 'miss'
+                    similarity REAL,
+                    rating TEXT,
+                    score INTEGER,
+                    created_at TEXT DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+            
             # Indexes for performance
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_quality_metrics_job_agent ON quality_metrics (job_id, agent_name)')
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_quality_metrics_model ON quality_metrics (model_provider, model_name)')
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_quality_metrics_domain ON quality_metrics (domain)')
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_quality_attempts_metrics ON quality_attempts (metrics_id)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_llm_cache_events_agent ON llm_cache_events (agent_name, event, tier)')
             
             conn.commit()
     
@@ -225,6 +243,59 @@ class QualityMetricsTracker:
         
         logger.info(f"Completed quality tracking {metrics_id}: {final_rating} ({final_score}) in {total_attempts} attempts")
     
+    def record_cache_event(self, job_id: Optional[str], agent_name: str, event: str, tier: str,
+                           similarity: Optional[float] = None, rating: Optional[str] = None,
+                           score: Optional[int] = None):
+        """Record an LLM response cache lookup or the quality outcome of a cached response."""
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute('''
+                INSERT INTO llm_cache_events (job_id, agent_name, event, tier, similarity, rating, score)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', (job_id, agent_name, event, tier, similarity, rating, score))
+        
+        logger.debug(f"Recorded cache {event} for {agent_name}: {tier} {rating or ''}")
+    
+    def get_cache_summary(self, agent_name: Optional[str] = None, days: int = 7) -> Dict[str, Any]:
+        """Get LLM response cache hit rates and hit quality per agent over specified days."""
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            
+            where_clause = "WHERE datetime(created_at) >= datetime('now', '-{} days')".format(days)
+            params = ()
+            if agent_name:
+                where_clause += " AND agent_name = ?"
+                params = (agent_name,)
+            
+            cursor.execute(f'''
+                SELECT 
+                    agent_name,
+                    SUM(CASE WHEN event = 'lookup' THEN 1 ELSE 0 END) as lookups,
+                    SUM(CASE WHEN event = 'lookup' AND tier = 'exact' THEN 1 ELSE 0 END) as exact_hits,
+                    SUM(CASE WHEN event = 'lookup' AND tier = 'semantic' THEN 1 ELSE 0 END) as semantic_hits,
+                    AVG(CASE WHEN event = 'lookup' AND tier = 'semantic' THEN similarity END) as avg_similarity,
+                    SUM(CASE WHEN event = 'outcome' AND tier = 'semantic' THEN 1 ELSE 0 END) as semantic_outcomes,
+                    SUM(CASE WHEN event = 'outcome' AND tier = 'semantic' AND rating IN ('EXCELLENT', 'GOOD') THEN 1 ELSE 0 END) as semantic_good,
+                    SUM(CASE WHEN event = 'outcome' AND tier = 'miss' THEN 1 ELSE 0 END) as miss_outcomes,
+                    SUM(CASE WHEN event = 'outcome' AND tier = 'miss' AND rating IN ('EXCELLENT', 'GOOD') THEN 1 ELSE 0 END) as miss_good
+                FROM llm_cache_events
+                {where_clause}
+                GROUP BY agent_name
+            ''', params)
+            
+            summary = {}
+            for row in cursor.fetchall():
+                lookups = row[1] or 0
+                summary[row[0]] = {
+                    'lookups': lookups,
+                    'exact_hit_rate': round((row[2] / lookups) * 100, 1) if lookups else 0,
+                    'semantic_hit_rate': round((row[3] / lookups) * 100, 1) if lookups else 0,
+                    'avg_semantic_similarity': round(row[4], 3) if row[4] else 0,
+                    'semantic_good_rate': round((row[6] / row[5]) * 100, 1) if row[5] else 0,
+                    'uncached_good_rate': round((row[8] / row[7]) * 100, 1) if row[7] else 0
+                }
+            
+            return summary
+    
     def get_agent_performance_summary(self, agent_name: Optional[str] = None, 
                                     days: int = 7) -> Dict[str, Any]:
         """Get performance summary for agent(s) over specified days."""
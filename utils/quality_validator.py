@@ -8,6 +8,11 @@ with the standards monitored by the Backlog Sweeper Agent.
 import re
 from typing import Dict, List, Any, Tuple, Optional
 
+from utils.text_feature_cache import TextFeatureCache
+
+# Qualifiers that make otherwise vague criteria measurable
+SPECIFIC_QUALIFIER_PATTERN = re.compile(r'\d+|specific|exact|precise|clearly|successfully')
+
 
 class WorkItemQualityValidator:
     """
@@ -31,6 +36,13 @@ class WorkItemQualityValidator:
             self.max_criteria_count = 8
             self.require_bdd_format = True
             self.require_functional_and_nonfunctional = True
+        
+        # Text features (lowercase, BDD keywords, keyword hits), shared per job via set_text_feature_cache
+        self.text_features = TextFeatureCache(config)
+    
+    def set_text_feature_cache(self, text_features: TextFeatureCache):
+        """Share a job-level text feature cache with this validator."""
+        self.text_features = text_features
     
     def validate_user_story_description(self, description: str) -> Tuple[bool, List[str]]:
         """
@@ -77,30 +89,27 @@ class WorkItemQualityValidator:
         
         # Check for BDD format (if required)
         if self.require_bdd_format:
-            bdd_count = 0
-            for criteria_text in criteria:
-                if re.search(r'\b(given|when|then)\b', criteria_text.lower()):
-                    bdd_count += 1
+            bdd_count = sum(1 for criteria_text in criteria if self.text_features.has_bdd_keyword(criteria_text))
             
             if bdd_count == 0:
                 issues.append("Consider using Given-When-Then (BDD) format for acceptance criteria clarity")
         
         # Check for functional vs non-functional criteria mix (if required)
         if self.require_functional_and_nonfunctional:
-            functional_indicators = ['user can', 'system shall', 'application will', 'feature allows', 'button click', 'form submit', 'displays', 'shows']
-            nonfunctional_indicators = ['performance', 'response time', 'security', 'usability', 'accessibility', 'reliability', 'scalability', 'within', 'seconds', 'concurrent']
+            functional_indicators = ('user can', 'system shall', 'application will', 'feature allows', 'button click', 'form submit', 'displays', 'shows')
+            nonfunctional_indicators = ('performance', 'response time', 'security', 'usability', 'accessibility', 'reliability', 'scalability', 'within', 'seconds', 'concurrent')
             
-            has_functional = any(any(indicator in criteria_text.lower() for indicator in functional_indicators) for criteria_text in criteria)
-            has_nonfunctional = any(any(indicator in criteria_text.lower() for indicator in nonfunctional_indicators) for criteria_text in criteria)
+            has_functional = any(self.text_features.contains_any(criteria_text, functional_indicators) for criteria_text in criteria)
+            has_nonfunctional = any(self.text_features.contains_any(criteria_text, nonfunctional_indicators) for criteria_text in criteria)
             
             if has_functional and not has_nonfunctional:
                 issues.append("Consider adding non-functional acceptance criteria (performance, security, usability)")
         
         # Check for vague or unmeasurable criteria
-        vague_words = ['better', 'faster', 'easier', 'improved', 'enhanced', 'good', 'bad', 'nice', 'properly', 'correctly']
+        vague_words = ('better', 'faster', 'easier', 'improved', 'enhanced', 'good', 'bad', 'nice', 'properly', 'correctly')
         for i, criteria_text in enumerate(criteria):
-            if any(vague_word in criteria_text.lower() for vague_word in vague_words):
-                if not re.search(r'\d+|specific|exact|precise|clearly|successfully', criteria_text.lower()):
+            if self.text_features.contains_any(criteria_text, vague_words):
+                if not self.text_features.search(criteria_text, SPECIFIC_QUALIFIER_PATTERN):
                     issues.append(f"Criteria {i+1} contains vague language. Make it more specific and measurable")
         
         return len(issues) == 0, issues
@@ -337,10 +346,9 @@ class WorkItemQualityValidator:
             Tuple of (is_valid, issues_found)
         """
         issues = []
-        content_lower = content.lower()
         
         # Check for generic phrases that should be more specific
-        generic_phrases = [
+        generic_phrases = (
             'implement functionality',
             'provide capability',
             'enable feature',
@@ -356,22 +364,23 @@ class WorkItemQualityValidator:
             'provide interface',
             'create interface',
             'implement interface'
-        ]
+        )
         
+        generic_hits = self.text_features.keyword_hits(content, generic_phrases)
         for phrase in generic_phrases:
-            if phrase in content_lower:
+            if phrase in generic_hits:
                 issues.append(f"{content_type} contains generic phrase '{phrase}' - be more specific about what exactly should be implemented")
         
         # Check for missing concrete details
         if content_type == 'description':
             # Look for quantifiable metrics or specific behaviors
-            has_specifics = any(indicator in content_lower for indicator in [
+            has_specifics = self.text_features.contains_any(content, (
                 'exactly', 'within', 'seconds', 'minutes', 'hours', 'days',
                 'percentage', '%', 'number', 'count', 'amount', 'size',
                 'format', 'type', 'method', 'approach', 'algorithm',
                 'database', 'api', 'endpoint', 'service', 'component',
                 'workflow', 'process', 'step', 'action', 'behavior'
-            ])
+            ))
             
             if not has_specifics and len(content) > 20:
                 issues.append(f"{content_type} lacks specific details - include concrete behaviors, formats, or measurable outcomes")
@@ -379,14 +388,14 @@ class WorkItemQualityValidator:
         # Check for actionable language
         if content_type in ['criteria', 'task']:
             # Should contain action words
-            action_words = [
+            action_words = (
                 'click', 'select', 'enter', 'submit', 'save', 'delete', 'update',
                 'display', 'show', 'hide', 'validate', 'verify', 'check',
                 'calculate', 'process', 'generate', 'create', 'remove',
                 'navigate', 'redirect', 'filter', 'sort', 'search'
-            ]
+            )
             
-            has_action = any(word in content_lower for word in action_words)
+            has_action = self.text_features.contains_any(content, action_words)
             if not has_action:
                 issues.append(f"{content_type} should contain specific action words (e.g., click, enter, display, validate)")
         
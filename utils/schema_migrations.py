@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Schema Migrations - run table setup once per schema version.
+
+Database, WorkItemStaging, QualityMetricsTracker, UserAuthManager, the job
+archive and the ADO mirror create their tables and apply column migrations
+when they are constructed, and several of them are constructed per request
+or per job. Their setup is run through ensure_schema(): the version applied to
+a database file is stored in its schema_versions table, so the setup runs only
+when SCHEMA_VERSIONS names a newer version. Databases already checked by this
+process are remembered, so later constructions do no SQLite work at all.
+
+A setup that raises leaves the stored version untouched, so the setup is
+retried by the next construction. Setups must therefore let errors
+propagate; add_column() ignores only the "duplicate column" error of a
+column migration that already ran.
+
+Bump a component's version here whenever its setup gains new DDL.
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+from typing import Callable, Dict, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Current schema version of each component's tables
+SCHEMA_VERSIONS: Dict[str, int] = {
+    'database': 1,
+    'work_item_staging': 1,
+    'quality_metrics': 1,
+    'user_auth': 1,
+    'job_archive': 1,
+    'ado_mirror': 1,
+}
+
+_lock = threading.Lock()
+# (database path, component, version) -> (device, inode) of the file checked at that version
+_checked: Dict[Tuple[str, str, int], Tuple[int, int]] = {}
+
+
+def _file_identity(db_path: str):
+    try:
+        stat = os.stat(db_path)
+    except OSError:
+        return None
+    return stat.st_dev, stat.st_ino
+
+
+def add_column(conn, table: str, column_definition: str) -> bool:
+    """
+    Add a column to a table unless it already exists.
+
+    Args:
+        conn: SQLite connection or cursor
+        table: Table name
+        column_definition: Column name, type and constraints
+
+    Returns:
+        True if the column was added
+
+    Raises:
+        sqlite3.OperationalError: For any error other than the column existing
+    """
+    try:
+        conn.execute(f"ALTER TABLE {table} ADD COLUMN {column_definition}")
+    except sqlite3.OperationalError as e:
+        if 'duplicate column name' not in str(e).lower():
+            raise
+        return False
+    return True
+
+
+def ensure_schema(db_path: str, component: str, setup: Callable[[], None]) -> bool:
+    """
+    Run a component's schema setup unless the database is already at its version.
+
+    Args:
+        db_path: SQLite database file
+        component: Key of SCHEMA_VERSIONS
+        setup: Idempotent setup (CREATE ... IF NOT EXISTS and column migrations)
+
+    Returns:
+        True if the setup ran
+
+    Raises:
+        Whatever the setup raises; the version is then not recorded
+    """
+    version = SCHEMA_VERSIONS[component]
+    in_memory = db_path == ':memory:' or db_path.startswith('file::memory:')
+    key = (os.path.realpath(db_path), component, version)
+
+    if not in_memory:
+        identity = _file_identity(db_path)
+        with _lock:
+            if identity is not None and _checked.get(key) == identity:
+                return False
+
+        if identity is not None and _stored_version(db_path, component) >= version:
+            with _lock:
+                _checked[key] = identity
+            return False
+
+    setup()
+
+    if not in_memory:
+        with sqlite3.connect(db_path) as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS schema_versions (
+                    component TEXT PRIMARY KEY,
+                    version INTEGER NOT NULL,
+                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+            conn.execute("""
+                INSERT OR REPLACE INTO schema_versions (component, version, updated_at)
+                VALUES (?, ?, CURRENT_TIMESTAMP)
+            """, (component, version))
+            conn.commit()
+        with _lock:
+            _checked[key] = _file_identity(db_path)
+        logger.info(f"Schema of {component} in {db_path} is at version {version}")
+    return True
+
+
+def _stored_version(db_path: str, component: str) -> int:
+    """Schema version stored for a component (0 if none)."""
+    try:
+        with sqlite3.connect(db_path) as conn:
+            row = conn.execute("SELECT version FROM schema_versions WHERE component = ?", (component,)).fetchone()
+    except sqlite3.OperationalError:
+        return 0  # No schema_versions table yet
+    return row[0] if row else 0
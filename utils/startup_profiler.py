@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Startup Profiler - import-time cost of a module, aggregated as a table.
+
+Runs a fresh interpreter with ``python -X importtime`` importing the module
+and turns its per-import trace into two tables: the slowest individual
+imports (self and cumulative time) and the total self time per top-level
+package. Used by ``unified_api_server.py --profile-startup``.
+"""
+
+import os
+import subprocess
+import sys
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+
+@dataclass
+class ImportTiming:
+    """One line of the -X importtime trace."""
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+    @property
+    def package(self) -> str:
+        return self.module.split('.')[0]
+
+
+def parse_importtime(trace: str) -> List[ImportTiming]:
+    """Parse the stderr of ``python -X importtime`` (other lines are ignored)."""
+    timings = []
+    for line in trace.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        fields = line[len('import time:'):].split('|')
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # Header line
+        name = fields[2].rstrip()
+        stripped = name.lstrip()
+        timings.append(ImportTiming(
+            module=stripped,
+            self_us=int(fields[0]),
+            cumulative_us=int(fields[1]),
+            depth=(len(name) - len(stripped) - 1) // 2,
+        ))
+    return timings
+
+
+def aggregate_by_package(timings: List[ImportTiming]) -> List[Tuple[str, int, int]]:
+    """(package, total self time in us, module count), most expensive first."""
+    totals: Dict[str, List[int]] = {}
+    for timing in timings:
+        total = totals.setdefault(timing.package, [0, 0])
+        total[0] += timing.self_us
+        total[1] += 1
+    return sorted(((package, self_us, count) for package, (self_us, count) in totals.items()),
+                  key=lambda row: row[1], reverse=True)
+
+
+def run_importtime(module: str, cwd: Optional[str] = None) -> str:
+    """Import a module in a fresh interpreter and return its -X importtime trace."""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=cwd, capture_output=True, text=True, env=dict(os.environ),
+    )
+    if result.returncode != 0:
+        last_line = result.stderr.strip().splitlines()[-1:] or ['no output']
+        raise RuntimeError(f"Importing {module} failed: {last_line[0]}")
+    return result.stderr
+
+
+def format_report(module: str, timings: List[ImportTiming], top: int = 25) -> str:
+    """Render the slowest imports and the per-package totals as text tables."""
+    total_us = next((t.cumulative_us for t in reversed(timings) if t.module == module), 0)
+    lines = [f"Startup import profile for {module}: {total_us / 1000:.1f} ms total, {len(timings)} modules", ""]
+
+    lines.append(f"{'Module':<60} {'Self ms':>9} {'Cumulative ms':>14}")
+    lines.append('-' * 85)
+    for timing in sorted(timings, key=lambda t: t.cumulative_us, reverse=True)[:top]:
+        name = ('  ' * timing.depth + timing.module)[:60]
+        lines.append(f"{name:<60} {timing.self_us / 1000:>9.1f} {timing.cumulative_us / 1000:>14.1f}")
+
+    lines.append("")
+    lines.append(f"{'Package':<40} {'Modules':>8} {'Self ms':>9} {'Share':>7}")
+    lines.append('-' * 67)
+    grand_total = sum(t.self_us for t in timings) or 1
+    for package, self_us, count in aggregate_by_package(timings)[:top]:
+        lines.append(f"{package:<40} {count:>8} {self_us / 1000:>9.1f} {self_us / grand_total:>7.1%}")
+    return '\n'.join(lines)
+
+
+def profile_startup(module: str, top: int = 25, cwd: Optional[str] = None) -> str:
+    """Profile a cold import of a module and return the report."""
+    return format_report(module, parse_importtime(run_importtime(module, cwd)), top)
@@ -0,0 +1,270 @@
+"""
+Structured Output - JSON schema constrained generation for agent outputs.
+
+Each agent output type (epics, features, user stories, tasks, test artifacts) has a
+typed model here. The schema derived from that model is sent to the LLM provider
+(Ollama ``format`` / OpenAI ``response_format``) so the response is valid JSON by
+construction, and the response is validated straight back into the typed model
+instead of going through the regex/bracket extraction chains.
+"""
+
+import json
+from typing import Any, Dict, List, Optional, Type, Union
+
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter, ValidationError
+
+from utils.safe_logger import get_safe_logger
+
+logger = get_safe_logger(__name__)
+
+# Providers that support schema constrained decoding
+SUPPORTED_PROVIDERS = ("ollama", "openai")
+
+# Key used to wrap list outputs for providers that require an object at the root
+LIST_WRAPPER_KEY = "items"
+
+
+class StructuredOutputError(ValueError):
+    """Raised when a structured response cannot be validated against its schema."""
+
+    def __init__(self, message: str, raw_response: Optional[str] = None):
+        super().__init__(message)
+        self.raw_response = raw_response
+
+
+class _OutputModel(BaseModel):
+    """Base model for agent outputs - unknown fields are kept, not rejected."""
+    model_config = ConfigDict(extra="allow")
+
+
+class EpicOutput(_OutputModel):
+    title: str
+    description: str
+    priority: str = "Medium"
+    estimated_complexity: Optional[str] = None
+    category: Optional[str] = None
+
+
+class FeatureOutput(_OutputModel):
+    title: str
+    description: str
+    priority: str = "Medium"
+    estimated_story_points: Optional[int] = None
+    dependencies: List[str] = Field(default_factory=list)
+    ui_ux_requirements: List[str] = Field(default_factory=list)
+    technical_considerations: List[str] = Field(default_factory=list)
+    business_value: Optional[str] = None
+    edge_cases: List[str] = Field(default_factory=list)
+    category: Optional[str] = None
+
+
+class UserStoryOutput(_OutputModel):
+    title: str
+    user_story: str
+    description: str
+    acceptance_criteria: List[str]
+    story_points: Optional[int] = None
+    priority: str = "Medium"
+    category: Optional[str] = None
+    user_type: Optional[str] = None
+
+
+class TaskOutput(_OutputModel):
+    title: str
+    description: str
+    category: Optional[str] = None
+    time_estimate: Optional[float] = None
+    story_points: Optional[int] = None
+    complexity: Optional[str] = None
+    dependencies: List[str] = Field(default_factory=list)
+    acceptance_criteria: List[str] = Field(default_factory=list)
+    technical_details: Dict[str, Any] = Field(default_factory=dict)
+
+
+class TestCaseOutput(_OutputModel):
+    title: str
+    description: str
+    test_steps: List[str]
+    expected_result: str
+    test_data: Optional[Union[str, List[str]]] = None
+    preconditions: List[str] = Field(default_factory=list)
+    priority: str = "Medium"
+    category: Optional[str] = None
+    automation_candidate: Optional[bool] = None
+
+
+class TestEnvironmentOutput(_OutputModel):
+    description: str = ""
+    data_requirements: Optional[str] = None
+    tools_required: List[str] = Field(default_factory=list)
+
+
+class RiskOutput(_OutputModel):
+    risk: str
+    impact: Optional[str] = None
+    mitigation: Optional[str] = None
+
+
+class TestPlanOutput(_OutputModel):
+    description: str
+    test_approach: str
+    test_types: List[str]
+    entry_criteria: List[str] = Field(default_factory=list)
+    exit_criteria: List[str] = Field(default_factory=list)
+    test_environment: Optional[TestEnvironmentOutput] = None
+    risks_and_mitigations: List[RiskOutput] = Field(default_factory=list)
+
+
+class TestSuiteOutput(_OutputModel):
+    description: str
+    test_categories: List[str] = Field(default_factory=list)
+    test_objectives: List[str] = Field(default_factory=list)
+    prerequisites: List[str] = Field(default_factory=list)
+    test_data_requirements: List[str] = Field(default_factory=list)
+    expected_test_cases: Optional[int] = None
+
+
+# Output type -> (item model, returns a list of items)
+OUTPUT_TYPES: Dict[str, tuple] = {
+    "epics": (EpicOutput, True),
+    "features": (FeatureOutput, True),
+    "user_stories": (UserStoryOutput, True),
+    "tasks": (TaskOutput, True),
+    "test_cases": (TestCaseOutput, True),
+    "test_plan": (TestPlanOutput, False),
+    "test_suite": (TestSuiteOutput, False),
+}
+
+_schema_cache: Dict[tuple, Dict[str, Any]] = {}
+_adapter_cache: Dict[str, TypeAdapter] = {}
+
+
+def _resolve(output_type: str) -> tuple:
+    if output_type not in OUTPUT_TYPES:
+        raise KeyError(f"Unknown structured output type: {output_type}")
+    return OUTPUT_TYPES[output_type]
+
+
+def get_output_schema(output_type: str, wrap_lists: bool = False) -> Dict[str, Any]:
+    """
+    Get the JSON schema for an agent output type.
+
+    Args:
+        output_type: Key from OUTPUT_TYPES (e.g. 'epics', 'test_plan')
+        wrap_lists: Wrap list outputs in an object ({"items": [...]}) for providers
+                    that only accept an object at the schema root
+
+    Returns:
+        JSON schema dictionary
+    """
+    cache_key = (output_type, wrap_lists)
+    if cache_key in _schema_cache:
+        return _schema_cache[cache_key]
+
+    model, is_list = _resolve(output_type)
+    if is_list:
+        schema = TypeAdapter(List[model]).json_schema()
+        if wrap_lists:
+            defs = schema.pop("$defs", None)
+            schema = {
+                "type": "object",
+                "properties": {LIST_WRAPPER_KEY: schema},
+                "required": [LIST_WRAPPER_KEY],
+            }
+            if defs:
+                schema["$defs"] = defs
+    else:
+        schema = model.model_json_schema()
+
+    _schema_cache[cache_key] = schema
+    return schema
+
+
+def build_request_options(provider: str, output_type: str) -> Dict[str, Any]:
+    """
+    Build the provider specific request fields that constrain output to the schema.
+
+    Returns:
+        Dict to merge into the request payload, empty if the provider is unsupported
+    """
+    if provider == "ollama":
+        return {"format": get_output_schema(output_type)}
+    if provider == "openai":
+        return {
+            "response_format": {
+                "type": "json_schema",
+                "json_schema": {
+                    "name": output_type,
+                    "schema": get_output_schema(output_type, wrap_lists=True),
+                    "strict": False,
+                },
+            }
+        }
+    return {}
+
+
+def unwrap_list_output(data: Any) -> Any:
+    """
+    Unwrap a list output wrapped as {"items": [...]} for providers that need an object root.
+
+    Used on validated responses and on the JSON extraction fallback alike, so a
+    wrapped response that fails schema validation still yields its list.
+    """
+    if isinstance(data, dict) and isinstance(data.get(LIST_WRAPPER_KEY), list):
+        return data[LIST_WRAPPER_KEY]
+    return data
+
+
+def parse_structured_output(output_type: str, response: str) -> Union[List[Dict[str, Any]], Dict[str, Any]]:
+    """
+    Validate a schema constrained response into the typed model.
+
+    Args:
+        output_type: Key from OUTPUT_TYPES
+        response: Raw LLM response text (expected to be pure JSON)
+
+    Returns:
+        List of item dicts for list outputs, a single dict otherwise
+
+    Raises:
+        StructuredOutputError: If the response is not valid JSON or fails validation
+    """
+    model, is_list = _resolve(output_type)
+
+    if not response or not response.strip():
+        raise StructuredOutputError("Empty structured response", response)
+
+    try:
+        data = json.loads(response)
+    except json.JSONDecodeError as e:
+        raise StructuredOutputError(f"Structured response is not valid JSON: {e}", response)
+
+    if is_list:
+        # Unwrap {"items": [...]} and tolerate a single object where a list was expected
+        data = unwrap_list_output(data)
+        if isinstance(data, dict):
+            data = [data]
+        adapter = _adapter_cache.get(output_type)
+        if adapter is None:
+            adapter = _adapter_cache[output_type] = TypeAdapter(List[model])
+        try:
+            items = adapter.validate_python(data)
+        except ValidationError as e:
+            raise StructuredOutputError(f"{output_type} failed schema validation: {e.error_count()} errors", response)
+        return [item.model_dump(exclude_none=True) for item in items]
+
+    try:
+        return model.model_validate(data).model_dump(exclude_none=True)
+    except ValidationError as e:
+        raise StructuredOutputError(f"{output_type} failed schema validation: {e.error_count()} errors", response)
+
+
+def is_structured_output_enabled(settings: Optional[Dict[str, Any]], provider: str) -> bool:
+    """Check settings.yaml 'structured_output' for whether a provider should use schemas."""
+    if provider not in SUPPORTED_PROVIDERS:
+        return False
+    so_settings = (settings or {}).get("structured_output", {}) or {}
+    if not so_settings.get("enabled", False):
+        return False
+    providers = so_settings.get("providers") or list(SUPPORTED_PROVIDERS)
+    return provider in providers
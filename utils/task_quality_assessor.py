@@ -11,9 +11,15 @@ Assesses technical task quality focusing on:
 """
 
 import re
+from collections import Counter
 from dataclasses import dataclass
 from typing import List, Dict, Any
 
+from utils.keyword_matcher import get_keyword_matcher
+
+# Meaningful words used for alignment checks
+KEYWORD_PATTERN = re.compile(r'\b\w{4,}\b')
+
 @dataclass
 class TaskQualityAssessment:
     """Represents a quality assessment for a technical task."""
@@ -30,6 +36,61 @@ class TaskQualityAssessor:
     def __init__(self):
         self.max_score = 100
         
+        # Technical implementation indicators
+        self.tech_indicators = [
+            'api', 'endpoint', 'database', 'table', 'model', 'class', 'function', 'method',
+            'component', 'service', 'controller', 'repository', 'interface', 'schema',
+            'query', 'validation', 'authentication', 'authorization', 'middleware',
+            'configuration', 'deployment', 'testing', 'logging', 'monitoring'
+        ]
+        
+        # Specific technology/framework mentions
+        self.tech_specifics = [
+            'react', 'angular', 'vue', 'node', 'express', 'fastapi', 'django', 'flask',
+            'postgresql', 'mysql', 'mongodb', 'redis', 'docker', 'kubernetes',
+            'aws', 'azure', 'gcp', 'rest', 'graphql', 'jwt', 'oauth'
+        ]
+        
+        # Implementation detail indicators
+        self.detail_indicators = ['create', 'implement', 'configure', 'setup', 'build', 'develop', 'design']
+        
+        # Domain-specific scoring
+        self.domain_keywords = {
+            'logistics': ['warehouse', 'dock', 'asset', 'gate', 'distribution', 'loading', 'shipment', 'inventory', 'tracking'],
+            'healthcare': ['patient', 'medical', 'clinical', 'diagnosis', 'treatment', 'healthcare', 'hospital', 'record'],
+            'finance': ['transaction', 'payment', 'account', 'financial', 'banking', 'investment', 'portfolio', 'compliance'],
+            'retail': ['customer', 'product', 'order', 'shopping', 'purchase', 'inventory', 'catalog', 'checkout'],
+            'education': ['student', 'course', 'learning', 'grade', 'assignment', 'curriculum', 'academic', 'assessment'],
+            'agriculture': ['field', 'crop', 'soil', 'irrigation', 'harvest', 'yield', 'sensor', 'weather', 'farm', 
+                           'precision', 'variable rate', 'isobus', 'fertilizer', 'moisture', 'satellite', 'ndvi',
+                           'agronomy', 'planting', 'tractor', 'implement', 'grain', 'livestock', 'pasture']
+        }
+        self.default_domain_keywords = ['user', 'system', 'data', 'interface']
+        
+        # Clear action verbs in title
+        self.action_verbs = [
+            'implement', 'create', 'build', 'develop', 'design', 'configure', 'setup',
+            'integrate', 'test', 'deploy', 'refactor', 'optimize', 'fix', 'update'
+        ]
+        
+        # Specific deliverable mentioned
+        self.deliverables = [
+            'component', 'endpoint', 'api', 'database', 'table', 'function', 'class',
+            'interface', 'service', 'test', 'documentation', 'configuration'
+        ]
+        
+        # Term tables compiled once and shared by all assessor instances
+        keyword_groups = {f'domain:{name}': terms for name, terms in self.domain_keywords.items()}
+        keyword_groups.update({
+            'domain:default': self.default_domain_keywords,
+            'tech_indicators': self.tech_indicators,
+            'tech_specifics': self.tech_specifics,
+            'detail_indicators': self.detail_indicators,
+            'action_verbs': self.action_verbs,
+            'deliverables': self.deliverables
+        })
+        self.keyword_matcher = get_keyword_matcher(keyword_groups)
+        
     def assess_task(self, task: Dict[str, Any], user_story_context: Dict[str, Any], 
                    domain: str, product_vision: str) -> TaskQualityAssessment:
         """
@@ -44,16 +105,63 @@ class TaskQualityAssessor:
         Returns:
             TaskQualityAssessment with rating and feedback
         """
+        context = {'user_story': user_story_context, 'domain': domain, 'product_vision': product_vision}
+        return self.assess_many([task], context)[0]
+    
+    def assess_many(self, tasks: List[Dict[str, Any]], context: Dict[str, Any]) -> List[TaskQualityAssessment]:
+        """
+        Assess a batch of tasks of the same user story.
+        
+        The parent story, its acceptance criteria and the product vision are
+        tokenised once for the whole batch, and vision alignment uses a compiled
+        matcher over the distinct vision words instead of one substring scan
+        per vision word per task.
         
-        # Extract task details
+        Args:
+            tasks: Technical tasks to assess
+            context: Shared context with 'user_story', 'domain' and 'product_vision'
+            
+        Returns:
+            One TaskQualityAssessment per task, in order
+        """
+        shared = self._prepare_context(
+            context.get('user_story'), context.get('domain', ''), context.get('product_vision', '')
+        )
+        return [self._assess_task(task, shared) for task in tasks]
+    
+    def _prepare_context(self, user_story_context: Dict[str, Any], domain: str, product_vision: str) -> Dict[str, Any]:
+        """Tokenise the shared story, domain and vision context once per batch."""
+        shared = {'user_story': user_story_context, 'domain': domain}
+        
+        if user_story_context:
+            story_title = user_story_context.get('title', '').lower()
+            story_description = user_story_context.get('description', '').lower()
+            shared['story_keywords'] = set(KEYWORD_PATTERN.findall(story_title + ' ' + story_description))
+            shared['criteria_keywords'] = [
+                set(KEYWORD_PATTERN.findall(criterion.lower()))
+                for criterion in user_story_context.get('acceptance_criteria', [])
+            ]
+        
+        shared['domain_label'] = f'domain:{domain}' if domain in self.domain_keywords else 'domain:default'
+        
+        # Vision words with their multiplicity; each occurrence counts towards alignment
+        vision_words = KEYWORD_PATTERN.findall((product_vision or '').lower())
+        shared['vision_word_count'] = len(vision_words)
+        shared['vision_word_frequencies'] = Counter(vision_words)
+        shared['vision_matcher'] = get_keyword_matcher({'vision': sorted(shared['vision_word_frequencies'])})
+        return shared
+    
+    def _assess_task(self, task: Dict[str, Any], shared: Dict[str, Any]) -> TaskQualityAssessment:
+        """Score one task against prepared shared context."""
         title = task.get('title', '')
         description = task.get('description', '')
+        task_text = (title + ' ' + description).lower()
         
         # Assess 5 dimensions
         scores = {
-            'user_story_alignment': self._assess_user_story_alignment(task, user_story_context),
-            'technical_specificity': self._assess_technical_specificity(task),
-            'domain_context': self._assess_domain_context(task, domain, product_vision),
+            'user_story_alignment': self._assess_user_story_alignment(task_text, shared),
+            'technical_specificity': self._assess_technical_specificity(task_text),
+            'domain_context': self._assess_domain_context(task_text, shared),
             'actionability': self._assess_actionability(task),
             'estimation_quality': self._assess_estimation_quality(task)
         }
@@ -72,7 +180,9 @@ class TaskQualityAssessor:
             rating = "POOR"
         
         # Generate feedback
-        strengths, weaknesses, issues, suggestions = self._generate_feedback(scores, task, user_story_context, domain)
+        strengths, weaknesses, issues, suggestions = self._generate_feedback(
+            scores, task, shared['user_story'], shared['domain']
+        )
         
         return TaskQualityAssessment(
             rating=rating,
@@ -83,25 +193,18 @@ class TaskQualityAssessor:
             improvement_suggestions=suggestions
         )
     
-    def _assess_user_story_alignment(self, task: Dict[str, Any], user_story_context: Dict[str, Any]) -> int:
+    def _assess_user_story_alignment(self, task_text: str, shared: Dict[str, Any]) -> int:
         """Assess how well task aligns with parent user story."""
-        if not user_story_context:
+        if not shared['user_story']:
             return 50  # Neutral score if no context
         
-        story_title = user_story_context.get('title', '').lower()
-        story_description = user_story_context.get('description', '').lower()
-        acceptance_criteria = user_story_context.get('acceptance_criteria', [])
-        
-        task_title = task.get('title', '').lower()
-        task_description = task.get('description', '').lower()
-        task_text = task_title + ' ' + task_description
+        story_keywords = shared['story_keywords']
+        criteria_keywords = shared['criteria_keywords']
+        task_keywords = set(KEYWORD_PATTERN.findall(task_text))
         
         score = 0
         
         # Check for shared keywords/concepts with story
-        story_keywords = set(re.findall(r'\b\w{4,}\b', story_title + ' ' + story_description))
-        task_keywords = set(re.findall(r'\b\w{4,}\b', task_text))
-        
         overlap = len(story_keywords.intersection(task_keywords))
         total_story_keywords = len(story_keywords)
         
@@ -112,89 +215,44 @@ class TaskQualityAssessor:
             score += 30  # Neutral if no story keywords
         
         # Check for acceptance criteria alignment
-        criteria_alignment = 0
-        for criterion in acceptance_criteria:
-            criterion_words = set(re.findall(r'\b\w{4,}\b', criterion.lower()))
-            criterion_overlap = len(criterion_words.intersection(task_keywords))
-            if criterion_overlap > 0:
-                criteria_alignment += 1
-        
-        if acceptance_criteria:
-            criteria_score = (criteria_alignment / len(acceptance_criteria)) * 40
+        criteria_alignment = sum(1 for criterion_words in criteria_keywords if criterion_words & task_keywords)
+        
+        if criteria_keywords:
+            criteria_score = (criteria_alignment / len(criteria_keywords)) * 40
             score += int(criteria_score)
         else:
             score += 20  # Neutral if no criteria
         
         return min(score, 100)
     
-    def _assess_technical_specificity(self, task: Dict[str, Any]) -> int:
+    def _assess_technical_specificity(self, task_text: str) -> int:
         """Assess technical implementation specificity and detail."""
-        title = task.get('title', '')
-        description = task.get('description', '')
-        task_text = (title + ' ' + description).lower()
-        
         score = 0
         
-        # Technical implementation indicators
-        tech_indicators = [
-            'api', 'endpoint', 'database', 'table', 'model', 'class', 'function', 'method',
-            'component', 'service', 'controller', 'repository', 'interface', 'schema',
-            'query', 'validation', 'authentication', 'authorization', 'middleware',
-            'configuration', 'deployment', 'testing', 'logging', 'monitoring'
-        ]
-        
-        found_tech_terms = sum(1 for term in tech_indicators if term in task_text)
+        found_tech_terms = self.keyword_matcher.count(task_text, 'tech_indicators')
         tech_score = min((found_tech_terms / 5) * 40, 40)  # 40 points max, expect 5+ terms
         score += int(tech_score)
         
-        # Specific technology/framework mentions
-        tech_specifics = [
-            'react', 'angular', 'vue', 'node', 'express', 'fastapi', 'django', 'flask',
-            'postgresql', 'mysql', 'mongodb', 'redis', 'docker', 'kubernetes',
-            'aws', 'azure', 'gcp', 'rest', 'graphql', 'jwt', 'oauth'
-        ]
-        
-        found_specifics = sum(1 for term in tech_specifics if term in task_text)
+        found_specifics = self.keyword_matcher.count(task_text, 'tech_specifics')
         specific_score = min((found_specifics / 2) * 30, 30)  # 30 points max, expect 2+ specifics
         score += int(specific_score)
         
-        # Implementation detail indicators
-        detail_indicators = ['create', 'implement', 'configure', 'setup', 'build', 'develop', 'design']
-        found_details = sum(1 for term in detail_indicators if term in task_text)
-        
-        if found_details > 0:
+        if self.keyword_matcher.contains_any(task_text, 'detail_indicators'):
             score += 30  # 30 points for actionable implementation verbs
         
         return min(score, 100)
     
-    def _assess_domain_context(self, task: Dict[str, Any], domain: str, product_vision: str) -> int:
+    def _assess_domain_context(self, task_text: str, shared: Dict[str, Any]) -> int:
         """Assess domain-specific context preservation."""
-        task_text = (
-            task.get('title', '') + ' ' + 
-            task.get('description', '')
-        ).lower()
-        
-        # Domain-specific scoring
-        domain_keywords = {
-            'logistics': ['warehouse', 'dock', 'asset', 'gate', 'distribution', 'loading', 'shipment', 'inventory', 'tracking'],
-            'healthcare': ['patient', 'medical', 'clinical', 'diagnosis', 'treatment', 'healthcare', 'hospital', 'record'],
-            'finance': ['transaction', 'payment', 'account', 'financial', 'banking', 'investment', 'portfolio', 'compliance'],
-            'retail': ['customer', 'product', 'order', 'shopping', 'purchase', 'inventory', 'catalog', 'checkout'],
-            'education': ['student', 'course', 'learning', 'grade', 'assignment', 'curriculum', 'academic', 'assessment'],
-            'agriculture': ['field', 'crop', 'soil', 'irrigation', 'harvest', 'yield', 'sensor', 'weather', 'farm', 
-                           'precision', 'variable rate', 'isobus', 'fertilizer', 'moisture', 'satellite', 'ndvi',
-                           'agronomy', 'planting', 'tractor', 'implement', 'grain', 'livestock', 'pasture']
-        }
+        domain_label = shared['domain_label']
         
-        relevant_keywords = domain_keywords.get(domain, ['user', 'system', 'data', 'interface'])
+        found_keywords = self.keyword_matcher.count(task_text, domain_label)
+        keyword_score = min((found_keywords / len(self.keyword_matcher.groups[domain_label])) * 60, 60)
         
-        found_keywords = sum(1 for keyword in relevant_keywords if keyword in task_text)
-        keyword_score = min((found_keywords / len(relevant_keywords)) * 60, 60)
-        
-        # Vision alignment check
-        vision_words = re.findall(r'\b\w{4,}\b', product_vision.lower())
-        vision_alignment = sum(1 for word in vision_words if word in task_text)
-        vision_score = min((vision_alignment / max(len(vision_words), 1)) * 40, 40)
+        # Vision alignment check: every vision word occurrence found in the task counts
+        frequencies = shared['vision_word_frequencies']
+        vision_alignment = sum(frequencies[word] for word in shared['vision_matcher'].find(task_text))
+        vision_score = min((vision_alignment / max(shared['vision_word_count'], 1)) * 40, 40)
         
         return int(keyword_score + vision_score)
     
@@ -205,24 +263,10 @@ class TaskQualityAssessor:
         
         score = 0
         
-        # Clear action verbs in title
-        action_verbs = [
-            'implement', 'create', 'build', 'develop', 'design', 'configure', 'setup',
-            'integrate', 'test', 'deploy', 'refactor', 'optimize', 'fix', 'update'
-        ]
-        
-        has_action_verb = any(verb in title.lower() for verb in action_verbs)
-        if has_action_verb:
+        if self.keyword_matcher.contains_any(title.lower(), 'action_verbs'):
             score += 30
         
-        # Specific deliverable mentioned
-        deliverables = [
-            'component', 'endpoint', 'api', 'database', 'table', 'function', 'class',
-            'interface', 'service', 'test', 'documentation', 'configuration'
-        ]
-        
-        has_deliverable = any(deliverable in (title + description).lower() for deliverable in deliverables)
-        if has_deliverable:
+        if self.keyword_matcher.contains_any((title + description).lower(), 'deliverables'):
             score += 30
         
         # Adequate description length
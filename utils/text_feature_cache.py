@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Text Feature Cache - shares text analysis between validators and assessors of one job.
+
+The same story, description and acceptance criteria text is lowercased,
+tokenised, keyword-scanned and checked for Given/When/Then by the work item
+quality validator, the user story quality assessor and the backlog sweeper,
+often several times per retry. One cache is shared by all agents of a job;
+features are computed once per distinct text (keyed by content hash) and
+evicted least-recently-used when the entry or character budget is exceeded.
+"""
+
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, Any, FrozenSet, Optional, Pattern, Tuple
+
+from utils.keyword_matcher import AUTOMATON_MIN_KEYWORDS, get_keyword_matcher
+
+# Meaningful words used for alignment overlap
+KEYWORD_PATTERN = re.compile(r'\b\w{4,}\b')
+
+# Any BDD keyword, checked on lowercased text
+BDD_KEYWORD_PATTERN = re.compile(r'\b(given|when|then)\b')
+
+# Full Given/When/Then clause
+GIVEN_WHEN_THEN_PATTERN = re.compile(r'Given\s+.+?,\s*When\s+.+?,\s*Then\s+.+?', re.I)
+
+
+@dataclass
+class TextFeatureCacheConfig:
+    """Configuration for the text feature cache."""
+    enabled: bool = True
+    max_entries: int = 4096
+    max_chars: int = 4_000_000
+
+
+@dataclass
+class TextFeatures:
+    """Features of one text, filled in lazily as validators ask for them."""
+    text: str
+    lower: str
+    _tokens: Optional[FrozenSet[str]] = None
+    _has_bdd_keyword: Optional[bool] = None
+    _is_given_when_then: Optional[bool] = None
+    keyword_hits: Dict[Tuple[str, ...], FrozenSet[str]] = field(default_factory=dict)
+    pattern_hits: Dict[Pattern, bool] = field(default_factory=dict)
+
+    @property
+    def tokens(self) -> FrozenSet[str]:
+        """Distinct words of four or more characters (lowercased)."""
+        if self._tokens is None:
+            self._tokens = frozenset(KEYWORD_PATTERN.findall(self.lower))
+        return self._tokens
+
+    @property
+    def has_bdd_keyword(self) -> bool:
+        """True if the text contains a standalone given/when/then."""
+        if self._has_bdd_keyword is None:
+            self._has_bdd_keyword = bool(BDD_KEYWORD_PATTERN.search(self.lower))
+        return self._has_bdd_keyword
+
+    @property
+    def is_given_when_then(self) -> bool:
+        """True if the text contains a full 'Given ..., When ..., Then ...' clause."""
+        if self._is_given_when_then is None:
+            self._is_given_when_then = bool(GIVEN_WHEN_THEN_PATTERN.search(self.text))
+        return self._is_given_when_then
+
+
+class TextFeatureCache:
+    """Content-hash keyed, memory-bounded cache of TextFeatures for one job."""
+
+    def __init__(self, settings: Dict[str, Any] = None, job_id: Optional[str] = None):
+        self.job_id = job_id
+        self.config = self._load_config(settings or {})
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, TextFeatures]" = OrderedDict()
+        self._chars = 0
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+
+    def _load_config(self, settings: Dict[str, Any]) -> TextFeatureCacheConfig:
+        """Load text feature cache configuration from settings dict."""
+        cache_config = settings.get('text_feature_cache', {}) or {}
+        defaults = TextFeatureCacheConfig()
+        return TextFeatureCacheConfig(
+            enabled=cache_config.get('enabled', defaults.enabled),
+            max_entries=cache_config.get('max_entries', defaults.max_entries),
+            max_chars=cache_config.get('max_chars', defaults.max_chars)
+        )
+
+    def get(self, text: str) -> TextFeatures:
+        """Get the features of a text, creating the entry on first use."""
+        text = text or ''
+        if not self.config.enabled:
+            return TextFeatures(text=text, lower=text.lower())
+
+        key = hashlib.sha1(text.encode('utf-8')).hexdigest()
+        with self._lock:
+            features = self._entries.get(key)
+            if features is not None:
+                self._entries.move_to_end(key)
+                self.stats['hits'] += 1
+                return features
+
+            features = TextFeatures(text=text, lower=text.lower())
+            self._entries[key] = features
+            self._chars += len(text)
+            self.stats['misses'] += 1
+            while self._entries and (len(self._entries) > self.config.max_entries or
+                                     self._chars > self.config.max_chars):
+                _, evicted = self._entries.popitem(last=False)
+                self._chars -= len(evicted.text)
+                self.stats['evictions'] += 1
+        return features
+
+    def lower(self, text: str) -> str:
+        """Lowercased text."""
+        return self.get(text).lower
+
+    def tokens(self, text: str) -> FrozenSet[str]:
+        """Distinct words of four or more characters in the lowercased text."""
+        return self.get(text).tokens
+
+    def has_bdd_keyword(self, text: str) -> bool:
+        """True if the text contains a standalone given/when/then."""
+        return self.get(text).has_bdd_keyword
+
+    def is_given_when_then(self, text: str) -> bool:
+        """True if the text contains a full 'Given ..., When ..., Then ...' clause."""
+        return self.get(text).is_given_when_then
+
+    def keyword_hits(self, text: str, keywords: Tuple[str, ...]) -> FrozenSet[str]:
+        """Keywords of the table occurring in the lowercased text (substring semantics)."""
+        features = self.get(text)
+        hits = features.keyword_hits.get(keywords)
+        if hits is None:
+            if len(keywords) >= AUTOMATON_MIN_KEYWORDS:
+                hits = frozenset(get_keyword_matcher({'keywords': keywords}).matches(features.lower, 'keywords'))
+            else:
+                hits = frozenset(keyword for keyword in keywords if keyword in features.lower)
+            features.keyword_hits[keywords] = hits
+        return hits
+
+    def contains_any(self, text: str, keywords: Tuple[str, ...]) -> bool:
+        """True if any keyword of the table occurs in the lowercased text."""
+        return bool(self.keyword_hits(text, keywords))
+
+    def search(self, text: str, pattern: Pattern) -> bool:
+        """True if the compiled pattern matches anywhere in the lowercased text."""
+        features = self.get(text)
+        hit = features.pattern_hits.get(pattern)
+        if hit is None:
+            hit = bool(pattern.search(features.lower))
+            features.pattern_hits[pattern] = hit
+        return hit
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics for this job."""
+        with self._lock:
+            return {**self.stats, 'job_id': self.job_id, 'entries': len(self._entries), 'chars': self._chars}
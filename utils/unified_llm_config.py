@@ -11,8 +11,9 @@ Configuration Priority (highest to lowest):
 """
 
 import os
+import threading
 import yaml
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
 from dataclasses import dataclass, field
 from utils.safe_logger import get_safe_logger
 
@@ -42,6 +43,9 @@ class UnifiedLLMConfigManager:
         self.settings_file = settings_file
         self._agent_configs = {}
         self._global_config = None
+        # (user_id, agent_name) -> (version stamp, resolved database settings)
+        self._resolved_cache: Dict[Tuple[str, str], Tuple[Tuple[int, int, int], Optional[Dict[str, Any]]]] = {}
+        self._resolved_lock = threading.Lock()
         self._load_settings()
     
     def _load_settings(self):
@@ -84,27 +88,11 @@ class UnifiedLLMConfigManager:
         # 2. Database user settings (HIGHEST PRIORITY - Frontend is the source of truth)
         if user_id:
             try:
-                from utils.llm_config_manager import LLMConfigManager
-                db_config_manager = LLMConfigManager()
-                
-                # Try to get agent-specific configuration first
-                agent_config = self._get_agent_specific_config(user_id, agent_name)
-                if agent_config:
-                    config.provider = agent_config['provider']
-                    config.model = agent_config['model']
-                    if 'preset' in agent_config:
-                        config.preset = agent_config['preset']
-                    sources.append(f"database[{agent_name}]")
-                else:
-                    # Fall back to global user configuration
-                    db_config = db_config_manager.get_active_configuration(user_id)
-                    if db_config and db_config.get('provider'):
-                        config.provider = db_config['provider']
-                        if 'model' in db_config and db_config['model']:
-                            config.model = db_config['model']
-                        if 'preset' in db_config:
-                            config.preset = db_config['preset']
-                        sources.append("database[global]")
+                resolved = self._get_database_config(user_id, agent_name)
+                if resolved:
+                    for key, value in resolved['values'].items():
+                        setattr(config, key, value)
+                    sources.append(resolved['source'])
                     
             except Exception as e:
                 logger.warning(f"Could not load database config for user {user_id}: {e}")
@@ -137,6 +125,46 @@ class UnifiedLLMConfigManager:
         logger.info(f"Agent {agent_name} config: {config.provider}:{config.model} (sources: {config.source})")
         return config
     
+    def _get_database_config(self, user_id: str, agent_name: str) -> Optional[Dict[str, Any]]:
+        """
+        Database settings for a user's agent, cached per (user, agent).
+        
+        Cached entries are tagged with the user's configuration version and are
+        resolved again after invalidate_llm_config() ran for that user, or at the
+        latest after LLMConfigVersions.MAX_AGE_SECONDS.
+        """
+        from utils.llm_config_manager import llm_config_manager, llm_config_versions
+        
+        cache_key = (user_id, agent_name)
+        version = llm_config_versions.get(user_id)
+        with self._resolved_lock:
+            cached = self._resolved_cache.get(cache_key)
+        if cached and cached[0] == version:
+            return cached[1]
+        
+        resolved = None
+        # Try to get agent-specific configuration first
+        agent_config = self._get_agent_specific_config(user_id, agent_name)
+        if agent_config:
+            values = {'provider': agent_config['provider'], 'model': agent_config['model']}
+            if 'preset' in agent_config:
+                values['preset'] = agent_config['preset']
+            resolved = {'values': values, 'source': f"database[{agent_name}]"}
+        else:
+            # Fall back to global user configuration
+            db_config = llm_config_manager.get_active_configuration(user_id)
+            if db_config and db_config.get('provider'):
+                values = {'provider': db_config['provider']}
+                if 'model' in db_config and db_config['model']:
+                    values['model'] = db_config['model']
+                if 'preset' in db_config:
+                    values['preset'] = db_config['preset']
+                resolved = {'values': values, 'source': "database[global]"}
+        
+        with self._resolved_lock:
+            self._resolved_cache[cache_key] = (version, resolved)
+        return resolved
+    
     def _get_agent_specific_config(self, user_id: str, agent_name: str) -> Optional[Dict[str, Any]]:
         """Get agent-specific configuration from database, respecting configuration_mode preference."""
         try:
@@ -7,6 +7,9 @@ import re
 from typing import Dict, List, Any
 from dataclasses import dataclass
 
+from utils.keyword_matcher import get_keyword_matcher
+from utils.text_feature_cache import TextFeatureCache
+
 @dataclass
 class QualityAssessment:
     rating: str  # EXCELLENT, GOOD, FAIR, POOR
@@ -22,17 +25,48 @@ class UserStoryQualityAssessor:
     def __init__(self):
         # User story format pattern
         self.story_pattern = r'^As an?\s+(.+?),\s*I want\s+(.+?)\s+so that\s+(.+?)[\.\s]*$'
-        
-        # Given/When/Then pattern
-        self.gwt_pattern = r'Given\s+.+?,\s*When\s+.+?,\s*Then\s+.+?'
-        
         # Specific role patterns (not generic "user")
         self.specific_roles = ['Urban Commuter', 'College Student', 'Tourist', 'Night Owl', 
                               'Manager', 'Admin', 'Operator', 'Inspector', 'Driver']
         
+        # Patterns and role tables compiled once
+        self.story_regex = re.compile(self.story_pattern, re.I)
+        self.keyword_matcher = get_keyword_matcher({
+            'role': [role.lower() for role in self.specific_roles],
+            'role_exact': self.specific_roles
+        })
+        
+        # Tokens and Given/When/Then parses, shared per job via set_text_feature_cache
+        self.text_features = TextFeatureCache()
+    
+    def set_text_feature_cache(self, text_features: TextFeatureCache):
+        """Share a job-level text feature cache with this assessor."""
+        self.text_features = text_features
+        
     def assess_user_story(self, story: Dict[str, Any], feature: Dict[str, Any], 
                          domain: str, product_vision: str) -> QualityAssessment:
         """Assess user story quality based on streamlined criteria."""
+        return self.assess_many([story], {'feature': feature, 'domain': domain, 'product_vision': product_vision})[0]
+    
+    def assess_many(self, stories: List[Dict[str, Any]], context: Dict[str, Any]) -> List[QualityAssessment]:
+        """
+        Assess a batch of user stories of the same parent feature.
+        
+        The feature is tokenised once for the whole batch instead of once per story.
+        
+        Args:
+            stories: User stories to assess
+            context: Shared context with 'feature', 'domain' and 'product_vision'
+        
+        Returns:
+            One QualityAssessment per story, in order
+        """
+        feature = context.get('feature') or {}
+        feature_keywords = self.text_features.tokens(f"{feature.get('title', '')} {feature.get('description', '')}")
+        return [self._assess_user_story(story, feature_keywords) for story in stories]
+    
+    def _assess_user_story(self, story: Dict[str, Any], feature_keywords: frozenset) -> QualityAssessment:
+        """Score one user story against the parent feature's keywords."""
         title = story.get('title', '').strip()
         user_story = story.get('user_story', '').strip()
         description = story.get('description', '').strip()
@@ -55,14 +89,14 @@ class UserStoryQualityAssessor:
         specific_issues = []
         
         # 1. User Story Format (20 points)
-        match = re.match(self.story_pattern, user_story, re.I)
+        match = self.story_regex.match(user_story)
         if match:
             role, goal, benefit = match.groups()
             score += 15
             strengths.append("Proper user story format")
             
             # Check for specific role (not generic "user")
-            if any(specific_role.lower() in role.lower() for specific_role in self.specific_roles):
+            if self.keyword_matcher.contains_any(role.lower(), 'role'):
                 score += 5
                 strengths.append("Uses specific role/persona")
             else:
@@ -84,7 +118,7 @@ class UserStoryQualityAssessor:
             strengths.append(f"Has {criteria_count} acceptance criteria")
             
             # Check Given/When/Then format
-            gwt_count = sum(1 for ac in acceptance_criteria if re.search(self.gwt_pattern, ac, re.I))
+            gwt_count = sum(1 for ac in acceptance_criteria if self.text_features.is_given_when_then(ac))
             if gwt_count == criteria_count:
                 score += 15
                 strengths.append("All criteria use Given/When/Then format")
@@ -119,11 +153,7 @@ class UserStoryQualityAssessor:
             weaknesses.append(f"Story points ({story_points}) suggest scope issues")
         
         # 6. Feature Alignment (15 points)
-        feature_text = f"{feature.get('title', '')} {feature.get('description', '')}".lower()
-        story_text = f"{title} {user_story} {description}".lower()
-        
-        feature_keywords = set(re.findall(r'\b\w{4,}\b', feature_text))
-        story_keywords = set(re.findall(r'\b\w{4,}\b', story_text))
+        story_keywords = self.text_features.tokens(f"{title} {user_story} {description}")
         overlap = len(feature_keywords & story_keywords)
         
         if overlap >= 5:
@@ -144,7 +174,7 @@ class UserStoryQualityAssessor:
                 improvement_suggestions.append("Provide exactly 3-5 acceptance criteria")
             if gwt_count < criteria_count:
                 improvement_suggestions.append("Use Given/When/Then format for all acceptance criteria")
-            if not any(role in user_story for role in self.specific_roles):
+            if not self.keyword_matcher.contains_any(user_story, 'role_exact'):
                 improvement_suggestions.append(f"Use specific role from vision (e.g., {', '.join(self.specific_roles[:3])})")
         
         # Determine rating
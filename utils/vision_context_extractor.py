@@ -4,13 +4,19 @@ Vision Context Extractor
 Extracts specific domain information from vision statements to enhance project context.
 """
 
+import logging
 import re
+import sqlite3
 from typing import Dict, Any, List
 
+from utils.keyword_matcher import get_keyword_matcher
+
+logger = logging.getLogger(__name__)
+
 class VisionContextExtractor:
     """Extracts domain-specific context from vision statements."""
     
-    def __init__(self):
+    def __init__(self, domain_knowledge=None):
         self.industry_patterns = {
             'oil_gas': ['oil', 'gas', 'petroleum', 'drilling', 'fracking', 'production', 'wells', 'field operations', 'downhole', 'stimulation'],
             'healthcare': ['healthcare', 'medical', 'patient', 'clinical', 'diagnosis', 'treatment', 'hospital', 'physician', 'nurse', 'surgery', 'therapy', 'prescription'],
@@ -188,242 +194,25 @@ class VisionContextExtractor:
             'end_users': ['user', 'customer', 'client', 'consumer']
         }
         
-    def extract_context(self, project_data: Dict[str, Any], business_objectives: List[str] = None, 
-                       target_audience: str = None, domain: str = None) -> Dict[str, Any]:
-        """Extract enhanced context from project data including vision statement."""
-        
-        enhanced_context = {}
-        
-        # Extract vision statement from project data
-        vision_statement = project_data.get('vision_statement', '')
-        if not vision_statement:
-            # Fallback to description if no vision statement
-            vision_statement = project_data.get('description', '')
-        
-        # Extract domain information
-        detected_domain = self._detect_domain(vision_statement)
-        if detected_domain:
-            enhanced_context['domain'] = detected_domain
-            enhanced_context['industry'] = detected_domain.replace('_', ' and ')
-        elif domain and domain != 'software_development':
-            enhanced_context['domain'] = domain
-            enhanced_context['industry'] = domain.replace('_', ' ')
-        
-        # Extract user types (pass detected domain for filtering)
-        detected_domain = enhanced_context.get('domain')
-        user_types = self._extract_user_types(vision_statement, target_audience, detected_domain)
-        if user_types:
-            enhanced_context['target_users'] = user_types
-        
-        # Extract specific technologies and platforms
-        tech_info = self._extract_technology_context(vision_statement)
-        enhanced_context.update(tech_info)
-        
-        # Extract business goals and metrics
-        goals = self._extract_business_goals(vision_statement, business_objectives)
-        enhanced_context.update(goals)
-        
-        # Extract specific terminology and vocabulary
-        vocabulary = self._extract_domain_vocabulary(vision_statement)
-        enhanced_context['domain_vocabulary'] = vocabulary
-        
-        return enhanced_context
-    
-    def _get_domain_user_types(self, domain: str) -> List[str]:
-        """Get user types relevant to a specific domain."""
-        if not domain:
-            return ['managers', 'analysts', 'end_users']  # Generic fallback
-        
-        domain_mappings = {
-            'logistics': ['logistics_coordinators', 'drivers', 'warehouse_workers', 'managers', 'end_users'],
-            'healthcare': ['healthcare_providers', 'patients', 'healthcare_administrators', 'managers'],
-            'finance': ['financial_advisors', 'traders', 'financial_customers', 'compliance_officers', 'analysts'],
-            'retail': ['retailers', 'retail_customers', 'suppliers', 'managers'],
-            'education': ['educators', 'students', 'education_administrators', 'managers'],
-            'manufacturing': ['production_workers', 'quality_inspectors', 'plant_managers', 'managers'],
-            'real_estate': ['real_estate_professionals', 'property_stakeholders', 'managers'],
-            'oil_gas': ['field_operators', 'petroleum_engineers', 'managers'],
-            'agriculture': ['farmers', 'agricultural_specialists', 'farm_workers', 'managers'],
-            'technology': ['developers', 'tech_professionals', 'tech_users', 'managers'],
-            'telecommunications': ['telecom_engineers', 'telecom_customers', 'managers'],
-            'energy': ['energy_professionals', 'energy_customers', 'managers'],
-            'transportation': ['transport_operators', 'transport_passengers', 'transport_planners', 'managers'],
-            'hospitality_tourism': ['hospitality_staff', 'guests', 'managers'],
-            'entertainment_media': ['content_creators', 'audience', 'managers'],
-            'construction': ['construction_workers', 'architects_engineers', 'construction_clients', 'managers'],
-            'automotive': ['automotive_workers', 'automotive_customers', 'managers'],
-            'aerospace_defense': ['aerospace_engineers', 'defense_personnel', 'managers'],
-            'pharmaceuticals_biotech': ['researchers', 'regulatory_professionals', 'managers'],
-            'consumer_goods': ['brand_managers', 'consumers', 'managers'],
-            'environmental_services': ['environmental_specialists', 'environmental_stakeholders', 'managers'],
-            'government_public_sector': ['government_employees', 'citizens', 'managers'],
-            'insurance': ['insurance_professionals', 'insurance_customers', 'managers'],
-            'professional_services': ['consultants', 'service_clients', 'managers'],
-            'nonprofit_social_impact': ['nonprofit_staff', 'beneficiaries', 'donors', 'managers'],
-            'mining_natural_resources': ['mining_workers', 'environmental_monitors', 'managers'],
-            'food_beverage': ['food_service_staff', 'diners', 'managers'],
-            'ecommerce': ['ecommerce_professionals', 'online_shoppers', 'managers'],
-            'sports_fitness': ['fitness_professionals', 'athletes', 'managers'],
-            'workforce_management': ['hr_professionals', 'employees', 'managers'],
-            'security_safety': ['security_professionals', 'protected_individuals', 'managers']
+        # Technology and platform indicators
+        self.technology_patterns = {
+            'web_platform': ['web-based', 'web platform', 'web application'],
+            'mobile_platform': ['mobile', 'mobile app'],
+            'desktop_platform': ['desktop', 'windows', 'mac'],
+            'real_time': ['real-time', 'real time', 'streaming'],
+            'visualization': ['visualization', 'dashboard', 'charts', 'graphs'],
+            'integration': ['api', 'integration', 'connectivity']
         }
         
-        return domain_mappings.get(domain, ['managers', 'analysts', 'end_users'])
-    
-    def _get_domain_default_users(self, domain: str) -> str:
-        """Get default users for a domain when no specific types are detected."""
-        if not domain:
-            return 'end users'
-        
-        domain_defaults = {
-            'logistics': 'warehouse managers, logistics coordinators',
-            'healthcare': 'healthcare providers, patients',
-            'finance': 'financial advisors, clients',
-            'retail': 'store managers, customers',
-            'education': 'educators, students',
-            'manufacturing': 'production managers, workers',
-            'real_estate': 'real estate agents, clients',
-            'oil_gas': 'field operators, engineers',
-            'agriculture': 'farmers, agricultural specialists',
-            'technology': 'developers, end users',
-            'telecommunications': 'network engineers, customers',
-            'energy': 'energy professionals, customers',
-            'transportation': 'transport operators, passengers',
-            'hospitality_tourism': 'hospitality staff, guests',
-            'entertainment_media': 'content creators, audience',
-            'construction': 'construction workers, clients',
-            'automotive': 'automotive workers, customers',
-            'aerospace_defense': 'aerospace engineers, personnel',
-            'pharmaceuticals_biotech': 'researchers, regulatory professionals',
-            'consumer_goods': 'brand managers, consumers',
-            'environmental_services': 'environmental specialists',
-            'government_public_sector': 'government employees, citizens',
-            'insurance': 'insurance professionals, customers',
-            'professional_services': 'consultants, clients',
-            'nonprofit_social_impact': 'nonprofit staff, beneficiaries',
-            'mining_natural_resources': 'mining workers, specialists',
-            'food_beverage': 'food service staff, customers',
-            'ecommerce': 'ecommerce professionals, online shoppers',
-            'sports_fitness': 'fitness professionals, athletes',
-            'workforce_management': 'HR professionals, employees',
-            'security_safety': 'security professionals, protected individuals'
-        }
-        
-        return domain_defaults.get(domain, 'end users')
-    
-    def _detect_domain(self, text: str) -> str:
-        """Detect the primary domain from the text."""
-        text_lower = text.lower()
-        
-        domain_scores = {}
-        for domain, keywords in self.industry_patterns.items():
-            score = sum(1 for keyword in keywords if keyword in text_lower)
-            if score > 0:
-                domain_scores[domain] = score
-        
-        if domain_scores:
-            return max(domain_scores, key=domain_scores.get)
-        return None
-    
-    def _extract_user_types(self, text: str, target_audience: str = None, detected_domain: str = None) -> str:
-        """Extract specific user types from the text, filtered by domain."""
-        text_lower = text.lower()
-        
-        # Check target audience first
-        if target_audience and target_audience != 'end users':
-            return target_audience
-        
-        # Get relevant user types based on detected domain
-        domain_user_types = self._get_domain_user_types(detected_domain)
-        
-        detected_types = []
-        for user_type, patterns in self.user_type_patterns.items():
-            # Only check user types relevant to the detected domain
-            if user_type in domain_user_types:
-                if any(pattern in text_lower for pattern in patterns):
-                    detected_types.append(user_type)
-        
-        if detected_types:
-            return ', '.join(detected_types).replace('_', ' ')
-        
-        # Domain-specific fallback
-        return self._get_domain_default_users(detected_domain)
-    
-    def _extract_technology_context(self, text: str) -> Dict[str, Any]:
-        """Extract technology and platform information."""
-        text_lower = text.lower()
-        tech_context = {}
-        
-        # Platform detection
-        if any(term in text_lower for term in ['web-based', 'web platform', 'web application']):
-            tech_context['platform'] = 'Web-based platform'
-        elif any(term in text_lower for term in ['mobile', 'mobile app']):
-            tech_context['platform'] = 'Mobile application'
-        elif any(term in text_lower for term in ['desktop', 'windows', 'mac']):
-            tech_context['platform'] = 'Desktop application'
-        else:
-            tech_context['platform'] = 'Web application'
-        
-        # Data-related technology
-        if any(term in text_lower for term in ['real-time', 'real time', 'streaming']):
-            tech_context['data_processing'] = 'Real-time data processing'
-        
-        if any(term in text_lower for term in ['visualization', 'dashboard', 'charts', 'graphs']):
-            tech_context['visualization'] = 'Data visualization and dashboards'
-        
-        if any(term in text_lower for term in ['api', 'integration', 'connectivity']):
-            tech_context['integration'] = 'API integration and connectivity'
-        
-        return tech_context
-    
-    def _extract_business_goals(self, text: str, business_objectives: List[str] = None) -> Dict[str, Any]:
-        """Extract business goals and metrics."""
-        goals_context = {}
-        
-        # Extract percentage targets
-        percentage_pattern = r'(\d+)%'
-        percentages = re.findall(percentage_pattern, text)
-        if percentages:
-            goals_context['performance_targets'] = f"{', '.join(percentages)}% improvement targets"
-        
-        # Extract timeline information
-        timeline_pattern = r'(\d+)\s*(month|year|quarter)s?'
-        timelines = re.findall(timeline_pattern, text.lower())
-        if timelines:
-            timeline_str = ', '.join([f"{num} {period}s" for num, period in timelines])
-            goals_context['timeline'] = timeline_str
-        
-        # Extract revenue/financial targets
-        revenue_pattern = r'\$(\d+(?:,\d+)*)\s*(million|billion|thousand)?'
-        revenue_matches = re.findall(revenue_pattern, text)
-        if revenue_matches:
-            goals_context['revenue_targets'] = f"${', '.join([f'{amount} {unit}' for amount, unit in revenue_matches])}"
-        
-        # Use business objectives if provided and not generic
-        if business_objectives and business_objectives != ['TBD']:
-            goals_context['business_objectives'] = business_objectives
-        
-        return goals_context
-    
-    def _extract_domain_vocabulary(self, text: str) -> List[str]:
-        """Extract domain-specific vocabulary and terms."""
-        # Extract technical terms and domain-specific vocabulary
-        text_lower = text.lower()
-        vocabulary = []
-        
         # Common domain terms
-        domain_terms = [
+        self.common_vocabulary_terms = [
             'efficiency', 'optimization', 'performance', 'productivity', 'scalability',
             'data-driven', 'actionable insights', 'real-time', 'automation', 'integration',
             'user experience', 'workflow', 'process improvement', 'analytics', 'reporting'
         ]
         
-        for term in domain_terms:
-            if term in text_lower:
-                vocabulary.append(term)
-        
         # Industry-specific terms
-        domain_vocabulary_mapping = {
+        self.domain_vocabulary_mapping = {
             'oil_gas': {
                 'triggers': ['oil', 'gas', 'field', 'well', 'drilling'],
                 'terms': [
@@ -647,11 +436,273 @@ class VisionContextExtractor:
             }
         }
         
+        # Vocabulary curated in the domain tables extends the built-in terms
+        self._merge_domain_knowledge_vocabulary(domain_knowledge)
+        
+        # All keyword tables compiled into one matcher, so each text is scanned once
+        keyword_groups = {}
+        for domain, keywords in self.industry_patterns.items():
+            keyword_groups[f'industry:{domain}'] = keywords
+        for user_type, patterns in self.user_type_patterns.items():
+            keyword_groups[f'users:{user_type}'] = patterns
+        for category, terms in self.technology_patterns.items():
+            keyword_groups[f'technology:{category}'] = terms
+        keyword_groups['vocabulary:common'] = self.common_vocabulary_terms
+        for domain, domain_data in self.domain_vocabulary_mapping.items():
+            keyword_groups[f'vocabulary_trigger:{domain}'] = domain_data['triggers']
+            keyword_groups[f'vocabulary:{domain}'] = [term.lower() for term in domain_data['terms']]
+        self.keyword_matcher = get_keyword_matcher(keyword_groups)
+        
+    def _merge_domain_knowledge_vocabulary(self, domain_knowledge=None):
+        """Add domain table vocabulary to the matching domains of domain_vocabulary_mapping."""
+        try:
+            if domain_knowledge is None:
+                from db import domain_knowledge
+            vocabulary_by_domain = domain_knowledge.get_vocabulary_by_domain_key()
+        except (ImportError, sqlite3.Error, ValueError) as e:
+            logger.warning(f"Domain knowledge vocabulary unavailable, using built-in terms only: {e}")
+            return
+        
+        for domain_key, terms in vocabulary_by_domain.items():
+            domain_data = self.domain_vocabulary_mapping.get(domain_key)
+            if not domain_data:
+                continue
+            known = {term.lower() for term in domain_data['terms']}
+            for term in terms:
+                if term and term.lower() not in known:
+                    domain_data['terms'].append(term)
+                    known.add(term.lower())
+    
+    def extract_context(self, project_data: Dict[str, Any], business_objectives: List[str] = None, 
+                       target_audience: str = None, domain: str = None) -> Dict[str, Any]:
+        """Extract enhanced context from project data including vision statement."""
+        
+        enhanced_context = {}
+        
+        # Extract vision statement from project data
+        vision_statement = project_data.get('vision_statement', '')
+        if not vision_statement:
+            # Fallback to description if no vision statement
+            vision_statement = project_data.get('description', '')
+        
+        # Extract domain information
+        detected_domain = self._detect_domain(vision_statement)
+        if detected_domain:
+            enhanced_context['domain'] = detected_domain
+            enhanced_context['industry'] = detected_domain.replace('_', ' and ')
+        elif domain and domain != 'software_development':
+            enhanced_context['domain'] = domain
+            enhanced_context['industry'] = domain.replace('_', ' ')
+        
+        # Extract user types (pass detected domain for filtering)
+        detected_domain = enhanced_context.get('domain')
+        user_types = self._extract_user_types(vision_statement, target_audience, detected_domain)
+        if user_types:
+            enhanced_context['target_users'] = user_types
+        
+        # Extract specific technologies and platforms
+        tech_info = self._extract_technology_context(vision_statement)
+        enhanced_context.update(tech_info)
+        
+        # Extract business goals and metrics
+        goals = self._extract_business_goals(vision_statement, business_objectives)
+        enhanced_context.update(goals)
+        
+        # Extract specific terminology and vocabulary
+        vocabulary = self._extract_domain_vocabulary(vision_statement)
+        enhanced_context['domain_vocabulary'] = vocabulary
+        
+        return enhanced_context
+    
+    def _get_domain_user_types(self, domain: str) -> List[str]:
+        """Get user types relevant to a specific domain."""
+        if not domain:
+            return ['managers', 'analysts', 'end_users']  # Generic fallback
+        
+        domain_mappings = {
+            'logistics': ['logistics_coordinators', 'drivers', 'warehouse_workers', 'managers', 'end_users'],
+            'healthcare': ['healthcare_providers', 'patients', 'healthcare_administrators', 'managers'],
+            'finance': ['financial_advisors', 'traders', 'financial_customers', 'compliance_officers', 'analysts'],
+            'retail': ['retailers', 'retail_customers', 'suppliers', 'managers'],
+            'education': ['educators', 'students', 'education_administrators', 'managers'],
+            'manufacturing': ['production_workers', 'quality_inspectors', 'plant_managers', 'managers'],
+            'real_estate': ['real_estate_professionals', 'property_stakeholders', 'managers'],
+            'oil_gas': ['field_operators', 'petroleum_engineers', 'managers'],
+            'agriculture': ['farmers', 'agricultural_specialists', 'farm_workers', 'managers'],
+            'technology': ['developers', 'tech_professionals', 'tech_users', 'managers'],
+            'telecommunications': ['telecom_engineers', 'telecom_customers', 'managers'],
+            'energy': ['energy_professionals', 'energy_customers', 'managers'],
+            'transportation': ['transport_operators', 'transport_passengers', 'transport_planners', 'managers'],
+            'hospitality_tourism': ['hospitality_staff', 'guests', 'managers'],
+            'entertainment_media': ['content_creators', 'audience', 'managers'],
+            'construction': ['construction_workers', 'architects_engineers', 'construction_clients', 'managers'],
+            'automotive': ['automotive_workers', 'automotive_customers', 'managers'],
+            'aerospace_defense': ['aerospace_engineers', 'defense_personnel', 'managers'],
+            'pharmaceuticals_biotech': ['researchers', 'regulatory_professionals', 'managers'],
+            'consumer_goods': ['brand_managers', 'consumers', 'managers'],
+            'environmental_services': ['environmental_specialists', 'environmental_stakeholders', 'managers'],
+            'government_public_sector': ['government_employees', 'citizens', 'managers'],
+            'insurance': ['insurance_professionals', 'insurance_customers', 'managers'],
+            'professional_services': ['consultants', 'service_clients', 'managers'],
+            'nonprofit_social_impact': ['nonprofit_staff', 'beneficiaries', 'donors', 'managers'],
+            'mining_natural_resources': ['mining_workers', 'environmental_monitors', 'managers'],
+            'food_beverage': ['food_service_staff', 'diners', 'managers'],
+            'ecommerce': ['ecommerce_professionals', 'online_shoppers', 'managers'],
+            'sports_fitness': ['fitness_professionals', 'athletes', 'managers'],
+            'workforce_management': ['hr_professionals', 'employees', 'managers'],
+            'security_safety': ['security_professionals', 'protected_individuals', 'managers']
+        }
+        
+        return domain_mappings.get(domain, ['managers', 'analysts', 'end_users'])
+    
+    def _get_domain_default_users(self, domain: str) -> str:
+        """Get default users for a domain when no specific types are detected."""
+        if not domain:
+            return 'end users'
+        
+        domain_defaults = {
+            'logistics': 'warehouse managers, logistics coordinators',
+            'healthcare': 'healthcare providers, patients',
+            'finance': 'financial advisors, clients',
+            'retail': 'store managers, customers',
+            'education': 'educators, students',
+            'manufacturing': 'production managers, workers',
+            'real_estate': 'real estate agents, clients',
+            'oil_gas': 'field operators, engineers',
+            'agriculture': 'farmers, agricultural specialists',
+            'technology': 'developers, end users',
+            'telecommunications': 'network engineers, customers',
+            'energy': 'energy professionals, customers',
+            'transportation': 'transport operators, passengers',
+            'hospitality_tourism': 'hospitality staff, guests',
+            'entertainment_media': 'content creators, audience',
+            'construction': 'construction workers, clients',
+            'automotive': 'automotive workers, customers',
+            'aerospace_defense': 'aerospace engineers, personnel',
+            'pharmaceuticals_biotech': 'researchers, regulatory professionals',
+            'consumer_goods': 'brand managers, consumers',
+            'environmental_services': 'environmental specialists',
+            'government_public_sector': 'government employees, citizens',
+            'insurance': 'insurance professionals, customers',
+            'professional_services': 'consultants, clients',
+            'nonprofit_social_impact': 'nonprofit staff, beneficiaries',
+            'mining_natural_resources': 'mining workers, specialists',
+            'food_beverage': 'food service staff, customers',
+            'ecommerce': 'ecommerce professionals, online shoppers',
+            'sports_fitness': 'fitness professionals, athletes',
+            'workforce_management': 'HR professionals, employees',
+            'security_safety': 'security professionals, protected individuals'
+        }
+        
+        return domain_defaults.get(domain, 'end users')
+    
+    def _detect_domain(self, text: str) -> str:
+        """Detect the primary domain from the text."""
+        text_lower = text.lower()
+        
+        domain_scores = {
+            label.split(':', 1)[1]: score
+            for label, score in self.keyword_matcher.group_counts(
+                text_lower, [f'industry:{domain}' for domain in self.industry_patterns]
+            ).items()
+        }
+        
+        if domain_scores:
+            return max(domain_scores, key=domain_scores.get)
+        return None
+    
+    def _extract_user_types(self, text: str, target_audience: str = None, detected_domain: str = None) -> str:
+        """Extract specific user types from the text, filtered by domain."""
+        text_lower = text.lower()
+        
+        # Check target audience first
+        if target_audience and target_audience != 'end users':
+            return target_audience
+        
+        # Get relevant user types based on detected domain
+        domain_user_types = self._get_domain_user_types(detected_domain)
+        
+        detected_types = []
+        for user_type in self.user_type_patterns:
+            # Only check user types relevant to the detected domain
+            if user_type in domain_user_types:
+                if self.keyword_matcher.contains_any(text_lower, f'users:{user_type}'):
+                    detected_types.append(user_type)
+        
+        if detected_types:
+            return ', '.join(detected_types).replace('_', ' ')
+        
+        # Domain-specific fallback
+        return self._get_domain_default_users(detected_domain)
+    
+    def _extract_technology_context(self, text: str) -> Dict[str, Any]:
+        """Extract technology and platform information."""
+        text_lower = text.lower()
+        tech_context = {}
+        
+        # Platform detection
+        if self.keyword_matcher.contains_any(text_lower, 'technology:web_platform'):
+            tech_context['platform'] = 'Web-based platform'
+        elif self.keyword_matcher.contains_any(text_lower, 'technology:mobile_platform'):
+            tech_context['platform'] = 'Mobile application'
+        elif self.keyword_matcher.contains_any(text_lower, 'technology:desktop_platform'):
+            tech_context['platform'] = 'Desktop application'
+        else:
+            tech_context['platform'] = 'Web application'
+        
+        # Data-related technology
+        if self.keyword_matcher.contains_any(text_lower, 'technology:real_time'):
+            tech_context['data_processing'] = 'Real-time data processing'
+        
+        if self.keyword_matcher.contains_any(text_lower, 'technology:visualization'):
+            tech_context['visualization'] = 'Data visualization and dashboards'
+        
+        if self.keyword_matcher.contains_any(text_lower, 'technology:integration'):
+            tech_context['integration'] = 'API integration and connectivity'
+        
+        return tech_context
+    
+    def _extract_business_goals(self, text: str, business_objectives: List[str] = None) -> Dict[str, Any]:
+        """Extract business goals and metrics."""
+        goals_context = {}
+        
+        # Extract percentage targets
+        percentage_pattern = r'(\d+)%'
+        percentages = re.findall(percentage_pattern, text)
+        if percentages:
+            goals_context['performance_targets'] = f"{', '.join(percentages)}% improvement targets"
+        
+        # Extract timeline information
+        timeline_pattern = r'(\d+)\s*(month|year|quarter)s?'
+        timelines = re.findall(timeline_pattern, text.lower())
+        if timelines:
+            timeline_str = ', '.join([f"{num} {period}s" for num, period in timelines])
+            goals_context['timeline'] = timeline_str
+        
+        # Extract revenue/financial targets
+        revenue_pattern = r'\$(\d+(?:,\d+)*)\s*(million|billion|thousand)?'
+        revenue_matches = re.findall(revenue_pattern, text)
+        if revenue_matches:
+            goals_context['revenue_targets'] = f"${', '.join([f'{amount} {unit}' for amount, unit in revenue_matches])}"
+        
+        # Use business objectives if provided and not generic
+        if business_objectives and business_objectives != ['TBD']:
+            goals_context['business_objectives'] = business_objectives
+        
+        return goals_context
+    
+    def _extract_domain_vocabulary(self, text: str) -> List[str]:
+        """Extract domain-specific vocabulary and terms."""
+        # Extract technical terms and domain-specific vocabulary
+        text_lower = text.lower()
+        found = self.keyword_matcher.find(text_lower)
+        vocabulary = [term for term in self.common_vocabulary_terms if term in found]
+        
         # Check each domain for vocabulary terms
-        for domain_key, domain_data in domain_vocabulary_mapping.items():
-            if any(trigger in text_lower for trigger in domain_data['triggers']):
+        for domain_key, domain_data in self.domain_vocabulary_mapping.items():
+            if self.keyword_matcher.contains_any(text_lower, f'vocabulary_trigger:{domain_key}'):
                 for term in domain_data['terms']:
-                    if term.lower() in text_lower:
+                    if term.lower() in found:
                         vocabulary.append(term)
         
         return vocabulary[:10]  # Limit to top 10 terms